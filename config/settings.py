@@ -66,6 +66,16 @@ class TradingConfig:
     trailing_min_improvement_percent: Decimal = Decimal('0.01')  # Update only if >= 0.01% improvement
     trailing_alert_if_unprotected_window_ms: int = 300  # Alert if unprotected window > 300ms
 
+    # Position price/PnL write-behind: mark ticks are flushed to DB in batches
+    position_db_flush_interval_sec: float = 2.0
+
+    # Protection sweep: account-wide Algo order snapshot, refetched when older than this
+    protection_snapshot_max_age_sec: float = 60.0
+
+    # Account ledger for can_open_position: REST reconcile period / max age before REST fallback
+    account_ledger_reconcile_sec: float = 60.0
+    account_ledger_max_age_sec: float = 300.0
+
     # NOTE: Aged position config removed 2026-02-12
     # Timeout logic handled by Smart Timeout v2.0 in signal_lifecycle.py
     commission_percent: Decimal = Decimal('0.05')
@@ -235,6 +245,14 @@ class Config:
             config.trailing_min_improvement_percent = Decimal(val)
         if val := os.getenv('TRAILING_ALERT_IF_UNPROTECTED_WINDOW_MS'):
             config.trailing_alert_if_unprotected_window_ms = int(val)
+        if val := os.getenv('POSITION_DB_FLUSH_INTERVAL_SEC'):
+            config.position_db_flush_interval_sec = float(val)
+        if val := os.getenv('PROTECTION_SNAPSHOT_MAX_AGE_SEC'):
+            config.protection_snapshot_max_age_sec = float(val)
+        if val := os.getenv('ACCOUNT_LEDGER_RECONCILE_SEC'):
+            config.account_ledger_reconcile_sec = float(val)
+        if val := os.getenv('ACCOUNT_LEDGER_MAX_AGE_SEC'):
+            config.account_ledger_max_age_sec = float(val)
 
         # Leverage control (RESTORED 2025-10-25)
         if val := os.getenv('LEVERAGE'):
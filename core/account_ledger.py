@@ -0,0 +1,301 @@
+"""
+In-Memory Account Ledger (Binance USD-M)
+
+Answers ExchangeManager.can_open_position without REST calls: USDT wallet
+balance, available margin, and per-symbol position notional / leverage /
+maxNotionalValue kept in memory.
+
+Sources:
+- reconcile(): fetch_balance + positionRisk for all symbols (two requests),
+  run by a slow timer (start()) and whenever the ledger is stale
+- ACCOUNT_UPDATE (wallet balance and position deltas) and
+  ACCOUNT_CONFIG_UPDATE (leverage) from BinanceHybridStream
+
+ACCOUNT_UPDATE carries no available balance, so it is tracked as the
+REST value adjusted by wallet balance changes (realized PnL, fees,
+funding) and by initial margin changes of positions (|amount| × entry /
+leverage). Unrealized PnL moves are only picked up on reconcile.
+
+is_fresh() is False while the user stream is down (on_stream_gap() until
+the next reconcile after on_stream_connected()) or when the last reconcile
+is older than max_age_sec; callers then use REST as before.
+
+balance_listener, when set, receives every new wallet balance (metrics
+drawdown without polling balance history).
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_LEDGER_RECONCILE_SEC = 60.0
+ACCOUNT_LEDGER_MAX_AGE_SEC = 300.0
+QUOTE_ASSET = 'USDT'
+
+
+@dataclass
+class LedgerPosition:
+    """One symbol / position side of the account."""
+    amount: float = 0.0              # Signed position amount
+    entry_price: float = 0.0
+    notional: float = 0.0            # Signed, mark based after reconcile, entry based after stream updates
+    leverage: float = 0.0            # 0 = unknown (default leverage used)
+
+    def initial_margin(self, default_leverage: float) -> float:
+        leverage = self.leverage or default_leverage
+        return abs(self.amount) * self.entry_price / leverage if leverage else 0.0
+
+
+class AccountLedger:
+    """
+    Account state for one exchange, fed by the user stream and reconciled over REST.
+
+    Usage:
+        ledger = AccountLedger(exchange.exchange, default_leverage=10)
+        ledger.start()                                  # slow reconcile timer
+        ledger.apply_account_update(data)               # ACCOUNT_UPDATE
+        if ledger.is_fresh():
+            free = ledger.available_balance
+    """
+
+    def __init__(self, exchange, default_leverage: float = 1.0,
+                 reconcile_interval_sec: float = ACCOUNT_LEDGER_RECONCILE_SEC,
+                 max_age_sec: float = ACCOUNT_LEDGER_MAX_AGE_SEC):
+        """
+        Args:
+            exchange: CCXT exchange instance (ExchangeManager.exchange)
+            default_leverage: Leverage for symbols positionRisk did not report
+            reconcile_interval_sec: Slow REST reconcile period
+            max_age_sec: Ledger is not used when the last reconcile is older than this
+        """
+        self.exchange = exchange
+        self.default_leverage = float(default_leverage)
+        self.reconcile_interval_sec = float(reconcile_interval_sec)
+        self.max_age_sec = float(max_age_sec)
+
+        self.wallet_balance = 0.0
+        self.available_balance = 0.0
+        self.positions: Dict[tuple, LedgerPosition] = {}       # {(symbol, position_side): LedgerPosition}
+        self.max_notional: Dict[str, str] = {}                 # {symbol: maxNotionalValue as reported}
+        self.leverage: Dict[str, float] = {}                   # {symbol: leverage}
+
+        self.stream_connected = False
+        self._reconciled_at: Optional[float] = None
+        self._reconcile_lock = asyncio.Lock()
+        self._updates_during_reconcile: Optional[List[tuple]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.balance_listener: Optional[Callable[[float], None]] = None
+
+        # Stats
+        self.reconciles = 0
+        self.reconcile_errors = 0
+        self.updates_applied = 0
+        self.stream_gaps = 0
+        self.hits = 0
+        self.misses = 0
+
+    # ==================== Freshness ====================
+
+    def is_fresh(self) -> bool:
+        return (
+            self.stream_connected
+            and self._reconciled_at is not None
+            and time.monotonic() - self._reconciled_at <= self.max_age_sec
+        )
+
+    def on_stream_connected(self) -> None:
+        """User stream (re)connected: usable again after the next reconcile."""
+        self.stream_connected = True
+        self._reconciled_at = None
+        self._ensure_task()
+
+    def on_stream_gap(self) -> None:
+        """User stream lost: deltas may be missing until reconciled."""
+        if self.stream_connected:
+            self.stream_gaps += 1
+        self.stream_connected = False
+        self._reconciled_at = None
+
+    # ==================== REST reconcile ====================
+
+    def start(self) -> None:
+        self._ensure_task()
+
+    def _ensure_task(self) -> None:
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._reconcile_loop())
+            except RuntimeError:
+                pass  # No running loop (sync construction in tests)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            if self.stream_connected:
+                await self.reconcile()
+            await asyncio.sleep(self._next_reconcile_delay())
+
+    def _next_reconcile_delay(self) -> float:
+        # Retry sooner while a reconnect left the ledger without a baseline
+        if self.stream_connected and self._reconciled_at is None:
+            return min(5.0, self.reconcile_interval_sec)
+        return self.reconcile_interval_sec
+
+    async def reconcile(self) -> bool:
+        """Replace ledger state with REST (fetch_balance + positionRisk for all symbols)."""
+        async with self._reconcile_lock:
+            self._updates_during_reconcile = []
+            try:
+                balance = await self.exchange.fetch_balance()
+                position_risk = await self.exchange.fapiPrivateV2GetPositionRisk({})
+            except Exception as e:
+                self.reconcile_errors += 1
+                logger.warning(f"Account ledger reconcile failed: {e}")
+                return False
+            finally:
+                updates, self._updates_during_reconcile = self._updates_during_reconcile, None
+
+            usdt = balance.get(QUOTE_ASSET, {}) or {}
+            self.available_balance = float(usdt.get('free', 0) or 0)
+            self.wallet_balance = float(usdt.get('total', 0) or 0)
+            for asset in (balance.get('info') or {}).get('assets', []) or []:
+                if asset.get('asset') == QUOTE_ASSET and asset.get('walletBalance') is not None:
+                    self.wallet_balance = float(asset['walletBalance'])
+            self._notify_balance()
+
+            positions: Dict[tuple, LedgerPosition] = {}
+            max_notional: Dict[str, str] = {}
+            leverage: Dict[str, float] = {}
+            for risk in position_risk or []:
+                symbol = risk.get('symbol')
+                if not symbol:
+                    continue
+                if risk.get('maxNotionalValue') is not None:
+                    max_notional[symbol] = risk['maxNotionalValue']
+                if risk.get('leverage'):
+                    leverage[symbol] = float(risk['leverage'])
+                amount = float(risk.get('positionAmt', 0) or 0)
+                if amount != 0:
+                    positions[(symbol, risk.get('positionSide', 'BOTH'))] = LedgerPosition(
+                        amount=amount,
+                        entry_price=float(risk.get('entryPrice', 0) or 0),
+                        notional=float(risk.get('notional', 0) or 0),
+                        leverage=leverage.get(symbol, 0.0),
+                    )
+            self.positions = positions
+            self.max_notional = max_notional
+            self.leverage = leverage
+            self._reconciled_at = time.monotonic()
+            self.reconciles += 1
+
+            # Stream events received while REST was in flight are newer than the response
+            for kind, data in updates:
+                self._apply(kind, data)
+
+            logger.debug(
+                f"Account ledger reconciled: wallet={self.wallet_balance:.2f}, "
+                f"available={self.available_balance:.2f}, positions={len(positions)}"
+            )
+            return True
+
+    # ==================== User stream ====================
+
+    def apply_account_update(self, data: Dict) -> None:
+        """ACCOUNT_UPDATE event (raw user stream message)."""
+        self._record('account', data)
+
+    def apply_config_update(self, data: Dict) -> None:
+        """ACCOUNT_CONFIG_UPDATE event (raw user stream message)."""
+        self._record('config', data)
+
+    def _record(self, kind: str, data: Dict) -> None:
+        if self._updates_during_reconcile is not None:
+            self._updates_during_reconcile.append((kind, data))
+        self._apply(kind, data)
+        self.updates_applied += 1
+
+    def _apply(self, kind: str, data: Dict) -> None:
+        if kind == 'account':
+            account = data.get('a', {})
+            for entry in account.get('B', []):
+                if entry.get('a') == QUOTE_ASSET and entry.get('wb') is not None:
+                    wallet_balance = float(entry['wb'])
+                    self.available_balance += wallet_balance - self.wallet_balance
+                    self.wallet_balance = wallet_balance
+                    self._notify_balance()
+            for entry in account.get('P', []):
+                symbol = entry.get('s')
+                if not symbol:
+                    continue
+                key = (symbol, entry.get('ps', 'BOTH'))
+                amount = float(entry.get('pa', 0) or 0)
+                entry_price = float(entry.get('ep', 0) or 0)
+                self._set_position(key, amount, entry_price)
+        elif kind == 'config':
+            config = data.get('ac', {})
+            symbol = config.get('s')
+            if symbol and config.get('l'):
+                new_leverage = float(config['l'])
+                for key, position in self.positions.items():
+                    if key[0] == symbol:
+                        self.available_balance += position.initial_margin(self.default_leverage)
+                        position.leverage = new_leverage
+                        self.available_balance -= position.initial_margin(self.default_leverage)
+                self.leverage[symbol] = new_leverage
+
+    def _notify_balance(self) -> None:
+        if self.balance_listener is None:
+            return
+        try:
+            self.balance_listener(self.wallet_balance)
+        except Exception as e:
+            logger.warning(f"Account ledger balance listener failed: {e}")
+
+    def _set_position(self, key: tuple, amount: float, entry_price: float) -> None:
+        old = self.positions.get(key)
+        if old:
+            self.available_balance += old.initial_margin(self.default_leverage)
+        if amount == 0:
+            self.positions.pop(key, None)
+            return
+        position = LedgerPosition(
+            amount=amount,
+            entry_price=entry_price,
+            notional=amount * entry_price,
+            leverage=self.leverage.get(key[0], 0.0),
+        )
+        self.positions[key] = position
+        self.available_balance -= position.initial_margin(self.default_leverage)
+
+    # ==================== Queries ====================
+
+    def total_notional(self) -> float:
+        return sum(abs(p.notional) for p in self.positions.values())
+
+    def get_stats(self) -> Dict:
+        return {
+            'fresh': self.is_fresh(),
+            'stream_connected': self.stream_connected,
+            'age_sec': round(time.monotonic() - self._reconciled_at, 1) if self._reconciled_at is not None else None,
+            'wallet_balance': round(self.wallet_balance, 2),
+            'available_balance': round(self.available_balance, 2),
+            'positions': len(self.positions),
+            'reconciles': self.reconciles,
+            'reconcile_errors': self.reconcile_errors,
+            'updates_applied': self.updates_applied,
+            'stream_gaps': self.stream_gaps,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -17,6 +17,7 @@ from decimal import Decimal
 import uuid
 from database.transactional_repository import TransactionalRepository
 from core.event_logger import EventLogger, EventType, log_event
+from core.latency_trace import NULL_TRACE
 from core.exchange_response_adapter import ExchangeResponseAdapter
 
 if TYPE_CHECKING:
@@ -581,6 +582,7 @@ class AtomicPositionManager:
         logger.info(f"Atomic params from {source}: SL={stop_loss_percent}%, TS_act={trailing_activation_percent}%, TS_cb={trailing_callback_percent}%")
 
         operation_id = f"pos_{symbol}_{now_utc().timestamp()}"
+        trace = getattr(request, 'trace', None) or NULL_TRACE
 
         position_id = None
         entry_order = None
@@ -774,6 +776,8 @@ class AtomicPositionManager:
                         # Fallback to signal price
                         exec_price = entry_price
 
+                trace.mark('entry_order')
+
                 # Step 2: Создание записи позиции с REAL execution price
                 # Position created AFTER order execution to use real fill price
                 logger.info(f"📝 Creating position record for {symbol} with exec price ${exec_price:.8f}")
@@ -886,6 +890,8 @@ class AtomicPositionManager:
                     logger.error(f"❌ Unexpected error during position verification: {e}")
                     raise AtomicPositionError(f"Position verification error: {e}")
 
+                trace.mark('position_record')
+
                 # Step 3: Размещение stop-loss с retry
                 logger.info(f"🛡️ Placing stop-loss for {symbol} at {stop_loss_price}")
                 state = PositionState.PENDING_SL
@@ -954,6 +960,7 @@ class AtomicPositionManager:
 
                 if not sl_placed:
                     raise AtomicPositionError("Stop-loss placement failed")
+                trace.mark('sl_placement')
 
                 # Step 4: Активация позиции с defensive check (Layer 3 defense)
                 activation_successful = await self._safe_activate_position(
@@ -971,6 +978,8 @@ class AtomicPositionManager:
                     )
 
                 state = PositionState.ACTIVE
+                trace.mark('activation')
+                trace.set(position_id=position_id)
                 logger.info(f"🎉 Position {symbol} is ACTIVE with protection")
 
                 return {
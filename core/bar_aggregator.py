@@ -6,7 +6,9 @@ Aggregates raw aggTrade data into 1-second bars with:
 - Delta (buy_volume - sell_volume)
 - Large trade counts (>$10k)
 
-Maintains cumulative sum arrays for O(1) rolling calculations.
+Maintains cumulative sum arrays for O(1) rolling calculations, and
+streaming indicator state (gain/loss and |delta|² prefix sums, rolling
+high/low) so the Smart Timeout indicators are O(1) per query.
 
 Based on: TRADING_BOT_ALGORITHM_SPEC.md §1.3, §9
 """
@@ -15,7 +17,8 @@ import logging
 import time
 from collections import deque
 from dataclasses import dataclass, field
-from typing import Optional, Deque, Callable
+from itertools import islice
+from typing import Optional, Deque, Callable, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +30,13 @@ DYNAMIC_THRESHOLD_PERCENTILE = 90   # P90 = top 10% of trades are "large"
 DYNAMIC_MIN_SAMPLES = 500           # Min trades before calibration
 TRADE_VOLUME_BUFFER_SIZE = 10_000   # Rolling buffer of trade volumes
 
+# Window of the streaming high/low (compute_extremes default = 1h)
+EXTREMES_WINDOW_SEC = 3600
+
+# Relative variance below which |delta| is treated as constant (z-score = 0);
+# absorbs rounding left over from differencing prefix sums of squares
+ZSCORE_VARIANCE_EPS = 1e-12
+
 
 @dataclass
 class OneSecondBar:
@@ -38,6 +48,50 @@ class OneSecondBar:
     large_sell_count: int   # Number of sell trades > $10k
 
 
+class RollingExtremes:
+    """
+    Sliding-window low/high over a stream of prices.
+
+    Monotonic deques of (seq, price): push() is amortised O(1), low/high
+    are O(1). Tracks the last `window` pushed values.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._seq = 0
+        self._mins: Deque[Tuple[int, float]] = deque()
+        self._maxs: Deque[Tuple[int, float]] = deque()
+
+    def push(self, price: float):
+        seq = self._seq
+        self._seq += 1
+
+        mins = self._mins
+        while mins and mins[-1][1] >= price:
+            mins.pop()
+        mins.append((seq, price))
+
+        maxs = self._maxs
+        while maxs and maxs[-1][1] <= price:
+            maxs.pop()
+        maxs.append((seq, price))
+
+        # At most one entry leaves the window per push
+        expired = seq - self.window
+        if mins[0][0] <= expired:
+            mins.popleft()
+        if maxs[0][0] <= expired:
+            maxs.popleft()
+
+    @property
+    def low(self) -> float:
+        return self._mins[0][1]
+
+    @property
+    def high(self) -> float:
+        return self._maxs[0][1]
+
+
 class BarAggregator:
     """
     Per-symbol 1-second bar aggregator with cumulative sums.
@@ -56,30 +110,20 @@ class BarAggregator:
         avg_abs = agg.get_avg_abs_delta(lookback=100)
     """
 
-    def __init__(self, symbol: str, max_bars: int = 4000):
+    def __init__(self, symbol: str, max_bars: int = 4000, clock: Optional[Callable[[], float]] = None):
         """
         Args:
             symbol: Trading pair (e.g., 'BTCUSDT')
             max_bars: Max bars to retain (must cover max(delta_window) + 100)
+            clock: Epoch seconds for trades without a timestamp and empty bars
+                   (default: wall clock)
         """
         self.symbol = symbol
         self.max_bars = max_bars
+        self.clock = clock or (lambda: time.time())
 
-        # Completed bars
-        self.bars: Deque[OneSecondBar] = deque(maxlen=max_bars)
-
-        # Cumulative sums for O(1) rolling calculations
-        # Index 0 = sum before first bar, index i = sum including bar i-1
-        self.cumsum_delta: Deque[float] = deque(maxlen=max_bars + 1)
-        self.cumsum_abs_delta: Deque[float] = deque(maxlen=max_bars + 1)
-
-        # Initialize cumsum with zero baseline
-        self.cumsum_delta.append(0.0)
-        self.cumsum_abs_delta.append(0.0)
-
-        # Count of bars with actual trades (for avg_abs_delta dilution fix)
-        self.cumsum_trade_count: Deque[int] = deque(maxlen=max_bars + 1)
-        self.cumsum_trade_count.append(0)
+        # Completed bars + cumulative sums
+        self._init_storage()
 
         # Current (incomplete) bar accumulator
         self._current_ts: int = 0
@@ -97,6 +141,73 @@ class BarAggregator:
         # Callback when new bar is completed
         self.on_bar_callback: Optional[Callable] = None
 
+    def _init_storage(self):
+        """Allocate bar buffer and cumulative sums (overridden by columnar mode)."""
+        # Completed bars
+        self.bars: Deque[OneSecondBar] = deque(maxlen=self.max_bars)
+
+        # Cumulative sums for O(1) rolling calculations
+        # Index 0 = sum before first bar, index i = sum including bar i-1
+        self.cumsum_delta: Deque[float] = deque(maxlen=self.max_bars + 1)
+        self.cumsum_abs_delta: Deque[float] = deque(maxlen=self.max_bars + 1)
+
+        # Initialize cumsum with zero baseline
+        self.cumsum_delta.append(0.0)
+        self.cumsum_abs_delta.append(0.0)
+
+        # Count of bars with actual trades (for avg_abs_delta dilution fix)
+        self.cumsum_trade_count: Deque[int] = deque(maxlen=self.max_bars + 1)
+        self.cumsum_trade_count.append(0)
+
+        # Streaming indicator state (Smart Timeout v2.0):
+        # price gains/losses for RSI, |delta|² for the volume z-score
+        self.cumsum_gain: Deque[float] = deque([0.0], maxlen=self.max_bars + 1)
+        self.cumsum_loss: Deque[float] = deque([0.0], maxlen=self.max_bars + 1)
+        self.cumsum_sq_abs_delta: Deque[float] = deque([0.0], maxlen=self.max_bars + 1)
+        self._extremes = RollingExtremes(min(EXTREMES_WINDOW_SEC, self.max_bars))
+
+        # Bars seen by _append_bar (detects bars appended to self.bars directly)
+        self._bars_appended: int = 0
+        self._last_appended: Optional[OneSecondBar] = None
+
+    def _append_bar(self, bar: OneSecondBar, has_trades: bool):
+        """
+        Store a completed bar and extend the cumulative sums.
+
+        Empty bars (has_trades=False) do not count towards the trade-bar
+        count used by get_avg_abs_delta.
+        """
+        change = bar.price - self.bars[-1].price if self.bars else 0.0
+        abs_delta = abs(bar.delta)
+
+        self.bars.append(bar)
+        self.cumsum_delta.append(self.cumsum_delta[-1] + bar.delta)
+        self.cumsum_abs_delta.append(self.cumsum_abs_delta[-1] + abs_delta)
+        self.cumsum_trade_count.append(self.cumsum_trade_count[-1] + (1 if has_trades else 0))
+
+        self.cumsum_gain.append(self.cumsum_gain[-1] + (change if change > 0 else 0.0))
+        self.cumsum_loss.append(self.cumsum_loss[-1] + (-change if change < 0 else 0.0))
+        self.cumsum_sq_abs_delta.append(self.cumsum_sq_abs_delta[-1] + abs_delta * abs_delta)
+        self._extremes.push(bar.price)
+
+        self._bars_appended += 1
+        self._last_appended = bar
+
+    def _streaming_in_sync(self) -> bool:
+        """
+        True if every stored bar went through _append_bar.
+
+        Bars appended to self.bars directly are not reflected in the
+        streaming indicator state; the indicator methods then fall back to
+        a full scan of self.bars. Stored bars are treated as immutable.
+        """
+        if not self.bars:
+            return self._bars_appended == 0
+        return (
+            self.bars[-1] is self._last_appended
+            and len(self.bars) == min(self._bars_appended, self.max_bars)
+        )
+
     def on_trade(self, price: float, qty: float, is_buyer_maker: bool, trade_time_ms: int = 0):
         """
         Process a single aggTrade.
@@ -109,7 +220,7 @@ class BarAggregator:
             is_buyer_maker: True if buyer is maker (= seller-initiated trade)
             trade_time_ms: Trade timestamp in milliseconds (optional, uses wall clock if 0)
         """
-        ts_sec = int(trade_time_ms / 1000) if trade_time_ms > 0 else int(time.time())
+        ts_sec = int(trade_time_ms / 1000) if trade_time_ms > 0 else int(self.clock())
 
         # Detect second boundary → flush previous bar
         if self._has_trades and ts_sec != self._current_ts:
@@ -157,14 +268,7 @@ class BarAggregator:
             large_sell_count=self._current_large_sell,
         )
 
-        self.bars.append(bar)
-
-        # Update cumulative sums
-        prev_delta = self.cumsum_delta[-1]
-        prev_abs = self.cumsum_abs_delta[-1]
-        self.cumsum_delta.append(prev_delta + bar.delta)
-        self.cumsum_abs_delta.append(prev_abs + abs(bar.delta))
-        self.cumsum_trade_count.append(self.cumsum_trade_count[-1] + 1)
+        self._append_bar(bar, has_trades=True)
 
         # Reset accumulator
         self._current_ts = 0
@@ -180,35 +284,35 @@ class BarAggregator:
 
         return bar
 
-    def tick(self) -> Optional[OneSecondBar]:
+    def tick(self, ts: Optional[int] = None) -> Optional[OneSecondBar]:
         """
         Called every second by lifecycle timer (§12.3).
         
         If trades arrived, flushes normally.
         If no trades but we have history, creates empty bar 
         with last known price and delta=0.
+
+        Args:
+            ts: Second of the empty bar (default: now); the bar clock
+                passes each boundary when catching up after a stall
         
         Returns:
             Completed bar (real or empty), or None if no history exists
         """
         if self._has_trades:
             return self._flush_current_bar()
-        elif self.bars:
+        elif self.bar_count:
             # §12.3: Empty bar with last known price
-            last = self.bars[-1]
+            last = self.get_latest_bar()
             bar = OneSecondBar(
-                ts=int(time.time()),
+                ts=int(self.clock()) if ts is None else ts,
                 price=last.price,
                 delta=0.0,
                 large_buy_count=0,
                 large_sell_count=0,
             )
-            self.bars.append(bar)
-
-            # Update cumulative sums (delta=0, abs_delta=0, trade_count unchanged)
-            self.cumsum_delta.append(self.cumsum_delta[-1])
-            self.cumsum_abs_delta.append(self.cumsum_abs_delta[-1])
-            self.cumsum_trade_count.append(self.cumsum_trade_count[-1])
+            # Cumulative sums: delta=0, abs_delta=0, trade_count unchanged
+            self._append_bar(bar, has_trades=False)
 
             # Notify callback
             if self.on_bar_callback:
@@ -223,12 +327,7 @@ class BarAggregator:
         
         Called when loading history via REST API before live monitoring.
         """
-        self.bars.append(bar)
-        prev_delta = self.cumsum_delta[-1]
-        prev_abs = self.cumsum_abs_delta[-1]
-        self.cumsum_delta.append(prev_delta + bar.delta)
-        self.cumsum_abs_delta.append(prev_abs + abs(bar.delta))
-        self.cumsum_trade_count.append(self.cumsum_trade_count[-1] + 1)
+        self._append_bar(bar, has_trades=True)
 
     def get_rolling_delta(self, window_sec: int) -> float:
         """
@@ -320,6 +419,19 @@ class BarAggregator:
         )
         return new_threshold
 
+    def get_large_trade_counts(self, window_sec: int = 60) -> Tuple[int, int]:
+        """
+        (large_buys, large_sells) summed over the last window_sec bars.
+
+        Walks only the tail of the buffer (no copy of the whole deque).
+        """
+        large_buys = 0
+        large_sells = 0
+        for bar in islice(reversed(self.bars), max(window_sec, 0)):
+            large_buys += bar.large_buy_count
+            large_sells += bar.large_sell_count
+        return large_buys, large_sells
+
     def get_latest_bar(self) -> Optional[OneSecondBar]:
         """Get the most recently completed bar."""
         return self.bars[-1] if self.bars else None
@@ -343,7 +455,9 @@ class BarAggregator:
         RSI from 1-second bars.
 
         Default period=840 = 14 minutes (14 × 60 seconds).
-        Uses standard Wilder RSI formula.
+        Simple-average RSI (Cutler): the mean gain and mean loss of the last
+        `period` bar-to-bar price changes, not Wilder's exponential smoothing.
+        O(1) via gain/loss prefix sums.
 
         Returns:
             RSI value 0-100, or 50.0 (neutral) if insufficient data.
@@ -352,6 +466,11 @@ class BarAggregator:
         if n < period + 1:
             return 50.0  # Neutral — not enough data
 
+        if self._streaming_in_sync():
+            gains = self.cumsum_gain[-1] - self.cumsum_gain[-(period + 1)]
+            losses = self.cumsum_loss[-1] - self.cumsum_loss[-(period + 1)]
+            return self._rsi_from_sums(gains, losses, period)
+
         gains = 0.0
         losses = 0.0
         for i in range(n - period, n):
@@ -360,7 +479,10 @@ class BarAggregator:
                 gains += change
             else:
                 losses -= change  # Make positive
+        return self._rsi_from_sums(gains, losses, period)
 
+    @staticmethod
+    def _rsi_from_sums(gains: float, losses: float, period: int) -> float:
         avg_gain = gains / period
         avg_loss = losses / period
 
@@ -374,6 +496,7 @@ class BarAggregator:
         Volume Z-score: current minute volume vs rolling hourly average.
 
         Uses |delta| as volume proxy (buy+sell pressure magnitude).
+        O(1) via prefix sums of |delta| and |delta|².
 
         Args:
             window: Full lookback for mean/std (default 3600s = 1h)
@@ -386,6 +509,12 @@ class BarAggregator:
         if n < window:
             return 0.0
 
+        if self._streaming_in_sync():
+            total = self.cumsum_abs_delta[-1] - self.cumsum_abs_delta[-(window + 1)]
+            total_sq = self.cumsum_sq_abs_delta[-1] - self.cumsum_sq_abs_delta[-(window + 1)]
+            recent = self.cumsum_abs_delta[-1] - self.cumsum_abs_delta[-(recent_window + 1)]
+            return self._zscore_from_sums(total, total_sq, recent, window, recent_window)
+
         volumes = [abs(self.bars[i].delta) for i in range(n - window, n)]
         recent_avg = sum(volumes[-recent_window:]) / recent_window
         mean = sum(volumes) / len(volumes)
@@ -397,6 +526,16 @@ class BarAggregator:
             return 0.0
         return (recent_avg - mean) / std
 
+    @staticmethod
+    def _zscore_from_sums(total: float, total_sq: float, recent: float,
+                          window: int, recent_window: int) -> float:
+        """Volume z-score from window sums of |delta| and |delta|²."""
+        mean = total / window
+        variance = total_sq / window - mean * mean
+        if variance <= ZSCORE_VARIANCE_EPS * mean * mean:
+            return 0.0
+        return (recent / recent_window - mean) / variance ** 0.5
+
     def compute_pair_momentum(self, window_sec: int) -> float:
         """
         Price change percentage over window.
@@ -415,10 +554,13 @@ class BarAggregator:
             return 0.0
         return ((self.bars[-1].price - old_price) / old_price) * 100.0
 
-    def compute_extremes(self, window_sec: int = 3600) -> dict:
+    def compute_extremes(self, window_sec: int = EXTREMES_WINDOW_SEC) -> dict:
         """
         Position of current price relative to hour high/low.
 
+        O(1) for the streaming window (EXTREMES_WINDOW_SEC); other windows
+        scan the bars.
+
         Returns:
             dict with:
                 'position': 0.0 (at low) to 1.0 (at high)
@@ -430,14 +572,21 @@ class BarAggregator:
         if actual_window < 10:
             return {'position': 0.5, 'near_low': False, 'near_high': False}
 
-        prices = [self.bars[n - actual_window + i].price for i in range(actual_window)]
-        low = min(prices)
-        high = max(prices)
-        rng = high - low
+        if actual_window == min(self._extremes.window, n) and self._streaming_in_sync():
+            low = self._extremes.low
+            high = self._extremes.high
+        else:
+            prices = [self.bars[n - actual_window + i].price for i in range(actual_window)]
+            low = min(prices)
+            high = max(prices)
+        return self._extremes_from(low, high, self.bars[-1].price)
 
+    @staticmethod
+    def _extremes_from(low: float, high: float, price: float) -> dict:
+        rng = high - low
         if rng == 0:
             return {'position': 0.5, 'near_low': False, 'near_high': False}
 
-        pos = (self.bars[-1].price - low) / rng
+        pos = (price - low) / rng
         return {'position': pos, 'near_low': pos < 0.15, 'near_high': pos > 0.85}
 
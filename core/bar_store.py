@@ -0,0 +1,231 @@
+"""
+Persistent 1-Second Bar Store
+
+Append-only binary file per symbol (<directory>/<SYMBOL>.bars) with fixed
+32-byte records: ts int64, price float64, delta float64, large buy / sell
+counts int32. Completed bars are buffered in memory and appended in a
+worker thread (asyncio.to_thread) at most once per flush interval, so the
+event loop never blocks on disk; on restart they are read back through a
+NumPy memmap, so a lifecycle's BarAggregator is warm before any REST
+lookback call.
+
+Retention is per symbol (seconds). A file is compacted — the retained tail
+rewritten to a temp file and atomically swapped in — once it holds more
+than compaction_factor × retention records.
+
+Large trade counts are stored as computed live (with the aggregator's
+threshold at the time).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from core.bar_aggregator import OneSecondBar
+
+logger = logging.getLogger(__name__)
+
+BAR_RECORD_DTYPE = np.dtype([
+    ('ts', '<i8'),
+    ('price', '<f8'),
+    ('delta', '<f8'),
+    ('large_buy', '<i4'),
+    ('large_sell', '<i4'),
+])
+
+BAR_STORE_RETENTION_SEC = 3600      # Bars kept per symbol (≈ seconds)
+BAR_STORE_COMPACTION_FACTOR = 2.0   # Compact when file > factor × retention records
+BAR_STORE_FLUSH_INTERVAL_SEC = 5.0  # Background flush period (bars buffered in between)
+
+
+def parse_retention_by_symbol(spec: str) -> Dict[str, int]:
+    """
+    Parse per-symbol retention overrides: "BTCUSDT=7200,ETHUSDT=7200".
+
+    Invalid entries are skipped with a warning.
+    """
+    overrides: Dict[str, int] = {}
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        symbol, _, value = item.partition('=')
+        try:
+            overrides[symbol.strip().upper()] = int(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid bar store retention override: {item!r}")
+    return overrides
+
+
+class BarStore:
+    """
+    Per-symbol append-only bar files.
+
+    Usage:
+        store = BarStore('data/bars', retention_sec=3600)
+        store.append('BTCUSDT', bar)        # on every completed bar
+        store.maybe_flush()                 # once per tick (threaded, on a timer)
+        await store.close()                 # shutdown: write what is left
+        bars = store.load('BTCUSDT', since_ts=now - 3600)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        retention_sec: int = BAR_STORE_RETENTION_SEC,
+        compaction_factor: float = BAR_STORE_COMPACTION_FACTOR,
+        retention_by_symbol: Optional[Dict[str, int]] = None,
+        flush_interval_sec: float = BAR_STORE_FLUSH_INTERVAL_SEC,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.retention_sec = retention_sec
+        self.compaction_factor = max(1.0, compaction_factor)
+        self.retention_by_symbol = {
+            s.upper(): r for s, r in (retention_by_symbol or {}).items()
+        }
+
+        self.flush_interval_sec = flush_interval_sec
+
+        self._pending: Dict[str, List[tuple]] = {}
+        self._record_counts: Dict[str, int] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_flush = 0.0
+
+        # Stats
+        self.records_written = 0
+        self.compactions = 0
+
+    def retention_for(self, symbol: str) -> int:
+        return self.retention_by_symbol.get(symbol.upper(), self.retention_sec)
+
+    def _path(self, symbol: str) -> Path:
+        return self.directory / f"{symbol.upper()}.bars"
+
+    def append(self, symbol: str, bar: OneSecondBar):
+        """Buffer a completed bar (written on the next flush)."""
+        self._pending.setdefault(symbol.upper(), []).append(
+            (bar.ts, bar.price, bar.delta, bar.large_buy_count, bar.large_sell_count)
+        )
+
+    def maybe_flush(self):
+        """
+        Bar clock hook: hand the buffered bars to a worker thread, at most
+        once per flush_interval_sec and with one write in flight.
+        """
+        if not self._pending or (self._flush_task and not self._flush_task.done()):
+            return
+        now = time.monotonic()
+        if now - self._last_flush < self.flush_interval_sec:
+            return
+        self._last_flush = now
+        pending, self._pending = self._pending, {}
+        self._flush_task = asyncio.create_task(asyncio.to_thread(self._write_pending, pending))
+
+    async def close(self):
+        """Wait for an in-flight write, then write the remaining bars (off the loop)."""
+        if self._flush_task:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await asyncio.to_thread(self.flush)
+
+    def flush(self) -> int:
+        """Append buffered bars to their files now (blocking). Returns records written."""
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        return self._write_pending(pending)
+
+    def _write_pending(self, pending: Dict[str, List[tuple]]) -> int:
+        written = 0
+        for symbol, rows in pending.items():
+            try:
+                written += self._append_records(symbol, np.array(rows, dtype=BAR_RECORD_DTYPE))
+            except OSError as e:
+                logger.error(f"Bar store write failed for {symbol}: {e}")
+        self.records_written += written
+        return written
+
+    def _append_records(self, symbol: str, records: np.ndarray) -> int:
+        path = self._path(symbol)
+        count = self._record_counts.get(symbol)
+        if count is None:
+            count = self._trim_partial_record(path)
+
+        with open(path, 'ab') as f:
+            records.tofile(f)
+        count += len(records)
+        self._record_counts[symbol] = count
+
+        if count > self.retention_for(symbol) * self.compaction_factor:
+            self.compact(symbol)
+        return len(records)
+
+    @staticmethod
+    def _trim_partial_record(path: Path) -> int:
+        """Drop a torn trailing record (crash mid-write). Returns whole records in file."""
+        if not path.exists():
+            return 0
+        size = path.stat().st_size
+        whole = size // BAR_RECORD_DTYPE.itemsize
+        if size % BAR_RECORD_DTYPE.itemsize:
+            os.truncate(path, whole * BAR_RECORD_DTYPE.itemsize)
+        return whole
+
+    def _read(self, symbol: str) -> np.ndarray:
+        """Memory-map the whole records in a symbol's file (empty if none)."""
+        path = self._path(symbol)
+        if not path.exists():
+            return np.empty(0, dtype=BAR_RECORD_DTYPE)
+        whole = path.stat().st_size // BAR_RECORD_DTYPE.itemsize
+        if whole == 0:
+            return np.empty(0, dtype=BAR_RECORD_DTYPE)
+        return np.memmap(path, dtype=BAR_RECORD_DTYPE, mode='r', shape=(whole,))
+
+    def compact(self, symbol: str):
+        """Rewrite a symbol's file keeping only bars within its retention."""
+        symbol = symbol.upper()
+        path = self._path(symbol)
+        records = self._read(symbol)
+        if len(records) == 0:
+            return
+
+        cutoff = int(records['ts'][-1]) - self.retention_for(symbol)
+        kept = np.array(records[records['ts'] > cutoff])
+        del records
+
+        tmp = path.with_suffix('.bars.tmp')
+        kept.tofile(tmp)
+        os.replace(tmp, path)
+        self._record_counts[symbol] = len(kept)
+        self.compactions += 1
+
+    def load(self, symbol: str, since_ts: int = 0) -> List[OneSecondBar]:
+        """Stored bars with ts >= since_ts (within retention), oldest first."""
+        symbol = symbol.upper()
+        records = self._read(symbol)
+        if len(records) == 0:
+            return []
+
+        since_ts = max(since_ts, int(records['ts'][-1]) - self.retention_for(symbol) + 1)
+        selected = records[records['ts'] >= since_ts]
+        return [
+            OneSecondBar(ts=ts, price=price, delta=delta, large_buy_count=lb, large_sell_count=ls)
+            for ts, price, delta, lb, ls in selected.tolist()
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bar store statistics."""
+        return {
+            'directory': str(self.directory),
+            'symbols': len(self._record_counts),
+            'records_written': self.records_written,
+            'compactions': self.compactions,
+            'pending': sum(len(rows) for rows in self._pending.values()),
+        }
@@ -0,0 +1,259 @@
+"""
+Columnar (NumPy) storage mode for BarAggregator
+
+Same public API as BarAggregator, but completed bars and their cumulative
+sums live in preallocated circular NumPy arrays instead of a deque of
+OneSecondBar dataclasses:
+
+- ts (int64), price / delta (float64), large buy / sell counts (int32)
+- prefix sums of delta, |delta|, trade-bar count and large counts
+
+Each ring is written twice (at i and i + capacity), so any trailing window
+is a contiguous view. Rolling sums and the Smart Timeout indicators use the
+same streaming state as deque mode (prefix sums, RollingExtremes); windows
+outside the streaming high/low fall back to vectorised NumPy expressions.
+
+Enabled per SignalLifecycleManager via bar_storage='columnar'
+(BAR_STORAGE env in main.py).
+"""
+
+import logging
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from core.bar_aggregator import (
+    BarAggregator,
+    EXTREMES_WINDOW_SEC,
+    OneSecondBar,
+    RollingExtremes,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _Ring:
+    """
+    Fixed-capacity circular NumPy buffer.
+
+    Every value is written at i and i + capacity, so the last n values
+    (n <= capacity) are always the contiguous slice ending at the newest.
+    """
+
+    __slots__ = ('capacity', '_buf', '_count')
+
+    def __init__(self, capacity: int, dtype):
+        self.capacity = capacity
+        self._buf = np.zeros(2 * capacity, dtype=dtype)
+        self._count = 0
+
+    def push(self, value):
+        i = self._count % self.capacity
+        self._buf[i] = value
+        self._buf[i + self.capacity] = value
+        self._count += 1
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def _end(self) -> int:
+        return (self._count - 1) % self.capacity + self.capacity + 1
+
+    def tail(self, n: int) -> np.ndarray:
+        """Contiguous view of the last n values (oldest → newest)."""
+        end = self._end()
+        return self._buf[end - n:end]
+
+    def at(self, index: int):
+        """Value by position (negative = from newest)."""
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('ring index out of range')
+        return self._buf[self._end() - n + index]
+
+    def last(self):
+        return self._buf[self._end() - 1]
+
+
+class _ColumnarBarView:
+    """
+    Read-only sequence view over the columnar bars.
+
+    Indexing and iteration materialise OneSecondBar copies; writing to
+    them does not change the stored columns.
+    """
+
+    def __init__(self, agg: 'ColumnarBarAggregator'):
+        self._agg = agg
+
+    def __len__(self) -> int:
+        return len(self._agg._ts)
+
+    def __getitem__(self, index: int) -> OneSecondBar:
+        agg = self._agg
+        return OneSecondBar(
+            ts=int(agg._ts.at(index)),
+            price=float(agg._price.at(index)),
+            delta=float(agg._delta.at(index)),
+            large_buy_count=int(agg._large_buy.at(index)),
+            large_sell_count=int(agg._large_sell.at(index)),
+        )
+
+    def __iter__(self) -> Iterator[OneSecondBar]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class ColumnarBarAggregator(BarAggregator):
+    """
+    BarAggregator with NumPy ring-buffer storage and vectorised indicators.
+
+    Trade accumulation, dynamic threshold calibration and callbacks are
+    inherited unchanged; only bar storage and the queries over it differ.
+    """
+
+    def _init_storage(self):
+        cap = self.max_bars
+        self._ts = _Ring(cap, np.int64)
+        self._price = _Ring(cap, np.float64)
+        self._delta = _Ring(cap, np.float64)
+        self._large_buy = _Ring(cap, np.int32)
+        self._large_sell = _Ring(cap, np.int32)
+
+        # Prefix sums: one extra slot for the baseline before the oldest bar
+        self._cum_delta = _Ring(cap + 1, np.float64)
+        self._cum_abs_delta = _Ring(cap + 1, np.float64)
+        self._cum_trade_count = _Ring(cap + 1, np.int64)
+        self._cum_large_buy = _Ring(cap + 1, np.int64)
+        self._cum_large_sell = _Ring(cap + 1, np.int64)
+        self._cum_gain = _Ring(cap + 1, np.float64)
+        self._cum_loss = _Ring(cap + 1, np.float64)
+        self._cum_sq_abs_delta = _Ring(cap + 1, np.float64)
+        for ring in (self._cum_delta, self._cum_abs_delta, self._cum_trade_count,
+                     self._cum_large_buy, self._cum_large_sell,
+                     self._cum_gain, self._cum_loss, self._cum_sq_abs_delta):
+            ring.push(0)
+        self._extremes = RollingExtremes(min(EXTREMES_WINDOW_SEC, cap))
+
+        # Running totals kept as Python scalars (same float summation as deque mode)
+        self._sum_delta = 0.0
+        self._sum_abs_delta = 0.0
+        self._sum_trade_count = 0
+        self._sum_large_buy = 0
+        self._sum_large_sell = 0
+        self._sum_gain = 0.0
+        self._sum_loss = 0.0
+        self._sum_sq_abs_delta = 0.0
+
+        self.bars = _ColumnarBarView(self)
+
+    def _append_bar(self, bar: OneSecondBar, has_trades: bool):
+        change = bar.price - float(self._price.last()) if len(self._price) else 0.0
+        abs_delta = abs(bar.delta)
+
+        self._ts.push(bar.ts)
+        self._price.push(bar.price)
+        self._delta.push(bar.delta)
+        self._large_buy.push(bar.large_buy_count)
+        self._large_sell.push(bar.large_sell_count)
+
+        self._sum_delta += bar.delta
+        self._sum_abs_delta += abs_delta
+        if has_trades:
+            self._sum_trade_count += 1
+        self._sum_large_buy += bar.large_buy_count
+        self._sum_large_sell += bar.large_sell_count
+        if change > 0:
+            self._sum_gain += change
+        elif change < 0:
+            self._sum_loss -= change
+        self._sum_sq_abs_delta += abs_delta * abs_delta
+
+        self._cum_delta.push(self._sum_delta)
+        self._cum_abs_delta.push(self._sum_abs_delta)
+        self._cum_trade_count.push(self._sum_trade_count)
+        self._cum_large_buy.push(self._sum_large_buy)
+        self._cum_large_sell.push(self._sum_large_sell)
+        self._cum_gain.push(self._sum_gain)
+        self._cum_loss.push(self._sum_loss)
+        self._cum_sq_abs_delta.push(self._sum_sq_abs_delta)
+        self._extremes.push(bar.price)
+
+    # ------------------------------------------------------------------
+    # Rolling sums (prefix-sum lookups)
+    # ------------------------------------------------------------------
+
+    @property
+    def bar_count(self) -> int:
+        return len(self._ts)
+
+    def get_rolling_delta(self, window_sec: int) -> float:
+        n = self.bar_count
+        if n == 0:
+            return 0.0
+        k = min(window_sec, n)
+        return float(self._cum_delta.last() - self._cum_delta.at(-(k + 1)))
+
+    def get_avg_abs_delta(self, lookback: int = 100) -> float:
+        n = self.bar_count
+        if n == 0:
+            return 0.0
+        k = min(lookback, n)
+        total = self._cum_abs_delta.last() - self._cum_abs_delta.at(-(k + 1))
+        trade_count = self._cum_trade_count.last() - self._cum_trade_count.at(-(k + 1))
+        if trade_count == 0:
+            return 0.0
+        return float(total / trade_count)
+
+    def get_large_trade_counts(self, window_sec: int = 60) -> Tuple[int, int]:
+        k = min(max(window_sec, 0), self.bar_count)
+        buys = self._cum_large_buy.last() - self._cum_large_buy.at(-(k + 1))
+        sells = self._cum_large_sell.last() - self._cum_large_sell.at(-(k + 1))
+        return int(buys), int(sells)
+
+    # ------------------------------------------------------------------
+    # Smart Timeout v2.0 indicators
+    # ------------------------------------------------------------------
+
+    def compute_rsi(self, period: int = 840) -> float:
+        if self.bar_count < period + 1:
+            return 50.0
+
+        gains = float(self._cum_gain.last() - self._cum_gain.at(-(period + 1)))
+        losses = float(self._cum_loss.last() - self._cum_loss.at(-(period + 1)))
+        return self._rsi_from_sums(gains, losses, period)
+
+    def compute_volume_zscore(self, window: int = 3600, recent_window: int = 60) -> float:
+        if self.bar_count < window:
+            return 0.0
+
+        total = float(self._cum_abs_delta.last() - self._cum_abs_delta.at(-(window + 1)))
+        total_sq = float(self._cum_sq_abs_delta.last() - self._cum_sq_abs_delta.at(-(window + 1)))
+        recent = float(self._cum_abs_delta.last() - self._cum_abs_delta.at(-(recent_window + 1)))
+        return self._zscore_from_sums(total, total_sq, recent, window, recent_window)
+
+    def compute_pair_momentum(self, window_sec: int) -> float:
+        n = self.bar_count
+        if n < window_sec or window_sec <= 0:
+            return 0.0
+        old_price = float(self._price.at(n - window_sec))
+        if old_price <= 0:
+            return 0.0
+        return ((float(self._price.last()) - old_price) / old_price) * 100.0
+
+    def compute_extremes(self, window_sec: int = EXTREMES_WINDOW_SEC) -> dict:
+        n = self.bar_count
+        actual_window = min(window_sec, n)
+        if actual_window < 10:
+            return {'position': 0.5, 'near_low': False, 'near_high': False}
+
+        if actual_window == min(self._extremes.window, n):
+            low = self._extremes.low
+            high = self._extremes.high
+        else:
+            prices = self._price.tail(actual_window)
+            low = float(prices.min())
+            high = float(prices.max())
+        return self._extremes_from(low, high, float(self._price.last()))
@@ -4,13 +4,20 @@ Composite Strategy Loader & Signal Matcher
 Loads trading rules from composite_strategy.json and matches incoming signals
 to the appropriate strategy parameters based on score range + filters.
 
+Rules are compiled into an immutable score index (CompiledMatcher) and can be
+hot-reloaded when the JSON file changes; a rule set that fails validation is
+rejected and the current one stays active.
+
 Based on: TRADING_BOT_ALGORITHM_SPEC.md §2 (Strategy Loading & Matching)
 """
 
+import asyncio
 import json
 import logging
+import math
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -28,6 +35,9 @@ SMART_TIMEOUT_RSI_OVERBOUGHT = 70    # RSI above = overbought (veto)
 SMART_TIMEOUT_VOL_ZSCORE_MIN = 2.0   # Volume z-score threshold (+1 pt)
 SMART_TIMEOUT_PAIR_DUMP_PCT = -2.0   # 15min dump threshold (+1 pt)
 
+# Signal dict key holding the cached match: (matcher generation, rule index or -1)
+SIGNAL_MATCH_KEY = '_strategy_match'
+
 
 @dataclass
 class ScoreFilter:
@@ -85,6 +95,73 @@ class StrategyRule:
     metrics: Dict[str, Any] = field(default_factory=dict)
 
 
+def signal_features(signal: Dict[str, Any]) -> Tuple[float, float, float, float]:
+    """(score, rsi, vol_zscore, oi_delta) of a normalized signal dict"""
+    return (
+        float(signal.get('total_score', signal.get('score_week', 0))),
+        float(signal.get('rsi', 0)),
+        float(signal.get('volume_zscore', signal.get('vol_zscore', 0))),
+        float(signal.get('oi_delta_pct', signal.get('oi_delta', 0))),
+    )
+
+
+class CompiledMatcher:
+    """
+    Immutable score index over a priority-sorted rule list.
+
+    The score axis is cut at every score_min / score_max into elementary
+    intervals [b_i, b_i+1); each interval holds the rules covering it, in
+    priority order, with their rsi / vol / oi thresholds. A match is one
+    bisect plus a scan of that interval's candidates, and returns the same
+    first match by priority as a linear walk over all rules.
+    """
+
+    __slots__ = ('rules', 'generation', '_bounds', '_buckets')
+
+    def __init__(self, rules: List[StrategyRule], generation: int = 0):
+        self.rules: Tuple[StrategyRule, ...] = tuple(rules)
+        self.generation = generation
+
+        bounds = sorted({r.filter.score_min for r in self.rules} | {r.filter.score_max for r in self.rules})
+        buckets: List[list] = [[] for _ in range(max(len(bounds) - 1, 0))]
+        for index, rule in enumerate(self.rules):
+            f = rule.filter
+            entry = (f.rsi_min, f.vol_min, f.oi_min, index)
+            for i in range(bisect_left(bounds, f.score_min), bisect_left(bounds, f.score_max)):
+                buckets[i].append(entry)
+
+        self._bounds = tuple(bounds)
+        self._buckets = tuple(tuple(bucket) for bucket in buckets)
+
+    def _bucket(self, score: float) -> tuple:
+        i = bisect_right(self._bounds, score) - 1
+        if 0 <= i < len(self._buckets):
+            return self._buckets[i]
+        return ()
+
+    def match(self, score: float, rsi: float, vol_zscore: float, oi_delta: float) -> int:
+        """Index of the first rule matching all 4 filters, -1 if none"""
+        for rsi_min, vol_min, oi_min, index in self._bucket(score):
+            if rsi < rsi_min or vol_zscore < vol_min or oi_delta < oi_min:
+                continue
+            return index
+        return -1
+
+    def match_score(self, score: float) -> int:
+        """Index of the first rule whose score range contains score, -1 if none"""
+        bucket = self._bucket(score)
+        return bucket[0][3] if bucket else -1
+
+    @property
+    def interval_count(self) -> int:
+        return len(self._buckets)
+
+
+def _check_number(value: Any, name: str):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or math.isnan(value):
+        raise ValueError(f"{name} must be a number, got {value!r}")
+
+
 class CompositeStrategy:
     """
     Loads composite_strategy.json and matches signals to strategy rules.
@@ -95,14 +172,29 @@ class CompositeStrategy:
         if params:
             derived = DerivedConstants.from_params(params)
             # proceed with trading
+
+    Hot reload:
+        cs.start_watching(interval_sec=10)   # or cs.reload() on demand
+        ...
+        await cs.stop_watching()
     """
 
     def __init__(self, json_path: str):
+        self.json_path = str(json_path)
         self.version: str = ""
         self.rules: List[StrategyRule] = []
         self.total_expected_pnl: float = 0
         self.avg_win_rate: float = 0
         self.avg_pnl_per_trade: float = 0
+        self.matcher = CompiledMatcher([])
+
+        # Hot reload
+        self.reloads = 0
+        self.reload_failures = 0
+        self.last_reload_error: Optional[str] = None
+        self.match_cache_hits = 0
+        self._file_signature: Optional[Tuple[int, int]] = None
+        self._watch_task: Optional[asyncio.Task] = None
 
         self._load(json_path)
 
@@ -112,50 +204,12 @@ class CompositeStrategy:
         if not path.exists():
             raise FileNotFoundError(f"Strategy file not found: {json_path}")
 
+        signature = self._stat(path)
         with open(path, 'r') as f:
             data = json.load(f)
 
-        self.version = data.get('version', 'unknown')
-        self.total_expected_pnl = data.get('total_expected_pnl', 0)
-        self.avg_win_rate = data.get('avg_win_rate', 0)
-        self.avg_pnl_per_trade = data.get('avg_pnl_per_trade', 0)
-
-        # Parse rules
-        for rule_data in data.get('rules', []):
-            filt = rule_data.get('filter', {})
-            strat = rule_data.get('strategy', {})
-
-            rule = StrategyRule(
-                priority=rule_data.get('priority', 0),
-                score_range=rule_data.get('score_range', ''),
-                consensus_score=rule_data.get('consensus_score', 0),
-                expert_scores=rule_data.get('expert_scores', {}),
-                filter=ScoreFilter(
-                    score_min=filt.get('score_min', 0),
-                    score_max=filt.get('score_max', 9999),
-                    rsi_min=filt.get('rsi_min', 0),
-                    vol_min=filt.get('vol_min', 0),
-                    oi_min=filt.get('oi_min', 0),
-                ),
-                strategy=StrategyParams(
-                    leverage=strat.get('leverage', 10),
-                    sl_pct=strat.get('sl_pct', 3.0),
-                    delta_window=strat.get('delta_window', 3600),
-                    delta_check_window=strat.get('delta_check_window', 300),
-                    threshold_mult=strat.get('threshold_mult', 1.0),
-                    base_activation=strat.get('base_activation', 10.0),
-                    base_callback=strat.get('base_callback', 3.0),
-                    base_reentry_drop=strat.get('base_reentry_drop', 5.0),
-                    base_cooldown=strat.get('base_cooldown', 300),
-                    max_reentry_hours=strat.get('max_reentry_hours', 4),
-                    max_position_hours=strat.get('max_position_hours', 24),
-                ),
-                metrics=rule_data.get('metrics', {}),
-            )
-            self.rules.append(rule)
-
-        # Sort by priority (ascending = highest priority first)
-        self.rules.sort(key=lambda r: r.priority)
+        meta, rules = self._parse(data)
+        self._apply(meta, rules, signature)
 
         logger.info(
             f"Loaded composite strategy v{self.version}: "
@@ -164,6 +218,196 @@ class CompositeStrategy:
             f"avg WR={self.avg_win_rate:.1%}"
         )
 
+    @staticmethod
+    def _stat(path: Path) -> Tuple[int, int]:
+        st = path.stat()
+        return st.st_mtime_ns, st.st_size
+
+    def _parse(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[StrategyRule]]:
+        """
+        Parse and validate the strategy JSON.
+
+        Raises ValueError if the file has no rules or any rule is invalid;
+        nothing is applied until the whole file has been validated.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("strategy file must contain a JSON object")
+        rules_data = data.get('rules')
+        if not isinstance(rules_data, list) or not rules_data:
+            raise ValueError("strategy file has no rules")
+
+        rules = []
+        for n, rule_data in enumerate(rules_data, 1):
+            try:
+                rules.append(self._parse_rule(rule_data))
+            except (AttributeError, TypeError, ValueError) as e:
+                raise ValueError(f"rule {n}: {e}") from e
+
+        # Sort by priority (ascending = highest priority first)
+        rules.sort(key=lambda r: r.priority)
+
+        meta = {
+            'version': data.get('version', 'unknown'),
+            'total_expected_pnl': data.get('total_expected_pnl', 0),
+            'avg_win_rate': data.get('avg_win_rate', 0),
+            'avg_pnl_per_trade': data.get('avg_pnl_per_trade', 0),
+        }
+        return meta, rules
+
+    @staticmethod
+    def _parse_rule(rule_data: Dict[str, Any]) -> StrategyRule:
+        """Build one StrategyRule, checking the values the matcher and lifecycle rely on"""
+        filt = rule_data.get('filter', {})
+        strat = rule_data.get('strategy', {})
+
+        rule = StrategyRule(
+            priority=rule_data.get('priority', 0),
+            score_range=rule_data.get('score_range', ''),
+            consensus_score=rule_data.get('consensus_score', 0),
+            expert_scores=rule_data.get('expert_scores', {}),
+            filter=ScoreFilter(
+                score_min=filt.get('score_min', 0),
+                score_max=filt.get('score_max', 9999),
+                rsi_min=filt.get('rsi_min', 0),
+                vol_min=filt.get('vol_min', 0),
+                oi_min=filt.get('oi_min', 0),
+            ),
+            strategy=StrategyParams(
+                leverage=strat.get('leverage', 10),
+                sl_pct=strat.get('sl_pct', 3.0),
+                delta_window=strat.get('delta_window', 3600),
+                delta_check_window=strat.get('delta_check_window', 300),
+                threshold_mult=strat.get('threshold_mult', 1.0),
+                base_activation=strat.get('base_activation', 10.0),
+                base_callback=strat.get('base_callback', 3.0),
+                base_reentry_drop=strat.get('base_reentry_drop', 5.0),
+                base_cooldown=strat.get('base_cooldown', 300),
+                max_reentry_hours=strat.get('max_reentry_hours', 4),
+                max_position_hours=strat.get('max_position_hours', 24),
+            ),
+            metrics=rule_data.get('metrics', {}),
+        )
+
+        _check_number(rule.priority, 'priority')
+        for name, value in vars(rule.filter).items():
+            _check_number(value, name)
+        for name, value in vars(rule.strategy).items():
+            _check_number(value, name)
+
+        f, p = rule.filter, rule.strategy
+        if not f.score_min < f.score_max:
+            raise ValueError(f"score_min={f.score_min} must be < score_max={f.score_max}")
+        if p.leverage < 1:
+            raise ValueError(f"leverage={p.leverage} must be >= 1")
+        if p.sl_pct <= 0:
+            raise ValueError(f"sl_pct={p.sl_pct} must be > 0")
+        if p.delta_window <= 0 or p.delta_check_window <= 0:
+            raise ValueError("delta_window and delta_check_window must be > 0")
+        if p.max_position_hours <= 0:
+            raise ValueError(f"max_position_hours={p.max_position_hours} must be > 0")
+        return rule
+
+    def _apply(self, meta: Dict[str, Any], rules: List[StrategyRule], signature: Optional[Tuple[int, int]]):
+        """Swap in a validated rule set (no awaits: atomic for the event loop)"""
+        matcher = CompiledMatcher(rules, generation=self.matcher.generation + 1)
+        self.version = meta['version']
+        self.total_expected_pnl = meta['total_expected_pnl']
+        self.avg_win_rate = meta['avg_win_rate']
+        self.avg_pnl_per_trade = meta['avg_pnl_per_trade']
+        self.rules = rules
+        self.matcher = matcher
+        self._file_signature = signature
+
+    # ── Hot reload ───────────────────────────────────────────────
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-read the strategy file if it changed since the last load.
+
+        The new rule set is parsed, validated and compiled before it
+        replaces the current one; on any error the current rules stay
+        active (and the broken file is not retried until it changes again).
+        Lifecycles already running keep the StrategyParams they started with.
+
+        Returns:
+            True if a new rule set was applied
+        """
+        path = Path(self.json_path)
+        try:
+            signature = self._stat(path)
+        except OSError:
+            signature = None
+        if not force and signature == self._file_signature:
+            return False
+
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            meta, rules = self._parse(data)
+        except (OSError, ValueError) as e:
+            self._file_signature = signature
+            self.reload_failures += 1
+            self.last_reload_error = str(e)
+            logger.error(
+                f"❌ Composite strategy reload failed, keeping v{self.version} "
+                f"({len(self.rules)} rules): {e}"
+            )
+            return False
+
+        previous = self.version
+        self._apply(meta, rules, signature)
+        self.reloads += 1
+        self.last_reload_error = None
+        logger.info(
+            f"🔄 Composite strategy reloaded: v{previous} → v{self.version}, "
+            f"{len(self.rules)} rules ({self.matcher.interval_count} score intervals)"
+        )
+        return True
+
+    def start_watching(self, interval_sec: float):
+        """Poll the strategy file every interval_sec and reload it on change."""
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch_loop(interval_sec))
+            logger.info(f"Watching {self.json_path} for changes (every {interval_sec}s)")
+
+    async def stop_watching(self):
+        task, self._watch_task = self._watch_task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _watch_loop(self, interval_sec: float):
+        while True:
+            await asyncio.sleep(interval_sec)
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Composite strategy watcher error: {e}", exc_info=True)
+
+    # ── Matching ─────────────────────────────────────────────────
+
+    def _match_index(self, matcher: CompiledMatcher, score: float, rsi: float,
+                     vol_zscore: float, oi_delta: float) -> int:
+        index = matcher.match(score, rsi, vol_zscore, oi_delta)
+        if index < 0:
+            logger.debug(
+                f"Signal score={score}, rsi={rsi:.1f}, vol={vol_zscore:.1f}, "
+                f"oi={oi_delta:.1f} did not match any rule"
+            )
+            return index
+
+        rule = matcher.rules[index]
+        logger.info(
+            f"✅ Signal MATCHED rule #{rule.priority} [{rule.score_range}]: "
+            f"score={score}, rsi={rsi:.1f}, vol={vol_zscore:.1f}, oi={oi_delta:.1f} → "
+            f"lev={rule.strategy.leverage}, SL={rule.strategy.sl_pct}%, "
+            f"TS act={rule.strategy.base_activation}%/cb={rule.strategy.base_callback}%"
+        )
+        return index
+
     def match_signal(self, score: float, rsi: float = 0.0,
                      vol_zscore: float = 0.0, oi_delta: float = 0.0) -> Optional[StrategyParams]:
         """
@@ -175,7 +419,8 @@ class CompositeStrategy:
         3. Volume z-score >= vol_min
         4. OI delta >= oi_min
         
-        Iterates rules by priority. Returns first match.
+        Returns the first match by priority (looked up in the compiled
+        score index, see CompiledMatcher).
         
         Args:
             score: Signal total_score
@@ -186,59 +431,36 @@ class CompositeStrategy:
         Returns:
             StrategyParams if matched, None if no rule applies
         """
-        for rule in self.rules:
-            f = rule.filter
-
-            # Check score range
-            if not (f.score_min <= score < f.score_max):
-                continue
-
-            # §2.2: Check RSI filter
-            if rsi < f.rsi_min:
-                logger.debug(
-                    f"Rule #{rule.priority} [{rule.score_range}]: "
-                    f"rsi={rsi:.1f} < rsi_min={f.rsi_min}, skip"
-                )
-                continue
+        matcher = self.matcher
+        index = self._match_index(matcher, score, rsi, vol_zscore, oi_delta)
+        return matcher.rules[index].strategy if index >= 0 else None
 
-            # §2.2: Check volume filter
-            if vol_zscore < f.vol_min:
-                logger.debug(
-                    f"Rule #{rule.priority} [{rule.score_range}]: "
-                    f"vol={vol_zscore:.1f} < vol_min={f.vol_min}, skip"
-                )
-                continue
-
-            # §2.2: Check OI delta filter
-            if oi_delta < f.oi_min:
-                logger.debug(
-                    f"Rule #{rule.priority} [{rule.score_range}]: "
-                    f"oi={oi_delta:.1f} < oi_min={f.oi_min}, skip"
-                )
-                continue
+    def match_signal_dict(self, signal: Dict[str, Any]) -> Optional[StrategyRule]:
+        """
+        Match a normalized signal dict, caching the result on the signal.
 
-            # All filters passed
-            logger.info(
-                f"✅ Signal MATCHED rule #{rule.priority} [{rule.score_range}]: "
-                f"score={score}, rsi={rsi:.1f}, vol={vol_zscore:.1f}, oi={oi_delta:.1f} → "
-                f"lev={rule.strategy.leverage}, SL={rule.strategy.sl_pct}%, "
-                f"TS act={rule.strategy.base_activation}%/cb={rule.strategy.base_callback}%"
-            )
-            return rule.strategy
+        The cache entry (SIGNAL_MATCH_KEY) records the matcher generation,
+        so the signal processor and the lifecycle manager share one match
+        per signal, and a reload invalidates it.
 
-        # No match
-        logger.debug(
-            f"Signal score={score}, rsi={rsi:.1f}, vol={vol_zscore:.1f}, "
-            f"oi={oi_delta:.1f} did not match any rule"
-        )
-        return None
+        Returns:
+            The matched StrategyRule, None if no rule applies
+        """
+        matcher = self.matcher
+        cached = signal.get(SIGNAL_MATCH_KEY)
+        if cached is not None and cached[0] == matcher.generation:
+            self.match_cache_hits += 1
+            index = cached[1]
+        else:
+            index = self._match_index(matcher, *signal_features(signal))
+            signal[SIGNAL_MATCH_KEY] = (matcher.generation, index)
+        return matcher.rules[index] if index >= 0 else None
 
     def get_rule_for_score(self, score: float) -> Optional[StrategyRule]:
         """Get the full rule (including metrics) for a score value."""
-        for rule in self.rules:
-            if rule.filter.score_min <= score < rule.filter.score_max:
-                return rule
-        return None
+        matcher = self.matcher
+        index = matcher.match_score(score)
+        return matcher.rules[index] if index >= 0 else None
 
     def get_stats(self) -> Dict[str, Any]:
         """Get strategy summary stats."""
@@ -249,4 +471,10 @@ class CompositeStrategy:
             'total_expected_pnl': self.total_expected_pnl,
             'avg_win_rate': self.avg_win_rate,
             'avg_pnl_per_trade': self.avg_pnl_per_trade,
+            'generation': self.matcher.generation,
+            'score_intervals': self.matcher.interval_count,
+            'reloads': self.reloads,
+            'reload_failures': self.reload_failures,
+            'last_reload_error': self.last_reload_error,
+            'match_cache_hits': self.match_cache_hits,
         }
@@ -3,11 +3,25 @@ Event Logger - Comprehensive audit trail for all critical operations
 
 CRITICAL: This module ensures complete traceability of system operations
 ⚠️ DO NOT DISABLE logging in production!
+
+High-frequency event types can be sampled (1 in N) or aggregated into one
+summary row per window (EventPolicy); all other types are written as is.
+
+Rows are written by a background worker with binary COPY
+(copy_records_to_table); the batch grows with queue depth. When the queue
+is full or a write fails, events are spilled to a JSON-lines file and
+replayed (streamed in chunks, read off the event loop) once the database
+keeps up again. A batch the server rejects for its data is retried row by
+row; a row that keeps failing is moved to a dead-letter file after
+EVENT_MAX_ATTEMPTS.
 """
 import asyncio
 import json
 import logging
-from typing import Dict, Any, Optional, List
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timezone
 from enum import Enum
 from decimal import Decimal
@@ -17,6 +31,18 @@ import traceback
 logger = logging.getLogger(__name__)
 
 
+EVENT_COLUMNS = [
+    'event_type', 'event_data', 'correlation_id',
+    'position_id', 'order_id', 'symbol', 'exchange',
+    'severity', 'error_message', 'stack_trace', 'created_at',
+]
+
+EVENT_BATCH_MIN = 100               # Rows per write when the queue is shallow
+EVENT_BATCH_MAX = 5000              # Rows per write when the queue is deep
+EVENT_SPILL_PATH = os.path.join('data', 'event_spill.jsonl')
+EVENT_MAX_ATTEMPTS = 3              # Rejected writes of one row before it is dead-lettered
+
+
 class DecimalEncoder(json.JSONEncoder):
     """JSON encoder that handles Decimal types"""
     def default(self, obj):
@@ -74,6 +100,7 @@ class EventType(Enum):
     SIGNAL_EXECUTION_FAILED = "signal_execution_failed"
     SIGNAL_FILTERED = "signal_filtered"
     SIGNAL_VALIDATION_FAILED = "signal_validation_failed"
+    SIGNAL_LATENCY = "signal_latency"  # Per-signal stage breakdown (core.latency_trace)
     BAD_SYMBOL_LEAKED = "bad_symbol_leaked"
     INSUFFICIENT_FUNDS = "insufficient_funds"
 
@@ -163,6 +190,93 @@ class EventType(Enum):
     SIGNALS_RECEIVED = "signals_received"
 
 
+@dataclass(frozen=True)
+class EventPolicy:
+    """
+    How often an event type is written.
+
+    mode:
+        always    - every event (default for types without a policy)
+        sample    - 1 in `every` events (the first of each run of N)
+        aggregate - one summary row per (type, position, symbol) per
+                    `window_sec`: count, min/max/last price and last data
+    """
+    mode: str = 'always'
+    every: int = 1
+    window_sec: float = 60.0
+
+
+ALWAYS = EventPolicy()
+
+# Per-tick events; everything else is written as is
+DEFAULT_EVENT_POLICIES: Dict[EventType, EventPolicy] = {
+    EventType.POSITION_UPDATED: EventPolicy('aggregate', window_sec=60.0),
+}
+
+
+def parse_event_policies(spec: str) -> Dict[EventType, EventPolicy]:
+    """
+    Parse policy overrides: "position_updated=aggregate:60,trailing_stop_updated=sample:10,
+    signal_filtered=always".
+
+    Invalid entries are skipped with a warning.
+    """
+    policies: Dict[EventType, EventPolicy] = {}
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, rule = item.partition('=')
+        mode, _, arg = rule.strip().lower().partition(':')
+        try:
+            event_type = EventType(name.strip().lower())
+            if mode == 'always':
+                policy = ALWAYS
+            elif mode == 'sample':
+                policy = EventPolicy('sample', every=max(1, int(arg)))
+            elif mode == 'aggregate':
+                policy = EventPolicy('aggregate', window_sec=float(arg) if arg else 60.0)
+            else:
+                raise ValueError(mode)
+        except ValueError:
+            logger.warning(f"Ignoring invalid event policy: {item!r}")
+            continue
+        policies[event_type] = policy
+    return policies
+
+
+class _EventAggregate:
+    """Open aggregation window for one (event type, position, symbol)."""
+    __slots__ = ('started', 'first_at', 'count', 'min_price', 'max_price', 'last_price',
+                 'data', 'exchange', 'severity', 'correlation_id')
+
+    def __init__(self, now: float, data: Dict[str, Any], exchange, severity, correlation_id):
+        self.started = now
+        self.first_at = datetime.now(timezone.utc)
+        self.count = 0
+        self.min_price = None
+        self.max_price = None
+        self.last_price = None
+        self.data = data
+        self.exchange = exchange
+        self.severity = severity
+        self.correlation_id = correlation_id
+
+    def add(self, data: Dict[str, Any], exchange, severity, correlation_id):
+        self.count += 1
+        self.data = data
+        self.exchange = exchange
+        self.severity = severity
+        self.correlation_id = correlation_id
+        price = data.get('new_price', data.get('price'))
+        if price is not None:
+            self.last_price = price
+            if self.min_price is None or price < self.min_price:
+                self.min_price = price
+            if self.max_price is None or price > self.max_price:
+                self.max_price = price
+
+
 class EventLogger:
     """
     Centralized event logging system
@@ -175,18 +289,56 @@ class EventLogger:
     - Audit trail for compliance
     """
 
-    def __init__(self, pool: asyncpg.Pool):
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        policies: Optional[Dict[EventType, EventPolicy]] = None,
+        use_copy: bool = True,
+        spill_path: str = EVENT_SPILL_PATH,
+        schema: str = 'monitoring',
+    ):
         """
         Args:
             pool: Database connection pool
+            policies: Per-type overrides of DEFAULT_EVENT_POLICIES
+            use_copy: Write batches with binary COPY (False: executemany INSERT)
+            spill_path: JSON-lines file for events that could not be queued or written
+            schema: Schema of the events table
         """
         self.pool = pool
         self._event_queue = asyncio.Queue(maxsize=10000)
-        self._batch_size = 100
+        self._batch_size = EVENT_BATCH_MIN
+        self._max_batch_size = EVENT_BATCH_MAX
         self._flush_interval = 5.0  # seconds
         self._worker_task = None
         self._shutdown = False
 
+        self.use_copy = use_copy
+        self.schema = schema
+        self.spill_path = spill_path
+        self.dead_letter_path = spill_path + '.dead'
+        self._spill_file = None
+        self._spill_dirty = False
+        self._db_ok = True
+
+        # Write stats
+        self.rows_written = 0
+        self.batches_written = 0
+        self.write_failures = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.rejected_rows = 0
+        self.dead_lettered = 0
+        self.last_batch_size = 0
+
+        self._policies: Dict[EventType, EventPolicy] = {**DEFAULT_EVENT_POLICIES, **(policies or {})}
+        self._sample_counts: Dict[EventType, int] = {}
+        self._aggregates: Dict[Tuple[EventType, Optional[int], Optional[str]], _EventAggregate] = {}
+
+        # Stats: event type value -> count
+        self.emitted: Dict[str, int] = {}
+        self.suppressed: Dict[str, int] = {}
+
     async def initialize(self):
         """Initialize event logger and verify tables exist"""
         try:
@@ -254,6 +406,8 @@ class EventLogger:
             exchange: Exchange name
             severity: INFO, WARNING, ERROR, CRITICAL
             error: Exception if this is an error event
+
+        Sampled-out and aggregated events are only counted (no serialisation).
         """
 
         # ✅ FIX: Validate position_id type before queueing
@@ -283,6 +437,25 @@ class EventLogger:
                     f"Event: {event_type.value}, Symbol: {symbol}"
                 )
 
+        policy = self._policies.get(event_type, ALWAYS)
+        if policy.mode == 'sample':
+            seen = self._sample_counts.get(event_type, 0)
+            self._sample_counts[event_type] = seen + 1
+            if seen % policy.every:
+                self.suppressed[event_type.value] = self.suppressed.get(event_type.value, 0) + 1
+                return
+        elif policy.mode == 'aggregate':
+            await self._aggregate(policy, event_type, data, correlation_id, position_id,
+                                  symbol, exchange, severity)
+            return
+
+        await self._emit(event_type, data, correlation_id, position_id, order_id,
+                         symbol, exchange, severity, error)
+
+    async def _emit(self, event_type: EventType, data: Dict[str, Any], correlation_id, position_id,
+                    order_id, symbol, exchange, severity, error=None):
+        """Queue an event row and mirror it to the standard logger."""
+        self.emitted[event_type.value] = self.emitted.get(event_type.value, 0) + 1
         event = {
             'event_type': event_type.value,
             'event_data': json.dumps(data, cls=DecimalEncoder),
@@ -297,12 +470,13 @@ class EventLogger:
             'created_at': datetime.now(timezone.utc)
         }
 
-        # Try to add to queue, if full log directly
+        # Try to add to queue, if full spill to disk (replayed by the worker)
         try:
             self._event_queue.put_nowait(event)
         except asyncio.QueueFull:
-            logger.warning("Event queue full, logging directly")
-            await self._write_event(event)
+            if not self.spilled:
+                logger.warning("Event queue full, spilling events to disk")
+            self._spill([event], flush=False)  # Flushed once per worker pass
 
         # Also log to standard logger
         log_msg = f"{event_type.value}: {data}"
@@ -313,6 +487,68 @@ class EventLogger:
         else:
             logger.info(log_msg)
 
+    async def _aggregate(self, policy: EventPolicy, event_type: EventType, data: Dict[str, Any],
+                         correlation_id, position_id, symbol, exchange, severity):
+        """Fold an event into its open window; emit the window once it has ended."""
+        key = (event_type, position_id, symbol)
+        now = time.monotonic()
+        window = self._aggregates.get(key)
+        if window is not None and now - window.started >= policy.window_sec:
+            del self._aggregates[key]
+            await self._emit_aggregate(key, window)
+            window = None
+        if window is None:
+            window = self._aggregates[key] = _EventAggregate(now, data, exchange, severity, correlation_id)
+        else:
+            self.suppressed[event_type.value] = self.suppressed.get(event_type.value, 0) + 1
+        window.add(data, exchange, severity, correlation_id)
+
+    async def _emit_aggregate(self, key, window: _EventAggregate):
+        event_type, position_id, symbol = key
+        summary = {
+            'aggregated': True,
+            'count': window.count,
+            'window_start': window.first_at.isoformat(),
+            'window_end': datetime.now(timezone.utc).isoformat(),
+            'min_price': window.min_price,
+            'max_price': window.max_price,
+            'last_price': window.last_price,
+            'last': window.data,
+        }
+        await self._emit(event_type, summary, window.correlation_id, position_id, None,
+                         symbol, window.exchange, window.severity)
+
+    async def flush_aggregates(self, force: bool = False):
+        """Emit aggregation windows that have ended (all of them if force)."""
+        now = time.monotonic()
+        for key, window in list(self._aggregates.items()):
+            policy = self._policies.get(key[0], ALWAYS)
+            if force or now - window.started >= policy.window_sec:
+                del self._aggregates[key]
+                await self._emit_aggregate(key, window)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get event logger statistics (per event type)."""
+        return {
+            'queue_size': self._event_queue.qsize(),
+            'open_aggregates': len(self._aggregates),
+            'write_mode': 'copy' if self.use_copy else 'insert',
+            'rows_written': self.rows_written,
+            'batches_written': self.batches_written,
+            'last_batch_size': self.last_batch_size,
+            'write_failures': self.write_failures,
+            'spilled': self.spilled,
+            'replayed': self.replayed,
+            'rejected_rows': self.rejected_rows,
+            'dead_lettered': self.dead_lettered,
+            'emitted': dict(self.emitted),
+            'suppressed': dict(self.suppressed),
+        }
+
+    def _target_batch_size(self) -> int:
+        """Rows per write: grows with queue depth (between min and max)."""
+        return max(self._batch_size, min(self._max_batch_size, self._event_queue.qsize()))
+
     async def _event_worker(self):
         """Background worker to batch write events"""
         batch = []
@@ -321,7 +557,7 @@ class EventLogger:
 
         while not self._shutdown:
             try:
-                # Drain as many events as available (up to batch_size)
+                # Drain as many events as available (up to the adaptive batch size)
                 try:
                     event = await asyncio.wait_for(
                         self._event_queue.get(),
@@ -329,7 +565,8 @@ class EventLogger:
                     )
                     batch.append(event)
                     # Drain remaining without waiting
-                    while len(batch) < self._batch_size:
+                    target = self._target_batch_size()
+                    while len(batch) < target:
                         try:
                             event = self._event_queue.get_nowait()
                             batch.append(event)
@@ -338,6 +575,10 @@ class EventLogger:
                 except asyncio.TimeoutError:
                     pass
 
+                # Windows with no newer event are emitted here
+                if self._aggregates:
+                    await self.flush_aggregates()
+
                 # Check if we should flush
                 current_time = asyncio.get_event_loop().time()
                 should_flush = (
@@ -350,6 +591,12 @@ class EventLogger:
                     batch = []
                     last_flush = current_time
 
+                self._flush_spill_file()
+
+                # Database keeps up again: replay spilled events
+                if self._db_ok and self._event_queue.qsize() < self._batch_size and self._has_spill():
+                    await self._replay_spill()
+
             except Exception as e:
                 logger.error(f"EventLogger worker error: {e}", exc_info=True)
                 await asyncio.sleep(1)
@@ -358,59 +605,216 @@ class EventLogger:
         if batch:
             await self._write_batch(batch)
 
-    async def _write_event(self, event: Dict[str, Any]):
-        """Write single event to database"""
-        async with self.pool.acquire() as conn:
-            query = """
-                INSERT INTO monitoring.events (
-                    event_type, event_data, correlation_id,
-                    position_id, order_id, symbol, exchange,
-                    severity, error_message, stack_trace, created_at
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
-            """
-            await conn.execute(
-                query,
-                event['event_type'],
-                event['event_data'],
-                event['correlation_id'],
-                event['position_id'],
-                event['order_id'],
-                event['symbol'],
-                event['exchange'],
-                event['severity'],
-                event['error_message'],
-                event['stack_trace'],
-                event['created_at']
-            )
+    async def _write_batch(self, batch: List[Dict[str, Any]]) -> bool:
+        """
+        Write batch of events to database.
 
-    async def _write_batch(self, batch: List[Dict[str, Any]]):
-        """Write batch of events to database"""
+        If the server rejects the rows themselves (bad data), the batch is
+        retried row by row so one bad row does not hold back the rest.
+        Any other failure (database unreachable) spills the whole batch to
+        disk and returns False.
+        """
         if not batch:
-            return
+            return True
 
-        async with self.pool.acquire() as conn:
-            query = """
-                INSERT INTO monitoring.events (
-                    event_type, event_data, correlation_id,
-                    position_id, order_id, symbol, exchange,
-                    severity, error_message, stack_trace, created_at
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
-            """
+        try:
+            await self._write_records([self._to_record(e) for e in batch])
+        except Exception as e:
+            if self._is_rejected_data(e):
+                await self._write_rows(batch)
+                return True
+            self._db_ok = False
+            self.write_failures += 1
+            logger.error(f"EventLogger batch write failed ({len(batch)} events), spilling to disk: {e}")
+            self._spill(batch)
+            return False
+
+        self._db_ok = True
+        self.rows_written += len(batch)
+        self.batches_written += 1
+        self.last_batch_size = len(batch)
+        return True
+
+    async def _write_rows(self, batch: List[Dict[str, Any]]):
+        """
+        Row-by-row fallback for a rejected batch.
 
+        A rejected row is spilled with its attempt count (and dead-lettered
+        after EVENT_MAX_ATTEMPTS). If the database becomes unreachable
+        midway, the rest of the batch is spilled unchanged.
+        """
+        written = 0
+        for i, event in enumerate(batch):
             try:
+                await self._write_records([self._to_record(event)])
+                written += 1
+            except Exception as e:
+                if not self._is_rejected_data(e):
+                    self._db_ok = False
+                    self.write_failures += 1
+                    self._spill(batch[i:])
+                    break
+                self.rejected_rows += 1
+                attempts = event.get('_attempts', 0) + 1
+                if attempts >= EVENT_MAX_ATTEMPTS:
+                    logger.error(
+                        f"EventLogger dead-lettering {event.get('event_type')} event "
+                        f"after {attempts} rejected writes: {e}"
+                    )
+                    self._dead_letter({**event, '_attempts': attempts}, e)
+                else:
+                    self._spill([{**event, '_attempts': attempts}])
+        self.rows_written += written
+        if written:
+            self._db_ok = True
+
+    async def _write_records(self, records: List[tuple]):
+        async with self.pool.acquire() as conn:
+            if self.use_copy:
+                await conn.copy_records_to_table(
+                    'events', schema_name=self.schema, columns=EVENT_COLUMNS, records=records
+                )
+            else:
                 await conn.executemany(
-                    query,
-                    [
-                        (
-                            e['event_type'], e['event_data'], e['correlation_id'],
-                            e['position_id'], e['order_id'], e['symbol'], e['exchange'],
-                            e['severity'], e['error_message'], e['stack_trace'], e['created_at']
-                        )
-                        for e in batch
-                    ]
+                    f"""
+                    INSERT INTO {self.schema}.events (
+                        event_type, event_data, correlation_id,
+                        position_id, order_id, symbol, exchange,
+                        severity, error_message, stack_trace, created_at
+                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
+                    """,
+                    records
                 )
-            except Exception as e:
-                logger.error(f"EventLogger batch write failed ({len(batch)} events): {e}", exc_info=True)
+
+    @staticmethod
+    def _to_record(e: Dict[str, Any]) -> tuple:
+        return (
+            e['event_type'], e['event_data'], e['correlation_id'],
+            e['position_id'], e['order_id'], e['symbol'], e['exchange'],
+            e['severity'], e['error_message'], e['stack_trace'], e['created_at']
+        )
+
+    @staticmethod
+    def _is_rejected_data(error: Exception) -> bool:
+        """The server (or driver) refused the rows themselves, not the connection."""
+        return isinstance(error, (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError))
+
+    @staticmethod
+    def _spill_line(event: Dict[str, Any]) -> str:
+        row = dict(event)
+        row['created_at'] = event['created_at'].isoformat()
+        return json.dumps(row) + '\n'
+
+    def _spill(self, events: List[Dict[str, Any]], flush: bool = True):
+        """Append events to the spill file (JSON lines)."""
+        try:
+            if self._spill_file is None:
+                directory = os.path.dirname(self.spill_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._spill_file = open(self.spill_path, 'a', encoding='utf-8')
+            for event in events:
+                self._spill_file.write(self._spill_line(event))
+            self.spilled += len(events)
+            self._spill_dirty = True
+            if flush:
+                self._flush_spill_file()
+        except OSError as e:
+            logger.error(f"EventLogger spill failed, {len(events)} events lost: {e}")
+
+    def _flush_spill_file(self):
+        if self._spill_dirty and self._spill_file is not None:
+            try:
+                self._spill_file.flush()
+            except OSError as e:
+                logger.error(f"EventLogger spill flush failed: {e}")
+            self._spill_dirty = False
+
+    def _dead_letter(self, event: Dict[str, Any], error: Exception):
+        """Append a permanently rejected event (with the last error) to the dead-letter file."""
+        try:
+            with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                f.write(self._spill_line({**event, '_last_error': str(error)}))
+            self.dead_lettered += 1
+        except OSError as e:
+            logger.error(f"EventLogger dead-letter write failed, event lost: {e}")
+
+    def _close_spill_file(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+            self._spill_dirty = False
+
+    def _has_spill(self) -> bool:
+        replay_path = self.spill_path + '.replay'
+        return (
+            os.path.exists(replay_path)
+            or (os.path.exists(self.spill_path) and os.path.getsize(self.spill_path) > 0)
+        )
+
+    @staticmethod
+    def _read_spill_chunk(f, max_events: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """Read up to max_events spilled events (worker thread). Returns (events, eof)."""
+        events = []
+        while len(events) < max_events:
+            line = f.readline()
+            if not line:
+                return events, True
+            try:
+                event = json.loads(line)
+                event['created_at'] = datetime.fromisoformat(event['created_at'])
+            except (ValueError, KeyError, TypeError):
+                continue  # Torn line from a crash mid-write
+            events.append(event)
+        return events, False
+
+    @staticmethod
+    def _keep_unreplayed(f, replay_path: str):
+        """Rewrite the replay file as its unread tail (worker thread)."""
+        tmp_path = replay_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            for line in f:
+                out.write(line)
+        f.close()
+        os.replace(tmp_path, replay_path)
+
+    async def _replay_spill(self) -> int:
+        """
+        Write spilled events back in max-size batches.
+
+        The spill file is renamed first, so events spilled meanwhile go to a
+        new file. A leftover .replay file (crash or outage during replay) is
+        replayed before the current spill file is taken. The file is read
+        one chunk at a time in a worker thread; if the database goes away
+        midway, the unread tail stays in the .replay file for next time.
+        """
+        replay_path = self.spill_path + '.replay'
+        if not os.path.exists(replay_path):
+            self._close_spill_file()
+            os.replace(self.spill_path, replay_path)
+
+        rows_before = self.rows_written
+        f = await asyncio.to_thread(open, replay_path, encoding='utf-8')
+        try:
+            while True:
+                chunk, eof = await asyncio.to_thread(self._read_spill_chunk, f, self._max_batch_size)
+                if chunk and not await self._write_batch(chunk) and not eof:
+                    # Failed chunk was spilled by _write_batch; keep the rest for later
+                    await asyncio.to_thread(self._keep_unreplayed, f, replay_path)
+                    break
+                if eof:
+                    f.close()
+                    os.remove(replay_path)
+                    break
+        finally:
+            f.close()
+
+        written = self.rows_written - rows_before
+
+        self.replayed += written
+        if written:
+            logger.info(f"EventLogger replayed {written} spilled events")
+        return written
 
     async def log_transaction(
         self,
@@ -516,9 +920,11 @@ class EventLogger:
 
     async def shutdown(self):
         """Graceful shutdown"""
+        await self.flush_aggregates(force=True)
         self._shutdown = True
         if self._worker_task:
             await self._worker_task
+        self._close_spill_file()
         logger.info("EventLogger shut down")
 
 
@@ -28,6 +28,8 @@ from config.settings import config
 logger = logging.getLogger(__name__)
 
 from utils.symbol_helpers import normalize_symbol
+from core.account_ledger import AccountLedger, ACCOUNT_LEDGER_RECONCILE_SEC, ACCOUNT_LEDGER_MAX_AGE_SEC
+from core.markets_cache import MarketsCache, exchange_info_fingerprint
 
 
 @dataclass
@@ -52,6 +54,29 @@ class OrderResult:
         return getattr(self, key, default)
 
 
+DEFAULT_MIN_AMOUNT = Decimal('0.001')
+DEFAULT_STEP_SIZE = Decimal('0.001')
+DEFAULT_TICK_SIZE = Decimal('0.01')
+
+
+@dataclass(frozen=True)
+class MarketFilters:
+    """Order filters of one market, parsed once per load_markets"""
+    min_amount: Decimal
+    step_size: Decimal
+    tick_size: Decimal
+
+
+def _filter_decimal(value) -> Optional[Decimal]:
+    """Exchange filter value (str / float / None) as Decimal, None if unparseable"""
+    if value is None or value == '':
+        return None
+    try:
+        return Decimal(str(value))
+    except (ArithmeticError, ValueError, TypeError):
+        return None
+
+
 class ExchangeManager:
     """
     Unified exchange interface using CCXT
@@ -144,28 +169,40 @@ class ExchangeManager:
                 logger.info(f"Bybit testnet configured with UNIFIED account settings")
 
         # Market information cache
+        # _symbol_index / _market_filters are derived from self.markets by _set_markets()
         self.markets = {}
+        self._indexed_markets = None
+        self._symbol_index: Dict[str, str] = {}
+        self._market_filters: Dict[str, MarketFilters] = {}
+        self.leverage_brackets: Dict[str, List[Dict]] = {}
+        self.markets_cache: Optional[MarketsCache] = None
+        self.markets_from_cache = False
         self.tickers = {}
         self.positions = {}
         self._last_ticker_update = {}
 
-        # Initialize rate limiter
+        # Stream-fed account state for can_open_position (see enable_account_ledger)
+        self.account_ledger: Optional[AccountLedger] = None
+
+        # Initialize rate limiter (weights resynced from response headers)
         self.rate_limiter = get_rate_limiter(self.name)
+        self.rate_limiter.attach(self.exchange)
 
         logger.info(f"Exchange {self.name} initialized {'(TESTNET)' if config.get('testnet') else ''}")
 
-    async def initialize(self):
-        """Load markets and validate connection"""
-        try:
-            # Load markets with rate limiting
-            self.markets = await self.rate_limiter.execute_request(
-                self.exchange.load_markets
-            )
-            logger.info(f"Loaded {len(self.markets)} markets from {self.name}")
+    async def initialize(self, markets_cache: Optional[MarketsCache] = None):
+        """
+        Load markets and validate connection
 
-            # Test connection with rate limiting
-            await self.rate_limiter.execute_request(
-                self.exchange.fetch_balance
+        Markets and the balance check run concurrently. With a markets_cache,
+        a still-valid cached entry replaces load_markets (see _load_markets).
+        """
+        try:
+            self.markets_cache = markets_cache
+            await asyncio.gather(
+                self._load_markets(),
+                # Test connection with rate limiting
+                self.rate_limiter.execute_request(self.exchange.fetch_balance),
             )
             logger.info(f"Connection to {self.name} verified")
 
@@ -174,10 +211,98 @@ class ExchangeManager:
             logger.error(f"Failed to initialize {self.name}: {e}")
             raise
 
+    async def _load_markets(self):
+        """Markets from the cache if still valid, otherwise load_markets (and refresh the cache)"""
+        cache = self.markets_cache
+        entry = cache.load(self.name) if cache else None
+        if entry is not None:
+            fingerprint = await self._fetch_exchange_info_fingerprint()
+            if fingerprint is None or fingerprint == entry.fingerprint:
+                self.exchange.set_markets(entry.markets)
+                self._set_markets(self.exchange.markets)
+                self.leverage_brackets = entry.leverage_brackets
+                self.markets_from_cache = True
+                logger.info(f"Loaded {len(self.markets)} markets for {self.name} from cache")
+                return
+            logger.info(f"Markets cache for {self.name} is outdated (exchange info changed), reloading")
+
+        # Load markets with rate limiting
+        self._set_markets(await self.rate_limiter.execute_request(
+            self.exchange.load_markets
+        ))
+        self.markets_from_cache = False
+        logger.info(f"Loaded {len(self.markets)} markets from {self.name}")
+        if cache:
+            self.leverage_brackets = await self._fetch_leverage_brackets()
+            self._save_markets_cache()
+
+    def _markets_fingerprint(self) -> Optional[str]:
+        """Fingerprint of the loaded markets, comparable to _fetch_exchange_info_fingerprint"""
+        if self.name != 'binance':
+            return None
+        return exchange_info_fingerprint(
+            m['info'] for m in self.markets.values() if m.get('linear') and 'symbol' in m.get('info', {})
+        )
+
+    async def _fetch_exchange_info_fingerprint(self) -> Optional[str]:
+        """
+        Fingerprint of the live USDⓈ-M exchangeInfo (Binance)
+
+        None where no cheap check exists (other exchanges, or the request
+        failed): the cache entry is then trusted up to its max age.
+        """
+        if self.name != 'binance':
+            return None
+        try:
+            info = await self.rate_limiter.execute_request(self.exchange.fapiPublicGetExchangeInfo)
+            return exchange_info_fingerprint(info.get('symbols', []))
+        except Exception as e:
+            logger.warning(f"Exchange info check failed for {self.name}: {e}")
+            return None
+
+    async def _fetch_leverage_brackets(self) -> Dict[str, List[Dict]]:
+        """Leverage brackets (notional tiers) per market symbol, {} if unsupported or failed"""
+        if not self.exchange.has.get('fetchLeverageTiers'):
+            return {}
+        try:
+            return await self.rate_limiter.execute_request(self.exchange.fetch_leverage_tiers) or {}
+        except Exception as e:
+            logger.warning(f"Failed to load leverage brackets for {self.name}: {e}")
+            return {}
+
+    def _save_markets_cache(self):
+        if self.markets_cache:
+            self.markets_cache.save(self.name, self.markets, self._markets_fingerprint(), self.leverage_brackets)
+
+    def get_leverage_brackets(self, symbol: str) -> List[Dict]:
+        """Leverage tiers of a market (exchange or normalized symbol), [] if unknown"""
+        market_symbol = symbol if symbol in self.markets else self.find_exchange_symbol(symbol)
+        return self.leverage_brackets.get(market_symbol, []) if market_symbol else []
+
     async def close(self):
         """Close exchange connection"""
+        if self.account_ledger:
+            await self.account_ledger.stop()
         await self.exchange.close()
 
+    def enable_account_ledger(self) -> AccountLedger:
+        """
+        Serve can_open_position from an in-memory AccountLedger.
+
+        Only meaningful with a user stream feeding it (BinanceHybridStream);
+        until the stream connects and the first reconcile completes, and
+        whenever the ledger goes stale, can_open_position uses REST.
+        """
+        if self.account_ledger is None:
+            self.account_ledger = AccountLedger(
+                self.exchange,
+                default_leverage=float(config.trading.leverage),
+                reconcile_interval_sec=getattr(config.trading, 'account_ledger_reconcile_sec', ACCOUNT_LEDGER_RECONCILE_SEC),
+                max_age_sec=getattr(config.trading, 'account_ledger_max_age_sec', ACCOUNT_LEDGER_MAX_AGE_SEC),
+            )
+            logger.info(f"Account ledger enabled for {self.name}")
+        return self.account_ledger
+
     def find_exchange_symbol(self, normalized_symbol: str) -> Optional[str]:
         """
         Find exchange-specific symbol format by searching markets
@@ -197,17 +322,102 @@ class ExchangeManager:
         if normalized_symbol in self.markets:
             return normalized_symbol
 
-        # Search for matching symbol in all markets
-        # This handles format conversion: 'BLASTUSDT' → 'BLAST/USDT:USDT'
-        for market_symbol in self.markets.keys():
-            if normalize_symbol(market_symbol) == normalized_symbol:
-                logger.debug(f"Symbol format conversion: {normalized_symbol} → {market_symbol} ({self.name})")
-                return market_symbol
+        # Format conversion via reverse index: 'BLASTUSDT' → 'BLAST/USDT:USDT'
+        self._ensure_market_index()
+        market_symbol = self._symbol_index.get(normalized_symbol)
+        if market_symbol is not None:
+            logger.debug(f"Symbol format conversion: {normalized_symbol} → {market_symbol} ({self.name})")
+            return market_symbol
 
         # Symbol not found on this exchange
         logger.warning(f"Symbol {normalized_symbol} not found in {len(self.markets)} markets on {self.name}")
         return None
 
+    def _set_markets(self, markets: Dict) -> None:
+        """
+        Replace markets and rebuild the derived lookups
+
+        The reverse symbol index (normalized id → market symbol) and the
+        per-market filters are built completely before being swapped in
+        together with markets, so readers never see a half-built index.
+        On normalized-id collisions (e.g. perpetual vs delivery contract)
+        the first market in load_markets order wins, as with the old scan.
+        """
+        markets = markets or {}
+        symbol_index: Dict[str, str] = {}
+        market_filters: Dict[str, MarketFilters] = {}
+        for market_symbol, market in markets.items():
+            symbol_index.setdefault(normalize_symbol(market_symbol), market_symbol)
+            market_filters[market_symbol] = self._parse_market_filters(market_symbol, market)
+
+        self.markets = markets
+        self._symbol_index = symbol_index
+        self._market_filters = market_filters
+        self._indexed_markets = markets
+
+    def _ensure_market_index(self) -> None:
+        """Rebuild the derived lookups if self.markets was replaced directly"""
+        if self._indexed_markets is not self.markets:
+            self._set_markets(self.markets)
+
+    async def reload_markets(self, reload: bool = False) -> Dict:
+        """
+        Load markets from the exchange and rebuild the symbol index / filters
+
+        Args:
+            reload: Force CCXT to refetch markets instead of returning its cache
+        """
+        self._set_markets(await self.rate_limiter.execute_request(
+            self.exchange.load_markets, reload
+        ))
+        logger.info(f"Reloaded {len(self.markets)} markets from {self.name}")
+        if reload:
+            self._save_markets_cache()
+        return self.markets
+
+    def _parse_market_filters(self, market_symbol: str, market: Dict) -> MarketFilters:
+        """
+        Parse min amount / step size / tick size of one market
+
+        For Binance the REAL minQty / stepSize come from the LOT_SIZE filter
+        (CCXT sometimes returns stepSize instead of minQty in limits.amount.min),
+        other exchanges use the CCXT parsed limits / precision.
+        """
+        lot_min_qty = lot_step_size = None
+        if self.name == 'binance':
+            for f in market.get('info', {}).get('filters', []):
+                if f.get('filterType') == 'LOT_SIZE':
+                    lot_min_qty = _filter_decimal(f.get('minQty'))
+                    lot_step_size = _filter_decimal(f.get('stepSize'))
+                    break
+
+        if lot_min_qty is not None:
+            min_amount = lot_min_qty
+            if min_amount <= 0:
+                logger.warning(f"{market_symbol}: Invalid minQty={min_amount} from exchange, using default 0.001")
+                min_amount = DEFAULT_MIN_AMOUNT
+        else:
+            min_amount = _filter_decimal(market.get('limits', {}).get('amount', {}).get('min', DEFAULT_MIN_AMOUNT))
+            if min_amount is None or min_amount <= 0:
+                logger.warning(f"{market_symbol}: Invalid min_amount={min_amount} from CCXT, using default 0.001")
+                min_amount = DEFAULT_MIN_AMOUNT
+
+        step_size = lot_step_size
+        if step_size is None:
+            step_size = _filter_decimal(market.get('precision', {}).get('amount')) or DEFAULT_STEP_SIZE
+
+        tick_size = _filter_decimal(market.get('precision', {}).get('price'))
+        if tick_size is None:
+            tick_size = DEFAULT_TICK_SIZE
+
+        return MarketFilters(min_amount=min_amount, step_size=step_size, tick_size=tick_size)
+
+    def get_market_filters(self, symbol: str) -> Optional[MarketFilters]:
+        """Precomputed order filters for symbol (DB or exchange format), None if unknown"""
+        exchange_symbol = self.find_exchange_symbol(symbol) or symbol
+        self._ensure_market_index()
+        return self._market_filters.get(exchange_symbol)
+
     # ============== Market Data ==============
 
     async def fetch_ticker(self, symbol: str, use_cache: bool = True) -> Dict:
@@ -1549,8 +1759,8 @@ class ExchangeManager:
         """
         try:
             # Load market data if not cached
-            if symbol not in self.markets:
-                await self.exchange.load_markets()
+            if symbol not in self.markets and not self.find_exchange_symbol(symbol):
+                await self.reload_markets()
 
             # CRITICAL FIX: Convert symbol to exchange-specific format
             # DB stores 'BLASTUSDT', Bybit needs 'BLAST/USDT:USDT'
@@ -1673,41 +1883,10 @@ class ExchangeManager:
 
     def get_min_amount(self, symbol: str) -> float:
         """Get minimum order amount for symbol"""
-        # CRITICAL FIX: Convert symbol to exchange-specific format
-        exchange_symbol = self.find_exchange_symbol(symbol) or symbol
-        market = self.markets.get(exchange_symbol)
-        if not market:
-            return 0.001  # Default
-
-        # For Binance: parse REAL minQty from LOT_SIZE filter (not CCXT parsed value)
-        # CCXT sometimes returns stepSize instead of minQty in limits.amount.min
-        if self.name == 'binance':
-            info = market.get('info', {})
-            filters = info.get('filters', [])
-
-            for f in filters:
-                if f.get('filterType') == 'LOT_SIZE':
-                    min_qty = f.get('minQty')
-                    if min_qty:
-                        try:
-                            min_qty_float = float(min_qty)
-                            # Validate min_qty is positive
-                            if min_qty_float <= 0:
-                                logger.warning(f"{symbol}: Invalid minQty={min_qty_float} from exchange, using default 0.001")
-                                return 0.001
-                            return min_qty_float
-                        except (ValueError, TypeError):
-                            pass
-
-        # Fallback to CCXT parsed value for other exchanges
-        min_from_ccxt = market.get('limits', {}).get('amount', {}).get('min', 0.001)
-
-        # Validate CCXT value too
-        if min_from_ccxt <= 0:
-            logger.warning(f"{symbol}: Invalid min_amount={min_from_ccxt} from CCXT, using default 0.001")
-            return 0.001
-
-        return min_from_ccxt
+        filters = self.get_market_filters(symbol)
+        if not filters:
+            return float(DEFAULT_MIN_AMOUNT)
+        return float(filters.min_amount)
 
     def get_min_notional(self, symbol: str) -> float:
         """
@@ -1764,43 +1943,26 @@ class ExchangeManager:
 
     def get_tick_size(self, symbol: str) -> float:
         """Get price tick size for symbol"""
-        # CRITICAL FIX: Convert symbol to exchange-specific format
-        exchange_symbol = self.find_exchange_symbol(symbol) or symbol
-        market = self.markets.get(exchange_symbol)
-        if market:
-            return market['precision']['price']
-        return 0.01  # Default
+        filters = self.get_market_filters(symbol)
+        if not filters:
+            return float(DEFAULT_TICK_SIZE)
+        return float(filters.tick_size)
 
     def get_step_size(self, symbol: str) -> float:
         """Get step size (amount precision) for symbol from LOT_SIZE filter"""
-        exchange_symbol = self.find_exchange_symbol(symbol) or symbol
-        market = self.markets.get(exchange_symbol)
-        if not market:
-            return 0.001  # Default
-
-        # For Binance: parse stepSize from LOT_SIZE filter
-        if self.name == 'binance':
-            info = market.get('info', {})
-            filters = info.get('filters', [])
-            for f in filters:
-                if f.get('filterType') == 'LOT_SIZE':
-                    step_size = f.get('stepSize')
-                    if step_size:
-                        try:
-                            return float(step_size)
-                        except (ValueError, TypeError):
-                            pass
-
-        # Fallback to CCXT precision for other exchanges
-        precision = market.get('precision', {}).get('amount')
-        if precision:
-            return precision
-        return 0.001  # Default
+        filters = self.get_market_filters(symbol)
+        if not filters:
+            return float(DEFAULT_STEP_SIZE)
+        return float(filters.step_size)
 
     async def can_open_position(self, symbol: str, notional_usd: float, preloaded_positions: Optional[List] = None) -> Tuple[bool, str]:
         """
         Check if we can open a new position without exceeding limits.
-        
+
+        With a fresh AccountLedger (Binance user stream) balance, position
+        notional and maxNotionalValue come from memory, without REST calls.
+        Otherwise they are fetched over REST.
+
         Retries up to 3 times on transient API errors (network/timeout/rate-limit)
         to prevent valid signals from being permanently killed by a single glitch.
 
@@ -1812,15 +1974,25 @@ class ExchangeManager:
         Returns:
             (can_open, reason)
         """
+        ledger = self.account_ledger
+        use_ledger = bool(ledger and ledger.is_fresh())
+        if ledger:
+            if use_ledger:
+                ledger.hits += 1
+            else:
+                ledger.misses += 1
+
         max_retries = 3
         retry_delay = 0.5  # seconds
 
         for attempt in range(1, max_retries + 1):
             try:
                 # Step 1: Check free balance (account for leverage)
-                free_usdt = await self._get_free_balance_usdt()
-                total_usdt = await self._get_total_balance_usdt()
-                
+                if use_ledger:
+                    free_usdt = ledger.available_balance
+                else:
+                    free_usdt = await self._get_free_balance_usdt()
+
                 # Get leverage from config
                 leverage = float(config.trading.leverage)
                 required_margin = float(notional_usd) / leverage
@@ -1840,12 +2012,15 @@ class ExchangeManager:
                     )
 
                 # Step 2: Get total current notional
-                if preloaded_positions is not None:
-                    positions = preloaded_positions
+                if preloaded_positions is None and use_ledger:
+                    total_notional = ledger.total_notional()
                 else:
-                    positions = await self.exchange.fetch_positions()
-                total_notional = sum(abs(float(p.get('notional', 0)))
-                                    for p in positions if float(p.get('contracts', 0)) > 0)
+                    if preloaded_positions is not None:
+                        positions = preloaded_positions
+                    else:
+                        positions = await self.exchange.fetch_positions()
+                    total_notional = sum(abs(float(p.get('notional', 0)))
+                                        for p in positions if float(p.get('contracts', 0)) > 0)
 
                 # Step 3: Check maxNotionalValue (Binance specific)
                 if self.name == 'binance':
@@ -1853,24 +2028,28 @@ class ExchangeManager:
                         exchange_symbol = self.find_exchange_symbol(symbol)
                         symbol_clean = exchange_symbol.replace('/USDT:USDT', 'USDT')
 
-                        position_risk = await self.exchange.fapiPrivateV2GetPositionRisk({
-                            'symbol': symbol_clean
-                        })
+                        if use_ledger:
+                            max_notional_str = ledger.max_notional.get(symbol_clean, 'INF')
+                        else:
+                            max_notional_str = 'INF'
+                            position_risk = await self.exchange.fapiPrivateV2GetPositionRisk({
+                                'symbol': symbol_clean
+                            })
+                            for risk in position_risk:
+                                if risk.get('symbol') == symbol_clean:
+                                    max_notional_str = risk.get('maxNotionalValue', 'INF')
+                                    break
 
-                        for risk in position_risk:
-                            if risk.get('symbol') == symbol_clean:
-                                max_notional_str = risk.get('maxNotionalValue', 'INF')
-                                if max_notional_str != 'INF':
-                                    max_notional = float(max_notional_str)
+                        if max_notional_str != 'INF':
+                            max_notional = float(max_notional_str)
 
-                                    # FIX BUG #2: Ignore maxNotional = 0 (means "no personal limit set")
-                                    # Binance returns "0" for symbols without open positions, not as a $0 limit
-                                    if max_notional > 0:
-                                        new_total = total_notional + float(notional_usd)
+                            # FIX BUG #2: Ignore maxNotional = 0 (means "no personal limit set")
+                            # Binance returns "0" for symbols without open positions, not as a $0 limit
+                            if max_notional > 0:
+                                new_total = total_notional + float(notional_usd)
 
-                                        if new_total > max_notional:
-                                            return False, f"Would exceed max notional: ${new_total:.2f} > ${max_notional:.2f}"
-                                break
+                                if new_total > max_notional:
+                                    return False, f"Would exceed max notional: ${new_total:.2f} > ${max_notional:.2f}"
                     except Exception as e:
                         # "Invalid symbol" is expected for some pairs (ME, 0G, LINEA, etc.)
                         error_str = str(e)
@@ -0,0 +1,236 @@
+"""
+Signal Latency Tracing
+
+Follows one signal from its WebSocket frame to a protected position (entry
+filled, stop loss confirmed, position active) with monotonic timestamps.
+Each stage closes its span with trace.mark(stage); a span starts at the
+previous mark (the first one at frame arrival):
+
+    decode           frame received → signal parsed and normalized (SignalWebSocketClient)
+    dispatch         → handed to WebSocketSignalProcessor
+    match            CompositeStrategy.match_signal_dict
+    lifecycle        SignalLifecycleManager.on_signal_received: checks, lifecycle, entry price
+    risk_checks      PositionManager.open_position: duplicate / risk checks, sizing
+    spread           PositionManager._validate_spread
+    entry_order      AtomicPositionManager: leverage, entry order, fill price
+    position_record  position row, audit rows, position verification
+    sl_placement     stop loss placed and confirmed
+    activation       position activated: protected
+    registration     trailing stop registration, lifecycle persisted
+    lookback         aggTrades subscription, _load_lookback_bars (after protection)
+
+The signal dict carries the trace id (TRACE_KEY, so it stays JSON
+serializable); from the processor on the trace object is passed along on the
+SignalLifecycle and the PositionRequest. SignalTracer.finish() turns it into
+a breakdown row for its sinks: Prometheus histograms
+(MetricsCollector.record_signal_trace) and a SIGNAL_LATENCY event row
+(event_log_sink).
+
+Signals that are not sampled get NULL_TRACE, whose mark() does nothing:
+an untraced stage costs one no-op method call.
+"""
+
+import asyncio
+import itertools
+import logging
+import random
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from core.event_logger import EventType, get_event_logger
+
+logger = logging.getLogger(__name__)
+
+TRACE_KEY = '_trace_id'             # Signal dict key carrying the trace id
+PROTECTED_STAGE = 'activation'      # Position open with its stop loss confirmed
+TRACE_HISTORY = 200                 # Breakdown rows kept for get_stats()
+TRACE_OPEN_MAX = 1000               # Started, unfinished traces kept (oldest dropped)
+
+# Outcomes passed to SignalTracer.finish()
+OPENED = 'opened'
+REJECTED = 'rejected'
+UNMATCHED = 'unmatched'
+ERROR = 'error'
+DROPPED = 'dropped'                 # Never dispatched (no consumer)
+
+
+class SignalTrace:
+    """Monotonic stage marks of one sampled signal"""
+
+    __slots__ = ('trace_id', 'symbol', 'start_ns', 'marks', 'attrs')
+    sampled = True
+
+    def __init__(self, trace_id: int, symbol: str = '', start_ns: Optional[int] = None):
+        self.trace_id = trace_id
+        self.symbol = symbol
+        self.start_ns = time.monotonic_ns() if start_ns is None else start_ns
+        self.marks: List[Tuple[str, int]] = []      # [(stage, monotonic ns at its end)]
+        self.attrs: Dict[str, Any] = {}
+
+    def mark(self, stage: str) -> None:
+        """Close the span of stage (it started at the previous mark)"""
+        self.marks.append((stage, time.monotonic_ns()))
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def spans(self) -> Dict[str, float]:
+        """{stage: ms}; a stage marked twice accumulates"""
+        spans: Dict[str, float] = {}
+        previous = self.start_ns
+        for stage, ts in self.marks:
+            spans[stage] = spans.get(stage, 0.0) + (ts - previous) / 1e6
+            previous = ts
+        return spans
+
+    def elapsed_ms(self, stage: Optional[str] = None) -> Optional[float]:
+        """Frame arrival to the (first) mark of stage, or to the last mark"""
+        if not self.marks:
+            return None
+        if stage is None:
+            return (self.marks[-1][1] - self.start_ns) / 1e6
+        for name, ts in self.marks:
+            if name == stage:
+                return (ts - self.start_ns) / 1e6
+        return None
+
+    def to_row(self, outcome: str) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'symbol': self.symbol,
+            'outcome': outcome,
+            'protected_ms': self.elapsed_ms(PROTECTED_STAGE),
+            'total_ms': self.elapsed_ms() or 0.0,
+            'stages': self.spans(),
+            **self.attrs,
+        }
+
+
+class _NullTrace:
+    """Trace of an unsampled signal: every call is a no-op"""
+
+    __slots__ = ()
+    sampled = False
+    trace_id = None
+
+    def mark(self, stage: str) -> None:
+        pass
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+class SignalTracer:
+    """
+    Samples signals, collects finished traces and hands rows to sinks.
+
+    Usage:
+        tracer = SignalTracer(sample_rate=1.0)
+        trace = tracer.start('BTCUSDT', start_ns=received_ns)
+        trace.mark('decode')
+        signal[TRACE_KEY] = trace.trace_id
+        ...
+        trace = tracer.trace_for(signal)
+        tracer.finish(trace, OPENED)
+    """
+
+    def __init__(self, sample_rate: float = 0.0, history: int = TRACE_HISTORY,
+                 rng: Optional[Callable[[], float]] = None):
+        """
+        Args:
+            sample_rate: Fraction of signals traced (0 = off, 1 = every signal)
+            history: Breakdown rows kept in memory
+            rng: Random source for sampling (tests)
+        """
+        self.sample_rate = max(0.0, min(1.0, float(sample_rate)))
+        self.sinks: List[Callable[[Dict[str, Any]], None]] = []
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._random = rng or random.random
+        self._ids = itertools.count(1)
+        self._open: 'OrderedDict[int, SignalTrace]' = OrderedDict()
+
+        # Stats
+        self.started = 0
+        self.finished = 0
+        self.sink_errors = 0
+        self.evicted = 0
+
+    def start(self, symbol: str = '', start_ns: Optional[int] = None):
+        """New trace, or NULL_TRACE when this signal is not sampled"""
+        rate = self.sample_rate
+        if rate <= 0.0 or (rate < 1.0 and self._random() >= rate):
+            return NULL_TRACE
+        self.started += 1
+        trace = SignalTrace(next(self._ids), symbol, start_ns)
+        self._open[trace.trace_id] = trace
+        if len(self._open) > TRACE_OPEN_MAX:
+            self._open.popitem(last=False)
+            self.evicted += 1
+        return trace
+
+    def trace_for(self, signal: Dict):
+        """Open trace of a signal dict (NULL_TRACE when it is not sampled)"""
+        return self._open.get(signal.get(TRACE_KEY), NULL_TRACE)
+
+    def discard(self, signal: Dict, outcome: str = DROPPED) -> Optional[Dict[str, Any]]:
+        """Finish the trace of a signal leaving the pipeline early (no-op if none is open)"""
+        return self.finish(self.trace_for(signal), outcome)
+
+    def add_sink(self, sink: Callable[[Dict[str, Any]], None]) -> None:
+        self.sinks.append(sink)
+
+    def finish(self, trace, outcome: str = OPENED) -> Optional[Dict[str, Any]]:
+        """Export a finished trace; returns its breakdown row (None if not sampled)"""
+        if not trace.sampled:
+            return None
+        self._open.pop(trace.trace_id, None)
+        row = trace.to_row(outcome)
+        self.recent.append(row)
+        self.finished += 1
+        for sink in self.sinks:
+            try:
+                sink(row)
+            except Exception as e:
+                self.sink_errors += 1
+                logger.warning(f"Signal trace sink failed: {e}")
+        return row
+
+    def get_stats(self) -> Dict[str, Any]:
+        stage_totals: Dict[str, List[float]] = {}
+        protected = sorted(r['protected_ms'] for r in self.recent if r['protected_ms'] is not None)
+        for row in self.recent:
+            for stage, ms in row['stages'].items():
+                stage_totals.setdefault(stage, []).append(ms)
+        return {
+            'sample_rate': self.sample_rate,
+            'started': self.started,
+            'finished': self.finished,
+            'sink_errors': self.sink_errors,
+            'open': len(self._open),
+            'evicted': self.evicted,
+            'protected_p50_ms': round(protected[len(protected) // 2], 3) if protected else None,
+            'protected_max_ms': round(protected[-1], 3) if protected else None,
+            'stage_avg_ms': {stage: round(sum(v) / len(v), 3) for stage, v in stage_totals.items()},
+        }
+
+
+_sink_tasks: Set[asyncio.Task] = set()      # Keeps pending log_event tasks referenced
+
+
+def event_log_sink(row: Dict[str, Any]) -> None:
+    """Write a breakdown row as a SIGNAL_LATENCY event (non-blocking)"""
+    event_logger = get_event_logger()
+    if event_logger:
+        task = asyncio.create_task(event_logger.log_event(
+            EventType.SIGNAL_LATENCY, row,
+            correlation_id=f"signal_trace_{row['trace_id']}",
+            position_id=row.get('position_id'),
+            symbol=row.get('symbol') or None,
+            severity='INFO'
+        ))
+        _sink_tasks.add(task)
+        task.add_done_callback(_sink_tasks.discard)
@@ -0,0 +1,303 @@
+"""
+Lookback History Service — shared 1s bar history for SignalLifecycleManager
+
+Loads historical 1-second bars from Binance Futures REST aggTrades (§1.2, §9.4):
+- One pooled aiohttp session for all symbols
+- Concurrent fetches across symbols, bounded by a semaphore and a shared
+  request-weight budget (token bucket, weight per minute)
+- Trades are folded into bars page by page (no raw trade list)
+- Recent bars are cached per symbol; a repeat load for the same symbol
+  (new signal, restore) only fetches the gap since the last cached trade.
+  The cache can be primed from the persistent BarStore after a restart.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from core.bar_aggregator import OneSecondBar
+
+logger = logging.getLogger(__name__)
+
+BINANCE_FUTURES_URL = "https://fapi.binance.com"
+AGGTRADES_PATH = "/fapi/v1/aggTrades"
+AGGTRADES_WEIGHT = 20               # Request weight of /fapi/v1/aggTrades
+AGGTRADES_PAGE_LIMIT = 1000
+
+LOOKBACK_MAX_SEC = 3600             # Limit lookback to 1 hour to avoid excessive API calls
+LOOKBACK_MAX_PAGES = 20             # FIX C3-1: 20 × 1000 trades (covers active symbols)
+LOOKBACK_MAX_CONCURRENT = 4         # Symbols fetched in parallel
+LOOKBACK_WEIGHT_PER_MIN = 1200      # Shared budget (half of Binance Futures 2400/min)
+LOOKBACK_CACHE_BARS = 3600          # Cached bars per symbol
+
+
+class WeightBudget:
+    """
+    Token bucket of request weight shared by all lookback fetches.
+
+    Starts full (one minute of weight as burst) and refills continuously.
+    Waiters are served in order.
+    """
+
+    def __init__(self, weight_per_minute: int = LOOKBACK_WEIGHT_PER_MIN):
+        self.capacity = float(weight_per_minute)
+        self.tokens = self.capacity
+        self.refill_per_sec = weight_per_minute / 60.0
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.refill_per_sec)
+        self._last_refill = now
+
+    async def acquire(self, weight: int) -> float:
+        """Wait until `weight` is available and consume it. Returns seconds waited."""
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self.tokens < weight:
+                delay = (weight - self.tokens) / self.refill_per_sec
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.tokens -= weight
+        return waited
+
+
+@dataclass
+class SymbolHistory:
+    """Cached bars for one symbol and the trade time range they cover."""
+    bars: Deque[OneSecondBar]
+    from_ms: int                    # Coverage start (inclusive)
+    until_ms: int                   # Coverage end: trades up to here are in bars
+    large_threshold: float          # Threshold the large counts were computed with
+
+
+class LookbackService:
+    """
+    Shared loader for lookback bars.
+
+    Usage:
+        lookback = LookbackService()
+        bars = await lookback.load_bars('BTCUSDT', lookback_sec=600, large_threshold=10_000)
+        for bar in bars:
+            agg.add_historical_bar(bar)
+        ...
+        await lookback.close()
+    """
+
+    def __init__(
+        self,
+        base_url: str = BINANCE_FUTURES_URL,
+        max_concurrent: int = LOOKBACK_MAX_CONCURRENT,
+        weight_per_minute: int = LOOKBACK_WEIGHT_PER_MIN,
+        max_pages: int = LOOKBACK_MAX_PAGES,
+        cache_bars: int = LOOKBACK_CACHE_BARS,
+        session: Optional[aiohttp.ClientSession] = None,
+        clock: Optional[Callable[[], float]] = None,   # Epoch seconds (default: wall clock)
+    ):
+        self.url = f"{base_url}{AGGTRADES_PATH}"
+        self.max_pages = max_pages
+        self.cache_bars = cache_bars
+        self.budget = WeightBudget(weight_per_minute)
+        self.clock = clock or (lambda: time.time())
+
+        self._session = session
+        self._owns_session = session is None
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._symbol_locks: Dict[str, asyncio.Lock] = {}
+        self._cache: Dict[str, SymbolHistory] = {}
+
+        # Stats
+        self.requests = 0
+        self.cache_hits = 0
+        self.budget_wait_sec = 0.0
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """Close the pooled session (if owned)."""
+        if self._owns_session and self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def load_bars(self, symbol: str, lookback_sec: int, large_threshold: float) -> List[OneSecondBar]:
+        """
+        1s bars for the last lookback_sec seconds (capped at LOOKBACK_MAX_SEC).
+
+        Uses cached bars when they overlap the window (from its start) with
+        the same large trade threshold, fetching only trades after the
+        cached range.
+        Fetch errors are logged; whatever was loaded is returned.
+        """
+        symbol = symbol.upper()
+        lock = self._symbol_locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            end_ms = int(self.clock() * 1000)
+            start_ms = end_ms - min(lookback_sec, LOOKBACK_MAX_SEC) * 1000
+
+            history = self._cache.get(symbol)
+            if (history and history.large_threshold == large_threshold
+                    and history.from_ms <= start_ms <= history.until_ms):
+                self.cache_hits += 1
+                fetch_from = history.until_ms + 1
+            else:
+                history = None
+                fetch_from = start_ms
+
+            if fetch_from < end_ms:
+                async with self._semaphore:
+                    bars_by_second, fetched_until = await self._fetch(
+                        symbol, fetch_from, end_ms, large_threshold
+                    )
+                history = self._merge(symbol, history, bars_by_second, fetch_from, fetched_until, large_threshold)
+
+            start_sec = start_ms // 1000
+            return [bar for bar in history.bars if bar.ts >= start_sec]
+
+    def prime(self, symbol: str, bars: List[OneSecondBar], large_threshold: float):
+        """
+        Seed the cache with complete bars from another source (BarStore).
+
+        Ignored if the cache already covers a later point in time.
+        """
+        if not bars:
+            return
+        symbol = symbol.upper()
+        until_ms = bars[-1].ts * 1000 + 999
+        current = self._cache.get(symbol)
+        if current and current.until_ms >= until_ms:
+            return
+        self._cache[symbol] = SymbolHistory(
+            bars=deque(bars, maxlen=self.cache_bars),
+            from_ms=bars[0].ts * 1000,
+            until_ms=until_ms,
+            large_threshold=large_threshold,
+        )
+
+    async def _fetch(self, symbol: str, start_ms: int, end_ms: int,
+                     large_threshold: float) -> Tuple[Dict[int, list], int]:
+        """
+        Page through aggTrades for [start_ms, end_ms], folding into bars.
+
+        Returns (bars_by_second, fetched_until_ms). fetched_until_ms is
+        end_ms when the range was fully read, otherwise the last trade
+        time seen (or start_ms - 1 if nothing was read).
+        """
+        bars_by_second: Dict[int, list] = {}  # ts → [close, delta, large_buy, large_sell]
+        fetched_until = start_ms - 1
+        current_start = start_ms
+
+        try:
+            session = await self._get_session()
+            for _ in range(self.max_pages):
+                self.budget_wait_sec += await self.budget.acquire(AGGTRADES_WEIGHT)
+                params = {
+                    'symbol': symbol,
+                    'startTime': current_start,
+                    'endTime': end_ms,
+                    'limit': AGGTRADES_PAGE_LIMIT,
+                }
+                self.requests += 1
+                async with session.get(self.url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                    if resp.status != 200:
+                        logger.warning(f"Lookback API error {resp.status} for {symbol}")
+                        break
+                    trades = await resp.json()
+
+                if not trades:
+                    fetched_until = end_ms
+                    break
+
+                self._fold_trades(bars_by_second, trades, large_threshold)
+
+                # Paginate: next page starts after last trade
+                last_trade_time = trades[-1].get('T', 0)
+                fetched_until = last_trade_time
+                current_start = last_trade_time + 1
+
+                if current_start >= end_ms or len(trades) < AGGTRADES_PAGE_LIMIT:
+                    fetched_until = end_ms
+                    break
+
+        except Exception as e:
+            logger.warning(f"Lookback fetch error for {symbol}: {e}")
+
+        return bars_by_second, fetched_until
+
+    @staticmethod
+    def _fold_trades(bars_by_second: Dict[int, list], trades: List[dict], large_threshold: float):
+        """Aggregate one page of aggTrades into 1-second bars."""
+        for trade in trades:
+            ts_sec = int(trade.get('T', 0) / 1000)
+            price = float(trade.get('p', 0))
+            volume_usd = price * float(trade.get('q', 0))
+
+            bar = bars_by_second.get(ts_sec)
+            if bar is None:
+                bar = bars_by_second[ts_sec] = [price, 0.0, 0, 0]
+            bar[0] = price  # Last price = close
+
+            if trade.get('m', False):
+                bar[1] -= volume_usd
+                if volume_usd >= large_threshold:
+                    bar[3] += 1
+            else:
+                bar[1] += volume_usd
+                if volume_usd >= large_threshold:
+                    bar[2] += 1
+
+    def _merge(self, symbol: str, history: Optional[SymbolHistory], bars_by_second: Dict[int, list],
+               fetch_from: int, fetched_until: int, large_threshold: float) -> SymbolHistory:
+        """Append newly fetched bars to the symbol's cached history."""
+        if history is None:
+            history = SymbolHistory(
+                bars=deque(maxlen=self.cache_bars),
+                from_ms=fetch_from,
+                until_ms=fetch_from - 1,
+                large_threshold=large_threshold,
+            )
+            self._cache[symbol] = history
+
+        new_bars = [
+            OneSecondBar(ts=ts, price=b[0], delta=b[1], large_buy_count=b[2], large_sell_count=b[3])
+            for ts, b in sorted(bars_by_second.items())
+        ]
+
+        # The cached range may end mid-second: merge into the same bar
+        if new_bars and history.bars and history.bars[-1].ts == new_bars[0].ts:
+            cached = history.bars.pop()
+            first = new_bars[0]
+            new_bars[0] = OneSecondBar(
+                ts=first.ts,
+                price=first.price,
+                delta=cached.delta + first.delta,
+                large_buy_count=cached.large_buy_count + first.large_buy_count,
+                large_sell_count=cached.large_sell_count + first.large_sell_count,
+            )
+
+        history.bars.extend(new_bars)
+        history.until_ms = max(history.until_ms, fetched_until)
+        if history.bars and len(history.bars) == history.bars.maxlen:
+            history.from_ms = max(history.from_ms, history.bars[0].ts * 1000)
+        return history
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lookback service statistics."""
+        return {
+            'requests': self.requests,
+            'cache_hits': self.cache_hits,
+            'cached_symbols': len(self._cache),
+            'budget_tokens': round(self.budget.tokens, 1),
+            'budget_wait_sec': round(self.budget_wait_sec, 2),
+        }
@@ -0,0 +1,153 @@
+"""
+On-disk Markets / Leverage Bracket Cache
+
+One JSON file per exchange (<directory>/<exchange>.json) holding the CCXT
+markets from load_markets, the leverage brackets and a fingerprint of the
+exchange info they were built from. On restart ExchangeManager validates the
+entry — cache format and CCXT version, age, and (Binance) the fingerprint of
+the current USDⓈ-M exchangeInfo — and uses it instead of the full
+load_markets round trips (spot / linear / inverse exchangeInfo + currencies).
+
+Files are written to a temp file and atomically swapped in.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import ccxt
+
+logger = logging.getLogger(__name__)
+
+MARKETS_CACHE_VERSION = 1
+MARKETS_CACHE_MAX_AGE_SEC = 86400
+
+
+def exchange_info_fingerprint(symbols: Iterable[Dict[str, Any]]) -> str:
+    """
+    Fingerprint of raw exchangeInfo symbol entries: symbol, status and filters
+
+    Works on both the exchangeInfo response ('symbols') and the 'info' of
+    CCXT markets, so a cache entry can be checked against the live endpoint.
+    """
+    rows = sorted(
+        (s.get('symbol', ''), s.get('status', ''), json.dumps(s.get('filters', []), sort_keys=True))
+        for s in symbols
+    )
+    return hashlib.sha1(json.dumps(rows).encode()).hexdigest()
+
+
+@dataclass
+class MarketsCacheEntry:
+    """Cached markets of one exchange"""
+    exchange: str
+    saved_at: float
+    fingerprint: Optional[str]
+    markets: Dict[str, Any]
+    leverage_brackets: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+
+
+class MarketsCache:
+    """
+    Versioned per-exchange markets cache.
+
+    Usage:
+        cache = MarketsCache('data/markets', max_age_sec=86400)
+        entry = cache.load('binance')           # None if missing / invalid / expired
+        cache.save('binance', markets, fingerprint, leverage_brackets)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_age_sec: float = MARKETS_CACHE_MAX_AGE_SEC,
+        clock: Optional[Callable[[], float]] = None,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_age_sec = max_age_sec
+        self.clock = clock or (lambda: time.time())
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.saves = 0
+
+    def path(self, exchange: str) -> Path:
+        return self.directory / f"{exchange}.json"
+
+    def load(self, exchange: str) -> Optional[MarketsCacheEntry]:
+        """Cached entry for exchange, None if missing, unreadable, other version or expired"""
+        path = self.path(exchange)
+        if not path.exists():
+            self.misses += 1
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Markets cache for {exchange} unreadable ({e}), ignoring")
+            self.misses += 1
+            return None
+
+        if data.get('version') != MARKETS_CACHE_VERSION or data.get('ccxt_version') != ccxt.__version__:
+            logger.info(f"Markets cache for {exchange} has another format/CCXT version, ignoring")
+            self.misses += 1
+            return None
+        age = self.clock() - data.get('saved_at', 0)
+        if age > self.max_age_sec:
+            logger.info(f"Markets cache for {exchange} expired ({age:.0f}s old)")
+            self.misses += 1
+            return None
+        if not data.get('markets'):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return MarketsCacheEntry(
+            exchange=exchange,
+            saved_at=data['saved_at'],
+            fingerprint=data.get('fingerprint'),
+            markets=data['markets'],
+            leverage_brackets=data.get('leverage_brackets') or {},
+        )
+
+    def save(
+        self,
+        exchange: str,
+        markets: Dict[str, Any],
+        fingerprint: Optional[str],
+        leverage_brackets: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    ) -> None:
+        path = self.path(exchange)
+        tmp = path.with_suffix('.json.tmp')
+        data = {
+            'version': MARKETS_CACHE_VERSION,
+            'ccxt_version': ccxt.__version__,
+            'exchange': exchange,
+            'saved_at': self.clock(),
+            'fingerprint': fingerprint,
+            'markets': markets,
+            'leverage_brackets': leverage_brackets or {},
+        }
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(data, f, default=str)
+            os.replace(tmp, path)
+            self.saves += 1
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write markets cache for {exchange}: {e}")
+
+    def invalidate(self, exchange: str) -> None:
+        try:
+            self.path(exchange).unlink()
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'hits': self.hits, 'misses': self.misses, 'saves': self.saves}
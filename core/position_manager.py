@@ -40,7 +40,7 @@ See docs/POSITION_CLEANUP_ARCHITECTURE.md for details.
 import asyncio
 import logging
 import os
-from typing import Dict, Optional, List
+from typing import Any, Callable, Dict, Optional, List
 from decimal import Decimal
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -52,6 +52,9 @@ from protection.trailing_stop import SmartTrailingStopManager
 from websocket.event_router import EventRouter
 from core.exchange_manager import ExchangeManager
 from core.event_logger import get_event_logger, EventType
+from core.latency_trace import NULL_TRACE
+from core.position_price_writer import PositionPriceWriter, POSITION_DB_FLUSH_INTERVAL_SEC
+from core.protection_snapshot import ProtectionSnapshot, PROTECTION_SNAPSHOT_MAX_AGE_SEC
 from core.atomic_position_manager import AtomicPositionManager, SymbolUnavailableError, MinimumOrderLimitError
 from utils.decimal_utils import to_decimal, calculate_stop_loss, calculate_pnl, calculate_quantity
 
@@ -145,6 +148,9 @@ class PositionRequest:
     # §6.6: If True, lifecycle manages TS/SL — skip legacy SmartTrailingStopManager
     lifecycle_managed: bool = False
 
+    # Signal latency trace (core.latency_trace) marked up to the protected position
+    trace: Optional[Any] = None
+
 
 @dataclass
 class PositionState:
@@ -288,6 +294,18 @@ class PositionManager:
         # CRITICAL FIX: Whitelist of protected order IDs (stop-loss, take-profit)
         self.protected_order_ids = set()  # Set of order IDs that must never be cancelled
 
+        # Write-behind for mark price ticks: price/PnL flushed in batches
+        self.price_writer = PositionPriceWriter(
+            repository,
+            flush_interval_sec=getattr(config, 'position_db_flush_interval_sec', POSITION_DB_FLUSH_INTERVAL_SEC)
+        )
+
+        # Account-wide Algo order snapshots for the protection sweep (Binance), per exchange
+        self.protection_snapshots: Dict[str, ProtectionSnapshot] = {}
+        self.protection_snapshot_max_age_sec = getattr(
+            config, 'protection_snapshot_max_age_sec', PROTECTION_SNAPSHOT_MAX_AGE_SEC
+        )
+
         logger.info("PositionManager initialized")
 
     def set_aggtrades_stream(self, aggtrades_stream, window_sec: int = 20, threshold_mult: float = 1.5):
@@ -422,8 +440,14 @@ class PositionManager:
             logger.error(f"Error verifying position {symbol}: {e}")
             return False
 
-    async def load_positions_from_db(self):
-        """Load open positions from database on startup"""
+    async def load_positions_from_db(self, on_protected: Optional[Callable[[], None]] = None):
+        """
+        Load open positions from database on startup
+
+        Args:
+            on_protected: Called once every loaded position has a verified
+                stop loss (before trailing stops are initialized)
+        """
         try:
             # FIRST: Synchronize with exchanges
             await self.synchronize_with_exchanges()
@@ -647,7 +671,10 @@ class PositionManager:
                         logger.error(f"Error setting stop loss for {position.symbol}: {e}")
             else:
                 logger.info("✅ All loaded positions have stop losses")
-            
+
+            if on_protected and all(p.has_stop_loss for p in self.positions.values()):
+                on_protected()
+
             # Initialize trailing stops for loaded positions
             # NEW: Try to restore from DB first, otherwise create new
             logger.info("🎯 Initializing trailing stops for loaded positions...")
@@ -832,6 +859,7 @@ class PositionManager:
                         except Exception as e:
                             logger.warning(f"Failed to log sync_cleanup exit: {e}")
 
+                        await self.price_writer.flush()
                         await self.repository.close_position(
                             pos_state.id,                           # position_id: int
                             float(pos_state.current_price) if pos_state.current_price else 0.0,        # close_price: float
@@ -839,6 +867,7 @@ class PositionManager:
                             float(pos_state.unrealized_pnl_percent) if pos_state.unrealized_pnl_percent else 0.0, # pnl_percentage: float
                             'sync_cleanup'                          # reason: str
                         )
+                        self.price_writer.discard(pos_state.id)
                     # ✅ REFACTOR: Use centralized cleanup method
                     # This ensures ALL monitoring systems are notified:
                     # - trailing_stop_manager (already was notified)
@@ -1064,6 +1093,12 @@ class PositionManager:
         async def handle_order_update(data: Dict):
             await self._on_order_fill_data(data)
 
+        @self.event_router.on('algo.update')
+        async def handle_algo_update(data: Dict):
+            snapshot = self._get_protection_snapshot('binance')
+            if snapshot:
+                snapshot.apply_algo_update(data)
+
         @self.event_router.on('stop_loss.triggered')
         async def handle_stop_loss(data: Dict):
             await self._on_stop_loss_triggered(data)
@@ -1233,7 +1268,10 @@ class PositionManager:
                 return None
 
             # 5. Measure spread at entry (for analytics, does not block)
+            trace = request.trace or NULL_TRACE
+            trace.mark('risk_checks')
             spread_at_entry = await self._validate_spread(exchange, symbol)
+            trace.mark('spread')
 
             # 6. Calculate stop-loss price first
             # FIX: Convert order side (BUY/SELL) to position side (long/short) before SL calculation
@@ -1413,6 +1451,7 @@ class PositionManager:
                     self.position_count += 1
                     self.total_exposure += Decimal(str(position.quantity * position.entry_price))
                     self.stats['positions_opened'] += 1
+                    await self._emit_position_opened(position)
 
                     logger.info(
                         f"✅ Position opened: {symbol} {position.side} "
@@ -1744,6 +1783,7 @@ class PositionManager:
             self.position_count += 1
             self.total_exposure += Decimal(str(position.quantity * position.entry_price))
             self.stats['positions_opened'] += 1
+            await self._emit_position_opened(position)
 
             # Apply any buffered WebSocket updates
             if symbol in self.pending_updates:
@@ -2483,22 +2523,13 @@ class PositionManager:
                 else:
                     position.unrealized_pnl = (float(position.entry_price) - float(position.current_price)) * qty
 
-                # Persist price and PnL to database
-                logger.info(
+                # Persist price and PnL to database (batched by the write-behind)
+                logger.debug(
                     f"[DB_UPDATE] {symbol}: id={position.id}, "
                     f"price={position.current_price}, "
                     f"pnl=${float(position.unrealized_pnl):.4f}, "
                     f"pnl%={position.unrealized_pnl_percent:.2f}"
                 )
-                try:
-                    await self.repository.update_position(
-                        position.id,
-                        current_price=position.current_price,
-                        unrealized_pnl=position.unrealized_pnl,
-                        pnl_percentage=position.unrealized_pnl_percent
-                    )
-                except Exception as e:
-                    logger.error(f"[DB_UPDATE] Failed for {symbol}: {e}")
 
             # Update trailing stop
             # LOCK: Acquire lock for trailing stop update
@@ -2509,13 +2540,13 @@ class PositionManager:
             async with self.trailing_stop_locks[trailing_lock_key]:
                 trailing_manager = self.trailing_managers.get(position.exchange)
 
-                # В position_manager.py, метод _on_position_update, после строки 1969
-                # В position_manager.py, метод _on_position_update, после строки 1969
-                logger.info(f"[TS_DEBUG] Exchange: {position.exchange}, "
-                            f"Trailing manager exists: {trailing_manager is not None}, "
-                            f"TS symbols in memory: {list(trailing_manager.trailing_stops.keys()) if trailing_manager else []}, "
-                            f"Pos TS Activated: {position.trailing_activated}, "
-                            f"Opened: {position.opened_at}")
+                # Per-tick dump of every TS key: DEBUG only, built only when enabled
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"[TS_DEBUG] Exchange: {position.exchange}, "
+                                 f"Trailing manager exists: {trailing_manager is not None}, "
+                                 f"TS symbols in memory: {list(trailing_manager.trailing_stops.keys()) if trailing_manager else []}, "
+                                 f"Pos TS Activated: {position.trailing_activated}, "
+                                 f"Opened: {position.opened_at}")
 
                 if trailing_manager and position.has_trailing_stop:
                     # NEW: Update TS health timestamp before calling TS Manager
@@ -2623,58 +2654,9 @@ class PositionManager:
                                             severity='ERROR'
                                         )
 
-            # Update database
-            try:
-                await self.repository.update_position_from_websocket({
-                    'symbol': symbol,
-                    'exchange': position.exchange,
-                    'current_price': position.current_price,
-                    'mark_price': position.current_price,
-                    'unrealized_pnl': position.unrealized_pnl,
-                    'unrealized_pnl_percent': position.unrealized_pnl_percent,
-                    'pnl_percentage': position.unrealized_pnl_percent,
-                })
-
-                # Log successful position update
-                event_logger = get_event_logger()
-                if event_logger:
-                    await event_logger.log_event(
-                        EventType.POSITION_UPDATED,
-                        {
-                            'symbol': symbol,
-                            'position_id': position.id,
-                            'old_price': float(old_price),
-                            'new_price': float(position.current_price),
-                            'unrealized_pnl': float(position.unrealized_pnl) if position.unrealized_pnl is not None else 0.0,
-                            'unrealized_pnl_percent': float(position.unrealized_pnl_percent) if position.unrealized_pnl_percent is not None else 0.0,
-                            'source': 'websocket'
-                        },
-                        position_id=position.id,
-                        symbol=symbol,
-                        exchange=position.exchange,
-                        severity='INFO'
-                    )
-
-            except Exception as db_error:
-                logger.error(f"Failed to update position from websocket in database for {symbol}: {db_error}")
-
-                # Log database update failure
-                event_logger = get_event_logger()
-                if event_logger:
-                    await event_logger.log_event(
-                        EventType.DATABASE_ERROR,
-                        {
-                            'symbol': symbol,
-                            'position_id': position.id,
-                            'operation': 'update_position_from_websocket',
-                            'error': str(db_error),
-                            'current_price': float(position.current_price)
-                        },
-                        position_id=position.id,
-                        symbol=symbol,
-                        exchange=position.exchange,
-                        severity='ERROR'
-                    )
+            # Update database: latest price/PnL is flushed in batches by the
+            # write-behind (one UPDATE for all dirty positions, POSITION_UPDATED per flush)
+            self.price_writer.mark(position)
 
 
 
@@ -2975,7 +2957,8 @@ class PositionManager:
                 except Exception as e:
                     logger.warning(f"Failed to log exit trade: {e}")
 
-                # Update database
+                # Update database (pending price updates first, so the close is the last write)
+                await self.price_writer.flush()
                 await self.repository.close_position(
                     position.id,                    # position_id: int
                     float(exit_price),              # close_price: float
@@ -2983,6 +2966,7 @@ class PositionManager:
                     float(realized_pnl_percent),    # pnl_percentage: float
                     reason                          # reason: str
                 )
+                self.price_writer.discard(position.id)
 
                 # Update statistics
                 self.stats['positions_closed'] += 1
@@ -2994,6 +2978,20 @@ class PositionManager:
                 else:
                     self.stats['loss_count'] += 1
 
+                await self._emit_position_event('position.closed', {
+                    'position_id': position.id,
+                    'symbol': symbol,
+                    'exchange': position.exchange,
+                    'side': position.side,
+                    'quantity': float(position.quantity),
+                    'entry_price': float(position.entry_price),
+                    'exit_price': float(exit_price),
+                    'realized_pnl': float(realized_pnl),
+                    'realized_pnl_percent': float(realized_pnl_percent),
+                    'reason': reason,
+                    'closed_at': datetime.now(timezone.utc),
+                })
+
                 # ✅ REFACTOR: Use centralized cleanup method
                 cleanup_result = await self._cleanup_position_monitoring(
                     symbol=symbol,
@@ -3109,6 +3107,24 @@ class PositionManager:
                     severity='ERROR'
                 )
 
+    async def _emit_position_opened(self, position: PositionState):
+        await self._emit_position_event('position.opened', {
+            'position_id': position.id,
+            'symbol': position.symbol,
+            'exchange': position.exchange,
+            'side': position.side,
+            'quantity': float(position.quantity),
+            'entry_price': float(position.entry_price),
+            'opened_at': position.opened_at,
+        })
+
+    async def _emit_position_event(self, event: str, data: Dict):
+        """position.opened / position.closed for metrics and listeners; never fails the caller"""
+        try:
+            await self.event_router.emit(event, data, source='position_manager')
+        except Exception as e:
+            logger.error(f"Failed to emit {event} for {data.get('symbol')}: {e}")
+
     async def _cleanup_position_monitoring(
         self,
         symbol: str,
@@ -3196,6 +3212,7 @@ class PositionManager:
                     position = self.positions[symbol]
                     del self.positions[symbol]
                     self.position_count -= 1
+                    self.price_writer.discard(position.id)
 
                     # Update total exposure
                     if position_data:
@@ -3468,17 +3485,39 @@ class PositionManager:
     # NOTE: check_position_age() method removed 2026-02-12
     # Timeout logic handled by Smart Timeout v2.0 in signal_lifecycle.py
 
+    def _get_protection_snapshot(self, exchange_name: str) -> Optional[ProtectionSnapshot]:
+        """Algo order snapshot for exchange (Binance only), created on first use"""
+        if exchange_name != 'binance':
+            return None
+        snapshot = self.protection_snapshots.get(exchange_name)
+        if snapshot is None:
+            exchange = self.exchanges.get(exchange_name)
+            if not exchange:
+                return None
+            snapshot = ProtectionSnapshot(exchange.exchange, max_age_sec=self.protection_snapshot_max_age_sec)
+            self.protection_snapshots[exchange_name] = snapshot
+        return snapshot
+
     async def check_positions_protection(self):
         """
         Periodically check and fix positions without stop loss.
 
-        Now using unified StopLossManager for ALL SL checks.
+        Binance: SL presence is answered from the account-wide ProtectionSnapshot
+        (one REST request per sweep at most); only positions found without SL
+        are re-checked and repaired over REST by StopLossManager.
+        Other exchanges (or if the snapshot can't be fetched): StopLossManager per position.
         """
         try:
             from core.stop_loss_manager import StopLossManager
 
             unprotected_positions = []
 
+            snapshots = {}
+            for exchange_name in {position.exchange for position in list(self.positions.values())}:
+                snapshot = self._get_protection_snapshot(exchange_name)
+                if snapshot and await snapshot.ensure_fresh():
+                    snapshots[exchange_name] = snapshot
+
             # Check all positions for stop loss - verify on exchange using unified manager
             # FIX: Create snapshot of keys to avoid "dictionary changed size during iteration"
             for symbol in list(self.positions.keys()):
@@ -3505,9 +3544,13 @@ class PositionManager:
                 # UNIFIED APPROACH: Use StopLossManager for SL check
                 # ============================================================
                 try:
-                    # ✅ FIX #1.4a: Pass position_manager for TS-awareness
-                    sl_manager = StopLossManager(exchange.exchange, position.exchange, position_manager=self)
-                    has_sl_on_exchange, sl_price, _ = await sl_manager.has_stop_loss(symbol)
+                    snapshot = snapshots.get(position.exchange)
+                    if snapshot:
+                        has_sl_on_exchange, sl_price, _ = snapshot.has_stop_loss(symbol)
+                    else:
+                        # ✅ FIX #1.4a: Pass position_manager for TS-awareness
+                        sl_manager = StopLossManager(exchange.exchange, position.exchange, position_manager=self)
+                        has_sl_on_exchange, sl_price, _ = await sl_manager.has_stop_loss(symbol)
 
                     logger.info(f"Checking position {symbol}: has_sl={has_sl_on_exchange}, price={sl_price}")
                     
@@ -4305,5 +4348,7 @@ class PositionManager:
                 'current_sync_interval': self.sync_interval,
                 'aggressive_threshold': self.aggressive_cleanup_threshold
             },
+            'price_writer': self.price_writer.get_stats(),
+            'protection_snapshots': {name: snapshot.get_stats() for name, snapshot in self.protection_snapshots.items()},
             'losses': self.stats['loss_count']
         }
\ No newline at end of file
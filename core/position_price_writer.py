@@ -0,0 +1,210 @@
+"""
+Write-Behind Cache for Position Price / PnL
+
+Mark price ticks (1 Hz per position) only update the in-memory latest
+current_price / unrealized_pnl / pnl_percentage per position. Dirty rows
+are written in one batched UPDATE (Repository.batch_update_position_prices)
+every flush_interval_sec, instead of two UPDATEs per tick.
+
+One POSITION_UPDATED event is logged per flushed row (price change since
+the previous flush), not per tick.
+
+PositionManager forces a flush before closing a position; main.py closes
+the writer (final flush) on shutdown before the database pool.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+from core.event_logger import EventType, get_event_logger
+
+logger = logging.getLogger(__name__)
+
+POSITION_DB_FLUSH_INTERVAL_SEC = 2.0
+ROUND_TRIP_WINDOW_SEC = 60          # Window for round_trips_per_sec
+
+
+@dataclass
+class PendingPriceUpdate:
+    """Latest unflushed price/PnL of one position."""
+    symbol: str
+    exchange: str
+    current_price: float
+    unrealized_pnl: float
+    pnl_percentage: float
+    first_marked: float             # monotonic time of the oldest unflushed tick
+
+
+class PositionPriceWriter:
+    """
+    Coalesces position price/PnL updates and flushes them in batches.
+
+    Usage:
+        writer = PositionPriceWriter(repository, flush_interval_sec=2.0)
+        writer.mark(position)        # on every mark price tick
+        await writer.flush()         # before closing a position
+        await writer.close()         # on shutdown
+    """
+
+    def __init__(self, repository, flush_interval_sec: float = POSITION_DB_FLUSH_INTERVAL_SEC):
+        self.repository = repository
+        self.flush_interval_sec = max(0.1, float(flush_interval_sec))
+
+        self._pending: Dict[int, PendingPriceUpdate] = {}
+        self._flushed_prices: Dict[int, float] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._round_trip_times: Deque[float] = deque()
+
+        # Stats
+        self.marks = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.flush_errors = 0
+        self.last_flush_lag_ms = 0.0
+        self.max_flush_lag_ms = 0.0
+
+    def mark(self, position) -> None:
+        """Record the position's latest price/PnL (written on the next flush)."""
+        if not isinstance(position.id, int):
+            return
+
+        self.marks += 1
+        pending = self._pending.get(position.id)
+        first_marked = pending.first_marked if pending else time.monotonic()
+        self._pending[position.id] = PendingPriceUpdate(
+            symbol=position.symbol,
+            exchange=position.exchange,
+            current_price=float(position.current_price),
+            unrealized_pnl=float(position.unrealized_pnl or 0),
+            pnl_percentage=float(position.unrealized_pnl_percent or 0),
+            first_marked=first_marked,
+        )
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+            except RuntimeError:
+                pass  # No running loop: rows stay pending until an explicit flush
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval_sec)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Position price flush loop error: {e}", exc_info=True)
+
+    async def flush(self) -> int:
+        """Write all pending rows in one statement. Returns rows written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            rows = [
+                (position_id, u.current_price, u.unrealized_pnl, u.pnl_percentage)
+                for position_id, u in batch.items()
+            ]
+            oldest = min(u.first_marked for u in batch.values())
+
+            try:
+                self._record_round_trip()
+                await self.repository.batch_update_position_prices(rows)
+            except Exception as e:
+                self.flush_errors += 1
+                # Keep the rows unless a newer tick replaced them meanwhile
+                for position_id, update in batch.items():
+                    self._pending.setdefault(position_id, update)
+                logger.error(f"Failed to flush {len(rows)} position price updates: {e}")
+                await self._log_flush_error(e, len(rows))
+                return 0
+
+            lag_ms = (time.monotonic() - oldest) * 1000
+            self.last_flush_lag_ms = lag_ms
+            self.max_flush_lag_ms = max(self.max_flush_lag_ms, lag_ms)
+            self.flushes += 1
+            self.rows_written += len(rows)
+
+            await self._log_updates(batch)
+            return len(rows)
+
+    def discard(self, position_id: int):
+        """Forget a position (closed elsewhere)."""
+        self._pending.pop(position_id, None)
+        self._flushed_prices.pop(position_id, None)
+
+    async def close(self):
+        """Stop the flush loop and write what is pending."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
+
+    def _record_round_trip(self):
+        now = time.monotonic()
+        self._round_trip_times.append(now)
+        while self._round_trip_times and now - self._round_trip_times[0] > ROUND_TRIP_WINDOW_SEC:
+            self._round_trip_times.popleft()
+
+    async def _log_updates(self, batch: Dict[int, PendingPriceUpdate]):
+        event_logger = get_event_logger()
+        for position_id, update in batch.items():
+            old_price = self._flushed_prices.get(position_id, update.current_price)
+            self._flushed_prices[position_id] = update.current_price
+            if event_logger:
+                await event_logger.log_event(
+                    EventType.POSITION_UPDATED,
+                    {
+                        'symbol': update.symbol,
+                        'position_id': position_id,
+                        'old_price': old_price,
+                        'new_price': update.current_price,
+                        'unrealized_pnl': update.unrealized_pnl,
+                        'unrealized_pnl_percent': update.pnl_percentage,
+                        'source': 'websocket'
+                    },
+                    position_id=position_id,
+                    symbol=update.symbol,
+                    exchange=update.exchange,
+                    severity='INFO'
+                )
+
+    async def _log_flush_error(self, error: Exception, row_count: int):
+        event_logger = get_event_logger()
+        if event_logger:
+            await event_logger.log_event(
+                EventType.DATABASE_ERROR,
+                {
+                    'operation': 'batch_update_position_prices',
+                    'error': str(error),
+                    'rows': row_count
+                },
+                severity='ERROR'
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write-behind statistics."""
+        now = time.monotonic()
+        recent = sum(1 for t in self._round_trip_times if now - t <= ROUND_TRIP_WINDOW_SEC)
+        return {
+            'flush_interval_sec': self.flush_interval_sec,
+            'pending': len(self._pending),
+            'marks': self.marks,
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+            'flush_errors': self.flush_errors,
+            'round_trips_per_sec': round(recent / ROUND_TRIP_WINDOW_SEC, 3),
+            'last_flush_lag_ms': round(self.last_flush_lag_ms, 1),
+            'max_flush_lag_ms': round(self.max_flush_lag_ms, 1),
+        }
@@ -0,0 +1,174 @@
+"""
+Account-Wide Protection Snapshot (Binance Algo orders)
+
+Since the December 2025 migration Binance stop losses are Algo orders.
+Instead of one openAlgoOrders request per position on every protection
+sweep, ProtectionSnapshot fetches all open Algo orders of the account in
+one request, indexes them by symbol, and answers has_stop_loss() from
+memory with the same matching rules as StopLossManager.has_stop_loss.
+
+The snapshot is kept fresh by ALGO_UPDATE events from BinanceHybridStream
+(routed as 'algo.update') and is refetched when older than max_age_sec,
+which bounds the damage of events missed during a user stream reconnect.
+Positions reported without SL are re-checked over REST before repair
+(StopLossManager.verify_and_fix_missing_sl), so a stale "missing" never
+creates a duplicate SL.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROTECTION_SNAPSHOT_MAX_AGE_SEC = 60.0
+ACTIVE_ALGO_STATUSES = ('NEW', 'WORKING')
+
+# Accessor names across CCXT versions (same list as StopLossManager._fetch_algo_orders)
+OPEN_ALGO_ORDERS_METHODS = (
+    'fapiPrivateGetOpenAlgoOrders',
+    'fapiprivate_get_openalgoorders',
+    'fapi_private_get_open_algo_orders',
+)
+
+
+def to_binance_symbol(symbol: str) -> str:
+    """'BTC/USDT:USDT' or 'BTCUSDT' → 'BTCUSDT' (as in StopLossManager.has_stop_loss)"""
+    return symbol.replace('/', '').replace(':USDT', '')
+
+
+class ProtectionSnapshot:
+    """
+    In-memory index of open Algo orders for one Binance account.
+
+    Usage:
+        snapshot = ProtectionSnapshot(exchange.exchange)
+        if await snapshot.ensure_fresh():
+            has_sl, sl_price, algo_id = snapshot.has_stop_loss('BTCUSDT')
+        snapshot.apply_algo_update(algo_info)   # on every ALGO_UPDATE
+    """
+
+    def __init__(self, exchange, max_age_sec: float = PROTECTION_SNAPSHOT_MAX_AGE_SEC):
+        """
+        Args:
+            exchange: CCXT exchange instance (ExchangeManager.exchange)
+            max_age_sec: Refetch the snapshot when older than this
+        """
+        self.exchange = exchange
+        self.max_age_sec = float(max_age_sec)
+
+        self._orders: Dict[str, Dict[str, Dict]] = {}    # {symbol: {algo_id: algo_order}}
+        self._refreshed_at: Optional[float] = None        # monotonic time of last successful fetch
+        self._refresh_lock = asyncio.Lock()
+        self._updates_during_refresh: Optional[List[Dict]] = None
+
+        # Stats
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.updates_applied = 0
+        self.lookups = 0
+
+    def is_fresh(self) -> bool:
+        return self._refreshed_at is not None and time.monotonic() - self._refreshed_at <= self.max_age_sec
+
+    async def ensure_fresh(self) -> bool:
+        """Refetch if stale. Returns False if no usable snapshot (caller falls back to REST)."""
+        if self.is_fresh():
+            return True
+        async with self._refresh_lock:
+            if self.is_fresh():
+                return True
+            return await self.refresh()
+
+    async def refresh(self) -> bool:
+        """Fetch all open Algo orders of the account (one weighted request)."""
+        self._updates_during_refresh = []
+        try:
+            algo_orders = await self._fetch_all_algo_orders()
+        except Exception as e:
+            self.refresh_errors += 1
+            self._refreshed_at = None
+            logger.warning(f"Protection snapshot refresh failed: {e}")
+            return False
+        finally:
+            updates, self._updates_during_refresh = self._updates_during_refresh, None
+
+        orders: Dict[str, Dict[str, Dict]] = {}
+        for algo_order in algo_orders:
+            if algo_order.get('algoStatus') in ACTIVE_ALGO_STATUSES:
+                orders.setdefault(algo_order.get('symbol', ''), {})[str(algo_order.get('algoId'))] = algo_order
+        self._orders = orders
+        self._refreshed_at = time.monotonic()
+        self.refreshes += 1
+
+        # Events that arrived while the request was in flight are newer than the response
+        for algo_order in updates:
+            self._apply(algo_order)
+
+        logger.debug(f"Protection snapshot: {len(algo_orders)} open algo orders on {len(orders)} symbols")
+        return True
+
+    async def _fetch_all_algo_orders(self) -> list:
+        for attr in OPEN_ALGO_ORDERS_METHODS:
+            method = getattr(self.exchange, attr, None)
+            if method is not None:
+                algo_orders = await method({})
+                if not isinstance(algo_orders, list):
+                    raise TypeError(f"unexpected openAlgoOrders response: {type(algo_orders).__name__}")
+                return algo_orders
+        raise AttributeError("CCXT missing Algo Order method (fapiPrivateGetOpenAlgoOrders)")
+
+    def apply_algo_update(self, algo_order: Dict) -> None:
+        """Apply an ALGO_UPDATE (REST-shaped keys: algoId, symbol, algoStatus, ...)."""
+        if self._updates_during_refresh is not None:
+            self._updates_during_refresh.append(algo_order)
+        self._apply(algo_order)
+        self.updates_applied += 1
+
+    def _apply(self, algo_order: Dict) -> None:
+        symbol = algo_order.get('symbol', '')
+        algo_id = str(algo_order.get('algoId'))
+        if algo_order.get('algoStatus') in ACTIVE_ALGO_STATUSES:
+            self._orders.setdefault(symbol, {})[algo_id] = algo_order
+        else:
+            symbol_orders = self._orders.get(symbol)
+            if symbol_orders:
+                symbol_orders.pop(algo_id, None)
+                if not symbol_orders:
+                    del self._orders[symbol]
+
+    def has_stop_loss(
+        self,
+        symbol: str,
+        position_side: Optional[str] = None
+    ) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Same result as StopLossManager.has_stop_loss for Binance, from memory.
+
+        Returns:
+            Tuple[bool, Optional[str], Optional[str]]: (has_sl, sl_price, algo_id)
+        """
+        self.lookups += 1
+        expected_side = None
+        if position_side:
+            expected_side = 'sell' if position_side == 'long' else 'buy'
+
+        for algo_id, algo_order in self._orders.get(to_binance_symbol(symbol), {}).items():
+            if algo_order.get('algoType') != 'CONDITIONAL':
+                continue
+            if expected_side and algo_order.get('side', '').lower() != expected_side:
+                continue
+            return True, algo_order.get('triggerPrice'), algo_id
+        return False, None, None
+
+    def get_stats(self) -> Dict:
+        return {
+            'symbols': len(self._orders),
+            'open_algo_orders': sum(len(orders) for orders in self._orders.values()),
+            'age_sec': round(time.monotonic() - self._refreshed_at, 1) if self._refreshed_at is not None else None,
+            'refreshes': self.refreshes,
+            'refresh_errors': self.refresh_errors,
+            'updates_applied': self.updates_applied,
+            'lookups': self.lookups,
+        }
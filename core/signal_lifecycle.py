@@ -9,21 +9,24 @@ Implements TRADING_BOT_ALGORITHM_SPEC.md:
 - §8: PnL calculation on close
 
 Each signal creates an independent SignalLifecycle with its own BarAggregator.
-The on_bar() callback runs the spec's priority-ordered checks every second.
+Completed bars are queued per symbol; a single 1s bar clock flushes all
+aggregators and runs the spec's priority-ordered on_bar() checks in one
+sharded pass per second.
 
 Date: 2026-02-09
 """
 
 import asyncio
 import logging
+import math
 import os
 import time
-import aiohttp
+from collections import deque
 from datetime import datetime
 from core.event_logger import get_event_logger, EventType
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from enum import Enum
-from typing import Dict, Optional, Any, Callable, List
+from typing import Deque, Dict, Optional, Any, Callable
 
 from core.composite_strategy import (
     CompositeStrategy, StrategyParams, DerivedConstants,
@@ -33,6 +36,10 @@ from core.composite_strategy import (
     SMART_TIMEOUT_VOL_ZSCORE_MIN, SMART_TIMEOUT_PAIR_DUMP_PCT,
 )
 from core.bar_aggregator import BarAggregator, OneSecondBar
+from core.columnar_bar_aggregator import ColumnarBarAggregator
+from core.bar_store import BarStore
+from core.latency_trace import NULL_TRACE
+from core.lookback_service import LOOKBACK_MAX_SEC, LookbackService
 from core.pnl_calculator import (
     calculate_pnl_from_entry,
     calculate_drawdown_from_max,
@@ -42,6 +49,9 @@ from core.pnl_calculator import (
 
 logger = logging.getLogger(__name__)
 
+# Bar clock (§12.3): one scheduler per manager instead of a task per bar
+BAR_BACKLOG_MAX = 10        # Pending bars kept per symbol (oldest dropped beyond)
+
 
 # ==============================================================================
 # State Machine
@@ -55,6 +65,20 @@ class SignalState(Enum):
     FINALIZED = "finalized"             # Lifecycle complete
 
 
+@dataclass
+class BarClockStats:
+    """Bar clock counters (exposed via get_stats()['bar_clock'])"""
+    ticks: int = 0
+    last_tick_ms: float = 0.0           # Wall time of the last tick (flush + checks)
+    max_tick_ms: float = 0.0
+    last_lag_ms: float = 0.0            # Tick start behind its second boundary
+    max_lag_ms: float = 0.0
+    caught_up_ticks: int = 0            # Boundaries ticked late after a loop stall
+    bars_processed: int = 0
+    busy_symbol_ticks: int = 0          # Ticks that found a symbol's evaluation still running
+    bars_dropped: int = 0               # Bars evicted from a full backlog
+
+
 @dataclass
 class TradeRecord:
     """Record of a single entry/exit cycle"""
@@ -127,6 +151,9 @@ class SignalLifecycle:
     extension_start_ts: int = 0
     last_strength_check_ts: int = 0
 
+    # Latency trace of the initial entry (core.latency_trace); re-entries are not traced
+    trace: Any = NULL_TRACE
+
 
 # ==============================================================================
 # Lifecycle Manager
@@ -141,7 +168,7 @@ class SignalLifecycleManager:
     - Uses CompositeStrategy for rule matching
     - Uses BarAggregator for delta calculations
     - Delegates position open/close to position_manager
-    - Self-contained monitoring via on_bar() callbacks
+    - Self-contained monitoring: on_bar() checks driven by a 1s bar clock
     
     Usage:
         manager = SignalLifecycleManager(
@@ -163,6 +190,12 @@ class SignalLifecycleManager:
         repository=None,                     # For lifecycle persistence (§4.1)
         max_concurrent_signals: int = 10,
         bar_buffer_size: int = 4000,
+        bar_storage: str = 'deque',          # 'deque' | 'columnar' (NumPy ring buffers)
+        bar_backlog_max: int = BAR_BACKLOG_MAX,
+        lookback_service: Optional[LookbackService] = None,
+        bar_store: Optional[BarStore] = None,    # Persistent 1s bars (warm restarts)
+        strategy_reload_sec: float = 0,          # Poll composite_strategy.json for changes (0 = off)
+        clock: Optional[Callable[[], float]] = None,  # Epoch seconds (simulated in offline replay)
     ):
         self.composite_strategy = composite_strategy
         self.position_manager = position_manager
@@ -171,6 +204,22 @@ class SignalLifecycleManager:
         self.repository = repository
         self.max_concurrent_signals = max_concurrent_signals
         self.bar_buffer_size = bar_buffer_size
+        if bar_storage not in ('deque', 'columnar'):
+            raise ValueError(f"Unknown bar_storage: {bar_storage!r}")
+        self.bar_storage = bar_storage
+        self.bar_backlog_max = max(1, bar_backlog_max)
+
+        # Bar clock: completed bars waiting for evaluation, per symbol,
+        # and the one evaluation task in flight per symbol
+        self._bar_backlog: Dict[str, Deque[OneSecondBar]] = {}
+        self._bar_tasks: Dict[str, asyncio.Task] = {}
+        self.bar_clock_stats = BarClockStats()
+
+        # Shared REST lookback loader (pooled session, weight budget, bar cache)
+        self.lookback = lookback_service or LookbackService()
+        self.bar_store = bar_store
+        self.strategy_reload_sec = strategy_reload_sec
+        self.clock = clock or (lambda: time.time())
 
         # RE_ENTRY toggle (env-level kill switch)
         self.reentry_enabled = os.getenv('RE_ENTRY', 'true').lower() == 'true'
@@ -195,6 +244,8 @@ class SignalLifecycleManager:
         self._running = True
         # §12.3: Start 1s tick timer for empty bar generation
         self._tick_task = asyncio.create_task(self._tick_loop())
+        if self.strategy_reload_sec > 0:
+            self.composite_strategy.start_watching(self.strategy_reload_sec)
 
         # §4.1: Restore active lifecycles from DB after restart
         restored = await self.restore_from_db()
@@ -203,7 +254,7 @@ class SignalLifecycleManager:
             f"✅ SignalLifecycleManager started: "
             f"strategy v{self.composite_strategy.version}, "
             f"max_concurrent={self.max_concurrent_signals}, "
-            f"bar_buffer={self.bar_buffer_size}, "
+            f"bar_buffer={self.bar_buffer_size} ({self.bar_storage}), "
             f"restored={restored}"
         )
 
@@ -214,35 +265,130 @@ class SignalLifecycleManager:
             self._monitor_task.cancel()
         if hasattr(self, '_tick_task') and self._tick_task and not self._tick_task.done():
             self._tick_task.cancel()
+        for task in list(self._bar_tasks.values()):
+            task.cancel()
+        if self.strategy_reload_sec > 0:
+            await self.composite_strategy.stop_watching()
+        await self.lookback.close()
+        if self.bar_store:
+            await self.bar_store.close()
         logger.info(
             f"SignalLifecycleManager stopped. "
             f"Active lifecycles: {len(self.active)}"
         )
 
+    def _create_bar_aggregator(self, symbol: str) -> BarAggregator:
+        """Create a bar aggregator using the configured storage mode."""
+        if self.bar_storage == 'columnar':
+            return ColumnarBarAggregator(symbol, max_bars=self.bar_buffer_size, clock=self.clock)
+        return BarAggregator(symbol, max_bars=self.bar_buffer_size, clock=self.clock)
+
+    def _enqueue_bar(self, symbol: str, bar: OneSecondBar):
+        """
+        BarAggregator.on_bar_callback: queue a completed bar for the bar clock.
+
+        The backlog is bounded per symbol; when full, the oldest bar is
+        dropped (counted in bar_clock_stats.bars_dropped).
+        """
+        backlog = self._bar_backlog.get(symbol)
+        if backlog is None:
+            backlog = self._bar_backlog[symbol] = deque(maxlen=self.bar_backlog_max)
+        if len(backlog) == backlog.maxlen:
+            self.bar_clock_stats.bars_dropped += 1
+        backlog.append(bar)
+
+        if self.bar_store:
+            self.bar_store.append(symbol, bar)
+
     async def _tick_loop(self):
         """
-        §12.3: Periodic 1s tick for all active lifecycles.
-        
-        Ensures empty bars are generated and timeout checks happen
-        even when no trades arrive for a symbol.
+        §12.3: 1s bar clock for all active lifecycles.
+
+        Wakes on each wall-clock second boundary and runs one pass
+        (_run_bar_clock_tick). Ensures empty bars are generated and timeout
+        checks happen even when no trades arrive for a symbol. Boundaries
+        missed while the event loop was stalled are ticked late, in order.
         """
+        boundary = math.floor(time.time()) + 1
         while self._running:
             try:
-                await asyncio.sleep(1.0)
-                for symbol, lc in list(self.active.items()):
-                    if lc.state in (SignalState.IN_POSITION, SignalState.REENTRY_WAIT):
-                        if lc.bar_aggregator:
-                            lc.bar_aggregator.tick()
+                await asyncio.sleep(max(0.0, boundary - time.time()))
+                latest = max(boundary, math.floor(time.time()))
+                await self._run_bar_clock_tick(latest, catch_up_from=boundary)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Tick loop error: {e}", exc_info=True)
+                latest = boundary
+
+            boundary = latest + 1
+
+    async def _run_bar_clock_tick(self, boundary: float, catch_up_from: Optional[int] = None):
+        """
+        One bar clock pass: flush every aggregator (an empty bar per boundary
+        from catch_up_from to boundary), then start evaluation of the queued
+        bars and append them to the bar store, if configured.
+
+        Never waits on bar handlers: each symbol's bars are evaluated by its
+        own task, at most one in flight per symbol so bars stay in order.
+        A symbol whose previous evaluation is still running keeps its bars
+        queued; that task picks them up when it gets to them.
+        """
+        stats = self.bar_clock_stats
+        lag_ms = max(0.0, (self.clock() - boundary) * 1000)
+        started = time.perf_counter()
+
+        first = int(boundary) if catch_up_from is None else min(int(catch_up_from), int(boundary))
+        stats.caught_up_ticks += int(boundary) - first
+        for ts in range(first, int(boundary) + 1):
+            for lc in list(self.active.values()):
+                if lc.state in (SignalState.IN_POSITION, SignalState.REENTRY_WAIT):
+                    if lc.bar_aggregator:
+                        lc.bar_aggregator.tick(ts)
+
+        for symbol, backlog in self._bar_backlog.items():
+            if not backlog:
+                continue
+            if symbol in self._bar_tasks:
+                stats.busy_symbol_ticks += 1
+                continue
+            self._bar_tasks[symbol] = asyncio.create_task(self._drain_bar_backlog(symbol))
+
+        if self.bar_store:
+            self.bar_store.maybe_flush()
+
+        tick_ms = (time.perf_counter() - started) * 1000
+        stats.ticks += 1
+        stats.last_tick_ms = tick_ms
+        stats.max_tick_ms = max(stats.max_tick_ms, tick_ms)
+        stats.last_lag_ms = lag_ms
+        stats.max_lag_ms = max(stats.max_lag_ms, lag_ms)
+
+    async def _drain_bar_backlog(self, symbol: str):
+        """Evaluate one symbol's queued bars in order until its backlog is empty."""
+        stats = self.bar_clock_stats
+        try:
+            while True:
+                backlog = self._bar_backlog.get(symbol)
+                if not backlog:
+                    break
+                await self._on_bar_safe(symbol, backlog.popleft())
+                stats.bars_processed += 1
+        finally:
+            if self._bar_tasks.get(symbol) is asyncio.current_task():
+                del self._bar_tasks[symbol]
+
+    async def wait_bar_evaluations(self):
+        """Wait until every in-flight bar evaluation has finished (replay, tests)."""
+        while self._bar_tasks:
+            await asyncio.gather(*list(self._bar_tasks.values()), return_exceptions=True)
 
     # ========================================================================
     # Signal Entry (§2 + §4)
     # ========================================================================
 
-    async def on_signal_received(self, signal: dict, matched_params: 'StrategyParams' = None) -> bool:
+    async def on_signal_received(self, signal: dict, matched_params: 'StrategyParams' = None,
+                                 trace=NULL_TRACE) -> bool:
         """
         Process incoming signal: match strategy → open position.
         
@@ -250,6 +396,8 @@ class SignalLifecycleManager:
             signal: Normalized signal dict with keys:
                 symbol, total_score, rsi, volume_zscore, oi_delta_pct,
                 exchange, signal_id
+            matched_params: Strategy already matched by the processor
+            trace: Latency trace of the signal (core.latency_trace), marked up to lookback
                 
         Returns:
             True if lifecycle created, False if rejected
@@ -257,9 +405,6 @@ class SignalLifecycleManager:
         self.total_signals_received += 1
         symbol = signal.get('symbol', '')
         score = float(signal.get('total_score', 0))
-        rsi = float(signal.get('rsi', 0))
-        vol_zscore = float(signal.get('volume_zscore', signal.get('vol_zscore', 0)))
-        oi_delta = float(signal.get('oi_delta_pct', signal.get('oi_delta', 0)))
         exchange = signal.get('exchange', 'binance')
         signal_id = signal.get('signal_id', signal.get('id', 0))
 
@@ -286,12 +431,12 @@ class SignalLifecycleManager:
             return False
 
         # 4. Match signal to strategy rule (§2.2: all filters)
+        #    Cached on the signal when the processor already matched it
+        rule = self.composite_strategy.match_signal_dict(signal)
         if matched_params is not None:
             params = matched_params
         else:
-            params = self.composite_strategy.match_signal(
-                score, rsi=rsi, vol_zscore=vol_zscore, oi_delta=oi_delta
-            )
+            params = rule.strategy if rule else None
         if params is None:
             logger.debug(f"Signal {symbol} score={score} did not match any strategy rule")
             return False
@@ -300,11 +445,11 @@ class SignalLifecycleManager:
         derived = DerivedConstants.from_params(params)
 
         # 5. Create bar aggregator
-        bar_agg = BarAggregator(symbol, max_bars=self.bar_buffer_size)
+        bar_agg = self._create_bar_aggregator(symbol)
 
         # 6. Create lifecycle
         # §5.1: signal_start_ts = signal's entry_time, not current time
-        entry_time = signal.get('entry_time', signal.get('timestamp', int(time.time())))
+        entry_time = signal.get('entry_time', signal.get('timestamp', int(self.clock())))
         # Convert entry_time to epoch int from various formats:
         # - datetime object (from signal_adapter)
         # - ISO string (from WS server: "2026-02-16T14:00:00.700173+00:00")
@@ -316,7 +461,7 @@ class SignalLifecycleManager:
                 entry_time = int(datetime.fromisoformat(entry_time).timestamp())
             except ValueError:
                 logger.warning(f"Could not parse entry_time '{entry_time}', using current time")
-                entry_time = int(time.time())
+                entry_time = int(self.clock())
         lc = SignalLifecycle(
             signal_id=signal_id or 0,
             symbol=symbol,
@@ -327,7 +472,9 @@ class SignalLifecycleManager:
             signal_start_ts=int(entry_time),
             bar_aggregator=bar_agg,
             total_score=score,
+            trace=trace,
         )
+        lc.trace.set(signal_id=lc.signal_id)
 
         self.active[symbol] = lc
 
@@ -347,6 +494,7 @@ class SignalLifecycleManager:
             return False
 
         # State already set inside _open_position() before DB persist
+        lc.trace.mark('registration')
 
         # 7. Subscribe to aggTrades for this symbol
         if self.aggtrades_stream:
@@ -360,15 +508,15 @@ class SignalLifecycleManager:
             logger.info(f"Loaded {loaded} lookback bars for {symbol} (requested {lookback_count}s)")
         except Exception as e:
             logger.warning(f"Failed to load lookback for {symbol}: {e}, continuing without history")
+        lc.trace.mark('lookback')
+        lc.trace = NULL_TRACE
 
-        # 8. Set bar callback → our monitoring loop
-        bar_agg.on_bar_callback = lambda bar, s=symbol: asyncio.create_task(
-            self._on_bar_safe(s, bar)
-        )
+        # 8. Set bar callback → bar clock backlog
+        bar_agg.on_bar_callback = lambda bar, s=symbol: self._enqueue_bar(s, bar)
 
         logger.info(
             f"🚀 Signal lifecycle created: {symbol} "
-            f"rule=[{self.composite_strategy.get_rule_for_score(score).score_range}] "
+            f"rule=[{rule.score_range if rule else 'n/a'}] "
             f"leverage={params.leverage}x SL={params.sl_pct}% "
             f"TS act={params.base_activation}%/cb={params.base_callback}%"
         )
@@ -676,9 +824,7 @@ class SignalLifecycleManager:
             score += 2
 
         # Large trades: use 60s window from bars
-        recent_bars = list(agg.bars)[-60:] if agg.bar_count >= 60 else list(agg.bars)
-        large_buys = sum(b.large_buy_count for b in recent_bars)
-        large_sells = sum(b.large_sell_count for b in recent_bars)
+        large_buys, large_sells = agg.get_large_trade_counts(60)
         if large_buys >= large_sells * 1.2 and large_buys > 0:
             score += 2
 
@@ -928,10 +1074,8 @@ class SignalLifecycleManager:
         LARGE_TRADE_WINDOW = 60  # seconds
         rolling_buys = 0
         rolling_sells = 0
-        if lc.bar_aggregator and lc.bar_aggregator.bars:
-            recent_bars = list(lc.bar_aggregator.bars)[-LARGE_TRADE_WINDOW:]
-            rolling_buys = sum(b.large_buy_count for b in recent_bars)
-            rolling_sells = sum(b.large_sell_count for b in recent_bars)
+        if lc.bar_aggregator and lc.bar_aggregator.bar_count:
+            rolling_buys, rolling_sells = lc.bar_aggregator.get_large_trade_counts(LARGE_TRADE_WINDOW)
         large_ok = rolling_buys >= 3 and rolling_buys >= rolling_sells * 1.5
 
         # Remaining window time
@@ -1009,6 +1153,9 @@ class SignalLifecycleManager:
         
         Fetches recent trades and aggregates into 1-second bars for
         accurate delta calculations from the first monitoring tick.
+        With a bar store, stored bars are added first (aggregator is warm
+        before any network call) and prime the LookbackService cache, so
+        only the gap since the last stored bar is fetched over REST.
         
         Args:
             lc: SignalLifecycle with bar_aggregator to populate
@@ -1017,107 +1164,29 @@ class SignalLifecycleManager:
         Returns:
             Number of bars loaded
         """
-        if not lc.bar_aggregator:
+        agg = lc.bar_aggregator
+        if not agg:
             return 0
 
-        symbol = lc.symbol.upper()
-        
-        # Binance Futures aggTrades REST endpoint
-        base_url = "https://fapi.binance.com"
-        url = f"{base_url}/fapi/v1/aggTrades"
-        
-        end_time = int(time.time() * 1000)
-        # Limit lookback to 1 hour max to avoid excessive API calls
-        effective_lookback = min(lookback_sec, 3600)
-        start_time = end_time - (effective_lookback * 1000)
-        
-        all_trades = []
-        current_start = start_time
-        max_pages = 20  # FIX C3-1: 20 × 1000 trades (covers active symbols)
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                for page in range(max_pages):
-                    params = {
-                        'symbol': symbol,
-                        'startTime': current_start,
-                        'endTime': end_time,
-                        'limit': 1000,
-                    }
-                    
-                    async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                        if resp.status != 200:
-                            logger.warning(f"Lookback API error {resp.status} for {symbol}")
-                            break
-                        
-                        trades = await resp.json()
-                        
-                    if not trades:
-                        break
-                    
-                    all_trades.extend(trades)
-                    
-                    # Paginate: next page starts after last trade
-                    last_trade_time = trades[-1].get('T', 0)
-                    current_start = last_trade_time + 1
-                    
-                    if current_start >= end_time or len(trades) < 1000:
-                        break
-                    
-                    await asyncio.sleep(0.1)  # Rate limiting
-                    
-        except Exception as e:
-            logger.warning(f"Lookback fetch error for {symbol}: {e}")
-            
-        if not all_trades:
-            return 0
-        
-        # Aggregate trades into 1-second bars
         # FIX B2-1: Use dynamic threshold from aggregator instead of hardcoded $10K
-        large_threshold = lc.bar_aggregator.large_trade_threshold if lc.bar_aggregator else 10_000
-        bars_by_second: Dict[int, dict] = {}
-        
-        for trade in all_trades:
-            ts_sec = int(trade.get('T', 0) / 1000)
-            price = float(trade.get('p', 0))
-            qty = float(trade.get('q', 0))
-            is_buyer_maker = trade.get('m', False)
-            volume_usd = price * qty
-            
-            if ts_sec not in bars_by_second:
-                bars_by_second[ts_sec] = {
-                    'price': price,
-                    'delta': 0.0,
-                    'large_buy': 0,
-                    'large_sell': 0,
-                }
-            
-            bar_data = bars_by_second[ts_sec]
-            bar_data['price'] = price  # Last price = close
-            
-            if is_buyer_maker:
-                bar_data['delta'] -= volume_usd
-                if volume_usd >= large_threshold:
-                    bar_data['large_sell'] += 1
-            else:
-                bar_data['delta'] += volume_usd
-                if volume_usd >= large_threshold:
-                    bar_data['large_buy'] += 1
-        
-        # Sort by timestamp and add to aggregator
-        sorted_seconds = sorted(bars_by_second.keys())
-        for ts_sec in sorted_seconds:
-            bar_data = bars_by_second[ts_sec]
-            bar = OneSecondBar(
-                ts=ts_sec,
-                price=bar_data['price'],
-                delta=bar_data['delta'],
-                large_buy_count=bar_data['large_buy'],
-                large_sell_count=bar_data['large_sell'],
-            )
-            lc.bar_aggregator.add_historical_bar(bar)
-        
-        return len(sorted_seconds)
+        large_threshold = agg.large_trade_threshold
+
+        loaded = 0
+        if self.bar_store:
+            since_ts = int(self.clock()) - min(lookback_sec, LOOKBACK_MAX_SEC)
+            stored = await asyncio.to_thread(self.bar_store.load, lc.symbol, since_ts)
+            for bar in stored:
+                agg.add_historical_bar(bar)
+            self.lookback.prime(lc.symbol, stored, large_threshold)
+            loaded = len(stored)
+
+        last = agg.get_latest_bar()
+        bars = await self.lookback.load_bars(lc.symbol, lookback_sec, large_threshold)
+        for bar in bars:
+            if last is None or bar.ts > last.ts:
+                agg.add_historical_bar(bar)
+                loaded += 1
+        return loaded
 
     # ========================================================================
     # Position Open / Close (§4, §8)
@@ -1191,13 +1260,15 @@ class SignalLifecycleManager:
                 'total_score': lc.total_score,
             }
 
+            lc.trace.mark('lifecycle')
+            request.trace = lc.trace
             result = await self.position_manager.open_position(request)
 
             if result and not isinstance(result, dict):
                 # PositionState returned = success
                 lc.entry_price = float(result.entry_price)
                 lc.max_price = lc.entry_price
-                lc.position_entry_ts = int(time.time())
+                lc.position_entry_ts = int(self.clock())
                 lc.state = SignalState.IN_POSITION  # FIX: set BEFORE persist (was after)
                 lc.in_position = True
                 lc.trade_count += 1
@@ -1329,7 +1400,7 @@ class SignalLifecycleManager:
             entry_price=lc.entry_price,
             exit_price=exit_price,
             entry_ts=lc.position_entry_ts,
-            exit_ts=int(time.time()),
+            exit_ts=int(self.clock()),
             reason=reason,
             pnl_pct=pnl,
             is_reentry=lc.trade_count > 1,
@@ -1372,7 +1443,7 @@ class SignalLifecycleManager:
 
         # Update lifecycle state
         lc.in_position = False
-        lc.last_exit_ts = int(time.time())
+        lc.last_exit_ts = int(self.clock())
         lc.last_exit_price = exit_price
         lc.last_exit_reason = reason
 
@@ -1390,7 +1461,7 @@ class SignalLifecycleManager:
             await self._finalize_lifecycle(lc, f"closed_{reason.lower()}")
         elif not self.reentry_enabled:
             await self._finalize_lifecycle(lc, "reentry_disabled")
-        elif self._is_reentry_expired(lc, int(time.time())):
+        elif self._is_reentry_expired(lc, int(self.clock())):
             await self._finalize_lifecycle(lc, "reentry_window_expired")
         else:
             lc.state = SignalState.REENTRY_WAIT
@@ -1434,7 +1505,7 @@ class SignalLifecycleManager:
             # closed manually, or duplicate exchange event), reset cooldown
             # so we don't immediately re-enter
             if lc.state == SignalState.REENTRY_WAIT:
-                lc.last_exit_ts = int(time.time())
+                lc.last_exit_ts = int(self.clock())
                 logger.info(
                     f"🔄 External close for {symbol} in REENTRY_WAIT — "
                     f"cooldown reset to {lc.strategy.base_cooldown}s"
@@ -1460,7 +1531,7 @@ class SignalLifecycleManager:
             entry_price=lc.entry_price,
             exit_price=exit_price,
             entry_ts=lc.position_entry_ts,
-            exit_ts=int(time.time()),
+            exit_ts=int(self.clock()),
             reason=reason,
             pnl_pct=pnl,
             is_reentry=lc.trade_count > 1,
@@ -1475,7 +1546,7 @@ class SignalLifecycleManager:
 
         # Update lifecycle state (skip PM.close_position — already closed!)
         lc.in_position = False
-        lc.last_exit_ts = int(time.time())
+        lc.last_exit_ts = int(self.clock())
         lc.last_exit_price = exit_price
         lc.last_exit_reason = reason
 
@@ -1489,7 +1560,7 @@ class SignalLifecycleManager:
             await self._finalize_lifecycle(lc, f"closed_{reason.lower()}")
         elif not self.reentry_enabled:
             await self._finalize_lifecycle(lc, "reentry_disabled")
-        elif self._is_reentry_expired(lc, int(time.time())):
+        elif self._is_reentry_expired(lc, int(self.clock())):
             await self._finalize_lifecycle(lc, "reentry_window_expired")
         else:
             lc.state = SignalState.REENTRY_WAIT
@@ -1560,6 +1631,7 @@ class SignalLifecycleManager:
 
         # Remove from active
         self.active.pop(lc.symbol, None)
+        self._bar_backlog.pop(lc.symbol, None)
 
     # ========================================================================
     # External Interface
@@ -1598,6 +1670,9 @@ class SignalLifecycleManager:
                 s: lc.state.value 
                 for s, lc in self.active.items()
             },
+            'bar_clock': asdict(self.bar_clock_stats),
+            'lookback': self.lookback.get_stats(),
+            'bar_store': self.bar_store.get_stats() if self.bar_store else None,
         }
 
     # ========================================================================
@@ -1680,8 +1755,11 @@ class SignalLifecycleManager:
         """
         Restore active lifecycles from DB after restart (§4.1).
         
-        Reconstructs SignalLifecycle objects, creates bar aggregators,
-        re-subscribes to aggTrades, and loads lookback history.
+        Reconstructs SignalLifecycle objects and bar aggregators, loads
+        lookback history (concurrently across symbols), then activates each
+        lifecycle and re-subscribes to aggTrades. History is complete before
+        any live trade or bar clock tick reaches an aggregator, so bars stay
+        in time order.
         """
         if not self.repository:
             logger.info("No repository configured — skipping lifecycle restore")
@@ -1697,7 +1775,7 @@ class SignalLifecycleManager:
             logger.info("No active lifecycles to restore")
             return 0
 
-        restored = 0
+        pending: list = []
         for row in rows:
             try:
                 symbol = row['symbol']
@@ -1722,7 +1800,7 @@ class SignalLifecycleManager:
                 derived = DerivedConstants.from_params(params)
 
                 # Create bar aggregator (FIX C-1: correct constructor params)
-                bar_agg = BarAggregator(symbol, max_bars=self.bar_buffer_size)
+                bar_agg = self._create_bar_aggregator(symbol)
 
                 # Reconstruct trade records
                 trade_records = [
@@ -1755,31 +1833,35 @@ class SignalLifecycleManager:
                     total_score=float(row.get('total_score', 0)),
                 )
 
+                pending.append(lc)
+            except Exception as e:
+                logger.error(f"Failed to restore lifecycle for {row.get('symbol', '?')}: {e}", exc_info=True)
+
+        # Load lookback bars before the lifecycles go live
+        await asyncio.gather(*(
+            self._restore_lookback(lc, max(lc.strategy.delta_window, 100))
+            for lc in pending
+        ))
+
+        restored = 0
+        for lc in pending:
+            symbol = lc.symbol
+            state = lc.state
+            state_str = state.value
+            try:
                 self.active[symbol] = lc
+                lc.bar_aggregator.on_bar_callback = lambda bar, s=symbol: self._enqueue_bar(s, bar)
 
                 # Re-subscribe to aggTrades
                 if self.aggtrades_stream:
                     await self.aggtrades_stream.subscribe(symbol)
 
-                # Load lookback bars
-                lookback_count = max(params.delta_window, 100)
-                try:
-                    loaded = await self._load_lookback_bars(lc, lookback_count)
-                    logger.info(f"Restored {symbol}: loaded {loaded} lookback bars")
-                except Exception as e:
-                    logger.warning(f"Lookback failed for restored {symbol}: {e}")
-
-                # Set bar callback
-                bar_agg.on_bar_callback = lambda bar, s=symbol: asyncio.create_task(
-                    self._on_bar_safe(s, bar)
-                )
-
                 # CRITICAL: Cross-check ALL non-IN_POSITION states with exchange
                 # Fix waiting_data/reentry_wait by checking actual exchange state
                 if state != SignalState.IN_POSITION and self.position_manager:
                     try:
                         has_pos = await self.position_manager.has_open_position(
-                            symbol, exchange
+                            symbol, lc.exchange
                         )
                         if has_pos:
                             logger.warning(
@@ -1814,7 +1896,15 @@ class SignalLifecycleManager:
                 )
 
             except Exception as e:
-                logger.error(f"Failed to restore lifecycle for {row.get('symbol', '?')}: {e}", exc_info=True)
+                logger.error(f"Failed to restore lifecycle for {symbol}: {e}", exc_info=True)
 
         logger.info(f"✅ Restored {restored}/{len(rows)} lifecycles from DB")
         return restored
+
+    async def _restore_lookback(self, lc: SignalLifecycle, lookback_count: int):
+        """Load lookback bars for a restored lifecycle (errors are logged)."""
+        try:
+            loaded = await self._load_lookback_bars(lc, lookback_count)
+            logger.info(f"Restored {lc.symbol}: loaded {loaded} lookback bars")
+        except Exception as e:
+            logger.warning(f"Lookback failed for restored {lc.symbol}: {e}")
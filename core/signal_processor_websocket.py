@@ -13,6 +13,8 @@ import asyncio
 import os
 
 from core.signal_lifecycle import SignalLifecycleManager
+from core.composite_strategy import signal_features
+from core.latency_trace import ERROR, OPENED, REJECTED, UNMATCHED, SignalTracer, event_log_sink
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 
@@ -46,8 +48,12 @@ class WebSocketSignalProcessor:
             'SIGNAL_BUFFER_SIZE': int(os.getenv('SIGNAL_BUFFER_SIZE', '100'))
         }
 
+        # Signal → protected position latency tracing (per-signal rows + histograms)
+        self.tracer = SignalTracer(sample_rate=float(os.getenv('SIGNAL_TRACE_SAMPLE_RATE', '0')))
+        self.tracer.add_sink(event_log_sink)
+
         # Initialize WebSocket client
-        self.ws_client = SignalWebSocketClient(self.ws_config)
+        self.ws_client = SignalWebSocketClient(self.ws_config, tracer=self.tracer)
 
         # Set WebSocket callbacks
         self.ws_client.set_callbacks(
@@ -143,6 +149,8 @@ class WebSocketSignalProcessor:
         except Exception as e:
             logger.error(f"Error processing WebSocket signals: {e}", exc_info=True)
             self.stats['signals_failed'] += len(ws_signals) if ws_signals else 0
+            for signal in ws_signals or ():
+                self.tracer.discard(signal, ERROR)      # No-op for traces already finished
 
     async def _delegate_to_lifecycle(self, signals: List[Dict]) -> List[Dict]:
         """
@@ -152,20 +160,21 @@ class WebSocketSignalProcessor:
         """
         if not self.lifecycle_manager:
             logger.warning("No lifecycle manager — cannot process signals")
+            for signal in signals:
+                self.tracer.discard(signal)
             return signals
 
         remaining = []
         for signal in signals:
-            score = float(signal.get('total_score', signal.get('score_week', 0)))
-            rsi = float(signal.get('rsi', 0))
-            vol_zscore = float(signal.get('volume_zscore', signal.get('vol_zscore', 0)))
-            oi_delta = float(signal.get('oi_delta_pct', signal.get('oi_delta', 0)))
+            trace = self.tracer.trace_for(signal)
+            trace.mark('dispatch')
+            score, rsi, vol_zscore, oi_delta = signal_features(signal)
 
             # Check if composite strategy has a rule for this signal
-            params = self.lifecycle_manager.composite_strategy.match_signal(
-                score, rsi=rsi, vol_zscore=vol_zscore, oi_delta=oi_delta
-            )
-            if params:
+            # (the match is cached on the signal for the lifecycle manager)
+            rule = self.lifecycle_manager.composite_strategy.match_signal_dict(signal)
+            trace.mark('match')
+            if rule:
                 symbol = signal.get('symbol', '')
                 logger.info(
                     f"🎯 Signal {symbol} score={score} rsi={rsi:.0f} "
@@ -173,9 +182,12 @@ class WebSocketSignalProcessor:
                     f"delegating to lifecycle manager"
                 )
                 try:
-                    await self.lifecycle_manager.on_signal_received(signal, matched_params=params)
+                    opened = await self.lifecycle_manager.on_signal_received(
+                        signal, matched_params=rule.strategy, trace=trace)
                     self.stats['signals_delegated'] += 1
+                    self.tracer.finish(trace, OPENED if opened else REJECTED)
                 except Exception as e:
+                    self.tracer.finish(trace, ERROR)
                     logger.error(f"Lifecycle manager error for {symbol}: {e}")
                     self.stats['signals_failed'] += 1
                     event_logger = get_event_logger()
@@ -186,6 +198,7 @@ class WebSocketSignalProcessor:
                             symbol=symbol, severity='ERROR'
                         ))
             else:
+                self.tracer.finish(trace, UNMATCHED)
                 remaining.append(signal)
 
         delegated = len(signals) - len(remaining)
@@ -217,4 +230,5 @@ class WebSocketSignalProcessor:
             **self.stats,
             'websocket': self.ws_client.get_stats(),
             'buffer_size': len(self.ws_client.signal_buffer),
+            'tracing': self.tracer.get_stats(),
         }
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Startup Dependency Graph
+
+TradingBot.initialize is split into stages with explicit dependencies;
+StartupGraph starts every stage as soon as the stages it depends on have
+finished, so independent work (DB connect, exchange markets, streams)
+overlaps instead of running serially.
+
+Per-stage timings and milestones (e.g. 'protected': stop-loss verified for
+every open position) are collected in a StartupReport.
+
+BOT_STARTUP_STAGES is the layout main.py uses; tests replay it with
+simulated stage durations to enforce the time-to-protected budget.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stage -> stages it waits for (TradingBot._startup_<stage>)
+BOT_STARTUP_STAGES: Dict[str, Tuple[str, ...]] = {
+    'database': (),
+    'exchanges': (),
+    'streams': ('exchanges',),
+    'positions': ('database', 'exchanges'),
+    'stream_sync': ('streams', 'positions'),
+    'signal_processor': ('positions',),
+    'lifecycle': ('signal_processor', 'streams'),
+}
+
+OK = 'ok'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+CANCELLED = 'cancelled'
+
+
+@dataclass
+class StageTiming:
+    """Offsets in seconds from the start of the graph"""
+    name: str
+    after: Tuple[str, ...]
+    start: Optional[float] = None
+    end: Optional[float] = None
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.start is None or self.end is None:
+            return None
+        return self.end - self.start
+
+
+@dataclass
+class StartupReport:
+    stages: Dict[str, StageTiming]
+    milestones: Dict[str, float] = field(default_factory=dict)
+    total: float = 0.0
+
+    @property
+    def serial_total(self) -> float:
+        """Sum of stage durations: what a serial startup would have taken"""
+        return sum(s.duration or 0.0 for s in self.stages.values())
+
+    @property
+    def time_to_protected(self) -> Optional[float]:
+        return self.milestones.get('protected')
+
+    def to_dict(self) -> Dict:
+        return {
+            'total_sec': round(self.total, 3),
+            'serial_total_sec': round(self.serial_total, 3),
+            'milestones': {k: round(v, 3) for k, v in self.milestones.items()},
+            'stages': {
+                name: {'start': s.start, 'end': s.end, 'duration': s.duration,
+                       'status': s.status, 'error': s.error}
+                for name, s in self.stages.items()
+            },
+        }
+
+    def summary(self) -> str:
+        lines = [f"Startup {self.total:.2f}s (serial {self.serial_total:.2f}s)"]
+        for s in sorted(self.stages.values(), key=lambda s: (s.start is None, s.start or 0)):
+            if s.duration is None:
+                lines.append(f"  {s.name:18s} {s.status}")
+            else:
+                lines.append(f"  {s.name:18s} {s.start:6.2f}s → {s.end:6.2f}s  ({s.duration:.2f}s) {s.status}")
+        for name, at in self.milestones.items():
+            lines.append(f"  ⏱ {name}: {at:.2f}s")
+        return '\n'.join(lines)
+
+
+class _Stage:
+    def __init__(self, name: str, fn: Callable[[], Awaitable], after: Tuple[str, ...], critical: bool):
+        self.name = name
+        self.fn = fn
+        self.after = after
+        self.critical = critical
+        self.timing = StageTiming(name, after)
+        self.done = asyncio.Event()
+
+
+class StartupGraph:
+    """
+    Run async stages concurrently, each after its dependencies.
+
+    Usage:
+        graph = StartupGraph()
+        graph.add('database', init_db)
+        graph.add('exchanges', init_exchanges)
+        graph.add('positions', load_positions, after=('database', 'exchanges'))
+        report = await graph.run()
+
+    A failed critical stage cancels the stages still running and re-raises.
+    A failed non-critical stage only skips the stages that depend on it.
+    """
+
+    def __init__(self, clock: Optional[Callable[[], float]] = None):
+        self.clock = clock or time.perf_counter
+        self._stages: Dict[str, _Stage] = {}
+        self._t0: Optional[float] = None
+        self.milestones: Dict[str, float] = {}
+
+    def add(self, name: str, fn: Callable[[], Awaitable], after: Iterable[str] = (),
+            critical: bool = True) -> None:
+        if name in self._stages:
+            raise ValueError(f"Duplicate startup stage: {name}")
+        self._stages[name] = _Stage(name, fn, tuple(after), critical)
+
+    def elapsed(self) -> float:
+        return 0.0 if self._t0 is None else self.clock() - self._t0
+
+    def mark(self, milestone: str) -> None:
+        """Record a milestone (first call wins) at the current offset"""
+        self.milestones.setdefault(milestone, self.elapsed())
+
+    def _validate(self) -> None:
+        for stage in self._stages.values():
+            for dep in stage.after:
+                if dep not in self._stages:
+                    raise ValueError(f"Startup stage {stage.name} depends on unknown stage {dep}")
+
+        # Depth-first cycle check
+        state: Dict[str, int] = {}
+
+        def visit(name: str, path: List[str]):
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Startup stage cycle: {' → '.join(path + [name])}")
+            state[name] = 1
+            for dep in self._stages[name].after:
+                visit(dep, path + [name])
+            state[name] = 2
+
+        for name in self._stages:
+            visit(name, [])
+
+    async def _run_stage(self, stage: _Stage):
+        timing = stage.timing
+        try:
+            for dep in stage.after:
+                await self._stages[dep].done.wait()
+            blocked = [d for d in stage.after if self._stages[d].timing.status != OK]
+            if blocked:
+                timing.status = SKIPPED
+                timing.error = f"dependency not ready: {', '.join(blocked)}"
+                logger.warning(f"Startup stage {stage.name} skipped ({timing.error})")
+                return
+
+            timing.start = self.elapsed()
+            try:
+                await stage.fn()
+            except asyncio.CancelledError:
+                timing.status = CANCELLED
+                raise
+            except Exception as e:
+                timing.end = self.elapsed()
+                timing.status = FAILED
+                timing.error = str(e)
+                if stage.critical:
+                    raise
+                logger.error(f"Startup stage {stage.name} failed: {e}")
+                return
+            timing.end = self.elapsed()
+            timing.status = OK
+        finally:
+            if timing.status is None:
+                timing.status = CANCELLED
+            stage.done.set()
+
+    async def run(self) -> StartupReport:
+        self._validate()
+        self._t0 = self.clock()
+        tasks = [asyncio.create_task(self._run_stage(s), name=f"startup-{s.name}")
+                 for s in self._stages.values()]
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        if pending:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
+        return self.report()
+
+    def report(self) -> StartupReport:
+        return StartupReport(
+            stages={name: s.timing for name, s in self._stages.items()},
+            milestones=dict(self.milestones),
+            total=self.elapsed(),
+        )
@@ -1,8 +1,10 @@
 import asyncpg
 import logging
 import hashlib
+import time
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from decimal import Decimal
 import json
 from utils.datetime_helpers import now_utc, ensure_utc
@@ -354,6 +356,36 @@ class Repository:
         except Exception as e:
             logger.error(f"❌ Failed to update position from websocket: {e}", exc_info=True)
 
+    async def batch_update_position_prices(self, rows: List[tuple]) -> int:
+        """
+        Update price/PnL of many active positions in one statement
+
+        Args:
+            rows: (position_id, current_price, unrealized_pnl, pnl_percentage) tuples
+
+        Returns:
+            int: Number of rows updated
+        """
+        if not rows:
+            return 0
+
+        ids, prices, pnls, pnl_percents = zip(*rows)
+        query = """
+            UPDATE monitoring.positions AS p
+            SET current_price = u.current_price,
+                unrealized_pnl = u.unrealized_pnl,
+                pnl_percentage = u.pnl_percentage,
+                updated_at = NOW()
+            FROM unnest($1::int[], $2::numeric[], $3::numeric[], $4::numeric[])
+                AS u(id, current_price, unrealized_pnl, pnl_percentage)
+            WHERE p.id = u.id
+                AND p.status = 'active'
+        """
+
+        async with self.pool.acquire() as conn:
+            result = await conn.execute(query, list(ids), list(prices), list(pnls), list(pnl_percents))
+            return int(result.split()[-1]) if result else 0
+
     async def update_position_stop_loss(self, position_id: int, stop_price: float, order_id: str):
         """Update position stop loss"""
         query = """
@@ -633,8 +665,28 @@ class Repository:
     
     
     async def get_closed_positions_since(self, since: datetime) -> List[Any]:
-        """Get closed positions since date"""
-        return []
+        """
+        Closed positions with closed_at >= since, oldest first
+
+        Rows are returned as attribute objects (position.realized_pnl,
+        position.closed_at, ...) like the Position model the performance
+        tracker reads. close_position() writes the PnL to `pnl`, so
+        realized_pnl falls back to it.
+        """
+        query = """
+            SELECT id, symbol, exchange, side, quantity, entry_price,
+                   current_price AS exit_price,
+                   COALESCE(pnl, realized_pnl) AS realized_pnl,
+                   pnl_percentage AS realized_pnl_percent,
+                   COALESCE(fees, 0) AS fees, exit_reason,
+                   COALESCE(opened_at, created_at) AS opened_at, closed_at
+            FROM monitoring.positions
+            WHERE status = 'closed' AND closed_at >= $1
+            ORDER BY closed_at
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, ensure_utc(since))
+            return [SimpleNamespace(**dict(row)) for row in rows]
     
     async def get_positions_by_date(self, date: Any) -> List[Any]:
         """Get positions by date"""
@@ -680,8 +732,28 @@ class Repository:
         return True
     
     async def health_check(self) -> Dict[str, Any]:
-        """Health check"""
-        return {'status': 'ok', 'pool_size': 10}
+        """
+        Probe the connection pool: time one acquire and a SELECT 1.
+
+        Returns pool size / idle / max and the acquire and query latency (ms).
+        """
+        if not self.pool:
+            return {'status': 'down', 'pool_size': 0, 'error': 'Pool not initialized'}
+
+        start = time.perf_counter()
+        async with self.pool.acquire() as conn:
+            acquired = time.perf_counter()
+            await conn.fetchval("SELECT 1")
+        done = time.perf_counter()
+
+        return {
+            'status': 'ok',
+            'pool_size': self.pool.get_size(),
+            'pool_idle': self.pool.get_idle_size(),
+            'pool_max': self.pool.get_max_size(),
+            'acquire_ms': round((acquired - start) * 1000, 2),
+            'query_ms': round((done - acquired) * 1000, 2),
+        }
 
     async def update_position_status(self, position_id: int, status: str,
                                     notes: str = None) -> bool:
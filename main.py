@@ -4,7 +4,6 @@ Entry point and orchestration
 """
 import asyncio
 import logging
-from logging.handlers import RotatingFileHandler
 import signal
 import sys
 import os
@@ -28,26 +27,34 @@ import argparse
 
 from config.settings import config as settings
 from utils.single_instance import SingleInstance, check_running, kill_running
+from utils.logger import HOT_PATH_LOGGERS, setup_async_logging, stop_async_logging, get_logging_stats
 from core.exchange_manager import ExchangeManager
 from core.position_manager import PositionManager
 from core.signal_processor_websocket import WebSocketSignalProcessor
 from database.repository import Repository as TradingRepository
-from websocket.event_router import EventRouter
+from websocket.event_router import EventRouter, parse_overflow_policies
 from protection.trailing_stop import SmartTrailingStopManager, TrailingStopConfig
+from core.markets_cache import MarketsCache
+from core.startup import BOT_STARTUP_STAGES, StartupGraph
 
 
 from monitoring.health_check import HealthChecker, HealthStatus
+from monitoring.metrics import MetricsCollector
 from monitoring.performance import PerformanceTracker
 import core.stop_loss_manager
 
-# Setup logging
-logging.basicConfig(
-    level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO')),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        RotatingFileHandler('logs/trading_bot.log', maxBytes=100*1024*1024, backupCount=10),
-        logging.StreamHandler()
-    ]
+# Setup logging (file/console I/O and rotation on a background thread)
+setup_async_logging(
+    level=os.getenv('LOG_LEVEL', 'INFO'),
+    log_file='logs/trading_bot.log',
+    max_bytes=100*1024*1024,
+    backup_count=10,
+    queue_size=int(os.getenv('LOG_QUEUE_SIZE', '10000')),
+    rate_limit_per_sec=float(os.getenv('LOG_RATE_LIMIT_PER_SEC', '50')),
+    dedup_window_sec=float(os.getenv('LOG_DEDUP_WINDOW_SEC', '5')),
+    hot_loggers=[name.strip() for name in os.getenv('LOG_HOT_PATH_LOGGERS', ','.join(HOT_PATH_LOGGERS)).split(',')
+                 if name.strip()],
+    stream=sys.stderr,
 )
 logger = logging.getLogger(__name__)
 
@@ -68,16 +75,21 @@ class TradingBot:
         self.exchanges: Dict[str, ExchangeManager] = {}
         self.websockets: Dict[str, Any] = {}
         self.repository: Optional[TradingRepository] = None
-        self.event_router = EventRouter()
+        self.event_router = EventRouter(
+            lane_size=int(os.getenv('EVENT_ROUTER_LANE_SIZE', '1000')),
+            overflow_policies=parse_overflow_policies(os.getenv('EVENT_ROUTER_OVERFLOW_POLICIES', '')),
+        )
         self.position_manager: Optional[PositionManager] = None
 
         self.signal_processor: Optional[WebSocketSignalProcessor] = None
         self.aggtrades_stream = None  # For delta calculation
         self.lifecycle_manager = None  # Composite strategy lifecycle (2026-02-09)
+        self.startup_report = None  # Per-stage startup timings (core.startup)
 
         # Monitoring - will be initialized after repository is ready
         self.health_monitor = None
         self.performance_tracker = None
+        self.metrics_collector = None  # Prometheus exporter, enabled by METRICS_PORT
 
         # Control
         self.running = False
@@ -86,7 +98,13 @@ class TradingBot:
         logger.info(f"Trading Bot initializing in {self.mode} mode")
 
     async def initialize(self):
-        """Initialize all components"""
+        """
+        Initialize all components
+
+        Stages run through a StartupGraph (layout: core.startup.BOT_STARTUP_STAGES):
+        independent stages (database / exchanges, streams / positions) overlap.
+        Per-stage timings and time-to-protected are kept in self.startup_report.
+        """
         try:
             logger.info("=" * 80)
             logger.info("TRADING BOT INITIALIZATION")
@@ -96,8 +114,8 @@ class TradingBot:
             if not settings.validate():
                 raise Exception("Configuration validation failed")
 
-            # Initialize database
-            logger.info("Initializing database...")
+            # Repository object first (no I/O): exchanges hold a reference while the
+            # database stage connects the pool concurrently
             db_config = {
                 'host': settings.database.host,
                 'port': settings.database.port,
@@ -108,282 +126,33 @@ class TradingBot:
                 'max_overflow': settings.database.max_overflow
             }
             self.repository = TradingRepository(db_config)
-            await self.repository.initialize()
-
-            # CRITICAL: Verify pool initialized successfully
-            if not self.repository.pool:
-                raise RuntimeError("Repository pool initialization failed!")
-            logger.info(f"✅ Repository pool initialized: {type(self.repository.pool)}")
-
-            # Initialize health checker and performance tracker with repository
-            self.health_monitor = HealthChecker(
-                self.repository,
-                {'check_interval': 10},
-                signal_processor=None  # Will be set after signal_processor initialization
-            )
-
-            # CRITICAL FIX: Start health monitoring
-            await self.health_monitor.start()
-            logger.info("✅ Health monitoring started")
-
-            self.performance_tracker = PerformanceTracker(
-                self.repository,
-                {'min_trades_for_stats': 20}
-            )
-
-            # Initialize exchanges (Phase 1: without position_manager)
-            logger.info("Initializing exchanges...")
-            for name, config in settings.exchanges.items():
-                # Skip disabled exchanges
-                if not config.enabled:
-                    logger.info(f"Skipping disabled exchange: {name}")
-                    continue
-
-                # Phase 1: Create exchange without position_manager (will be linked in Phase 3)
-                exchange = ExchangeManager(name, config.__dict__, repository=self.repository, position_manager=None)
-                try:
-                    await exchange.initialize()
-                    self.exchanges[name] = exchange
-                    logger.info(f"✅ {name.capitalize()} exchange ready")
-                except Exception as e:
-                    logger.error(f"Failed to initialize {name}: {e}")
-                    # Cleanup on failure
-                    await exchange.close()
-                    if self.mode == 'production':
-                        raise
-                    # In non-production, continue with other exchanges
-
-            if not self.exchanges:
-                raise Exception("No exchanges available")
-
-            # Initialize WebSocket streams
-            logger.info("Initializing WebSocket streams...")
-            for name, config in settings.exchanges.items():
-                # Skip disabled exchanges
-                if not config.enabled:
-                    continue
-                    
-                if name == 'binance':
-                    # Check if we're on testnet
-                    is_testnet = config.testnet
-                    
-                    if is_testnet:
-                        # Use adaptive stream for testnet
-                        logger.info("🔧 Using AdaptiveStream for testnet")
-                        from websocket.adaptive_stream import AdaptiveBinanceStream
-                        
-                        # Get exchange client
-                        exchange = self.exchanges.get(name)
-                        if exchange:
-                            stream = AdaptiveBinanceStream(exchange, is_testnet=True)
-                            
-                            # Set up callbacks to integrate with existing event system
-                            async def on_price_update(symbol, price):
-                                await self._handle_stream_event('price_update', {
-                                    'symbol': symbol,
-                                    'price': price
-                                })
-
-                            async def on_position_update(positions):
-                                # CRITICAL FIX: Event name must match subscription in position_manager (position.update)
-                                # positions is dict {symbol: position_data}, emit event for each position
-                                if positions:
-                                    logger.info(f"📊 REST polling: received {len(positions)} position updates with mark prices")
-                                for symbol, pos_data in positions.items():
-                                    await self._handle_stream_event('position.update', pos_data)
-                            
-                            stream.set_callback('price_update', on_price_update)
-                            stream.set_callback('position_update', on_position_update)
-                            
-                            # Start in background
-                            asyncio.create_task(stream.start())
-                            self.websockets[name] = stream
-                            logger.info(f"✅ {name.capitalize()} AdaptiveStream ready (testnet)")
-                    else:
-                        # Use Hybrid WebSocket for Binance mainnet
-                        logger.info("🚀 Using Hybrid WebSocket for Binance mainnet")
-                        from websocket.binance_hybrid_stream import BinanceHybridStream
-
-                        # Get API credentials
-                        api_key = os.getenv('BINANCE_API_KEY')
-                        api_secret = os.getenv('BINANCE_API_SECRET')
-
-                        if api_key and api_secret:
-                            try:
-                                # Define callback for snapshot sync
-                                async def fetch_active_positions():
-                                    try:
-                                        # Use exchange manager to fetch positions
-                                        # This uses CCXT which goes via REST API
-                                        return await self.exchanges[name].fetch_positions()
-                                    except Exception as e:
-                                        logger.error(f"Failed to fetch positions for snapshot sync: {e}")
-                                        return []
-
-                                hybrid_stream = BinanceHybridStream(
-                                    api_key=api_key,
-                                    api_secret=api_secret,
-                                    event_handler=self._handle_stream_event,
-                                    position_fetch_callback=fetch_active_positions,
-                                    exchange_manager=self.exchanges.get(name),  # For REST price fallback
-                                    testnet=False
-                                )
-                                await hybrid_stream.start()
-                                self.websockets[f'{name}_hybrid'] = hybrid_stream
-                                logger.info(f"✅ {name.capitalize()} Hybrid WebSocket ready (mainnet)")
-                                logger.info(f"   → User WS: Position lifecycle (ACCOUNT_UPDATE)")
-                                logger.info(f"   → Mark WS: Price updates (1-3s)")
-                                
-                                # Initialize AggTrades stream for delta calculation (per-symbol isolation)
-                                from websocket.aggtrades_per_symbol_pool import AggTradesPerSymbolPool
-                                aggtrades_stream = AggTradesPerSymbolPool(testnet=False)
-                                await aggtrades_stream.start()
-                                self.websockets[f'{name}_aggtrades'] = aggtrades_stream
-                                self.aggtrades_stream = aggtrades_stream  # Store reference
-                                logger.info(f"✅ {name.capitalize()} AggTrades Per-Symbol Pool ready (delta calculation)")
-                            except Exception as e:
-                                logger.error(f"Failed to start Binance hybrid stream: {e}")
-                                raise
-                        else:
-                            logger.error(f"❌ Binance mainnet requires API credentials")
-                            raise ValueError("Binance API credentials required for mainnet")
-
-
-            # Initialize position manager (Phase 2)
-            logger.info("Initializing position manager...")
-            self.position_manager = PositionManager(
-                settings.trading,
-                self.exchanges,
-                self.repository,
-                self.event_router
-            )
-
-            # Phase 3: Link position_manager back to exchanges for real-time position lookup
-            logger.info("Linking position_manager to exchanges...")
-            for exchange in self.exchanges.values():
-                exchange.position_manager = self.position_manager
-            logger.info(f"✅ Linked position_manager to {len(self.exchanges)} exchange(s)")
-
-            # Load existing positions from database
-            logger.info("Loading positions from database...")
-            await self.position_manager.load_positions_from_db()
-
-            # CRITICAL FIX: Sync positions with Binance Hybrid WebSocket
-            # User WS may not send position snapshot on startup,
-            # so we need to explicitly subscribe to mark prices for existing positions
-            binance_ws = self.websockets.get('binance_hybrid')
-            if binance_ws:
-                #  NEW: Connect position_manager for health check
-                binance_ws.set_position_manager(self.position_manager)
-                
-                # Get active Binance positions (PositionState objects)
-                binance_position_states = [
-                    p for p in self.position_manager.positions.values()
-                    if p.exchange == 'binance'
-                ]
-
-                if binance_position_states:
-                    # Convert PositionState objects to dicts for sync_positions()
-                    binance_positions = [
-                        {
-                            'symbol': p.symbol.replace('/', '').split(':')[0],
-                            'side': p.side,
-                            'quantity': p.quantity,
-                            'entry_price': p.entry_price,
-                            'current_price': p.current_price
-                        }
-                        for p in binance_position_states
-                    ]
-
-                    logger.info(f"🔄 Syncing {len(binance_positions)} Binance positions with WebSocket...")
-                    try:
-                        await binance_ws.sync_positions(binance_positions)
-                        logger.info(f"✅ Binance WebSocket synced with {len(binance_positions)} positions")
-                    except Exception as e:
-                        logger.error(f"Failed to sync Binance positions: {e}")
-                else:
-                    logger.info("No active Binance positions to sync")
-
-            # Connect AggTrades stream to position manager for delta filtering
-            if self.aggtrades_stream and self.position_manager:
-                # Get delta filter params from env or use defaults
-                delta_window = int(os.getenv('DELTA_WINDOW_SEC', '20'))
-                delta_threshold = float(os.getenv('DELTA_THRESHOLD_MULT', '1.5'))
-                self.position_manager.set_aggtrades_stream(
-                    self.aggtrades_stream, 
-                    window_sec=delta_window,
-                    threshold_mult=delta_threshold
-                )
-                logger.info(f"✅ Delta filter connected (window={delta_window}s, threshold={delta_threshold}x)")
 
+            self._startup_graph = StartupGraph()
+            for stage, after in BOT_STARTUP_STAGES.items():
+                self._startup_graph.add(stage, getattr(self, f'_startup_{stage}'), after=after)
+            try:
+                await self._startup_graph.run()
+            finally:
+                self.startup_report = self._startup_graph.report()
+                logger.info(self.startup_report.summary())
 
-            # NOTE: Aged position management removed 2026-02-12
-            # Timeout logic handled by Smart Timeout v2.0 in signal_lifecycle.py
-
-            # Initialize WebSocket signal processor
-            logger.info("Initializing WebSocket signal processor...")
-            self.signal_processor = WebSocketSignalProcessor(
-                config=settings.trading,
-                position_manager=self.position_manager,
-                repository=self.repository,
-                event_router=self.event_router
-            )
-            logger.info("✅ WebSocket signal processor initialized")
-
-            # Initialize Composite Strategy + Lifecycle Manager (2026-02-09)
-            strategy_path = os.path.join(BASE_DIR, 'composite_strategy.json')
-            if os.path.exists(strategy_path):
-                try:
-                    from core.composite_strategy import CompositeStrategy
-                    from core.signal_lifecycle import SignalLifecycleManager
-
-                    composite_strategy = CompositeStrategy(strategy_path)
-
-                    lifecycle_manager = SignalLifecycleManager(
-                        composite_strategy=composite_strategy,
-                        position_manager=self.position_manager,
-                        aggtrades_stream=self.aggtrades_stream,
-                        exchange_manager=self.exchanges.get('binance'),
-                        repository=self.repository,
-                        max_concurrent_signals=int(os.getenv('MAX_LIFECYCLE_SIGNALS', '10')),
-                    )
-                    await lifecycle_manager.start()
-                    self.lifecycle_manager = lifecycle_manager
-
-                    # Wire into signal processor
-                    self.signal_processor.set_lifecycle_manager(lifecycle_manager)
-
-                    # FIX #3: Wire into position manager for external closure notifications
-                    self.position_manager.set_lifecycle_manager(lifecycle_manager)
-
-                    # Hook aggTrades to feed bar aggregators (FIX N-5: proper callback)
-                    if self.aggtrades_stream:
-                        def _lifecycle_trade_handler(data):
-                            symbol = data.get('s', '').upper()
-                            if lifecycle_manager.has_active_lifecycle(symbol):
-                                price = float(data.get('p', '0'))
-                                qty = float(data.get('q', '0'))
-                                is_buyer_maker = data.get('m', False)
-                                trade_time_ms = data.get('T', 0)
-                                lifecycle_manager.route_trade(
-                                    symbol, price, qty, is_buyer_maker, trade_time_ms
-                                )
-
-                        self.aggtrades_stream._trade_handlers.append(_lifecycle_trade_handler)
-
-                    logger.info(
-                        f"✅ Composite strategy v{composite_strategy.version} ready: "
-                        f"{len(composite_strategy.rules)} rules, lifecycle manager active"
-                    )
-                except Exception as e:
-                    logger.warning(f"⚠️ Failed to initialize composite strategy: {e}")
-                    logger.warning("Continuing without composite strategy — wave pipeline only")
-            else:
-                logger.info("No composite_strategy.json found — using wave pipeline only")
+            if self.position_manager and self.position_manager.positions and \
+                    self.startup_report.time_to_protected is None:
+                logger.warning("⚠️ Not every open position has a verified stop loss after startup")
 
             # Set signal processor reference in health monitor
             if self.health_monitor:
                 self.health_monitor.set_signal_processor(self.signal_processor)
+                self.health_monitor.set_components(
+                    exchanges=self.exchanges,
+                    websockets=self.websockets,
+                    position_manager=self.position_manager
+                )
+
+            # Prometheus metrics: gauges fed by events, periodic DB reconcile only
+            metrics_port = int(os.getenv('METRICS_PORT', '0'))
+            if metrics_port:
+                await self._start_metrics(metrics_port)
 
             # Stop-list symbols are now loaded from configuration (.env file)
             # via SymbolFilter in signal_processor
@@ -407,6 +176,369 @@ class TradingBot:
             await self.cleanup()
             raise
 
+    async def _startup_database(self):
+        """Connect the database; start health monitor and performance tracker"""
+        logger.info("Initializing database...")
+        await self.repository.initialize()
+
+        # CRITICAL: Verify pool initialized successfully
+        if not self.repository.pool:
+            raise RuntimeError("Repository pool initialization failed!")
+        logger.info(f"✅ Repository pool initialized: {type(self.repository.pool)}")
+
+        # Initialize health checker and performance tracker with repository
+        self.health_monitor = HealthChecker(
+            self.repository,
+            {
+                'check_interval': 10,
+                'check_timeout_sec': float(os.getenv('HEALTH_CHECK_TIMEOUT_SEC', '5')),
+            },
+            signal_processor=None  # Will be set after signal_processor initialization
+        )
+
+        # CRITICAL FIX: Start health monitoring
+        await self.health_monitor.start()
+        logger.info("✅ Health monitoring started")
+
+        self.performance_tracker = PerformanceTracker(
+            self.repository,
+            {'min_trades_for_stats': 20}
+        )
+
+    async def _start_metrics(self, port: int):
+        """Start the metrics server on port, fed by router events, account ledgers and signal traces"""
+        self.metrics_collector = MetricsCollector(
+            self.repository,
+            {
+                'metrics_port': port,
+                'exchanges': list(self.exchanges),
+                'reconcile_interval': float(os.getenv('METRICS_RECONCILE_SEC', '300')),
+            }
+        )
+        self.metrics_collector.attach(self.event_router)
+        for name, exchange in self.exchanges.items():
+            ledger = getattr(exchange, 'account_ledger', None)
+            if ledger:
+                self.metrics_collector.attach_account_ledger(name, ledger)
+        if self.health_monitor:
+            self.metrics_collector.set_health_checker(self.health_monitor)
+        if self.signal_processor:
+            self.signal_processor.tracer.add_sink(self.metrics_collector.record_signal_trace)
+        await self.metrics_collector.start()
+
+    async def _startup_exchanges(self):
+        """Initialize enabled exchanges concurrently (markets from the on-disk cache when valid)"""
+        logger.info("Initializing exchanges...")
+        markets_cache = None
+        markets_cache_dir = os.getenv('MARKETS_CACHE_DIR', os.path.join(BASE_DIR, 'data', 'markets'))
+        if markets_cache_dir:
+            markets_cache = MarketsCache(
+                markets_cache_dir,
+                max_age_sec=float(os.getenv('MARKETS_CACHE_MAX_AGE_SEC', '86400')),
+            )
+
+        async def init_exchange(name, config):
+            # Phase 1: Create exchange without position_manager (will be linked in Phase 3)
+            exchange = ExchangeManager(name, config.__dict__, repository=self.repository, position_manager=None)
+            try:
+                await exchange.initialize(markets_cache=markets_cache)
+                logger.info(f"✅ {name.capitalize()} exchange ready")
+                return exchange
+            except Exception as e:
+                logger.error(f"Failed to initialize {name}: {e}")
+                # Cleanup on failure
+                await exchange.close()
+                if self.mode == 'production':
+                    raise
+                # In non-production, continue with other exchanges
+                return None
+
+        enabled = []
+        for name, config in settings.exchanges.items():
+            # Skip disabled exchanges
+            if not config.enabled:
+                logger.info(f"Skipping disabled exchange: {name}")
+                continue
+            enabled.append(name)
+
+        results = await asyncio.gather(
+            *(init_exchange(name, settings.exchanges[name]) for name in enabled),
+            return_exceptions=True,
+        )
+        failures = [r for r in results if isinstance(r, BaseException)]
+        if failures:
+            # Don't leave the exchanges that did start with open sessions
+            started = [r for r in results if isinstance(r, ExchangeManager)]
+            await asyncio.gather(*(exchange.close() for exchange in started), return_exceptions=True)
+            raise failures[0]
+        for name, exchange in zip(enabled, results):
+            if exchange is not None:
+                self.exchanges[name] = exchange
+
+        if not self.exchanges:
+            raise Exception("No exchanges available")
+
+    async def _startup_streams(self):
+        """Start WebSocket streams (user / mark price / aggTrades)"""
+        logger.info("Initializing WebSocket streams...")
+        for name, config in settings.exchanges.items():
+            # Skip disabled exchanges
+            if not config.enabled:
+                continue
+
+            if name == 'binance':
+                # Check if we're on testnet
+                is_testnet = config.testnet
+
+                if is_testnet:
+                    # Use adaptive stream for testnet
+                    logger.info("🔧 Using AdaptiveStream for testnet")
+                    from websocket.adaptive_stream import AdaptiveBinanceStream
+
+                    # Get exchange client
+                    exchange = self.exchanges.get(name)
+                    if exchange:
+                        stream = AdaptiveBinanceStream(exchange, is_testnet=True)
+
+                        # Set up callbacks to integrate with existing event system
+                        async def on_price_update(symbol, price):
+                            await self._handle_stream_event('price_update', {
+                                'symbol': symbol,
+                                'price': price
+                            })
+
+                        async def on_position_update(positions):
+                            # CRITICAL FIX: Event name must match subscription in position_manager (position.update)
+                            # positions is dict {symbol: position_data}, emit event for each position
+                            if positions:
+                                logger.info(f"📊 REST polling: received {len(positions)} position updates with mark prices")
+                            for symbol, pos_data in positions.items():
+                                await self._handle_stream_event('position.update', pos_data)
+
+                        stream.set_callback('price_update', on_price_update)
+                        stream.set_callback('position_update', on_position_update)
+
+                        # Start in background
+                        asyncio.create_task(stream.start())
+                        self.websockets[name] = stream
+                        logger.info(f"✅ {name.capitalize()} AdaptiveStream ready (testnet)")
+                else:
+                    # Use Hybrid WebSocket for Binance mainnet
+                    logger.info("🚀 Using Hybrid WebSocket for Binance mainnet")
+                    from websocket.binance_hybrid_stream import BinanceHybridStream
+
+                    # Get API credentials
+                    api_key = os.getenv('BINANCE_API_KEY')
+                    api_secret = os.getenv('BINANCE_API_SECRET')
+
+                    if api_key and api_secret:
+                        try:
+                            # Define callback for snapshot sync
+                            async def fetch_active_positions():
+                                try:
+                                    # Use exchange manager to fetch positions
+                                    # This uses CCXT which goes via REST API
+                                    return await self.exchanges[name].fetch_positions()
+                                except Exception as e:
+                                    logger.error(f"Failed to fetch positions for snapshot sync: {e}")
+                                    return []
+
+                            # Balance / positions for can_open_position from the user stream
+                            self.exchanges[name].enable_account_ledger()
+
+                            hybrid_stream = BinanceHybridStream(
+                                api_key=api_key,
+                                api_secret=api_secret,
+                                event_handler=self._handle_stream_event,
+                                position_fetch_callback=fetch_active_positions,
+                                exchange_manager=self.exchanges.get(name),  # For REST price fallback
+                                testnet=False
+                            )
+                            await hybrid_stream.start()
+                            self.websockets[f'{name}_hybrid'] = hybrid_stream
+                            logger.info(f"✅ {name.capitalize()} Hybrid WebSocket ready (mainnet)")
+                            logger.info(f"   → User WS: Position lifecycle (ACCOUNT_UPDATE)")
+                            logger.info(f"   → Mark WS: Price updates (1-3s)")
+
+                            # Initialize AggTrades stream for delta calculation (per-symbol isolation)
+                            from websocket.aggtrades_per_symbol_pool import AggTradesPerSymbolPool
+                            aggtrades_stream = AggTradesPerSymbolPool(
+                                testnet=False,
+                                precision=os.getenv('AGGTRADES_PRECISION', 'float'),
+                                multiplexed=os.getenv('MARKET_STREAMS_MULTIPLEXED', 'true').lower() == 'true',
+                            )
+                            await aggtrades_stream.start()
+                            self.websockets[f'{name}_aggtrades'] = aggtrades_stream
+                            self.aggtrades_stream = aggtrades_stream  # Store reference
+                            logger.info(f"✅ {name.capitalize()} AggTrades Per-Symbol Pool ready (delta calculation)")
+                        except Exception as e:
+                            logger.error(f"Failed to start Binance hybrid stream: {e}")
+                            raise
+                    else:
+                        logger.error(f"❌ Binance mainnet requires API credentials")
+                        raise ValueError("Binance API credentials required for mainnet")
+
+    async def _startup_positions(self):
+        """Create the position manager, load positions and verify their stop losses"""
+        # Initialize position manager (Phase 2)
+        logger.info("Initializing position manager...")
+        self.position_manager = PositionManager(
+            settings.trading,
+            self.exchanges,
+            self.repository,
+            self.event_router
+        )
+
+        # Phase 3: Link position_manager back to exchanges for real-time position lookup
+        logger.info("Linking position_manager to exchanges...")
+        for exchange in self.exchanges.values():
+            exchange.position_manager = self.position_manager
+        logger.info(f"✅ Linked position_manager to {len(self.exchanges)} exchange(s)")
+
+        # Load existing positions from database
+        logger.info("Loading positions from database...")
+        await self.position_manager.load_positions_from_db(
+            on_protected=lambda: self._startup_graph.mark('protected')
+        )
+
+    async def _startup_stream_sync(self):
+        """Subscribe streams to loaded positions; connect the delta filter"""
+        # CRITICAL FIX: Sync positions with Binance Hybrid WebSocket
+        # User WS may not send position snapshot on startup,
+        # so we need to explicitly subscribe to mark prices for existing positions
+        binance_ws = self.websockets.get('binance_hybrid')
+        if binance_ws:
+            #  NEW: Connect position_manager for health check
+            binance_ws.set_position_manager(self.position_manager)
+
+            # Get active Binance positions (PositionState objects)
+            binance_position_states = [
+                p for p in self.position_manager.positions.values()
+                if p.exchange == 'binance'
+            ]
+
+            if binance_position_states:
+                # Convert PositionState objects to dicts for sync_positions()
+                binance_positions = [
+                    {
+                        'symbol': p.symbol.replace('/', '').split(':')[0],
+                        'side': p.side,
+                        'quantity': p.quantity,
+                        'entry_price': p.entry_price,
+                        'current_price': p.current_price
+                    }
+                    for p in binance_position_states
+                ]
+
+                logger.info(f"🔄 Syncing {len(binance_positions)} Binance positions with WebSocket...")
+                try:
+                    await binance_ws.sync_positions(binance_positions)
+                    logger.info(f"✅ Binance WebSocket synced with {len(binance_positions)} positions")
+                except Exception as e:
+                    logger.error(f"Failed to sync Binance positions: {e}")
+            else:
+                logger.info("No active Binance positions to sync")
+
+        # Connect AggTrades stream to position manager for delta filtering
+        if self.aggtrades_stream and self.position_manager:
+            # Get delta filter params from env or use defaults
+            delta_window = int(os.getenv('DELTA_WINDOW_SEC', '20'))
+            delta_threshold = float(os.getenv('DELTA_THRESHOLD_MULT', '1.5'))
+            self.position_manager.set_aggtrades_stream(
+                self.aggtrades_stream, 
+                window_sec=delta_window,
+                threshold_mult=delta_threshold
+            )
+            logger.info(f"✅ Delta filter connected (window={delta_window}s, threshold={delta_threshold}x)")
+
+    async def _startup_signal_processor(self):
+        """Create the WebSocket signal processor"""
+        # Initialize WebSocket signal processor
+        logger.info("Initializing WebSocket signal processor...")
+        self.signal_processor = WebSocketSignalProcessor(
+            config=settings.trading,
+            position_manager=self.position_manager,
+            repository=self.repository,
+            event_router=self.event_router
+        )
+        logger.info("✅ WebSocket signal processor initialized")
+
+    async def _startup_lifecycle(self):
+        """Composite strategy + lifecycle manager (optional)"""
+        # Initialize Composite Strategy + Lifecycle Manager (2026-02-09)
+        strategy_path = os.path.join(BASE_DIR, 'composite_strategy.json')
+        if os.path.exists(strategy_path):
+            try:
+                from core.composite_strategy import CompositeStrategy
+                from core.signal_lifecycle import SignalLifecycleManager
+                from core.lookback_service import LookbackService
+                from core.bar_store import BarStore, parse_retention_by_symbol
+
+                bar_store = None
+                bar_store_dir = os.getenv('BAR_STORE_DIR', os.path.join(BASE_DIR, 'data', 'bars'))
+                if bar_store_dir:
+                    bar_store = BarStore(
+                        bar_store_dir,
+                        retention_sec=int(os.getenv('BAR_STORE_RETENTION_SEC', '3600')),
+                        compaction_factor=float(os.getenv('BAR_STORE_COMPACTION_FACTOR', '2.0')),
+                        flush_interval_sec=float(os.getenv('BAR_STORE_FLUSH_INTERVAL_SEC', '5')),
+                        retention_by_symbol=parse_retention_by_symbol(
+                            os.getenv('BAR_STORE_RETENTION_BY_SYMBOL', '')
+                        ),
+                    )
+
+                composite_strategy = CompositeStrategy(strategy_path)
+
+                lifecycle_manager = SignalLifecycleManager(
+                    composite_strategy=composite_strategy,
+                    position_manager=self.position_manager,
+                    aggtrades_stream=self.aggtrades_stream,
+                    exchange_manager=self.exchanges.get('binance'),
+                    repository=self.repository,
+                    max_concurrent_signals=int(os.getenv('MAX_LIFECYCLE_SIGNALS', '10')),
+                    bar_storage=os.getenv('BAR_STORAGE', 'deque'),
+                    bar_backlog_max=int(os.getenv('BAR_BACKLOG_MAX', '10')),
+                    lookback_service=LookbackService(
+                        max_concurrent=int(os.getenv('LOOKBACK_MAX_CONCURRENT', '4')),
+                        weight_per_minute=int(os.getenv('LOOKBACK_WEIGHT_PER_MIN', '1200')),
+                    ),
+                    bar_store=bar_store,
+                    strategy_reload_sec=float(os.getenv('COMPOSITE_STRATEGY_RELOAD_SEC', '10')),
+                )
+                await lifecycle_manager.start()
+                self.lifecycle_manager = lifecycle_manager
+
+                # Wire into signal processor
+                self.signal_processor.set_lifecycle_manager(lifecycle_manager)
+
+                # FIX #3: Wire into position manager for external closure notifications
+                self.position_manager.set_lifecycle_manager(lifecycle_manager)
+
+                # Hook aggTrades to feed bar aggregators (FIX N-5: proper callback)
+                if self.aggtrades_stream:
+                    def _lifecycle_trade_handler(data):
+                        symbol = data.get('s', '').upper()
+                        if lifecycle_manager.has_active_lifecycle(symbol):
+                            price = float(data.get('p', '0'))
+                            qty = float(data.get('q', '0'))
+                            is_buyer_maker = data.get('m', False)
+                            trade_time_ms = data.get('T', 0)
+                            lifecycle_manager.route_trade(
+                                symbol, price, qty, is_buyer_maker, trade_time_ms
+                            )
+
+                    self.aggtrades_stream._trade_handlers.append(_lifecycle_trade_handler)
+
+                logger.info(
+                    f"✅ Composite strategy v{composite_strategy.version} ready: "
+                    f"{len(composite_strategy.rules)} rules, lifecycle manager active"
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to initialize composite strategy: {e}")
+                logger.warning("Continuing without composite strategy — wave pipeline only")
+        else:
+            logger.info("No composite_strategy.json found — using wave pipeline only")
+
     def _register_event_handlers(self):
         """Register application event handlers"""
 
@@ -442,14 +574,14 @@ class TradingBot:
         @self.event_router.on('position.opened')
         async def handle_position_opened(data: Dict):
             logger.info(f"📈 Position opened: {data['symbol']} {data['side']}")
-            await self.performance_tracker.record_trade(data)
 
         @self.event_router.on('position.closed')
         async def handle_position_closed(data: Dict):
-            pnl = data.get('realized_pnl', 0)
+            pnl = data.get('realized_pnl') or 0
             emoji = "✅" if pnl > 0 else "❌"
             logger.info(f"{emoji} Position closed: {data['symbol']} PnL: ${pnl:.2f}")
-            await self.performance_tracker.record_trade_close(data)
+            if self.performance_tracker:
+                self.performance_tracker.record_trade(data)
 
         @self.event_router.on('stop_loss.triggered')
         async def handle_stop_loss(data: Dict):
@@ -488,8 +620,12 @@ class TradingBot:
 
         # Initialize EventLogger for audit trail
         try:
-            from core.event_logger import EventLogger, EventType, set_event_logger
-            event_logger = EventLogger(self.repository.pool)
+            from core.event_logger import EventLogger, EventType, set_event_logger, parse_event_policies
+            event_logger = EventLogger(
+                self.repository.pool,
+                policies=parse_event_policies(os.getenv('EVENT_LOG_POLICIES', '')),
+                spill_path=os.path.join(BASE_DIR, 'data', 'event_spill.jsonl')
+            )
             await event_logger.initialize()
             set_event_logger(event_logger)
 
@@ -790,6 +926,9 @@ class TradingBot:
             except Exception as e:
                 logger.error(f"Failed to close WebSocket {name}: {e}")
 
+        # Stop event dispatch (no stream events arrive any more)
+        await self.event_router.stop()
+
         # Close exchange connections
         for name, exchange in self.exchanges.items():
             try:
@@ -798,6 +937,21 @@ class TradingBot:
             except Exception as e:
                 logger.error(f"Failed to close exchange {name}: {e}")
 
+        # Flush pending position price/PnL updates
+        if self.position_manager:
+            try:
+                await self.position_manager.price_writer.close()
+                logger.debug("Flushed position price updates")
+            except Exception as e:
+                logger.error(f"Failed to flush position price updates: {e}")
+
+        # Stop metrics server (before its reconcile source closes)
+        if self.metrics_collector:
+            try:
+                await self.metrics_collector.stop()
+            except Exception as e:
+                logger.error(f"Failed to stop metrics server: {e}")
+
         # Close database
         if self.repository:
             try:
@@ -818,6 +972,13 @@ class TradingBot:
             except Exception as e:
                 logger.error(f"Failed to save final report: {e}")
 
+        log_stats = get_logging_stats()
+        if log_stats:
+            logger.info(
+                f"Logging: {log_stats['enqueued']} records, {log_stats['dropped']} dropped, "
+                f"{log_stats['deduplicated']} deduplicated, {log_stats['rate_limited']} rate-limited"
+            )
+
         logger.info("✅ Cleanup complete")
 
     def handle_shutdown(self, signum, frame):
@@ -899,7 +1060,7 @@ def main():
             sys.exit(1)
     finally:
         # Lock is automatically released by SingleInstance on exit
-        pass
+        stop_async_logging()
 
 
 if __name__ == "__main__":
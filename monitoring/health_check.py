@@ -3,7 +3,8 @@ Health check system for monitoring component status and alerting
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional, Callable
+import time
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from datetime import datetime, timezone, timedelta
 from enum import Enum
 from dataclasses import dataclass, field
@@ -58,6 +59,13 @@ class SystemHealth:
     alerts: List[str] = field(default_factory=list)
 
 
+_SEVERITY = [HealthStatus.HEALTHY, HealthStatus.DEGRADED, HealthStatus.UNHEALTHY, HealthStatus.CRITICAL]
+
+
+def _worst(a: HealthStatus, b: HealthStatus) -> HealthStatus:
+    return a if _SEVERITY.index(a) >= _SEVERITY.index(b) else b
+
+
 class HealthChecker:
     """
     Comprehensive health monitoring system
@@ -68,16 +76,28 @@ class HealthChecker:
     - Alert generation
     - Auto-recovery attempts
     - Health history tracking
+
+    Checks run concurrently, each bounded by its own deadline, and read
+    in-process counters of the attached components (stream pools, REST
+    rate limiters, position manager) rather than querying full tables.
+    The last result is kept as a snapshot that get_snapshot() serves
+    without I/O.
     """
     
     def __init__(self,
                  repository: Repository,
                  config: Dict[str, Any],
-                 signal_processor=None):
+                 signal_processor=None,
+                 exchanges: Optional[Dict[str, Any]] = None,
+                 websockets: Optional[Dict[str, Any]] = None,
+                 position_manager=None):
 
         self.repository = repository
         self.config = config
         self.signal_processor = signal_processor
+        self.exchanges = exchanges or {}
+        self.websockets = websockets or {}
+        self.position_manager = position_manager
         
         # Health check intervals
         self.check_interval = config.get('health_check_interval', 30)  # seconds
@@ -87,6 +107,14 @@ class HealthChecker:
         self.max_response_time_ms = config.get('max_response_time_ms', 1000)
         self.max_error_count = config.get('max_error_count', 3)
         self.degraded_threshold = config.get('degraded_threshold', 0.8)
+        self.max_pool_acquire_ms = config.get('max_pool_acquire_ms', 250)
+        self.max_stream_silence_sec = config.get('max_stream_silence_sec', 30)
+        self.max_rest_error_rate = config.get('max_rest_error_rate', 0.1)
+        self.min_rate_limit_headroom = config.get('min_rate_limit_headroom', 0.1)
+
+        # Per-check deadlines (seconds), by component type value
+        self.check_timeout = config.get('check_timeout_sec', 5.0)
+        self.check_timeouts: Dict[str, float] = dict(config.get('check_timeouts', {}))
         
         # Component checks
         self.component_checks: Dict[ComponentType, Callable] = {
@@ -113,6 +141,12 @@ class HealthChecker:
         self.system_health: Optional[SystemHealth] = None
         self.health_history: List[SystemHealth] = []
         self.consecutive_failures: Dict[ComponentType, int] = {}
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_time: Optional[float] = None
+
+        # Counters at the previous check, for rates: name -> (total, failed) / (time, messages)
+        self._rest_counters: Dict[str, Tuple[int, int]] = {}
+        self._stream_counters: Dict[str, Tuple[float, int]] = {}
         
         # Alert callbacks
         self.alert_callbacks: List[Callable] = []
@@ -132,6 +166,17 @@ class HealthChecker:
         logger.warning(f"🔧 Signal processor reference set in HealthChecker: {signal_processor is not None}")
         logger.info("Signal processor reference set in HealthChecker")
 
+    def set_components(self, exchanges: Optional[Dict[str, Any]] = None,
+                       websockets: Optional[Dict[str, Any]] = None,
+                       position_manager=None):
+        """Attach components whose in-process counters the checks read"""
+        if exchanges is not None:
+            self.exchanges = exchanges
+        if websockets is not None:
+            self.websockets = websockets
+        if position_manager is not None:
+            self.position_manager = position_manager
+
     async def start(self):
         """Start health monitoring"""
         
@@ -189,44 +234,31 @@ class HealthChecker:
                 await asyncio.sleep(self.check_interval)
     
     async def check_system_health(self) -> SystemHealth:
-        """Perform comprehensive system health check"""
+        """Perform comprehensive system health check (all checks concurrently)"""
         
+        started = time.perf_counter()
         components = []
         checks_passed = 0
         checks_failed = 0
         
-        # Check each component
-        for component_type, check_func in self.component_checks.items():
-            try:
-                component_health = await check_func()
-                components.append(component_health)
-                
-                # Update tracking
-                self.component_health[component_type] = component_health
-                
-                if component_health.status == HealthStatus.HEALTHY:
-                    checks_passed += 1
-                    self.consecutive_failures[component_type] = 0
-                else:
-                    checks_failed += 1
-                    self.consecutive_failures[component_type] = \
-                        self.consecutive_failures.get(component_type, 0) + 1
-                
-            except Exception as e:
-                logger.error(f"Failed to check {component_type.value}: {e}")
-                
-                # Create failed health check
-                component_health = ComponentHealth(
-                    name=component_type.value,
-                    type=component_type,
-                    status=HealthStatus.CRITICAL,
-                    last_check=datetime.now(timezone.utc),
-                    response_time_ms=0,
-                    error_count=self.consecutive_failures.get(component_type, 0) + 1,
-                    error_message=str(e)
-                )
-                components.append(component_health)
+        results = await asyncio.gather(*(
+            self._run_check(component_type, check_func)
+            for component_type, check_func in self.component_checks.items()
+        ))
+
+        for component_type, component_health in zip(self.component_checks, results):
+            components.append(component_health)
+
+            # Update tracking
+            self.component_health[component_type] = component_health
+
+            if component_health.status == HealthStatus.HEALTHY:
+                checks_passed += 1
+                self.consecutive_failures[component_type] = 0
+            else:
                 checks_failed += 1
+                self.consecutive_failures[component_type] = \
+                    self.consecutive_failures.get(component_type, 0) + 1
         
         # Check dependencies
         for component_type, deps in self.dependencies.items():
@@ -267,25 +299,93 @@ class HealthChecker:
         )
         
         self.system_health = system_health
+        self._update_snapshot(system_health, (time.perf_counter() - started) * 1000)
         return system_health
+
+    async def _run_check(self, component_type: ComponentType, check_func: Callable) -> ComponentHealth:
+        """Run one check within its deadline; response time is the measured duration"""
+
+        timeout = self.check_timeouts.get(component_type.value, self.check_timeout)
+        start = time.perf_counter()
+        try:
+            component_health = await asyncio.wait_for(check_func(), timeout)
+            component_health.response_time_ms = round((time.perf_counter() - start) * 1000, 2)
+            return component_health
+
+        except asyncio.TimeoutError:
+            previous = self.component_health.get(component_type)
+            return ComponentHealth(
+                name=previous.name if previous else component_type.value,
+                type=component_type,
+                status=HealthStatus.UNHEALTHY,
+                last_check=datetime.now(timezone.utc),
+                response_time_ms=round((time.perf_counter() - start) * 1000, 2),
+                error_count=self.consecutive_failures.get(component_type, 0) + 1,
+                error_message=f"Check timed out after {timeout:g}s"
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to check {component_type.value}: {e}")
+            return ComponentHealth(
+                name=component_type.value,
+                type=component_type,
+                status=HealthStatus.CRITICAL,
+                last_check=datetime.now(timezone.utc),
+                response_time_ms=0,
+                error_count=self.consecutive_failures.get(component_type, 0) + 1,
+                error_message=str(e)
+            )
+
+    def _update_snapshot(self, health: SystemHealth, duration_ms: float):
+        self.snapshot = {
+            'status': health.status.value,
+            'last_check': health.last_check.isoformat(),
+            'check_duration_ms': round(duration_ms, 2),
+            'checks_passed': health.checks_passed,
+            'checks_failed': health.checks_failed,
+            'components': {
+                c.name: {
+                    'status': c.status.value,
+                    'response_time_ms': c.response_time_ms,
+                    'error': c.error_message,
+                    'metadata': c.metadata
+                }
+                for c in health.components
+            },
+            'alerts': health.alerts
+        }
+        self._snapshot_time = time.monotonic()
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Last health check result (no I/O), with its age in seconds"""
+
+        if self.snapshot is None:
+            return {'status': 'unknown', 'message': 'No health check performed yet'}
+        return {**self.snapshot, 'age_sec': round(time.monotonic() - self._snapshot_time, 1)}
     
     async def _check_database(self) -> ComponentHealth:
-        """Check database connectivity and performance"""
-        
-        start_time = asyncio.get_event_loop().time()
+        """Check database connectivity: pool acquire and SELECT 1 latency"""
         
         try:
-            # Test database query
             result = await self.repository.health_check()
+            result = result if isinstance(result, dict) else {'status': 'ok' if result else 'down'}
+            acquire_ms = result.get('acquire_ms', 0)
+            query_ms = result.get('query_ms', 0)
+            exhausted = result.get('pool_max') and result.get('pool_idle') == 0 and \
+                result.get('pool_size') == result.get('pool_max')
             
-            response_time = (asyncio.get_event_loop().time() - start_time) * 1000
-            
-            if not result:
+            if result.get('status') != 'ok':
                 status = HealthStatus.UNHEALTHY
-                error_message = "Database health check returned false"
-            elif response_time > self.max_response_time_ms:
+                error_message = result.get('error', "Database health check failed")
+            elif acquire_ms > self.max_pool_acquire_ms:
+                status = HealthStatus.DEGRADED
+                error_message = f"Slow pool acquire: {acquire_ms:.0f}ms"
+            elif query_ms > self.max_response_time_ms:
                 status = HealthStatus.DEGRADED
-                error_message = f"Slow response: {response_time:.0f}ms"
+                error_message = f"Slow response: {query_ms:.0f}ms"
+            elif exhausted:
+                status = HealthStatus.DEGRADED
+                error_message = f"Connection pool exhausted ({result['pool_size']}/{result['pool_max']})"
             else:
                 status = HealthStatus.HEALTHY
                 error_message = None
@@ -295,9 +395,15 @@ class HealthChecker:
                 type=ComponentType.DATABASE,
                 status=status,
                 last_check=datetime.now(timezone.utc),
-                response_time_ms=response_time,
+                response_time_ms=acquire_ms + query_ms,
                 error_message=error_message,
-                metadata={'connection_pool_size': result.get('pool_size', 0)}
+                metadata={
+                    'connection_pool_size': result.get('pool_size', 0),
+                    'pool_idle': result.get('pool_idle'),
+                    'pool_max': result.get('pool_max'),
+                    'pool_acquire_ms': acquire_ms,
+                    'query_ms': query_ms
+                }
             )
             
         except Exception as e:
@@ -312,38 +418,129 @@ class HealthChecker:
             )
     
     async def _check_exchange_api(self) -> ComponentHealth:
-        """Check exchange API connectivity"""
-        
-        # This should check actual exchange manager
-        # For now, returning mock healthy status
-        
+        """Check exchange APIs from rate limiter counters: REST error rate, headroom, bans"""
+        
+        status = HealthStatus.HEALTHY if self.exchanges else HealthStatus.DEGRADED
+        problems = [] if self.exchanges else ["No exchanges attached"]
+        metadata = {}
+
+        for name, exchange in self.exchanges.items():
+            probe = self._rest_probe(name, exchange)
+            metadata[name] = probe
+            if probe.get('blocked_for', 0) > 0:
+                status = _worst(status, HealthStatus.UNHEALTHY)
+                problems.append(f"{name} blocked for {probe['blocked_for']:.0f}s")
+            elif probe.get('error_rate', 0) > self.max_rest_error_rate:
+                status = _worst(status, HealthStatus.UNHEALTHY if probe['error_rate'] >= 0.5
+                                else HealthStatus.DEGRADED)
+                problems.append(f"{name} REST error rate {probe['error_rate']:.0%}")
+            elif probe.get('headroom', 1) < self.min_rate_limit_headroom:
+                status = _worst(status, HealthStatus.DEGRADED)
+                problems.append(f"{name} rate limit headroom {probe['headroom']:.0%}")
+
         return ComponentHealth(
             name="Exchange APIs",
             type=ComponentType.EXCHANGE_API,
-            status=HealthStatus.HEALTHY,
+            status=status,
             last_check=datetime.now(timezone.utc),
-            response_time_ms=50,
-            metadata={
-                'binance_status': 'connected'
-            }
+            response_time_ms=0,
+            error_message="; ".join(problems) or None,
+            metadata=metadata
         )
+
+    def _rest_probe(self, name: str, exchange) -> Dict[str, Any]:
+        """REST counters of one exchange since the previous check"""
+
+        limiter = getattr(getattr(exchange, 'rate_limiter', None), 'limiter', None)
+        if limiter is None:
+            return {'rate_limiter': None}
+
+        stats = limiter.get_stats()
+        total = stats['total_requests']
+        failed = stats['failed_requests']
+        prev_total, prev_failed = self._rest_counters.get(name, (0, 0))
+        self._rest_counters[name] = (total, failed)
+        requests = total - prev_total
+
+        return {
+            'requests': requests,
+            'errors': failed - prev_failed,
+            'error_rate': round((failed - prev_failed) / requests, 3) if requests > 0 else 0.0,
+            'rate_limited_total': stats['rate_limited_requests'],
+            'headroom': round(stats['current_tokens'] / limiter.max_weight, 3) if limiter.max_weight else 1.0,
+            'used_weight_1m': stats['used_weight_1m'],
+            'blocked_for': stats['blocked_for']
+        }
     
     async def _check_websocket(self) -> ComponentHealth:
-        """Check WebSocket connections"""
-        
-        # Should check actual WebSocket status
+        """Check WebSocket streams: connection state and last-message age per pool"""
+        
+        status = HealthStatus.HEALTHY if self.websockets else HealthStatus.DEGRADED
+        problems = [] if self.websockets else ["No streams attached"]
+        metadata = {}
+
+        for name, stream in self.websockets.items():
+            probe = self._stream_probe(name, stream)
+            metadata[name] = probe
+            connections = probe.get('connections', 0)
+            stale = probe.get('stale_connections', 0)
+            if not probe['connected']:
+                status = _worst(status, HealthStatus.UNHEALTHY)
+                problems.append(f"{name} disconnected")
+            elif connections and stale == connections:
+                status = _worst(status, HealthStatus.UNHEALTHY)
+                problems.append(f"{name}: all {connections} price streams silent")
+            elif stale:
+                status = _worst(status, HealthStatus.DEGRADED)
+                problems.append(f"{name}: {stale}/{connections} price streams silent "
+                                f"> {self.max_stream_silence_sec}s")
+            elif (probe.get('mark_age_sec') or 0) > self.max_stream_silence_sec:
+                status = _worst(status, HealthStatus.DEGRADED)
+                problems.append(f"{name}: no mark price for {probe['mark_age_sec']:.0f}s")
         
         return ComponentHealth(
             name="WebSocket Streams",
             type=ComponentType.WEBSOCKET,
-            status=HealthStatus.HEALTHY,
+            status=status,
             last_check=datetime.now(timezone.utc),
-            response_time_ms=10,
-            metadata={
-                'binance_ws': 'connected',
-                'message_rate': 100  # messages per second
-            }
+            response_time_ms=0,
+            error_message="; ".join(problems) or None,
+            metadata=metadata
         )
+
+    def _stream_probe(self, name: str, stream) -> Dict[str, Any]:
+        """Connection state, message ages and rate of one stream (in-process counters)"""
+
+        probe: Dict[str, Any] = {'connected': bool(getattr(stream, 'connected', False))}
+
+        pool = getattr(stream, 'mark_price_pool', None)
+        if pool is not None:
+            connections = pool.get_status().get('connections', [])
+            ages = [c['last_message_age_sec'] for c in connections
+                    if c.get('last_message_age_sec') is not None]
+            messages = sum(c.get('messages_received', 0) for c in connections)
+            now = time.monotonic()
+            previous = self._stream_counters.get(name)
+            self._stream_counters[name] = (now, messages)
+
+            probe['connections'] = len(connections)
+            probe['stale_connections'] = sum(
+                1 for c in connections
+                if (c.get('last_message_age_sec') or 0) > self.max_stream_silence_sec
+                or not c.get('connected', True)
+            )
+            probe['max_message_age_sec'] = max(ages) if ages else None
+            if previous and now > previous[0]:
+                probe['message_rate'] = round((messages - previous[1]) / (now - previous[0]), 2)
+
+        # Stream-level message times (event loop clock)
+        loop_now = asyncio.get_running_loop().time()
+        for attr, key in (('last_mark_message_time', 'mark_age_sec'), ('last_user_message_time', 'user_age_sec')):
+            last = getattr(stream, attr, None)
+            if isinstance(last, (int, float)) and last > 0:
+                probe[key] = round(loop_now - last, 1)
+
+        return probe
     
     async def _check_signal_processor(self) -> ComponentHealth:
         """
@@ -495,20 +692,26 @@ class HealthChecker:
         )
     
     async def _check_position_manager(self) -> ComponentHealth:
-        """Check position management system"""
+        """Check position management system (in-process positions when attached)"""
         
         try:
-            # Check active positions
-            positions = await self.repository.get_active_positions()
-            
+            if self.position_manager is None:
+                positions = await self.repository.get_active_positions()
+                unprotected = 0
+            else:
+                positions = list(self.position_manager.positions.values())
+                unprotected = sum(1 for p in positions if not getattr(p, 'has_stop_loss', True))
+
             return ComponentHealth(
                 name="Position Manager",
                 type=ComponentType.POSITION_MANAGER,
-                status=HealthStatus.HEALTHY,
+                status=HealthStatus.DEGRADED if unprotected else HealthStatus.HEALTHY,
                 last_check=datetime.now(timezone.utc),
-                response_time_ms=20,
+                response_time_ms=0,
+                error_message=f"{unprotected} positions without stop loss" if unprotected else None,
                 metadata={
                     'active_positions': len(positions),
+                    'without_stop_loss': unprotected,
                     'pending_orders': 0
                 }
             )
@@ -575,7 +778,7 @@ class HealthChecker:
             error_message = None
 
             # Check if TS count matches open positions
-            positions_count = len(await self.repository.get_open_positions())
+            positions_count = await self._open_positions_count()
 
             # Exclude lifecycle-managed positions (they use internal TS, not legacy SmartTrailingStop)
             lifecycle_count = 0
@@ -629,6 +832,16 @@ class HealthChecker:
                 error_message=str(e)
             )
 
+    async def _open_positions_count(self) -> int:
+        """Open positions: in-process count when attached, else a COUNT(*) (no row loads)"""
+
+        if self.position_manager is not None:
+            return len(self.position_manager.positions)
+        count = await self.repository.pool.fetchval(
+            "SELECT COUNT(*) FROM monitoring.positions WHERE status = 'active'"
+        )
+        return count or 0
+
     def _generate_alerts(self, components: List[ComponentHealth]) -> List[str]:
         """Generate alerts based on component health"""
         
@@ -699,26 +912,8 @@ class HealthChecker:
         self.recovery_actions[component_type] = action
     
     async def get_health_summary(self) -> Dict[str, Any]:
-        """Get current health summary"""
-        
-        if not self.system_health:
-            return {'status': 'unknown', 'message': 'No health check performed yet'}
-        
-        return {
-            'status': self.system_health.status.value,
-            'last_check': self.system_health.last_check.isoformat(),
-            'checks_passed': self.system_health.checks_passed,
-            'checks_failed': self.system_health.checks_failed,
-            'components': {
-                c.name: {
-                    'status': c.status.value,
-                    'response_time_ms': c.response_time_ms,
-                    'error': c.error_message
-                }
-                for c in self.system_health.components
-            },
-            'alerts': self.system_health.alerts
-        }
+        """Get current health summary (cached snapshot of the last check)"""
+        return self.get_snapshot()
     
     async def force_health_check(self) -> SystemHealth:
         """Force immediate health check"""
@@ -2,6 +2,7 @@
 Prometheus metrics collection and export for trading bot monitoring
 """
 
+import json
 import time
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone, timedelta
@@ -16,6 +17,7 @@ import asyncio
 from loguru import logger
 
 from database.repository import Repository
+from monitoring.metrics_state import WIN_RATE_WINDOWS, TradingMetricsState
 
 
 class MetricsCollector:
@@ -27,6 +29,12 @@ class MetricsCollector:
     - System health (latency, errors, uptime)
     - Exchange connectivity (API calls, WebSocket status)
     - Risk metrics (exposure, drawdown, violations)
+    
+    Trading and risk gauges come from a TradingMetricsState fed by router
+    events (attach()) and the account ledger (attach_account_ledger());
+    they are refreshed on every scrape in O(exchanges × timeframes). The
+    database is only read for a warm start and a periodic reconcile of the
+    open positions.
     """
     
     def __init__(self, 
@@ -41,12 +49,19 @@ class MetricsCollector:
         self.port = config.get('metrics_port', 8000)
         self.push_gateway = config.get('push_gateway_url')
         self.push_interval = config.get('push_interval', 60)
+        self.collect_interval = config.get('collect_interval', 10)
+        self.reconcile_interval = config.get('reconcile_interval', 300)
+        self.exchanges = list(config.get('exchanges', ['binance']))
+        
+        # Event-fed trading state (gauges read from it, not from the database)
+        self.state = TradingMetricsState()
         
         # Initialize metrics
         self._init_trading_metrics()
         self._init_system_metrics()
         self._init_exchange_metrics()
         self._init_risk_metrics()
+        self._init_latency_metrics()
         
         # Metrics server
         self.app = web.Application()
@@ -55,7 +70,16 @@ class MetricsCollector:
         
         # State tracking
         self.start_time = time.time()
+        self.health_checker = None  # HealthChecker whose snapshot /health serves
         self.last_push = datetime.now(timezone.utc)
+        self.last_reconcile: Optional[float] = None
+        self._collect_task: Optional[asyncio.Task] = None
+        
+        # Stats
+        self.collections = 0
+        self.db_queries = 0
+        self.last_collect_ms = 0.0
+        self.last_refresh_ms = 0.0
         
         logger.info(f"MetricsCollector initialized on port {self.port}")
     
@@ -333,23 +357,71 @@ class MetricsCollector:
             registry=self.registry
         )
     
+    def _init_latency_metrics(self):
+        """Initialize signal → protected position latency metrics (core.latency_trace)"""
+        
+        self.signal_stage_latency = Histogram(
+            'signal_stage_latency_ms',
+            'Signal pipeline stage latency in milliseconds',
+            ['stage'],
+            buckets=(0.05, 0.25, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+            registry=self.registry
+        )
+        
+        self.signal_to_protected = Histogram(
+            'signal_to_protected_latency_ms',
+            'Signal frame arrival to position open with stop loss confirmed, in milliseconds',
+            buckets=(50, 100, 250, 500, 1000, 2000, 3000, 5000, 10000, 30000),
+            registry=self.registry
+        )
+        
+        self.signal_traces = Counter(
+            'signal_traces_total',
+            'Traced signals by outcome',
+            ['outcome'],
+            registry=self.registry
+        )
+    
     def _setup_routes(self):
         """Setup HTTP routes for metrics endpoint"""
         
         async def metrics_handler(request):
             """Prometheus metrics endpoint"""
+            self._refresh_trading_gauges()
             metrics = generate_latest(self.registry)
-            return web.Response(text=metrics.decode('utf-8'), 
-                              content_type=CONTENT_TYPE_LATEST)
+            # CONTENT_TYPE_LATEST carries a charset, which content_type= rejects
+            return web.Response(body=metrics, headers={'Content-Type': CONTENT_TYPE_LATEST})
         
         async def health_handler(request):
-            """Health check endpoint"""
-            return web.json_response({'status': 'healthy', 
-                                    'uptime': time.time() - self.start_time})
+            """Health check endpoint (cached HealthChecker snapshot, no I/O)"""
+            if self.health_checker is None:
+                return web.json_response({'status': 'healthy',
+                                        'uptime': time.time() - self.start_time})
+            snapshot = self.health_checker.get_snapshot()
+            return web.json_response({**snapshot, 'uptime': time.time() - self.start_time},
+                                     status=503 if snapshot['status'] == 'critical' else 200,
+                                     dumps=lambda data: json.dumps(data, default=str))
         
         self.app.router.add_get('/metrics', metrics_handler)
         self.app.router.add_get('/health', health_handler)
     
+    def set_health_checker(self, health_checker):
+        """Serve the health checker's cached snapshot on /health"""
+        self.health_checker = health_checker
+
+    def attach(self, event_router):
+        """Maintain positions, trades and fills from router events"""
+        event_router.add_handler('position.opened', self._on_position_opened)
+        event_router.add_handler('position.update', self._on_position_update)
+        event_router.add_handler('position.closed', self._on_position_closed)
+        event_router.add_handler('order.update', self._on_order_update)
+    
+    def attach_account_ledger(self, exchange: str, ledger):
+        """Track the wallet balance (drawdown) from an AccountLedger"""
+        ledger.balance_listener = lambda balance: self.state.on_balance(exchange, balance)
+        if ledger.wallet_balance:
+            self.state.on_balance(exchange, ledger.wallet_balance)
+    
     async def start(self):
         """Start metrics server"""
         
@@ -365,8 +437,9 @@ class MetricsCollector:
             if self.push_gateway:
                 asyncio.create_task(self._push_metrics_loop())
             
-            # Start metric collection tasks
-            asyncio.create_task(self._collect_metrics_loop())
+            # Warm start of the win-rate windows, then the collection loop
+            await self._load_closed_trades()
+            self._collect_task = asyncio.create_task(self._collect_metrics_loop())
             
         except Exception as e:
             logger.error(f"Failed to start metrics server: {e}")
@@ -374,63 +447,111 @@ class MetricsCollector:
     async def stop(self):
         """Stop metrics server"""
         
+        if self._collect_task:
+            self._collect_task.cancel()
+            self._collect_task = None
         if self.runner:
             await self.runner.cleanup()
             logger.info("Metrics server stopped")
     
     async def _collect_metrics_loop(self):
-        """Periodically collect and update metrics"""
+        """Periodically refresh gauges; reconcile open positions with the database"""
         
         while True:
             try:
-                await asyncio.sleep(10)  # Collect every 10 seconds
-                
-                # Update uptime
-                self.uptime.set(time.time() - self.start_time)
-                
-                # Collect trading metrics
-                await self._collect_trading_metrics()
-                
-                # Collect system metrics
-                await self._collect_system_metrics()
-                
-                # Collect risk metrics
-                await self._collect_risk_metrics()
-                
+                await asyncio.sleep(self.collect_interval)
+                await self.collect()
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error collecting metrics: {e}")
                 self.errors.labels(component='metrics', severity='medium').inc()
     
-    async def _collect_trading_metrics(self):
-        """Collect current trading metrics from database"""
+    async def collect(self):
+        """One collection: uptime, trading gauges, system metrics, reconcile when due"""
+        
+        start = time.perf_counter()
+        self.uptime.set(time.time() - self.start_time)
+        
+        now = time.time()
+        if self.last_reconcile is None or now - self.last_reconcile >= self.reconcile_interval:
+            await self._reconcile_positions()
+            self.last_reconcile = now
+        
+        self._refresh_trading_gauges()
+        await self._collect_system_metrics()
+        
+        self.collections += 1
+        self.last_collect_ms = (time.perf_counter() - start) * 1000
+    
+    def _refresh_trading_gauges(self):
+        """Copy the event-fed state into the trading and risk gauges (no I/O)"""
+        
+        start = time.perf_counter()
+        state = self.state
+        for exchange in set(self.exchanges) | set(state.exchanges()):
+            self.active_positions.labels(exchange=exchange).set(state.active_positions(exchange))
+            self.unrealized_pnl.labels(exchange=exchange).set(state.unrealized_pnl(exchange))
+            self.total_exposure.labels(exchange=exchange).set(state.exposure(exchange))
+            self.daily_pnl.labels(exchange=exchange).set(state.daily_pnl(exchange))
+            self.current_drawdown.labels(exchange=exchange).set(state.drawdown(exchange))
+            for timeframe in WIN_RATE_WINDOWS:
+                self.win_rate.labels(exchange=exchange, timeframe=timeframe).set(
+                    state.win_rate(exchange, timeframe))
+        self.last_refresh_ms = (time.perf_counter() - start) * 1000
+    
+    async def _reconcile_positions(self):
+        """Replace the event-fed open positions with the database view"""
         
         try:
-            # Get active positions
-            positions = await self.repository.get_active_positions()
-            
-            for exchange in ['binance']:
-                exchange_positions = [p for p in positions if p.exchange == exchange]
-                self.active_positions.labels(exchange=exchange).set(len(exchange_positions))
-                
-                # Calculate unrealized PnL
-                total_unrealized = sum(p.unrealized_pnl or 0 for p in exchange_positions)
-                self.unrealized_pnl.labels(exchange=exchange).set(float(total_unrealized))
-            
-            # Get daily PnL
-            daily_stats = await self.repository.get_daily_stats(datetime.now(timezone.utc).date())
-            if daily_stats:
-                for exchange in ['binance']:
-                    daily_pnl = daily_stats.get(exchange, {}).get('pnl', 0)
-                    self.daily_pnl.labels(exchange=exchange).set(float(daily_pnl))
-            
-            # Calculate win rates
-            for timeframe in ['1h', '24h', '7d', '30d']:
-                win_rate = await self._calculate_win_rate(timeframe)
-                for exchange, rate in win_rate.items():
-                    self.win_rate.labels(exchange=exchange, timeframe=timeframe).set(rate)
-            
+            self.db_queries += 1
+            positions = await self.repository.get_open_positions()
+            corrections = self.state.reconcile(positions)
+            if corrections:
+                logger.info(f"Metrics reconcile corrected {corrections} open position(s)")
         except Exception as e:
-            logger.error(f"Error collecting trading metrics: {e}")
+            logger.error(f"Error reconciling position metrics: {e}")
+    
+    async def _load_closed_trades(self):
+        """Warm start: closed positions of the longest win-rate window, read once"""
+        
+        try:
+            since = datetime.now(timezone.utc) - timedelta(seconds=max(WIN_RATE_WINDOWS.values()))
+            self.db_queries += 1
+            closed = await self.repository.get_closed_positions_since(since)
+            loaded = self.state.load_closed_trades(closed)
+            logger.info(f"Metrics warm start: {loaded} closed trades")
+        except Exception as e:
+            logger.error(f"Error loading closed trades for metrics: {e}")
+    
+    async def _on_position_opened(self, data: Dict):
+        self.state.on_position_opened(data)
+        self.record_position_opened(data.get('exchange', 'binance'), data.get('symbol', ''),
+                                    data.get('side', ''))
+    
+    async def _on_position_update(self, data: Dict):
+        self.state.on_position_update(data)
+    
+    async def _on_position_closed(self, data: Dict):
+        self.state.on_position_closed(data)
+        pnl = float(data.get('realized_pnl') or 0)
+        self.record_position_closed(data.get('exchange', 'binance'), data.get('symbol', ''),
+                                    data.get('side', ''), pnl)
+    
+    async def _on_order_update(self, data: Dict):
+        if data.get('status') == 'FILLED':
+            self.record_order_filled(data.get('exchange', 'binance'), data.get('type', ''),
+                                     data.get('side', ''))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Collection cost and database usage"""
+        return {
+            'collections': self.collections,
+            'db_queries': self.db_queries,
+            'last_collect_ms': round(self.last_collect_ms, 3),
+            'last_refresh_ms': round(self.last_refresh_ms, 3),
+            'state': self.state.get_stats(),
+        }
     
     async def _collect_system_metrics(self):
         """Collect system resource metrics"""
@@ -454,85 +575,6 @@ class MetricsCollector:
         except Exception as e:
             logger.error(f"Error collecting system metrics: {e}")
     
-    async def _collect_risk_metrics(self):
-        """Collect risk management metrics"""
-        
-        try:
-            positions = await self.repository.get_active_positions()
-            
-            for exchange in ['binance']:
-                exchange_positions = [p for p in positions if p.exchange == exchange]
-                
-                # Calculate total exposure
-                total_exposure = sum(
-                    abs(p.size * p.entry_price) 
-                    for p in exchange_positions
-                )
-                self.total_exposure.labels(exchange=exchange).set(float(total_exposure))
-                
-                # Calculate current drawdown
-                drawdown = await self._calculate_drawdown(exchange)
-                self.current_drawdown.labels(exchange=exchange).set(drawdown)
-            
-        except Exception as e:
-            logger.error(f"Error collecting risk metrics: {e}")
-    
-    async def _calculate_win_rate(self, timeframe: str) -> Dict[str, float]:
-        """Calculate win rate for given timeframe"""
-        
-        try:
-            # Parse timeframe
-            if timeframe.endswith('h'):
-                hours = int(timeframe[:-1])
-                since = datetime.now(timezone.utc) - timedelta(hours=hours)
-            elif timeframe.endswith('d'):
-                days = int(timeframe[:-1])
-                since = datetime.now(timezone.utc) - timedelta(days=days)
-            else:
-                return {}
-            
-            # Get closed positions
-            closed = await self.repository.get_closed_positions_since(since)
-            
-            win_rates = {}
-            for exchange in ['binance']:
-                exchange_positions = [p for p in closed if p.exchange == exchange]
-                if exchange_positions:
-                    wins = sum(1 for p in exchange_positions if p.realized_pnl > 0)
-                    win_rates[exchange] = (wins / len(exchange_positions)) * 100
-                else:
-                    win_rates[exchange] = 0
-            
-            return win_rates
-            
-        except Exception as e:
-            logger.error(f"Error calculating win rate: {e}")
-            return {}
-    
-    async def _calculate_drawdown(self, exchange: str) -> float:
-        """Calculate current drawdown from peak"""
-        
-        try:
-            # Get account balance history
-            history = await self.repository.get_balance_history(exchange, days=30)
-            
-            if not history:
-                return 0
-            
-            # Find peak balance
-            peak = max(h.balance for h in history)
-            current = history[-1].balance
-            
-            if peak > 0:
-                drawdown = ((peak - current) / peak) * 100
-                return max(0, drawdown)
-            
-            return 0
-            
-        except Exception as e:
-            logger.error(f"Error calculating drawdown: {e}")
-            return 0
-    
     async def _push_metrics_loop(self):
         """Push metrics to Prometheus push gateway"""
         
@@ -609,6 +651,14 @@ class MetricsCollector:
         """Record WebSocket reconnection"""
         self.ws_reconnects.labels(exchange=exchange, stream=stream).inc()
     
+    def record_signal_trace(self, row: Dict[str, Any]):
+        """Record a signal latency breakdown (SignalTracer sink)"""
+        for stage, ms in row['stages'].items():
+            self.signal_stage_latency.labels(stage=stage).observe(ms)
+        if row.get('protected_ms') is not None:
+            self.signal_to_protected.observe(row['protected_ms'])
+        self.signal_traces.labels(outcome=row['outcome']).inc()
+    
     def update_price(self, exchange: str, symbol: str, price: float):
         """Update last price metric"""
         self.last_price.labels(exchange=exchange, symbol=symbol).set(price)
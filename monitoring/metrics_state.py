@@ -0,0 +1,338 @@
+"""
+Incremental trading state behind the MetricsCollector gauges
+
+The trading gauges used to be recomputed every collection from the database
+(active positions, closed positions per win-rate window, 30 days of balance
+history). This state is fed by in-process events instead, and every value is
+read in O(1):
+
+- open positions (position.opened / position.update / position.closed):
+  running count, exposure and unrealized PnL per exchange
+- closed trades: win-rate windows kept as time-bucketed counters with
+  running totals, realized PnL of the current UTC day
+- wallet balance (AccountLedger, fed by ACCOUNT_UPDATE): daily peaks for the
+  drawdown over the last DRAWDOWN_DAYS days
+
+reconcile() replaces the open positions from a database snapshot, fixing any
+drift left by missed events.
+"""
+
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.symbol_helpers import normalize_symbol
+
+WIN_RATE_WINDOWS = {'1h': 3600, '24h': 86400, '7d': 7 * 86400, '30d': 30 * 86400}
+WINDOW_BUCKETS = 60
+DRAWDOWN_DAYS = 30
+DAY_SEC = 86400
+DEFAULT_EXCHANGE = 'binance'
+
+
+def _field(item: Any, *names: str) -> Any:
+    """First non-None field among names of a dict or object"""
+    for name in names:
+        value = item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+        if value is not None:
+            return value
+    return None
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _timestamp(value: Any) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)      # Exchange events carry ms
+    return None
+
+
+class RollingCounter:
+    """
+    Trades and wins per key over a sliding window
+
+    Closes are counted in buckets of window / buckets seconds; running totals
+    are adjusted as buckets expire, so reads never scan the trade history.
+    The window edge is exact to one bucket.
+    """
+
+    def __init__(self, window_sec: float, buckets: int = WINDOW_BUCKETS):
+        self.window_sec = window_sec
+        self.buckets = buckets
+        self.bucket_sec = window_sec / buckets
+        self._buckets: deque = deque()                  # (bucket index, {key: [trades, wins]}), oldest first
+        self._totals: Dict[str, List[int]] = {}
+
+    def add(self, key: str, won: bool, ts: float) -> None:
+        counts = self._bucket(int(ts // self.bucket_sec))
+        if counts is None:
+            return
+        for entry in (counts.setdefault(key, [0, 0]), self._totals.setdefault(key, [0, 0])):
+            entry[0] += 1
+            entry[1] += int(won)
+
+    def _bucket(self, index: int) -> Optional[Dict[str, List[int]]]:
+        if not self._buckets or index > self._buckets[-1][0]:
+            self._buckets.append((index, {}))
+            return self._buckets[-1][1]
+        if index <= self._buckets[-1][0] - self.buckets:
+            return None                                 # Already outside the window
+
+        # Late close (warm start, delayed event): walk back from the newest bucket
+        for position in range(len(self._buckets) - 1, -1, -1):
+            bucket_index, counts = self._buckets[position]
+            if bucket_index == index:
+                return counts
+            if bucket_index < index:
+                self._buckets.insert(position + 1, (index, {}))
+                return self._buckets[position + 1][1]
+        self._buckets.appendleft((index, {}))
+        return self._buckets[0][1]
+
+    def expire(self, now: float) -> None:
+        oldest = int(now // self.bucket_sec) - self.buckets + 1
+        while self._buckets and self._buckets[0][0] < oldest:
+            _, counts = self._buckets.popleft()
+            for key, (trades, wins) in counts.items():
+                total = self._totals[key]
+                total[0] -= trades
+                total[1] -= wins
+                if total[0] <= 0:
+                    del self._totals[key]
+
+    def counts(self, key: str, now: float) -> Tuple[int, int]:
+        """(trades, wins) for key within the window ending at now"""
+        self.expire(now)
+        trades, wins = self._totals.get(key, (0, 0))
+        return trades, wins
+
+    def keys(self) -> List[str]:
+        return list(self._totals)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+@dataclass
+class _OpenPosition:
+    exchange: str
+    exposure: float
+    unrealized_pnl: float
+
+
+class TradingMetricsState:
+    """
+    Trading gauges maintained from in-process events
+
+    Usage:
+        state = TradingMetricsState()
+        state.on_position_opened({'symbol': 'BTCUSDT', 'quantity': 0.1, 'entry_price': 60000})
+        state.on_position_closed({'symbol': 'BTCUSDT', 'realized_pnl': 12.5})
+        state.win_rate('binance', '24h')
+    """
+
+    def __init__(self, clock: Optional[Callable[[], float]] = None):
+        self.clock = clock or (lambda: time.time())
+
+        self.positions: Dict[Tuple[str, str], _OpenPosition] = {}     # {(exchange, symbol): _OpenPosition}
+        self._active: Dict[str, int] = defaultdict(int)
+        self._exposure: Dict[str, float] = defaultdict(float)
+        self._unrealized: Dict[str, float] = defaultdict(float)
+
+        self.win_rates = {timeframe: RollingCounter(window) for timeframe, window in WIN_RATE_WINDOWS.items()}
+        self._daily_pnl: Dict[str, float] = defaultdict(float)
+        self._day = int(self.clock() // DAY_SEC)
+
+        self._balances: Dict[str, float] = {}
+        self._balance_peaks: Dict[str, deque] = defaultdict(deque)    # {exchange: deque[(day, max balance)]}
+
+        # Stats
+        self.events_applied = 0
+        self.trades_loaded = 0
+        self.reconciles = 0
+        self.reconcile_corrections = 0
+
+    # ==================== Open positions ====================
+
+    def _key(self, data: Any) -> Tuple[str, str]:
+        return (_field(data, 'exchange') or DEFAULT_EXCHANGE, normalize_symbol(_field(data, 'symbol') or ''))
+
+    def _set_position(self, key: Tuple[str, str], exposure: float, unrealized_pnl: float) -> None:
+        self._remove_position(key)
+        exchange = key[0]
+        self.positions[key] = _OpenPosition(exchange, exposure, unrealized_pnl)
+        self._active[exchange] += 1
+        self._exposure[exchange] += exposure
+        self._unrealized[exchange] += unrealized_pnl
+
+    def _remove_position(self, key: Tuple[str, str]) -> None:
+        position = self.positions.pop(key, None)
+        if position is None:
+            return
+        exchange = position.exchange
+        self._active[exchange] -= 1
+        if self._active[exchange] <= 0:
+            # Reset exactly instead of carrying float residue
+            self._active[exchange] = 0
+            self._exposure[exchange] = 0.0
+            self._unrealized[exchange] = 0.0
+        else:
+            self._exposure[exchange] -= position.exposure
+            self._unrealized[exchange] -= position.unrealized_pnl
+
+    def _apply_position(self, data: Any) -> None:
+        key = self._key(data)
+        quantity = _float(_field(data, 'quantity', 'size', 'contracts', 'amount'))
+        if quantity == 0:
+            self._remove_position(key)
+            return
+        entry_price = _float(_field(data, 'entry_price', 'entryPrice'))
+        previous = self.positions.get(key)
+        exposure = abs(quantity * entry_price) if entry_price else (previous.exposure if previous else 0.0)
+        self._set_position(key, exposure, _float(_field(data, 'unrealized_pnl', 'unrealizedPnl', 'pnl')))
+
+    def on_position_opened(self, data: Any) -> None:
+        self._apply_position(data)
+        self.events_applied += 1
+
+    def on_position_update(self, data: Any) -> None:
+        """Position snapshot from the stream; size 0 means the position is gone"""
+        if _field(data, 'quantity', 'size', 'contracts', 'amount') is None:
+            return
+        self._apply_position(data)
+        self.events_applied += 1
+
+    def on_position_closed(self, data: Any) -> None:
+        self._remove_position(self._key(data))
+        exchange = _field(data, 'exchange') or DEFAULT_EXCHANGE
+        closed_at = _timestamp(_field(data, 'closed_at', 'timestamp'))
+        self.record_trade(exchange, _float(_field(data, 'realized_pnl', 'pnl')), closed_at)
+        self.events_applied += 1
+
+    # ==================== Closed trades ====================
+
+    def record_trade(self, exchange: str, realized_pnl: float, closed_at: Optional[float] = None) -> None:
+        """Count a closed trade in every win-rate window and in today's PnL"""
+        now = self.clock()
+        closed_at = now if closed_at is None else closed_at
+        won = realized_pnl > 0
+        for counter in self.win_rates.values():
+            counter.add(exchange, won, closed_at)
+
+        self._roll_day(now)
+        if int(closed_at // DAY_SEC) == self._day:
+            self._daily_pnl[exchange] += realized_pnl
+
+    def load_closed_trades(self, trades: Iterable[Any]) -> int:
+        """Warm start from closed positions (exchange, realized_pnl, closed_at)"""
+        loaded = 0
+        for trade in trades:
+            closed_at = _timestamp(_field(trade, 'closed_at'))
+            if closed_at is None:
+                continue
+            self.record_trade(_field(trade, 'exchange') or DEFAULT_EXCHANGE,
+                              _float(_field(trade, 'realized_pnl', 'pnl')), closed_at)
+            loaded += 1
+        self.trades_loaded += loaded
+        return loaded
+
+    def _roll_day(self, now: float) -> None:
+        day = int(now // DAY_SEC)
+        if day != self._day:
+            self._day = day
+            self._daily_pnl.clear()
+
+    # ==================== Balance ====================
+
+    def on_balance(self, exchange: str, balance: float, ts: Optional[float] = None) -> None:
+        """Wallet balance sample (ACCOUNT_UPDATE / ledger reconcile)"""
+        day = int((self.clock() if ts is None else ts) // DAY_SEC)
+        peaks = self._balance_peaks[exchange]
+        if peaks and peaks[-1][0] == day:
+            peaks[-1] = (day, max(peaks[-1][1], balance))
+        else:
+            peaks.append((day, balance))
+        self._balances[exchange] = balance
+        self.events_applied += 1
+
+    # ==================== Reconcile ====================
+
+    def reconcile(self, positions: Iterable[Any]) -> int:
+        """
+        Replace the open positions with a snapshot (database rows or objects).
+
+        Returns:
+            Number of positions that were missing or stale in the event-fed state
+        """
+        before = set(self.positions)
+        self.positions.clear()
+        self._active.clear()
+        self._exposure.clear()
+        self._unrealized.clear()
+        for position in positions:
+            self._apply_position(position)
+
+        corrections = len(before ^ set(self.positions))
+        self.reconciles += 1
+        self.reconcile_corrections += corrections
+        return corrections
+
+    # ==================== Reads (O(1)) ====================
+
+    def exchanges(self) -> List[str]:
+        return sorted(set(self._active) | set(self.win_rates['30d'].keys()) | set(self._daily_pnl)
+                      | set(self._balances))
+
+    def active_positions(self, exchange: str) -> int:
+        return self._active.get(exchange, 0)
+
+    def exposure(self, exchange: str) -> float:
+        return self._exposure.get(exchange, 0.0)
+
+    def unrealized_pnl(self, exchange: str) -> float:
+        return self._unrealized.get(exchange, 0.0)
+
+    def daily_pnl(self, exchange: str) -> float:
+        self._roll_day(self.clock())
+        return self._daily_pnl.get(exchange, 0.0)
+
+    def win_rate(self, exchange: str, timeframe: str) -> float:
+        """Percentage of profitable trades in the window (0 without trades)"""
+        trades, wins = self.win_rates[timeframe].counts(exchange, self.clock())
+        return wins / trades * 100 if trades else 0.0
+
+    def trade_count(self, exchange: str, timeframe: str) -> int:
+        return self.win_rates[timeframe].counts(exchange, self.clock())[0]
+
+    def drawdown(self, exchange: str) -> float:
+        """Current drawdown from the peak balance of the last DRAWDOWN_DAYS days, in percent"""
+        peaks = self._balance_peaks.get(exchange)
+        if not peaks:
+            return 0.0
+        oldest = int(self.clock() // DAY_SEC) - DRAWDOWN_DAYS + 1
+        while len(peaks) > 1 and peaks[0][0] < oldest:
+            peaks.popleft()
+        peak = max(balance for _, balance in peaks)
+        if peak <= 0:
+            return 0.0
+        return max(0.0, (peak - self._balances[exchange]) / peak * 100)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'open_positions': len(self.positions),
+            'exchanges': self.exchanges(),
+            'events_applied': self.events_applied,
+            'trades_loaded': self.trades_loaded,
+            'reconciles': self.reconciles,
+            'reconcile_corrections': self.reconcile_corrections,
+            'win_rate_buckets': {timeframe: len(counter) for timeframe, counter in self.win_rates.items()},
+        }
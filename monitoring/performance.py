@@ -3,7 +3,7 @@ Performance tracking and analytics for trading bot
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime, timezone, timedelta, date
 from decimal import Decimal
 from dataclasses import dataclass, field
@@ -595,11 +595,12 @@ class PerformanceTracker:
             }
         }
     
-    def record_trade(self, position: Position):
-        """Record completed trade for session tracking"""
+    def record_trade(self, position: Union[Position, Dict]):
+        """Record completed trade for session tracking (Position or position.closed event data)"""
         
-        if position.realized_pnl:
-            self.session_pnl += Decimal(str(position.realized_pnl))
+        realized_pnl = position.get('realized_pnl') if isinstance(position, dict) else position.realized_pnl
+        if realized_pnl:
+            self.session_pnl += Decimal(str(realized_pnl))
             self.session_trades += 1
     
     async def export_performance_report(self, filepath: str):
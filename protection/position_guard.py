@@ -3,7 +3,9 @@ Position Guard - Real-time position protection and monitoring system
 """
 
 import asyncio
-from typing import Dict, Any, Optional, List, Set
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Any, Optional, List, Set, Tuple
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
 from enum import Enum
@@ -19,6 +21,7 @@ from database.models import Position, Alert, RiskEvent
 from database.repository import Repository
 from websocket.event_router import EventRouter
 from utils.decorators import async_retry
+from utils.symbol_helpers import normalize_symbol
 
 
 class RiskLevel(Enum):
@@ -59,6 +62,61 @@ class PositionHealth:
     alerts: List[str] = field(default_factory=list)
 
 
+class SymbolVolatilityStore:
+    """
+    Rolling per-symbol volatility built from streamed prices
+
+    Prices are bucketed into bars of bar_sec (last price is the close); the
+    score is the std of close-to-close returns over the last `window` bars,
+    annualized to a day like the previous 5m OHLCV calculation. Shared by
+    every position on the symbol.
+    """
+
+    def __init__(self, bar_sec: float = 300, window: int = 20,
+                 clock: Optional[Callable[[], float]] = None):
+        self.bar_sec = bar_sec
+        self.window = window
+        self.clock = clock or (lambda: time.time())
+        self._closes: Dict[str, Deque[float]] = {}
+        self._bar: Dict[str, int] = {}
+
+    def update(self, symbol: str, price: float):
+        """Record a price; replaces the close of the current bar"""
+        key = normalize_symbol(symbol)
+        bar = int(self.clock() // self.bar_sec)
+        closes = self._closes.get(key)
+        if closes is None:
+            closes = self._closes[key] = deque(maxlen=self.window)
+        if closes and self._bar.get(key) == bar:
+            closes[-1] = float(price)
+        else:
+            closes.append(float(price))
+            self._bar[key] = bar
+
+    def seed(self, symbol: str, closes: List[float]):
+        """Start a symbol from historical closes (last one is the current bar)"""
+        key = normalize_symbol(symbol)
+        self._closes[key] = deque((float(c) for c in closes), maxlen=self.window)
+        self._bar[key] = int(self.clock() // self.bar_sec)
+
+    def volatility(self, symbol: str) -> Optional[float]:
+        """Volatility in percent, None until two bars are known"""
+        closes = self._closes.get(normalize_symbol(symbol))
+        if not closes or len(closes) < 2:
+            return None
+        values = np.fromiter(closes, dtype=float)
+        returns = np.diff(values) / values[:-1]
+        return float(np.std(returns) * np.sqrt(86400 / self.bar_sec) * 100)
+
+    def discard(self, symbol: str):
+        key = normalize_symbol(symbol)
+        self._closes.pop(key, None)
+        self._bar.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._closes)
+
+
 class PositionGuard:
     """
     Advanced position protection system that monitors and protects positions in real-time
@@ -69,6 +127,12 @@ class PositionGuard:
     - Dynamic protection adjustments
     - Emergency exit mechanisms
     - Correlation-based risk analysis
+
+    All positions are guarded by one scheduler task (see run_guard_pass):
+    prices come from the stream (price_source / price_update events), the
+    volatility store is shared per symbol and order-book liquidity is
+    fetched at most once per symbol per liquidity_ttl_sec. REST is only
+    used as a fallback for symbols without a streamed price.
     """
     
     def __init__(self,
@@ -78,7 +142,9 @@ class PositionGuard:
                  trailing_stop_manager: TrailingStopManager,
                  repository: Repository,
                  event_router: EventRouter,
-                 config: Dict[str, Any]):
+                 config: Dict[str, Any],
+                 price_source: Optional[Callable[[str], Any]] = None,
+                 clock: Optional[Callable[[], float]] = None):
         
         self.exchange_manager = exchange_manager
         self.risk_manager = risk_manager
@@ -94,6 +160,12 @@ class PositionGuard:
         self.time_limit_hours = config.get('max_position_hours', 48)
         self.volatility_threshold = config.get('volatility_threshold', 2.0)
         self.correlation_threshold = config.get('correlation_threshold', 0.7)
+
+        # Scheduler settings
+        self.check_interval = config.get('check_interval_sec', 5)
+        self.health_interval = config.get('health_interval_sec', 60)
+        self.liquidity_ttl = config.get('liquidity_ttl_sec', 60)
+        self.daily_change_ttl = config.get('daily_change_ttl_sec', self.health_interval)
         
         # Health score weights
         self.health_weights = {
@@ -110,6 +182,34 @@ class PositionGuard:
         self.position_peaks: Dict[str, Decimal] = {}  # Track highest values
         self.emergency_mode: bool = False
         self.frozen_positions: Set[str] = set()
+
+        # Shared per-symbol market data (keys are normalized symbols)
+        self.clock = clock or (lambda: time.time())
+        self.price_source = price_source
+        self.mark_prices: Dict[str, Decimal] = {}
+        self.daily_changes: Dict[str, float] = {}
+        self._daily_change_at: Dict[str, float] = {}           # symbol -> when daily_changes was set
+        self.volatility_store = SymbolVolatilityStore(
+            bar_sec=config.get('volatility_bar_sec', 300),
+            window=config.get('volatility_window', 20),
+            clock=self.clock
+        )
+        self._liquidity: Dict[str, Tuple[float, float]] = {}  # symbol -> (score, fetched_at)
+        self._volatility_seeded: Set[str] = set()
+        self._guard_task: Optional[asyncio.Task] = None
+        self._last_health_pass: Optional[float] = None
+
+        self.guard_stats = {
+            'passes': 0,
+            'health_passes': 0,
+            'positions_scored': 0,
+            'rest_calls': 0,
+            'rest_calls_saved': 0,
+            'last_pass_ms': 0.0,
+            'max_pass_ms': 0.0,
+            'last_health_pass_ms': 0.0,
+            'total_pass_ms': 0.0,
+        }
         
         # Performance tracking
         self.protection_stats = {
@@ -173,8 +273,8 @@ class PositionGuard:
             # Setup initial protection
             await self._setup_initial_protection(position, health)
             
-            # Start monitoring loop
-            asyncio.create_task(self._monitor_position_loop(position_id))
+            # Guarded by the shared scheduler from the next pass
+            self.start()
             
             logger.info(f"Started protection for position {position_id} "
                        f"(Health: {health.health_score:.1f}, Risk: {health.risk_level.value})")
@@ -183,47 +283,191 @@ class PositionGuard:
             logger.error(f"Failed to start position protection: {e}")
             await self._emergency_protection(position)
     
-    async def _monitor_position_loop(self, position_id: str):
-        """Continuous monitoring loop for a position"""
-        
-        check_interval = 5  # seconds
-        last_health_check = datetime.now(timezone.utc)
-        
-        while position_id in self.monitored_positions:
+    def start(self):
+        """Start the guard scheduler (no-op if running); it exits when nothing is monitored"""
+        if self._guard_task is None or self._guard_task.done():
+            self._guard_task = asyncio.create_task(self._guard_loop())
+
+    async def stop(self):
+        """Stop the guard scheduler"""
+        task, self._guard_task = self._guard_task, None
+        if task and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _guard_loop(self):
+        """Single monitoring loop for all positions"""
+
+        while self.monitored_positions:
             try:
-                await asyncio.sleep(check_interval)
-                
-                position = self.monitored_positions[position_id]
-                
-                # Get current market data
-                ticker = await self.exchange_manager.fetch_ticker(position.symbol)
-                current_price = Decimal(str(ticker['last']))
-                
-                # Update position peak
-                if position.side == 'long':
-                    if current_price > self.position_peaks[position_id]:
-                        self.position_peaks[position_id] = current_price
-                else:
-                    if current_price < self.position_peaks[position_id]:
-                        self.position_peaks[position_id] = current_price
-                
-                # Perform health check every minute
-                if (datetime.now(timezone.utc) - last_health_check).seconds >= 60:
-                    health = await self._calculate_position_health(position, current_price)
-                    self.position_health[position_id] = health
-                    last_health_check = datetime.now(timezone.utc)
-                    
-                    # Take protection actions based on health
-                    await self._execute_protection_actions(position, health)
-                
-                # Quick checks for critical conditions
-                await self._check_critical_conditions(position, current_price)
-                
+                await asyncio.sleep(self.check_interval)
+                await self.run_guard_pass()
+
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in position monitor loop: {e}")
-                await asyncio.sleep(check_interval * 2)
+                logger.error(f"Error in position guard loop: {e}")
+                await asyncio.sleep(self.check_interval * 2)
+
+    async def run_guard_pass(self):
+        """
+        One pass over all monitored positions
+
+        Reads one price per symbol, updates peaks, runs the batched health
+        pass when health_interval has elapsed and checks critical conditions.
+        REST calls saved are counted against the previous per-position loop
+        (2 tickers per position per check, plus OHLCV + order book per
+        position per health check).
+        """
+        started = time.perf_counter()
+        rest_before = self.guard_stats['rest_calls']
+        positions = list(self.monitored_positions.items())
+        legacy_calls = 2 * len(positions)
+
+        prices: Dict[str, Decimal] = {}
+        for symbol in {position.symbol for _, position in positions}:
+            price = await self._current_price(symbol)
+            if price is not None:
+                prices[symbol] = price
+                self.volatility_store.update(symbol, float(price))
+
+        for position_id, position in positions:
+            price = prices.get(position.symbol)
+            if price is not None:
+                self._update_peak(position_id, position.side, price)
+
+        now = self.clock()
+        if self._last_health_pass is None or now - self._last_health_pass >= self.health_interval:
+            self._last_health_pass = now
+            legacy_calls += 2 * len(positions)
+            await self._health_pass(positions, prices)
+
+        for position_id, position in positions:
+            price = prices.get(position.symbol)
+            if price is None or position_id not in self.monitored_positions:
+                continue
+            await self._check_critical_conditions(
+                position, price,
+                daily_change=self._fresh_daily_change(position.symbol)
+            )
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = self.guard_stats
+        stats['passes'] += 1
+        stats['rest_calls_saved'] += max(0, legacy_calls - (stats['rest_calls'] - rest_before))
+        stats['last_pass_ms'] = elapsed_ms
+        stats['max_pass_ms'] = max(stats['max_pass_ms'], elapsed_ms)
+        stats['total_pass_ms'] += elapsed_ms
+
+    async def _health_pass(self, positions: List[Tuple[str, Position]], prices: Dict[str, Decimal]):
+        """Refresh stale per-symbol market data once, then score every position"""
+
+        started = time.perf_counter()
+        symbols = {position.symbol for _, position in positions if position.symbol in prices}
+        refresh = [self._calculate_liquidity_score(symbol)
+                   for symbol in symbols if not self._liquidity_fresh(symbol)]
+        refresh += [self._calculate_volatility_score(symbol)
+                    for symbol in symbols if self._needs_volatility_seed(symbol)]
+        if refresh:
+            await asyncio.gather(*refresh)
+
+        to_act = []
+        for position_id, position in positions:
+            price = prices.get(position.symbol)
+            if price is None:
+                continue
+            health = self._score_position_health(
+                position, price,
+                self._volatility(position.symbol),
+                self._liquidity.get(normalize_symbol(position.symbol), (50, 0))[0]
+            )
+            self.position_health[position_id] = health
+            if any(a != ProtectionAction.MONITOR for a in health.recommended_actions):
+                to_act.append((position, health))
+
+        self.guard_stats['health_passes'] += 1
+        self.guard_stats['positions_scored'] += len(positions)
+        self.guard_stats['last_health_pass_ms'] = (time.perf_counter() - started) * 1000
+
+        # Take protection actions based on health
+        if to_act:
+            await asyncio.gather(*(self._execute_protection_actions(p, h) for p, h in to_act))
+
+    async def _current_price(self, symbol: str) -> Optional[Decimal]:
+        """Streamed mark price; REST ticker only if the stream has none"""
+
+        key = normalize_symbol(symbol)
+        price = self.price_source(key) if self.price_source else self.mark_prices.get(key)
+        if price:
+            return Decimal(str(price))
+
+        try:
+            self.guard_stats['rest_calls'] += 1
+            ticker = await self.exchange_manager.fetch_ticker(symbol)
+            if ticker.get('percentage') is not None:
+                self._record_daily_change(key, ticker['percentage'])
+            return Decimal(str(ticker['last']))
+        except Exception as e:
+            logger.error(f"Failed to get price for {symbol}: {e}")
+            return None
+
+    def _update_peak(self, position_id: Any, side: str, price: Decimal):
+        if position_id not in self.position_peaks:
+            position_id = str(position_id)    # start_protection keys peaks by str(id)
+        peak = self.position_peaks.get(position_id)
+        if peak is None:
+            return
+        if side == 'long':
+            if price > peak:
+                self.position_peaks[position_id] = price
+        elif price < peak:
+            self.position_peaks[position_id] = price
+
+    def _record_daily_change(self, symbol: str, percentage: float):
+        key = normalize_symbol(symbol)
+        self.daily_changes[key] = float(percentage)
+        self._daily_change_at[key] = self.clock()
+
+    def _fresh_daily_change(self, symbol: str) -> Optional[float]:
+        """Streamed or cached 24h change, None if missing or older than daily_change_ttl"""
+        key = normalize_symbol(symbol)
+        fetched_at = self._daily_change_at.get(key)
+        if fetched_at is None or self.clock() - fetched_at >= self.daily_change_ttl:
+            return None
+        return self.daily_changes.get(key)
+
+    async def _fetch_daily_change(self, symbol: str) -> float:
+        """24h change from the ticker, at most once per symbol per daily_change_ttl"""
+        daily_change = self._fresh_daily_change(symbol)
+        if daily_change is None:
+            self.guard_stats['rest_calls'] += 1
+            ticker = await self.exchange_manager.fetch_ticker(symbol)
+            daily_change = float(ticker.get('percentage') or 0)
+            self._record_daily_change(symbol, daily_change)
+        return daily_change
+
+    def _liquidity_fresh(self, symbol: str) -> bool:
+        cached = self._liquidity.get(normalize_symbol(symbol))
+        return cached is not None and self.clock() - cached[1] < self.liquidity_ttl
+
+    def _needs_volatility_seed(self, symbol: str) -> bool:
+        key = normalize_symbol(symbol)
+        return key not in self._volatility_seeded and self.volatility_store.volatility(key) is None
+
+    def _volatility(self, symbol: str) -> float:
+        volatility = self.volatility_store.volatility(symbol)
+        return 1.0 if volatility is None else volatility
+
+    def get_guard_stats(self) -> Dict[str, Any]:
+        """Scheduler statistics: passes, REST calls made / saved, pass duration"""
+
+        stats = dict(self.guard_stats)
+        total = stats.pop('total_pass_ms')
+        stats['avg_pass_ms'] = round(total / stats['passes'], 3) if stats['passes'] else 0.0
+        stats['symbols'] = len({normalize_symbol(p.symbol) for p in self.monitored_positions.values()})
+        stats['volatility_symbols'] = len(self.volatility_store)
+        stats['liquidity_symbols'] = len(self._liquidity)
+        return stats
     
     async def _calculate_position_health(self, 
                                         position: Position,
@@ -233,9 +477,33 @@ class PositionGuard:
         try:
             # Get current price if not provided
             if current_price is None:
+                self.guard_stats['rest_calls'] += 1
                 ticker = await self.exchange_manager.fetch_ticker(position.symbol)
                 current_price = Decimal(str(ticker['last']))
-            
+
+            # Shared per-symbol market data, fetched only if missing / stale
+            if self._needs_volatility_seed(position.symbol):
+                await self._calculate_volatility_score(position.symbol)
+            if not self._liquidity_fresh(position.symbol):
+                await self._calculate_liquidity_score(position.symbol)
+            liquidity_score = self._liquidity.get(normalize_symbol(position.symbol), (50, 0))[0]
+
+            return self._score_position_health(
+                position, current_price, self._volatility(position.symbol), liquidity_score
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to calculate position health: {e}")
+            return self._failed_health(position)
+
+    def _score_position_health(self,
+                               position: Position,
+                               current_price: Decimal,
+                               volatility_score: float,
+                               liquidity_score: float) -> PositionHealth:
+        """Score position health from price and per-symbol market data (no I/O)"""
+
+        try:
             entry_price = Decimal(str(position.entry_price))
             position_size = Decimal(str(position.quantity))
             
@@ -260,12 +528,6 @@ class PositionGuard:
             time_in_position = datetime.now(timezone.utc) - position.opened_at
             time_score = self._calculate_time_score(time_in_position)
             
-            # Calculate volatility score
-            volatility_score = await self._calculate_volatility_score(position.symbol)
-            
-            # Calculate liquidity score
-            liquidity_score = await self._calculate_liquidity_score(position.symbol)
-            
             # Calculate health scores for each component
             scores = {
                 'pnl': self._score_pnl(pnl_pct),
@@ -308,22 +570,26 @@ class PositionGuard:
             
         except Exception as e:
             logger.error(f"Failed to calculate position health: {e}")
-            # Return critical health on error
-            return PositionHealth(
-                position_id=position.id,
-                symbol=position.symbol,
-                health_score=0,
-                risk_level=RiskLevel.CRITICAL,
-                unrealized_pnl=Decimal('0'),
-                pnl_percentage=Decimal('0'),
-                time_in_position=timedelta(),
-                volatility_score=0,
-                liquidity_score=0,
-                drawdown=Decimal('0'),
-                max_drawdown=self.max_drawdown_pct,
-                recommended_actions=[ProtectionAction.EMERGENCY_EXIT],
-                alerts=["Health check failed - emergency mode"]
-            )
+            return self._failed_health(position)
+
+    def _failed_health(self, position: Position) -> PositionHealth:
+        """Critical health returned when a health check fails"""
+
+        return PositionHealth(
+            position_id=position.id,
+            symbol=position.symbol,
+            health_score=0,
+            risk_level=RiskLevel.CRITICAL,
+            unrealized_pnl=Decimal('0'),
+            pnl_percentage=Decimal('0'),
+            time_in_position=timedelta(),
+            volatility_score=0,
+            liquidity_score=0,
+            drawdown=Decimal('0'),
+            max_drawdown=self.max_drawdown_pct,
+            recommended_actions=[ProtectionAction.EMERGENCY_EXIT],
+            alerts=["Health check failed - emergency mode"]
+        )
     
     def _score_pnl(self, pnl_pct: Decimal) -> float:
         """Score PnL component (0-100)"""
@@ -391,7 +657,9 @@ class PositionGuard:
         """Calculate current volatility score"""
         
         try:
-            # Get recent candles
+            # Seed the shared store once per symbol; streamed prices extend it
+            self._volatility_seeded.add(normalize_symbol(symbol))
+            self.guard_stats['rest_calls'] += 1
             candles = await self.exchange_manager.fetch_ohlcv(
                 symbol, timeframe='5m', limit=20
             )
@@ -399,24 +667,23 @@ class PositionGuard:
             if len(candles) < 2:
                 return 1.0
             
-            # Calculate returns
-            closes = [c[4] for c in candles]
-            returns = [(closes[i] - closes[i-1]) / closes[i-1] 
-                      for i in range(1, len(closes))]
-            
-            # Calculate volatility (standard deviation of returns)
-            volatility = np.std(returns) * np.sqrt(288)  # Annualized for 5m bars
-            
-            return volatility * 100  # Convert to percentage
+            self.volatility_store.seed(symbol, [c[4] for c in candles])
+            return self._volatility(symbol)
             
         except Exception as e:
             logger.error(f"Failed to calculate volatility: {e}")
             return 1.0
     
     async def _calculate_liquidity_score(self, symbol: str) -> float:
-        """Calculate liquidity score based on order book"""
-        
+        """Calculate liquidity score based on order book (cached per symbol for liquidity_ttl)"""
+
+        score = await self._fetch_liquidity_score(symbol)
+        self._liquidity[normalize_symbol(symbol)] = (score, self.clock())
+        return score
+
+    async def _fetch_liquidity_score(self, symbol: str) -> float:
         try:
+            self.guard_stats['rest_calls'] += 1
             orderbook = await self.exchange_manager.fetch_order_book(symbol, limit=20)
             
             # Calculate bid-ask spread
@@ -579,8 +846,14 @@ class PositionGuard:
         except Exception as e:
             logger.error(f"Failed to execute protection actions: {e}")
     
-    async def _check_critical_conditions(self, position: Position, current_price: Decimal):
-        """Quick check for critical conditions requiring immediate action"""
+    async def _check_critical_conditions(self, position: Position, current_price: Decimal,
+                                         daily_change: Optional[float] = None):
+        """
+        Quick check for critical conditions requiring immediate action
+
+        daily_change: streamed 24h change in percent; fetched from the ticker
+            (cached per symbol for daily_change_ttl) if None
+        """
         
         try:
             entry_price = Decimal(str(position.entry_price))
@@ -598,8 +871,9 @@ class PositionGuard:
                 return
             
             # Check for unusual price movement
-            ticker = await self.exchange_manager.fetch_ticker(position.symbol)
-            daily_change = abs(ticker.get('percentage', 0))
+            if daily_change is None:
+                daily_change = await self._fetch_daily_change(position.symbol)
+            daily_change = abs(daily_change or 0)
             
             if daily_change > 10:  # 10% daily move
                 logger.warning(f"Unusual price movement on {position.symbol}: {daily_change:.2f}%")
@@ -793,7 +1067,8 @@ class PositionGuard:
                 }
                 for pid, health in self.position_health.items()
             },
-            'protection_stats': self.protection_stats
+            'protection_stats': self.protection_stats,
+            'guard': self.get_guard_stats()
         }
     
     # WebSocket Event Handlers
@@ -813,16 +1088,20 @@ class PositionGuard:
         
         symbol = data.get('symbol')
         price = Decimal(str(data.get('price', 0)))
+        if not symbol or price <= 0:
+            return
+
+        # Shared per-symbol state read by the guard scheduler
+        key = normalize_symbol(symbol)
+        self.mark_prices[key] = price
+        self.volatility_store.update(key, float(price))
+        if data.get('percentage') is not None:
+            self._record_daily_change(key, data['percentage'])
         
         # Update peaks for positions with this symbol
         for position_id, position in self.monitored_positions.items():
-            if position.symbol == symbol:
-                if position.side == 'long':
-                    if price > self.position_peaks[position_id]:
-                        self.position_peaks[position_id] = price
-                else:
-                    if price < self.position_peaks[position_id]:
-                        self.position_peaks[position_id] = price
+            if normalize_symbol(position.symbol) == key:
+                self._update_peak(position_id, position.side, price)
     
     async def _handle_order_filled(self, data: Dict[str, Any]):
         """Handle order fill event"""
@@ -10,6 +10,7 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from enum import Enum
 import asyncio
+import time
 from decimal import Decimal
 from core.event_logger import get_event_logger, EventType
 
@@ -25,6 +26,9 @@ TRAILING_MIN_PEAK_SAVE_INTERVAL_SEC = 10    # Min 10s between peak saves
 TRAILING_MIN_PEAK_CHANGE_PERCENT = 0.2      # Save if peak changed > 0.2%
 TRAILING_EMERGENCY_PEAK_CHANGE = 1.0        # Always save if peak changed > 1.0%
 
+# Float fast path: relative margin on cached thresholds (float rounding vs Decimal)
+QUIET_LIMIT_MARGIN = 1e-9
+
 
 class TrailingStopState(Enum):
     """Trailing stop states"""
@@ -99,6 +103,10 @@ class TrailingStopInstance:
     activation_percent: Decimal = Decimal('0')  # Saved from position on creation
     callback_percent: Decimal = Decimal('0')    # Saved from position on creation
 
+    # Float fast path: ticks below (long) / above (short) this price change nothing.
+    # Recomputed after every locked update; None forces the locked path.
+    quiet_limit: Optional[float] = None
+
 
 class SmartTrailingStopManager:
     """
@@ -129,9 +137,18 @@ class SmartTrailingStopManager:
         # Active trailing stops
         self.trailing_stops: Dict[str, TrailingStopInstance] = {}
 
-        # Lock for thread safety
+        # Lock for thread safety (trailing_stops dict: create / remove)
         self.lock = asyncio.Lock()
 
+        # Per-symbol locks for price updates (symbols don't queue behind each other)
+        self.symbol_locks: Dict[str, asyncio.Lock] = {}
+
+        # update_price metrics
+        self.fast_path_ticks = 0
+        self.locked_ticks = 0
+        self.lock_wait_total_sec = 0.0
+        self.lock_wait_max_sec = 0.0
+
         # Per-symbol locks for SL updates
         self.sl_update_locks = {}
 
@@ -716,80 +733,139 @@ class SmartTrailingStopManager:
         Update price and check trailing stop logic
         Called from WebSocket on every price update
 
+        Ticks that cannot change anything (no new peak, no breakeven, no
+        activation) are rejected by a lock-free float compare against
+        ts.quiet_limit; all others run under the symbol's lock.
+
         Returns:
             Dict with action if stop needs update, None otherwise
         """
-        if symbol not in self.trailing_stops:
+        ts = self.trailing_stops.get(symbol)
+        if ts is None:
             # Position closed or not tracked - silent skip (prevents log spam)
             return None
 
-        async with self.lock:
-            ts = self.trailing_stops[symbol]
-            old_price = ts.current_price
-            ts.current_price = price
+        limit = ts.quiet_limit
+        if limit is not None:
+            price_f = float(price)
+            if (price_f < limit) if ts.side == 'long' else (price_f > limit):
+                ts.current_price = price
+                self.fast_path_ticks += 1
+                return None
 
-            # Update highest/lowest
-            peak_updated = False
-            if ts.side == 'long':
-                if ts.current_price > ts.highest_price:
-                    old_highest = ts.highest_price
-                    ts.highest_price = ts.current_price
-                    peak_updated = True
-                    logger.debug(f"[TS] {symbol} highest_price updated: {old_highest} → {ts.highest_price}")
+        # Ticks arriving while this one is in progress take the locked path too
+        ts.quiet_limit = None
+        lock = self.symbol_locks.get(symbol)
+        if lock is None:
+            lock = self.symbol_locks[symbol] = asyncio.Lock()
+
+        wait_start = time.perf_counter()
+        async with lock:
+            waited = time.perf_counter() - wait_start
+            self.lock_wait_total_sec += waited
+            self.lock_wait_max_sec = max(self.lock_wait_max_sec, waited)
+            self.locked_ticks += 1
+
+            ts = self.trailing_stops.get(symbol)
+            if ts is None:
+                return None  # Closed while waiting
+            try:
+                return await self._update_price_locked(ts, price)
+            finally:
+                ts.quiet_limit = self._quiet_limit(ts)
+
+    def _quiet_limit(self, ts: TrailingStopInstance) -> Optional[float]:
+        """
+        Price bound for the fast path: below it (long) / above it (short) a
+        tick makes no new peak or highest profit and, before activation,
+        triggers neither breakeven nor activation.
+        """
+        if ts.entry_price <= 0:
+            return None
+
+        entry = float(ts.entry_price)
+        sign = 1 if ts.side == 'long' else -1
+        peak = ts.highest_price if ts.side == 'long' else ts.lowest_price
+        bounds = [float(peak), entry * (1 + sign * float(ts.highest_profit_percent) / 100)]
+
+        if ts.state in (TrailingStopState.INACTIVE, TrailingStopState.WAITING):
+            if ts.activation_price is not None:
+                bounds.append(float(ts.activation_price))
+            if self.config.breakeven_at and not ts.current_stop_price:
+                bounds.append(entry * (1 + sign * float(self.config.breakeven_at) / 100))
+
+        if ts.side == 'long':
+            return min(bounds) * (1 - QUIET_LIMIT_MARGIN)
+        return max(bounds) * (1 + QUIET_LIMIT_MARGIN)
+
+    async def _update_price_locked(self, ts: TrailingStopInstance, price: Decimal) -> Optional[Dict]:
+        """Peak / profit tracking and state machine for one tick (symbol lock held)"""
+        symbol = ts.symbol
+        old_price = ts.current_price
+        ts.current_price = price
+
+        # Update highest/lowest
+        peak_updated = False
+        if ts.side == 'long':
+            if ts.current_price > ts.highest_price:
+                old_highest = ts.highest_price
+                ts.highest_price = ts.current_price
+                peak_updated = True
+                logger.debug(f"[TS] {symbol} highest_price updated: {old_highest} → {ts.highest_price}")
+        else:
+            if ts.current_price < ts.lowest_price:
+                old_lowest = ts.lowest_price
+                ts.lowest_price = ts.current_price
+                peak_updated = True
+                logger.debug(f"[TS] {symbol} lowest_price updated: {old_lowest} → {ts.lowest_price}")
+
+        # CRITICAL FIX: Calculate profit_percent BEFORE using it in logging
+        profit_percent = self._calculate_profit_percent(ts)
+        if profit_percent > ts.highest_profit_percent:
+            ts.highest_profit_percent = profit_percent
+
+        # NEW: Save peak to database if needed (only for ACTIVE TS)
+        if peak_updated and ts.state == TrailingStopState.ACTIVE:
+            current_peak = ts.highest_price if ts.side == 'long' else ts.lowest_price
+            should_save, skip_reason = self._should_save_peak(ts, current_peak)
+
+            if should_save:
+                # Update tracking fields BEFORE saving
+                ts.last_peak_save_time = datetime.now(timezone.utc)
+                ts.last_saved_peak_price = current_peak
+
+                # Save to database
+                await self._save_state(ts)
+
+                # trailing_stop.py:465 - изменить с debug на info
+                logger.info(  # было: logger.debug
+                    f"[TS] {symbol} @ {ts.current_price:.4f} | "
+                    f"profit: {profit_percent:.2f}% | "
+                    f"activation: {ts.activation_price:.4f} | "
+                    f"state: {ts.state.name}"
+                )
             else:
-                if ts.current_price < ts.lowest_price:
-                    old_lowest = ts.lowest_price
-                    ts.lowest_price = ts.current_price
-                    peak_updated = True
-                    logger.debug(f"[TS] {symbol} lowest_price updated: {old_lowest} → {ts.lowest_price}")
-
-            # CRITICAL FIX: Calculate profit_percent BEFORE using it in logging
-            profit_percent = self._calculate_profit_percent(ts)
-            if profit_percent > ts.highest_profit_percent:
-                ts.highest_profit_percent = profit_percent
-
-            # NEW: Save peak to database if needed (only for ACTIVE TS)
-            if peak_updated and ts.state == TrailingStopState.ACTIVE:
-                current_peak = ts.highest_price if ts.side == 'long' else ts.lowest_price
-                should_save, skip_reason = self._should_save_peak(ts, current_peak)
-
-                if should_save:
-                    # Update tracking fields BEFORE saving
-                    ts.last_peak_save_time = datetime.now(timezone.utc)
-                    ts.last_saved_peak_price = current_peak
-
-                    # Save to database
-                    await self._save_state(ts)
-
-                    # trailing_stop.py:465 - изменить с debug на info
-                    logger.info(  # было: logger.debug
-                        f"[TS] {symbol} @ {ts.current_price:.4f} | "
-                        f"profit: {profit_percent:.2f}% | "
-                        f"activation: {ts.activation_price:.4f} | "
-                        f"state: {ts.state.name}"
-                    )
-                else:
-                    logger.debug(f"⏭️  {symbol}: Peak save SKIPPED - {skip_reason}")
+                logger.debug(f"⏭️  {symbol}: Peak save SKIPPED - {skip_reason}")
 
-            # Log current state
-            logger.debug(
-                f"[TS] {symbol} @ {ts.current_price:.4f} | "
-                f"profit: {profit_percent:.2f}% | "
-                f"activation: {ts.activation_price:.4f} | "
-                f"state: {ts.state.name}"
-            )
+        # Log current state
+        logger.debug(
+            f"[TS] {symbol} @ {ts.current_price:.4f} | "
+            f"profit: {profit_percent:.2f}% | "
+            f"activation: {ts.activation_price:.4f} | "
+            f"state: {ts.state.name}"
+        )
 
-            # State machine
-            if ts.state == TrailingStopState.INACTIVE:
-                return await self._check_activation(ts)
+        # State machine
+        if ts.state == TrailingStopState.INACTIVE:
+            return await self._check_activation(ts)
 
-            elif ts.state == TrailingStopState.WAITING:
-                return await self._check_activation(ts)
+        elif ts.state == TrailingStopState.WAITING:
+            return await self._check_activation(ts)
 
-            elif ts.state == TrailingStopState.ACTIVE:
-                return await self._update_trailing_stop(ts)
+        elif ts.state == TrailingStopState.ACTIVE:
+            return await self._update_trailing_stop(ts)
 
-            return None
+        return None
 
     async def _check_activation(self, ts: TrailingStopInstance) -> Optional[Dict]:
         """Check if trailing stop should be activated"""
@@ -1753,72 +1829,78 @@ class SmartTrailingStopManager:
                 logger.info(f"✅ {symbol}: Cleaned orphaned TS state from database on position close")
             return
 
-        async with self.lock:
-            ts = self.trailing_stops[symbol]
+        # Let an in-flight price update for this symbol finish first
+        symbol_lock = self.symbol_locks.setdefault(symbol, asyncio.Lock())
+        async with symbol_lock:
+            if symbol not in self.trailing_stops:
+                return
+            async with self.lock:
+                ts = self.trailing_stops[symbol]
 
-            # FIX B5-1: Check state BEFORE overwriting to TRIGGERED
-            was_active = ts.state == TrailingStopState.ACTIVE
-            ts.state = TrailingStopState.TRIGGERED
+                # FIX B5-1: Check state BEFORE overwriting to TRIGGERED
+                was_active = ts.state == TrailingStopState.ACTIVE
+                ts.state = TrailingStopState.TRIGGERED
 
-            # Update statistics
-            if was_active:
-                self.stats['total_triggered'] += 1
+                # Update statistics
+                if was_active:
+                    self.stats['total_triggered'] += 1
 
-                if realized_pnl:
-                    profit_percent = (realized_pnl / (ts.entry_price * ts.quantity)) * Decimal('100')
+                    if realized_pnl:
+                        profit_percent = (realized_pnl / (ts.entry_price * ts.quantity)) * Decimal('100')
 
-                    # Update average
-                    current_avg = Decimal(str(self.stats['average_profit_on_trigger']))
-                    total = Decimal(str(self.stats['total_triggered']))
-                    self.stats['average_profit_on_trigger'] = (
-                            (current_avg * (total - Decimal('1')) + profit_percent) / total
-                    )
+                        # Update average
+                        current_avg = Decimal(str(self.stats['average_profit_on_trigger']))
+                        total = Decimal(str(self.stats['total_triggered']))
+                        self.stats['average_profit_on_trigger'] = (
+                                (current_avg * (total - Decimal('1')) + profit_percent) / total
+                        )
 
-                    best_profit = Decimal(str(self.stats['best_profit']))
-                    if profit_percent > best_profit:
-                        self.stats['best_profit'] = profit_percent
+                        best_profit = Decimal(str(self.stats['best_profit']))
+                        if profit_percent > best_profit:
+                            self.stats['best_profit'] = profit_percent
 
-            # Log trailing stop removal
-            event_logger = get_event_logger()
-            if event_logger:
-                await event_logger.log_event(
-                    EventType.TRAILING_STOP_REMOVED,
-                    {
-                        'symbol': symbol,
-                        'reason': 'position_closed',
-                        'state': ts.state.value,
-                        'was_active': ts.state == TrailingStopState.ACTIVE,
-                        'realized_pnl': float(realized_pnl) if realized_pnl else None,
-                        'update_count': ts.update_count,
-                        'final_stop_price': float(ts.current_stop_price) if ts.current_stop_price else None
-                    },
-                    symbol=symbol,
-                    exchange=self.exchange_name,
-                    severity='INFO'
-                )
+                # Log trailing stop removal
+                event_logger = get_event_logger()
+                if event_logger:
+                    await event_logger.log_event(
+                        EventType.TRAILING_STOP_REMOVED,
+                        {
+                            'symbol': symbol,
+                            'reason': 'position_closed',
+                            'state': ts.state.value,
+                            'was_active': ts.state == TrailingStopState.ACTIVE,
+                            'realized_pnl': float(realized_pnl) if realized_pnl else None,
+                            'update_count': ts.update_count,
+                            'final_stop_price': float(ts.current_stop_price) if ts.current_stop_price else None
+                        },
+                        symbol=symbol,
+                        exchange=self.exchange_name,
+                        severity='INFO'
+                    )
 
-            # Remove from active stops
-            del self.trailing_stops[symbol]
+                # Remove from active stops
+                del self.trailing_stops[symbol]
 
-            # ============================================================
-            # FIX #3: VERIFY TS STATE DELETED FROM DATABASE
-            # ============================================================
-            # Delete state from database and verify success
-            delete_success = await self._delete_state(symbol)
+                # ============================================================
+                # FIX #3: VERIFY TS STATE DELETED FROM DATABASE
+                # ============================================================
+                # Delete state from database and verify success
+                delete_success = await self._delete_state(symbol)
 
-            if delete_success:
-                logger.info(
-                    f"✅ {symbol}: Position closed, TS removed from memory AND database - "
-                    f"side={ts.side}, entry={ts.entry_price}, updates={ts.update_count}"
-                )
-            else:
-                logger.error(
-                    f"⚠️ {symbol}: Position closed, TS removed from memory BUT database deletion FAILED - "
-                    f"side={ts.side}, entry={ts.entry_price} (may leave stale state in DB)"
-                )
-            # ============================================================
-            # END FIX #3
-            # ============================================================
+                if delete_success:
+                    logger.info(
+                        f"✅ {symbol}: Position closed, TS removed from memory AND database - "
+                        f"side={ts.side}, entry={ts.entry_price}, updates={ts.update_count}"
+                    )
+                else:
+                    logger.error(
+                        f"⚠️ {symbol}: Position closed, TS removed from memory BUT database deletion FAILED - "
+                        f"side={ts.side}, entry={ts.entry_price} (may leave stale state in DB)"
+                    )
+                # ============================================================
+                # END FIX #3
+                # ============================================================
+        self.symbol_locks.pop(symbol, None)
 
     # ============================================================
     # FIX #4: TS-POSITION CONSISTENCY CHECK
@@ -2019,7 +2101,14 @@ class SmartTrailingStopManager:
                 symbol: self.get_status(symbol)
                 for symbol in self.trailing_stops
             },
-            'statistics': self.stats
+            'statistics': self.stats,
+            'update_price': {
+                'fast_path_ticks': self.fast_path_ticks,
+                'locked_ticks': self.locked_ticks,
+                'lock_wait_total_ms': round(self.lock_wait_total_sec * 1000, 3),
+                'lock_wait_avg_ms': round(self.lock_wait_total_sec * 1000 / self.locked_ticks, 3) if self.locked_ticks else 0.0,
+                'lock_wait_max_ms': round(self.lock_wait_max_sec * 1000, 3),
+            }
         }
 # Alias for compatibility
 TrailingStopManager = SmartTrailingStopManager
@@ -0,0 +1,205 @@
+"""
+Benchmark: AggTradesPerSymbolPool delta queries and trade ingest at 10k trades per symbol
+
+Compares the previous full-deque rescans over TradeData (reproduced below
+as the "before" reference) with the per-second bucket lookups in
+SymbolDeltaState, and checks both give the same answers on a tape
+whose trades sit in the middle of each second and a clock pinned to a
+whole second (where 1-second buckets and the old sliding buckets agree).
+
+Run:
+    pytest tests/performance/test_aggtrades_delta_benchmark.py -s -m performance
+"""
+
+import random
+import time
+from collections import deque
+from decimal import Decimal
+
+import pytest
+from unittest.mock import patch
+
+from websocket.aggtrades_per_symbol_pool import (
+    AggTradesPerSymbolPool,
+    SymbolDeltaState,
+    TradeData,
+)
+
+TRADES_PER_SYMBOL = 10_000
+TRADES_PER_SECOND = 50
+
+
+# ══════════════════════════════════════════════════════
+# "Before": linear rescans of the trade deque
+# ══════════════════════════════════════════════════════
+
+def scan_rolling_delta(trades: deque, now: float, window_sec: int) -> Decimal:
+    cutoff = now - window_sec
+    buy_volume = Decimal('0')
+    sell_volume = Decimal('0')
+    for trade in trades:
+        if trade.timestamp >= cutoff:
+            if trade.side == 'buy':
+                buy_volume += trade.volume_usdt
+            else:
+                sell_volume += trade.volume_usdt
+    return buy_volume - sell_volume
+
+
+def scan_avg_delta(trades: deque, now: float, samples: int) -> Decimal:
+    bucket_deltas = []
+    for i in range(samples):
+        bucket_start = now - (i + 1)
+        bucket_end = now - i
+        bucket_buy = Decimal('0')
+        bucket_sell = Decimal('0')
+        for trade in trades:
+            if bucket_start <= trade.timestamp < bucket_end:
+                if trade.side == 'buy':
+                    bucket_buy += trade.volume_usdt
+                else:
+                    bucket_sell += trade.volume_usdt
+        bucket_deltas.append(abs(bucket_buy - bucket_sell))
+    return sum(bucket_deltas) / len(bucket_deltas)
+
+
+def scan_large_trade_counts(trades: deque, now: float, window_sec: int):
+    cutoff = now - window_sec
+    large_buys = 0
+    large_sells = 0
+    for trade in trades:
+        if trade.timestamp >= cutoff and trade.volume_usdt >= AggTradesPerSymbolPool.LARGE_TRADE_THRESHOLD:
+            if trade.side == 'buy':
+                large_buys += 1
+            else:
+                large_sells += 1
+    return (large_buys, large_sells)
+
+
+# ══════════════════════════════════════════════════════
+# Helpers
+# ══════════════════════════════════════════════════════
+
+def build_tape(now: float) -> list:
+    """10k trades on a whole-second grid ending at `now`, all mid-second."""
+    rng = random.Random(42)
+    end_sec = int(now)
+    start_sec = end_sec - TRADES_PER_SYMBOL // TRADES_PER_SECOND
+    return [
+        TradeData(
+            timestamp=start_sec + i // TRADES_PER_SECOND + 0.5,
+            price=Decimal(str(round(rng.uniform(99.0, 101.0), 2))),
+            quantity=Decimal(str(rng.choice([0.5, 2.0, 150.0]))),
+            is_buyer_maker=rng.random() < 0.5,
+        )
+        for i in range(TRADES_PER_SYMBOL)
+    ]
+
+
+def build_pool(tape: list, precision: str = 'decimal') -> AggTradesPerSymbolPool:
+    pool = AggTradesPerSymbolPool(testnet=False, precision=precision)
+    pool.delta_states['BTCUSDT'] = SymbolDeltaState(trades=tape, precision=precision)
+    return pool
+
+
+def build_payloads(tape: list) -> list:
+    """aggTrade messages as delivered by the stream (post JSON parse)."""
+    return [
+        {'e': 'aggTrade', 's': 'BTCUSDT', 'p': str(t.price), 'q': str(t.quantity),
+         'T': int(t.timestamp * 1000), 'm': t.is_buyer_maker}
+        for t in tape
+    ]
+
+
+def time_calls(fn, calls: int) -> float:
+    """Mean per-call latency in microseconds."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+# ══════════════════════════════════════════════════════
+# Benchmark
+# ══════════════════════════════════════════════════════
+
+@pytest.mark.performance
+class TestDeltaQueryBenchmark:
+    @pytest.mark.asyncio
+    async def test_bucket_lookups_match_scan_and_are_faster(self):
+        # Pin the pool's wall clock to a whole second
+        now = float(int(time.time()) + 1)
+        tape = build_tape(now)
+        with patch('websocket.aggtrades_per_symbol_pool.time.time', new=lambda: now):
+            self._run(build_pool(tape), deque(tape, maxlen=TRADES_PER_SYMBOL), now)
+
+    def _run(self, pool, trades, now):
+        # Parity
+        assert pool.get_rolling_delta('BTCUSDT', 20) == scan_rolling_delta(trades, now, 20)
+        assert pool.get_avg_delta('BTCUSDT', 100) == scan_avg_delta(trades, now, 100)
+        assert pool.get_large_trade_counts('BTCUSDT', 60) == scan_large_trade_counts(trades, now, 60)
+
+        results = {
+            'get_rolling_delta(20)': (
+                time_calls(lambda: scan_rolling_delta(trades, now, 20), 20),
+                time_calls(lambda: pool.get_rolling_delta('BTCUSDT', 20), 20_000),
+            ),
+            'get_avg_delta(100)': (
+                time_calls(lambda: scan_avg_delta(trades, now, 100), 2),
+                time_calls(lambda: pool.get_avg_delta('BTCUSDT', 100), 20_000),
+            ),
+            'get_large_trade_counts(60)': (
+                time_calls(lambda: scan_large_trade_counts(trades, now, 60), 20),
+                time_calls(lambda: pool.get_large_trade_counts('BTCUSDT', 60), 20_000),
+            ),
+        }
+
+        print(f"\n{'query':<28} {'before (µs)':>14} {'after (µs)':>12} {'speedup':>10}")
+        for name, (before, after) in results.items():
+            print(f"{name:<28} {before:>14.1f} {after:>12.2f} {before / after:>9.0f}x")
+
+        for before, after in results.values():
+            assert after < before
+
+
+@pytest.mark.performance
+class TestTradeIngestBenchmark:
+    def test_bucket_ingest_per_trade(self):
+        tape = build_tape(1_700_000_000.0)
+        payloads = build_payloads(tape)
+
+        def ingest_dataclass():
+            trades = deque(maxlen=TRADES_PER_SYMBOL)
+            for data in payloads:
+                trades.append(TradeData(
+                    timestamp=data['T'] / 1000,
+                    price=Decimal(str(data['p'])),
+                    quantity=Decimal(str(data['q'])),
+                    is_buyer_maker=data['m'],
+                ))
+            return trades
+
+        def ingest_buckets(precision):
+            state = SymbolDeltaState(precision=precision)
+            for data in payloads:
+                state.add_trade(data['T'] / 1000, data['p'], data['q'], data['m'])
+            return state
+
+        per_trade = {
+            'TradeData + deque': time_calls(ingest_dataclass, 3) / len(payloads),
+            'buckets (decimal)': time_calls(lambda: ingest_buckets('decimal'), 3) / len(payloads),
+            'buckets (float)': time_calls(lambda: ingest_buckets('float'), 3) / len(payloads),
+        }
+        decimal_state = ingest_buckets('decimal')
+        float_state = ingest_buckets('float')
+
+        print(f"\n{'ingest path':<22} {'µs/trade':>10}")
+        for name, micros in per_trade.items():
+            print(f"{name:<22} {micros:>10.2f}")
+        print(f"memory per symbol: decimal={decimal_state.memory_bytes() / 1024:.0f} KiB, "
+              f"float={float_state.memory_bytes() / 1024:.0f} KiB")
+
+        # Both precisions agree on the signal the trailing stop reads
+        assert abs(
+            float(decimal_state.delta_since(0)) - float_state.delta_since(0)
+        ) < 1e-6 * max(1.0, abs(float_state.delta_since(0)))
@@ -0,0 +1,114 @@
+"""
+Benchmark: _compute_strength_score over 4000 bars
+
+Fills aggregators with the same 4000-bar random walk and times
+SignalLifecycleManager._compute_strength_score (rolling delta, large
+trades, RSI, volume z-score, extremes, momentum) against:
+
+- scan:     BarAggregator with bars appended directly (full rescans)
+- deque:    BarAggregator fed via add_historical_bar (streaming state)
+- columnar: ColumnarBarAggregator (NumPy rings + streaming state)
+
+All must produce the same score.
+
+Run:
+    pytest tests/performance/test_bar_aggregator_benchmark.py -s -m performance
+"""
+
+import logging
+import random
+import time
+
+import pytest
+
+from core.bar_aggregator import BarAggregator, OneSecondBar
+from core.columnar_bar_aggregator import ColumnarBarAggregator
+from core.composite_strategy import StrategyParams, DerivedConstants
+from core.signal_lifecycle import SignalLifecycle, SignalLifecycleManager, SignalState
+
+BAR_COUNT = 4000
+
+
+def build_bars(n: int) -> list:
+    rng = random.Random(42)
+    price = 100.0
+    bars = []
+    for i in range(n):
+        price = max(1.0, price * (1 + rng.gauss(0, 0.0005)))
+        bars.append(OneSecondBar(
+            ts=1_700_000_000 + i,
+            price=price,
+            delta=rng.gauss(0, 2000),
+            large_buy_count=rng.randint(0, 1),
+            large_sell_count=rng.randint(0, 1),
+        ))
+    return bars
+
+
+def build_lifecycle(agg: BarAggregator) -> SignalLifecycle:
+    strategy = StrategyParams(sl_pct=3.0, leverage=10, max_position_hours=6, delta_window=60)
+    lc = SignalLifecycle(
+        signal_id=1,
+        symbol='TESTUSDT',
+        exchange='binance',
+        strategy=strategy,
+        derived=DerivedConstants.from_params(strategy),
+        state=SignalState.IN_POSITION,
+        in_position=True,
+        entry_price=100.0,
+        max_price=100.0,
+    )
+    lc.bar_aggregator = agg
+    return lc
+
+
+def time_calls(fn, calls: int) -> float:
+    """Mean per-call latency in microseconds."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+@pytest.mark.performance
+class TestStrengthScoreBenchmark:
+    def test_streaming_matches_scan_and_is_faster(self):
+        mgr = SignalLifecycleManager.__new__(SignalLifecycleManager)
+        bars = build_bars(BAR_COUNT)
+
+        scan = BarAggregator('TESTUSDT', max_bars=BAR_COUNT)
+        for bar in bars:
+            scan.bars.append(bar)
+            scan.cumsum_delta.append(scan.cumsum_delta[-1] + bar.delta)
+            scan.cumsum_abs_delta.append(scan.cumsum_abs_delta[-1] + abs(bar.delta))
+            scan.cumsum_trade_count.append(scan.cumsum_trade_count[-1] + 1)
+
+        lifecycles = {'scan': build_lifecycle(scan)}
+        for name, cls in (('deque', BarAggregator), ('columnar', ColumnarBarAggregator)):
+            agg = cls('TESTUSDT', max_bars=BAR_COUNT)
+            for bar in bars:
+                agg.add_historical_bar(bar)
+            lifecycles[name] = build_lifecycle(agg)
+
+        last_bar = bars[-1]
+        lc_logger = logging.getLogger('core.signal_lifecycle')
+        previous_level = lc_logger.level
+        lc_logger.setLevel(logging.WARNING)
+        try:
+            scores = {name: mgr._compute_strength_score(lc, last_bar) for name, lc in lifecycles.items()}
+            results = {
+                name: time_calls(lambda lc=lc: mgr._compute_strength_score(lc, last_bar), 200)
+                for name, lc in lifecycles.items()
+            }
+        finally:
+            lc_logger.setLevel(previous_level)
+
+        assert scores['deque'] == scores['scan']
+        assert scores['columnar'] == scores['scan']
+
+        print(f"\n{'storage':<10} {'µs/call':>10} {'speedup':>10}")
+        for name, us in results.items():
+            print(f"{name:<10} {us:>10.1f} {results['scan'] / us:>9.1f}x")
+
+        assert results['deque'] < results['scan']
+        assert results['columnar'] < results['scan']
@@ -0,0 +1,117 @@
+"""
+Benchmark: CompositeStrategy matching with a 1,000-rule synthetic strategy file
+
+500 score bands of width 10 (0..5000), each with a filtered rule (rsi / vol /
+oi minimums) and an unfiltered fallback, priorities shuffled. 20,000 signals
+with random scores and features are matched the way the bot does it: once in
+WebSocketSignalProcessor and once more in SignalLifecycleManager.
+
+- linear:   walk all rules by priority, on both calls (previous behaviour)
+- compiled: score index lookup, the second call served from the signal cache
+
+Also reports the time to reload (parse + validate + compile) the file.
+
+Run:
+    pytest tests/performance/test_composite_strategy_benchmark.py -s -m performance
+"""
+
+import json
+import logging
+import random
+import time
+
+import pytest
+
+from core.composite_strategy import CompositeStrategy, signal_features
+
+BANDS = 500
+SIGNALS = 20_000
+
+
+class LinearStrategy(CompositeStrategy):
+    """Previous behaviour: linear first-match over all rules."""
+
+    def match_signal(self, score, rsi=0.0, vol_zscore=0.0, oi_delta=0.0):
+        for rule in self.rules:
+            f = rule.filter
+            if not (f.score_min <= score < f.score_max):
+                continue
+            if rsi < f.rsi_min or vol_zscore < f.vol_min or oi_delta < f.oi_min:
+                continue
+            return rule.strategy
+        return None
+
+
+def write_synthetic_strategy(path):
+    rng = random.Random(3)
+    priorities = list(range(1, 2 * BANDS + 1))
+    rng.shuffle(priorities)
+    rules = []
+    for band in range(BANDS):
+        lo = band * 10
+        for filtered in (True, False):
+            rules.append({
+                'priority': priorities.pop(),
+                'score_range': f"{lo}-{lo + 10}",
+                'filter': {'score_min': lo, 'score_max': lo + 10,
+                           'rsi_min': 50 if filtered else 0,
+                           'vol_min': 2.0 if filtered else 0,
+                           'oi_min': 1.0 if filtered else 0},
+                'strategy': {'leverage': rng.randint(3, 20), 'sl_pct': rng.choice([3, 5, 10])},
+            })
+    path.write_text(json.dumps({'version': 'bench', 'rules': rules}))
+    return len(rules)
+
+
+def build_signals():
+    rng = random.Random(5)
+    return [{
+        'symbol': f'S{i % 300}USDT',
+        'total_score': rng.uniform(0, 5200),
+        'rsi': rng.uniform(0, 100),
+        'volume_zscore': rng.uniform(0, 4),
+        'oi_delta_pct': rng.uniform(-2, 3),
+    } for i in range(SIGNALS)]
+
+
+@pytest.mark.performance
+def test_match_throughput(tmp_path):
+    logging.getLogger('core.composite_strategy').setLevel(logging.WARNING)
+    path = tmp_path / 'composite_strategy.json'
+    assert write_synthetic_strategy(path) == 2 * BANDS
+
+    linear = LinearStrategy(path)
+    compiled = CompositeStrategy(path)
+    signals = build_signals()
+
+    start = time.perf_counter()
+    linear_results = []
+    for signal in signals:
+        features = signal_features(signal)
+        linear.match_signal(*features)                            # Processor
+        linear_results.append(linear.match_signal(*features))    # Lifecycle manager
+    linear_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled_results = []
+    for signal in signals:
+        compiled.match_signal_dict(signal)
+        rule = compiled.match_signal_dict(signal)
+        compiled_results.append(rule.strategy if rule else None)
+    compiled_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled.reload(force=True)
+    reload_ms = (time.perf_counter() - start) * 1e3
+
+    assert [p and (p.leverage, p.sl_pct) for p in linear_results] == \
+        [p and (p.leverage, p.sl_pct) for p in compiled_results]
+
+    stats = compiled.get_stats()
+    print(f"\n{stats['rules_count']} rules, {SIGNALS} signals x 2 matches:")
+    print(f"  linear   {linear_sec / SIGNALS * 1e6:8.2f} µs/signal")
+    print(f"  compiled {compiled_sec / SIGNALS * 1e6:8.2f} µs/signal "
+          f"({stats['score_intervals']} score intervals, {stats['match_cache_hits']} cache hits)")
+    print(f"  reload   {reload_ms:8.2f} ms")
+
+    assert compiled_sec * 10 < linear_sec
@@ -0,0 +1,126 @@
+"""
+Benchmark: EventRouter throughput with 500 symbols and one slow handler
+
+Every symbol emits UPDATES_PER_SYMBOL position.update events, interleaved and
+yielding to the loop between frames as the user stream does. Two subscribers:
+a fast in-memory handler and a deliberately slow one (SLOW_HANDLER_SEC await,
+like a DB write).
+
+- global: previous router, one queue drained strictly in order — every event
+          waits for the slow handler of all events before it
+- lanes:  per-symbol lanes, ordered within a symbol, parallel across symbols
+
+The global router is measured on the first GLOBAL_EVENTS events only (it
+would take EVENTS × SLOW_HANDLER_SEC in total). Reports events/s, dispatch
+latency and checks per-symbol order.
+
+Run:
+    pytest tests/performance/test_event_router_benchmark.py -s -m performance
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+import pytest
+
+from websocket.event_router import EventRouter
+
+SYMBOLS = 500
+UPDATES_PER_SYMBOL = 4
+EVENTS = SYMBOLS * UPDATES_PER_SYMBOL
+SLOW_HANDLER_SEC = 0.002
+GLOBAL_EVENTS = 300
+
+
+class GlobalQueueRouter:
+    """Previous behaviour: one queue, each event's handlers gathered before the next."""
+
+    def __init__(self):
+        self._handlers = defaultdict(list)
+        self._queue = asyncio.Queue()
+        self._processing = False
+        self._task = None
+
+    def add_handler(self, event_name, handler):
+        self._handlers[event_name].append(handler)
+
+    async def emit(self, event_name, data):
+        await self._queue.put((event_name, data))
+        if not self._processing:
+            self._task = asyncio.create_task(self._process_events())
+
+    async def _process_events(self):
+        self._processing = True
+        try:
+            while not self._queue.empty():
+                event_name, data = await self._queue.get()
+                await asyncio.gather(*(h(data) for h in self._handlers.get(event_name, [])),
+                                     return_exceptions=True)
+        finally:
+            self._processing = False
+
+    async def join(self):
+        while self._processing or not self._queue.empty():
+            await asyncio.sleep(0.001)
+
+
+def events():
+    for n in range(UPDATES_PER_SYMBOL):
+        for i in range(SYMBOLS):
+            yield {'symbol': f"S{i}USDT", 'n': n}
+
+
+async def run(router, limit):
+    seen = defaultdict(list)
+    latencies = []
+
+    async def fast(data):
+        seen[data['symbol']].append(data['n'])
+        latencies.append(time.perf_counter() - data['emitted'])
+
+    async def slow(data):
+        await asyncio.sleep(SLOW_HANDLER_SEC)
+
+    router.add_handler('position.update', fast)
+    router.add_handler('position.update', slow)
+
+    start = time.perf_counter()
+    for k, data in enumerate(events()):
+        if k == limit:
+            break
+        data['emitted'] = time.perf_counter()
+        await router.emit('position.update', data)
+        await asyncio.sleep(0)          # Stream reader yields between frames
+    await router.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'events': len(latencies),
+        'events_per_sec': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'max_ms': latencies[-1] * 1000,
+        'ordered': all(ns == sorted(ns) for ns in seen.values()),
+    }
+
+
+@pytest.mark.performance
+async def test_router_throughput():
+    logging.getLogger('websocket.event_router').setLevel(logging.WARNING)
+
+    legacy = await run(GlobalQueueRouter(), GLOBAL_EVENTS)
+    router = EventRouter()
+    lanes = await run(router, EVENTS)
+    stats = router.get_stats()
+
+    print(f"\n{SYMBOLS} symbols, slow handler {SLOW_HANDLER_SEC * 1000:.0f} ms:")
+    for name, r in (('global', legacy), ('lanes', lanes)):
+        print(f"  {name:7s} {r['events']:5d} events  {r['events_per_sec']:9.0f} ev/s  "
+              f"p50 {r['p50_ms']:8.1f} ms  max {r['max_ms']:8.1f} ms")
+    print(f"  lanes: max {stats['max_lanes']} concurrent, max depth {stats['max_lane_depth']}, "
+          f"avg dispatch {stats['events']['position.update']['latency_avg_ms']:.1f} ms")
+
+    assert lanes['events'] == EVENTS and lanes['ordered']
+    assert lanes['events_per_sec'] > 10 * legacy['events_per_sec']
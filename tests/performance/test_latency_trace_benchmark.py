@@ -0,0 +1,64 @@
+"""
+Benchmark: cost of signal latency tracing per span
+
+Every traced stage calls trace.mark(stage). With sampling off each signal
+gets NULL_TRACE at the client (tracer.start), the processor looks it up
+(tracer.trace_for) and the remaining stages call the no-op mark().
+
+- disabled: tracer.start + trace_for + 12 NULL_TRACE marks per signal
+- sampled:  the same path with a real SignalTrace, plus finish() building
+            the breakdown row for a Prometheus-style sink
+
+Reports ns per span and per signal; disabled must stay below 1 us per span.
+
+Run:
+    pytest tests/performance/test_latency_trace_benchmark.py -s -m performance
+"""
+
+import time
+
+import pytest
+
+from core.latency_trace import TRACE_KEY, SignalTracer
+
+SIGNALS = 20_000
+STAGES = ('decode', 'dispatch', 'match', 'lifecycle', 'risk_checks', 'spread', 'entry_order',
+          'position_record', 'sl_placement', 'activation', 'registration', 'lookback')
+
+
+def run(tracer):
+    """Per-signal tracing calls of the pipeline; returns seconds per signal"""
+    signal = {'symbol': 'BTCUSDT'}
+    start = time.perf_counter()
+    for _ in range(SIGNALS):
+        trace = tracer.start('BTCUSDT', time.monotonic_ns())
+        trace.mark('decode')
+        if trace.sampled:
+            signal[TRACE_KEY] = trace.trace_id
+        trace = tracer.trace_for(signal)
+        for stage in STAGES[1:]:
+            trace.mark(stage)
+        tracer.finish(trace)
+    return (time.perf_counter() - start) / SIGNALS
+
+
+@pytest.mark.performance
+def test_span_overhead():
+    disabled_tracer = SignalTracer(sample_rate=0.0)
+    sampled_tracer = SignalTracer(sample_rate=1.0)
+    observed = []
+    sampled_tracer.add_sink(lambda row: observed.extend(row['stages'].values()))
+
+    disabled = min(run(disabled_tracer) for _ in range(3))
+    sampled = min(run(sampled_tracer) for _ in range(3))
+
+    spans = len(STAGES)
+    print(f"\n{SIGNALS} signals x {spans} spans:")
+    print(f"  disabled  {disabled / spans * 1e9:7.0f} ns/span  {disabled * 1e6:7.2f} us/signal")
+    print(f"  sampled   {sampled / spans * 1e9:7.0f} ns/span  {sampled * 1e6:7.2f} us/signal "
+          f"(incl. breakdown row and sink)")
+
+    assert disabled / spans < 1e-6
+    assert disabled_tracer.get_stats()['started'] == 0
+    assert sampled_tracer.finished == 3 * SIGNALS and sampled_tracer.get_stats()['open'] == 0
+    assert len(observed) == 3 * SIGNALS * spans
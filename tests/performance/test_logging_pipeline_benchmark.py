@@ -0,0 +1,122 @@
+"""
+Benchmark: event-loop stall time spent in logging at hot-path volume
+
+One simulated second of hot-path logging with 40 open positions: per mark
+price update a "Price updated" line, the [TS_DEBUG] dump of every TS key and
+the EventLogger mirror line, plus 1,000 aggTrade-rate DEBUG/INFO lines from
+the delta pools. Replayed for SECONDS simulated seconds on the event loop, with
+a small maxBytes so file rotation happens during the run.
+
+- sync:  RotatingFileHandler + console StreamHandler on the root logger
+         (previous main.py setup); formatting, writes and rollovers on the loop
+- queue: setup_async_logging(); the loop only filters and enqueues
+
+Reports loop time spent in logger calls per simulated second and the worst
+single call (a rollover in the sync case).
+
+Run:
+    pytest tests/performance/test_logging_pipeline_benchmark.py -s -m performance
+"""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from utils.logger import _build_handlers, get_logging_stats, setup_async_logging, stop_async_logging
+
+POSITIONS = 40
+TRADE_LINES_PER_SEC = 1000
+SECONDS = 5
+MAX_BYTES = 2 * 1024 * 1024
+
+
+def one_second_of_logs(second):
+    symbols = [f"S{i}USDT" for i in range(POSITIONS)]
+    ts_keys = str(symbols)
+    lines = []
+    for n, symbol in enumerate(symbols):
+        price = 100 + second * 0.01 + n
+        lines.append(('core.position_manager', logging.INFO,
+                      f"  → Price updated {symbol}: {price - 0.01:.4f} → {price:.4f}"))
+        lines.append(('core.position_manager', logging.INFO,
+                      f"[TS_DEBUG] Exchange: binance, Trailing manager exists: True, "
+                      f"TS symbols in memory: {ts_keys}, Pos TS Activated: False, Opened: 2026-01-01"))
+        lines.append(('core.event_logger', logging.INFO,
+                      f"position_updated: {{'symbol': '{symbol}', 'price': {price:.4f}}}"))
+    for k in range(TRADE_LINES_PER_SEC):
+        symbol = symbols[k % POSITIONS]
+        lines.append(('websocket.aggtrades_per_symbol_pool', logging.INFO,
+                      f"[AGG-{symbol}] delta window updated"))
+    return lines
+
+
+async def run_hot_path(volume):
+    """Emit the volume on the loop, timing each logger call."""
+    loggers = {}
+    total = worst = 0.0
+    for second in volume:
+        for name, level, msg in second:
+            log = loggers.get(name) or loggers.setdefault(name, logging.getLogger(name))
+            start = time.perf_counter()
+            log.log(level, msg)
+            elapsed = time.perf_counter() - start
+            total += elapsed
+            worst = max(worst, elapsed)
+        await asyncio.sleep(0)
+    return total, worst
+
+
+@pytest.mark.performance
+async def test_loop_stall_per_second(tmp_path):
+    volume = [one_second_of_logs(s) for s in range(SECONDS)]
+    records = sum(len(s) for s in volume)
+    root = logging.getLogger()
+    saved, saved_level = root.handlers[:], root.level
+    console = open(tmp_path / 'console.log', 'w')
+    try:
+        # Before: synchronous handlers on the root logger
+        handlers = _build_handlers(str(tmp_path / 'sync' / 'bot.log'), True,
+                                   '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                                   MAX_BYTES, 10, console)
+        root.handlers[:] = handlers
+        root.setLevel(logging.INFO)
+        sync_total, sync_worst = await run_hot_path(volume)
+        for h in handlers:
+            h.close()
+
+        # After: queue pipeline, no suppression (same records written)
+        setup_async_logging(log_file=str(tmp_path / 'queue' / 'bot.log'), max_bytes=MAX_BYTES,
+                            backup_count=10, stream=console, queue_size=100_000,
+                            rate_limit_per_sec=0, dedup_window_sec=0)
+        queue_total, queue_worst = await run_hot_path(volume)
+        queue_stats = get_logging_stats()
+        stop_async_logging()
+
+        # After, with the production defaults (dedup + per-logger rate limit on hot-path loggers)
+        setup_async_logging(log_file=str(tmp_path / 'limited' / 'bot.log'), max_bytes=MAX_BYTES,
+                            backup_count=10, stream=console)
+        limited_total, limited_worst = await run_hot_path(volume)
+        limited_stats = get_logging_stats()
+        stop_async_logging()
+    finally:
+        console.close()
+        root.handlers[:] = saved
+        root.setLevel(saved_level)
+
+    print(f"\n{records // SECONDS} records per simulated second, {SECONDS} s:")
+    for name, total, worst, stats in (('sync', sync_total, sync_worst, None),
+                                      ('queue', queue_total, queue_worst, queue_stats),
+                                      ('queue+limit', limited_total, limited_worst, limited_stats)):
+        extra = ''
+        if stats:
+            extra = (f"  (enqueued {stats['enqueued']}, dropped {stats['dropped']}, "
+                     f"suppressed {stats['deduplicated'] + stats['rate_limited']})")
+        print(f"  {name:12s} {total / SECONDS * 1e3:8.2f} ms stall/s   worst call {worst * 1e3:6.2f} ms{extra}")
+
+    assert queue_stats['dropped'] == 0 and queue_stats['enqueued'] == records
+    assert queue_total < sync_total
+    # Position and event-log lines all pass; only the stream chatter is suppressed
+    assert set(limited_stats['suppressed_by_logger']) == {'websocket.aggtrades_per_symbol_pool'}
+    assert limited_stats['enqueued'] < records // 5
@@ -0,0 +1,196 @@
+"""
+Benchmark: MetricsCollector cost with 150 open positions and 100k closed trades
+
+CLOSED_TRADES closes spread over HISTORY_DAYS, POSITIONS open positions and
+hourly balance snapshots, served by an in-memory repository that counts
+queries and rows (database time itself is not simulated, so the legacy
+numbers are a lower bound). Five minutes of collections every 10 s.
+
+- legacy:      previous collection — active positions (twice), daily stats,
+               closed positions per win-rate window (1h / 24h / 7d / 30d)
+               and 30 days of balance history on every collection
+- incremental: gauges refreshed from the event-fed TradingMetricsState,
+               one warm-start query, open positions reconciled every 300 s;
+               one position.update per position per second in between
+
+Reports DB queries and rows per minute, per-collection and per-scrape cost.
+
+Run:
+    pytest tests/performance/test_metrics_benchmark.py -s -m performance
+"""
+
+import bisect
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from loguru import logger
+from prometheus_client import generate_latest
+
+from monitoring.metrics import MetricsCollector
+
+POSITIONS = 150
+CLOSED_TRADES = 100_000
+HISTORY_DAYS = 90
+COLLECT_SEC = 10
+MINUTES = 5
+COLLECTIONS = MINUTES * 60 // COLLECT_SEC
+RECONCILE_SEC = 300
+WIN_RATE_WINDOWS = {'1h': timedelta(hours=1), '24h': timedelta(hours=24),
+                    '7d': timedelta(days=7), '30d': timedelta(days=30)}
+
+
+class CountingRepository:
+    """In-memory positions / trades / balances; counts queries and rows returned"""
+
+    def __init__(self):
+        rng = random.Random(7)
+        now = datetime.now(timezone.utc)
+        self.positions = [
+            SimpleNamespace(exchange='binance', symbol=f"S{i}USDT", size=1.0 + i % 5, quantity=1.0 + i % 5,
+                            entry_price=100.0 + i, unrealized_pnl=rng.uniform(-5, 5))
+            for i in range(POSITIONS)
+        ]
+        ages = sorted((rng.uniform(0, HISTORY_DAYS * 86400) for _ in range(CLOSED_TRADES)), reverse=True)
+        self.closed = [SimpleNamespace(exchange='binance', realized_pnl=rng.uniform(-10, 12),
+                                       closed_at=now - timedelta(seconds=age)) for age in ages]
+        self.closed_times = [p.closed_at for p in self.closed]
+        self.balances = [SimpleNamespace(balance=10_000 + 50 * ((h * 37) % 11)) for h in range(30 * 24)]
+        self.queries = 0
+        self.rows = 0
+
+    def _result(self, rows):
+        self.queries += 1
+        self.rows += len(rows)
+        return rows
+
+    async def get_active_positions(self):
+        return self._result(list(self.positions))
+
+    async def get_open_positions(self):
+        return self._result([vars(p) for p in self.positions])
+
+    async def get_closed_positions_since(self, since):
+        return self._result(self.closed[bisect.bisect_left(self.closed_times, since):])
+
+    async def get_balance_history(self, exchange, days):
+        return self._result(list(self.balances))
+
+    async def get_daily_stats(self, date):
+        return self._result([{'binance': {'pnl': 12.5}}])[0]
+
+
+async def legacy_collect(collector, repository):
+    """Trading and risk collection of the previous MetricsCollector"""
+    positions = await repository.get_active_positions()
+    exchange_positions = [p for p in positions if p.exchange == 'binance']
+    collector.active_positions.labels(exchange='binance').set(len(exchange_positions))
+    collector.unrealized_pnl.labels(exchange='binance').set(
+        float(sum(p.unrealized_pnl or 0 for p in exchange_positions)))
+
+    daily_stats = await repository.get_daily_stats(datetime.now(timezone.utc).date())
+    collector.daily_pnl.labels(exchange='binance').set(float(daily_stats.get('binance', {}).get('pnl', 0)))
+
+    for timeframe, window in WIN_RATE_WINDOWS.items():
+        closed = await repository.get_closed_positions_since(datetime.now(timezone.utc) - window)
+        exchange_closed = [p for p in closed if p.exchange == 'binance']
+        wins = sum(1 for p in exchange_closed if p.realized_pnl > 0)
+        rate = wins / len(exchange_closed) * 100 if exchange_closed else 0
+        collector.win_rate.labels(exchange='binance', timeframe=timeframe).set(rate)
+
+    positions = await repository.get_active_positions()
+    exchange_positions = [p for p in positions if p.exchange == 'binance']
+    collector.total_exposure.labels(exchange='binance').set(
+        float(sum(abs(p.size * p.entry_price) for p in exchange_positions)))
+    history = await repository.get_balance_history('binance', days=30)
+    peak = max(h.balance for h in history)
+    collector.current_drawdown.labels(exchange='binance').set(max(0, (peak - history[-1].balance) / peak * 100))
+
+
+def make_collector(repository):
+    collector = MetricsCollector(repository, {'reconcile_interval': RECONCILE_SEC})
+    collector._collect_system_metrics = AsyncMock()         # Same in both, not measured
+    return collector
+
+
+async def run_legacy():
+    repository = CountingRepository()
+    collector = make_collector(repository)
+    durations = []
+    for _ in range(COLLECTIONS):
+        start = time.perf_counter()
+        await legacy_collect(collector, repository)
+        durations.append(time.perf_counter() - start)
+    return repository, durations
+
+
+async def run_incremental():
+    repository = CountingRepository()
+    collector = make_collector(repository)
+    rng = random.Random(11)
+
+    start = time.perf_counter()
+    await collector._load_closed_trades()
+    warm_start = time.perf_counter() - start
+
+    for position in repository.positions:
+        await collector._on_position_opened({'symbol': position.symbol, 'side': 'long',
+                                             'quantity': position.quantity, 'entry_price': position.entry_price})
+
+    durations, event_sec = [], 0.0
+    for _ in range(COLLECTIONS):
+        start = time.perf_counter()
+        for _ in range(COLLECT_SEC):                        # One update per position per second
+            for position in repository.positions:
+                await collector._on_position_update({
+                    'symbol': position.symbol, 'side': 'long', 'size': str(position.quantity),
+                    'entry_price': str(position.entry_price), 'unrealized_pnl': f"{rng.uniform(-5, 5):.4f}",
+                })
+        event_sec += time.perf_counter() - start
+
+        start = time.perf_counter()
+        await collector.collect()
+        durations.append(time.perf_counter() - start)
+        collector.last_reconcile -= COLLECT_SEC             # Simulated time: one collection = COLLECT_SEC
+
+    start = time.perf_counter()
+    collector._refresh_trading_gauges()
+    generate_latest(collector.registry)
+    scrape = time.perf_counter() - start
+    return repository, collector, durations, warm_start, event_sec, scrape
+
+
+@pytest.mark.performance
+async def test_metrics_collection_cost():
+    logger.disable('monitoring.metrics')
+    try:
+        legacy_repo, legacy_durations = await run_legacy()
+        repo, collector, durations, warm_start, event_sec, scrape = await run_incremental()
+    finally:
+        logger.enable('monitoring.metrics')
+
+    events = COLLECTIONS * COLLECT_SEC * POSITIONS
+    print(f"\n{POSITIONS} positions, {CLOSED_TRADES} closed trades, {MINUTES} min of {COLLECT_SEC} s collections:")
+    print(f"  legacy       {legacy_repo.queries / MINUTES:6.1f} queries/min  {legacy_repo.rows / MINUTES:9.0f} rows/min  "
+          f"collection avg {sum(legacy_durations) / COLLECTIONS * 1000:7.2f} ms  max {max(legacy_durations) * 1000:7.2f} ms")
+    steady = repo.queries - 1
+    print(f"  incremental  {steady / MINUTES:6.1f} queries/min  {(repo.rows - collector.state.trades_loaded) / MINUTES:9.0f} rows/min  "
+          f"collection avg {sum(durations) / COLLECTIONS * 1000:7.2f} ms  max {max(durations) * 1000:7.2f} ms")
+    print(f"  warm start {warm_start * 1000:.0f} ms ({collector.state.trades_loaded} trades, one query)  "
+          f"events {event_sec / events * 1e6:.1f} us/update  scrape {scrape * 1000:.2f} ms")
+
+    assert legacy_repo.queries == COLLECTIONS * 8
+    assert steady == MINUTES * 60 // RECONCILE_SEC          # Open positions reconcile only
+    assert collector.state.active_positions('binance') == POSITIONS
+    assert sum(durations) < sum(legacy_durations)
+    assert collector.state.win_rate('binance', '30d') == pytest.approx(
+        legacy_win_rate(legacy_repo, WIN_RATE_WINDOWS['30d']), abs=0.5)
+
+
+def legacy_win_rate(repository, window):
+    since = datetime.now(timezone.utc) - window
+    closed = repository.closed[bisect.bisect_left(repository.closed_times, since):]
+    return sum(1 for p in closed if p.realized_pnl > 0) / len(closed) * 100
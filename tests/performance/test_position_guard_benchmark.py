@@ -0,0 +1,144 @@
+"""
+Benchmark: PositionGuard REST load for 150 positions over one minute
+
+POSITIONS positions on SYMBOLS symbols (several positions per symbol), every
+exchange call costs REST_SEC. One minute = 12 checks at 5 s; the first is
+also a health check.
+
+- legacy:    previous per-position loop — fetch_ticker twice per check,
+             fetch_ohlcv + fetch_order_book per position per health check
+- scheduler: single guard pass over streamed mark prices, shared volatility
+             store, order book once per symbol per liquidity TTL, 24h change
+             from the ticker once per symbol per daily_change_ttl_sec (mark
+             price updates do not carry it)
+
+Reports REST calls per minute, calls saved and per-pass duration.
+
+Run:
+    pytest tests/performance/test_position_guard_benchmark.py -s -m performance
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+from loguru import logger
+
+from database.models import Position
+from protection.position_guard import PositionGuard
+
+POSITIONS = 150
+SYMBOLS = 60
+CHECKS_PER_MINUTE = 12
+REST_SEC = 0.002
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_760_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingExchange:
+    """Exchange manager stand-in: every call sleeps REST_SEC and is counted"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def _rest(self):
+        self.calls += 1
+        await asyncio.sleep(REST_SEC)
+
+    async def fetch_ticker(self, symbol):
+        await self._rest()
+        return {'last': 100.5, 'percentage': 1.0}
+
+    async def fetch_ohlcv(self, symbol, timeframe='5m', limit=20):
+        await self._rest()
+        return [[0, 100, 100.2, 99.8, 100 + (i % 3) * 0.1, 1] for i in range(limit)]
+
+    async def fetch_order_book(self, symbol, limit=20):
+        await self._rest()
+        return {'bids': [[100.4, 1000.0]], 'asks': [[100.6, 1000.0]]}
+
+
+def make_positions():
+    return [
+        Position(id=i, trade_id=i, exchange='binance', symbol=f"S{i % SYMBOLS}/USDT:USDT", side='long',
+                 quantity=1.0, entry_price=100.0, status='OPEN', opened_at=datetime.now(timezone.utc))
+        for i in range(POSITIONS)
+    ]
+
+
+def make_guard(exchange, clock):
+    return PositionGuard(exchange_manager=exchange, risk_manager=Mock(), stop_loss_manager=Mock(),
+                         trailing_stop_manager=Mock(), repository=Mock(), event_router=Mock(),
+                         config={}, clock=clock)
+
+
+async def legacy_minute(guard, positions):
+    """One minute of the previous per-position loops (all running concurrently)"""
+
+    async def position_loop(position):
+        for check in range(CHECKS_PER_MINUTE):
+            ticker = await guard.exchange_manager.fetch_ticker(position.symbol)
+            price = Decimal(str(ticker['last']))
+            ticker = await guard.exchange_manager.fetch_ticker(position.symbol)    # 24h change
+            if check == 0:
+                await guard.exchange_manager.fetch_ohlcv(position.symbol, timeframe='5m', limit=20)
+                await guard.exchange_manager.fetch_order_book(position.symbol, limit=20)
+            await guard._check_critical_conditions(position, price, daily_change=ticker['percentage'])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(position_loop(p) for p in positions))
+    return time.perf_counter() - start
+
+
+async def scheduler_minute(guard, clock):
+    durations = []
+    for _ in range(CHECKS_PER_MINUTE):
+        start = time.perf_counter()
+        await guard.run_guard_pass()
+        durations.append(time.perf_counter() - start)
+        clock.now += 5
+    return durations
+
+
+@pytest.mark.performance
+async def test_guard_rest_load():
+    logger.disable('protection.position_guard')
+    try:
+        clock = FakeClock()
+        legacy_exchange = CountingExchange()
+        legacy_guard = make_guard(legacy_exchange, clock)
+        legacy_sec = await legacy_minute(legacy_guard, make_positions())
+
+        exchange = CountingExchange()
+        guard = make_guard(exchange, clock)
+        for position in make_positions():
+            guard.monitored_positions[position.id] = position
+            guard.position_peaks[str(position.id)] = Decimal('100')
+        for i in range(SYMBOLS):
+            await guard._handle_price_update({'symbol': f"S{i}USDT", 'price': '100.5'})   # As streamed: no 24h change
+        durations = await scheduler_minute(guard, clock)
+        stats = guard.get_guard_stats()
+    finally:
+        logger.enable('protection.position_guard')
+
+    print(f"\n{POSITIONS} positions / {SYMBOLS} symbols, {CHECKS_PER_MINUTE} checks, REST {REST_SEC * 1000:.0f} ms:")
+    print(f"  legacy     {legacy_exchange.calls:5d} REST calls/min  (REST-bound checks: {legacy_sec * 1000:.0f} ms)")
+    print(f"  scheduler  {exchange.calls:5d} REST calls/min  saved {stats['rest_calls_saved']}  "
+          f"health pass {durations[0] * 1000:.1f} ms  price pass avg "
+          f"{sum(durations[1:]) / len(durations[1:]) * 1000:.2f} ms  max {stats['max_pass_ms']:.1f} ms")
+
+    assert legacy_exchange.calls == POSITIONS * (2 * CHECKS_PER_MINUTE + 2)
+    # Per symbol: one OHLCV seed + one order book, and one 24h-change ticker per daily_change_ttl_sec
+    assert guard.daily_change_ttl >= CHECKS_PER_MINUTE * 5 - 5
+    assert exchange.calls == 3 * SYMBOLS
+    assert stats['rest_calls_saved'] == legacy_exchange.calls - exchange.calls
+    assert len(guard.position_health) == POSITIONS
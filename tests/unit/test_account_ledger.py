@@ -0,0 +1,214 @@
+"""
+AccountLedger — stream-fed account state for ExchangeManager.can_open_position
+
+Tests cover:
+1. Reconcile from fetch_balance + positionRisk (all symbols)
+2. ACCOUNT_UPDATE / ACCOUNT_CONFIG_UPDATE deltas (wallet balance, position margin, leverage)
+3. Freshness: stream gaps and max age; events during reconcile are kept
+4. can_open_position answers from a fresh ledger without REST, same decisions as REST
+5. BinanceHybridStream feeds the ledger
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from config.settings import config
+from core.account_ledger import AccountLedger
+from core.exchange_manager import ExchangeManager
+
+LEVERAGE = float(config.trading.leverage)
+MIN_ACTIVE = float(config.safety.MINIMUM_ACTIVE_BALANCE_USD)
+
+
+def make_exchange(free=1000.0, wallet=1200.0, position_risk=None):
+    exchange = MagicMock()
+    exchange.fetch_balance = AsyncMock(return_value={
+        'USDT': {'free': free, 'total': wallet + 5},
+        'info': {'assets': [{'asset': 'USDT', 'walletBalance': str(wallet)}]},
+    })
+    exchange.fapiPrivateV2GetPositionRisk = AsyncMock(return_value=position_risk if position_risk is not None else [
+        {'symbol': 'BTCUSDT', 'positionAmt': '0.01', 'entryPrice': '100000', 'notional': '1010',
+         'leverage': '10', 'maxNotionalValue': '5000', 'positionSide': 'BOTH'},
+        {'symbol': 'ETHUSDT', 'positionAmt': '0', 'entryPrice': '0', 'notional': '0',
+         'leverage': '20', 'maxNotionalValue': 'INF', 'positionSide': 'BOTH'},
+    ])
+    return exchange
+
+
+def account_update(wallet=None, positions=()):
+    data = {'e': 'ACCOUNT_UPDATE', 'a': {'m': 'ORDER', 'B': [], 'P': []}}
+    if wallet is not None:
+        data['a']['B'].append({'a': 'USDT', 'wb': str(wallet), 'cw': str(wallet), 'bc': '0'})
+    for symbol, amount, entry in positions:
+        data['a']['P'].append({'s': symbol, 'pa': str(amount), 'ep': str(entry), 'up': '0', 'mt': 'cross', 'ps': 'BOTH'})
+    return data
+
+
+async def fresh_ledger(exchange=None) -> AccountLedger:
+    ledger = AccountLedger(exchange or make_exchange(), default_leverage=10)
+    ledger.stream_connected = True
+    assert await ledger.reconcile()
+    return ledger
+
+
+class TestLedger:
+    async def test_reconcile(self):
+        ledger = await fresh_ledger()
+
+        assert ledger.available_balance == 1000.0
+        assert ledger.wallet_balance == 1200.0                   # From walletBalance, not ccxt total
+        assert list(ledger.positions) == [('BTCUSDT', 'BOTH')]
+        assert ledger.total_notional() == 1010.0
+        assert ledger.max_notional == {'BTCUSDT': '5000', 'ETHUSDT': 'INF'}
+        assert ledger.leverage['ETHUSDT'] == 20.0
+        ledger.exchange.fapiPrivateV2GetPositionRisk.assert_awaited_once_with({})
+
+    async def test_account_update_deltas(self):
+        ledger = await fresh_ledger()
+
+        # Open ETH at 20x: 1 × 2000 / 20 = 100 margin
+        ledger.apply_account_update(account_update(positions=[('ETHUSDT', 1, 2000)]))
+        assert ledger.available_balance == pytest.approx(900.0)
+        assert ledger.total_notional() == pytest.approx(3010.0)
+
+        # Close BTC (0.01 × 100000 / 10 = 100 margin back) with +50 realized PnL
+        ledger.apply_account_update(account_update(wallet=1250, positions=[('BTCUSDT', 0, 0)]))
+        assert ledger.available_balance == pytest.approx(1050.0)
+        assert ('BTCUSDT', 'BOTH') not in ledger.positions
+
+    async def test_leverage_update(self):
+        ledger = await fresh_ledger()
+        ledger.apply_config_update({'e': 'ACCOUNT_CONFIG_UPDATE', 'ac': {'s': 'BTCUSDT', 'l': 20}})
+
+        # BTC margin 100 → 50
+        assert ledger.available_balance == pytest.approx(1050.0)
+        assert ledger.leverage['BTCUSDT'] == 20.0
+
+    async def test_freshness(self):
+        ledger = AccountLedger(make_exchange(), max_age_sec=300)
+        with patch('core.account_ledger.time.monotonic', return_value=1000.0):
+            await ledger.reconcile()
+            assert not ledger.is_fresh()                # Stream not connected yet
+
+            ledger.stream_connected = True
+            assert ledger.is_fresh()
+
+            ledger.on_stream_gap()
+            assert not ledger.is_fresh()
+            ledger.on_stream_connected()
+            assert not ledger.is_fresh()                # Needs a reconcile after the gap
+            await ledger.reconcile()
+            assert ledger.is_fresh()
+
+        with patch('core.account_ledger.time.monotonic', return_value=1301.0):
+            assert not ledger.is_fresh()
+        await ledger.stop()
+        assert ledger.get_stats()['stream_gaps'] == 1
+
+    async def test_update_during_reconcile_kept(self):
+        release = asyncio.Event()
+        exchange = make_exchange(position_risk=[])
+
+        async def slow_risk(params):
+            await release.wait()
+            return []                               # Predates the fill below
+        exchange.fapiPrivateV2GetPositionRisk = AsyncMock(side_effect=slow_risk)
+        ledger = AccountLedger(exchange, default_leverage=10)
+
+        reconcile = asyncio.create_task(ledger.reconcile())
+        await asyncio.sleep(0)
+        ledger.apply_account_update(account_update(positions=[('SOLUSDT', 10, 100)]))
+        release.set()
+        await reconcile
+
+        assert ('SOLUSDT', 'BOTH') in ledger.positions
+        assert ledger.available_balance == pytest.approx(900.0)
+
+    async def test_reconcile_failure(self):
+        exchange = make_exchange()
+        exchange.fetch_balance = AsyncMock(side_effect=ConnectionError('down'))
+        ledger = AccountLedger(exchange)
+        ledger.stream_connected = True
+
+        assert not await ledger.reconcile()
+        assert not ledger.is_fresh()
+
+
+def make_manager() -> ExchangeManager:
+    em = ExchangeManager('binance', {'api_key': 'test', 'api_secret': 'test', 'testnet': True},
+                         repository=None, position_manager=None)
+    em._set_markets({
+        'BTC/USDT:USDT': {'symbol': 'BTC/USDT:USDT', 'precision': {'price': 0.1, 'amount': 0.001}, 'limits': {}},
+        'ETH/USDT:USDT': {'symbol': 'ETH/USDT:USDT', 'precision': {'price': 0.01, 'amount': 0.001}, 'limits': {}},
+    })
+    return em
+
+
+class TestCanOpenPosition:
+    async def check_both_paths(self, notional, free=1000.0):
+        """(ledger decision, REST decision) for the same account state"""
+        em = make_manager()
+        exchange = make_exchange(free=free)
+        em.exchange = exchange
+        ledger = em.enable_account_ledger()
+        ledger.stream_connected = True
+        await ledger.reconcile()
+        exchange.fetch_balance.reset_mock()
+        exchange.fapiPrivateV2GetPositionRisk.reset_mock()
+
+        from_ledger = await em.can_open_position('BTCUSDT', notional)
+        assert exchange.fetch_balance.await_count == 0
+        assert exchange.fapiPrivateV2GetPositionRisk.await_count == 0
+
+        ledger.on_stream_gap()
+        exchange.fetch_positions = AsyncMock(return_value=[{'notional': 1010, 'contracts': 0.01}])
+        from_rest = await em.can_open_position('BTCUSDT', notional)
+        assert exchange.fetch_balance.await_count == 1          # Total balance no longer fetched
+        assert ledger.get_stats()['hits'] == 1 and ledger.get_stats()['misses'] == 1
+        return from_ledger, from_rest
+
+    async def test_ok(self):
+        from_ledger, from_rest = await self.check_both_paths(notional=100)
+        assert from_ledger == from_rest == (True, 'OK')
+
+    async def test_insufficient_balance(self):
+        notional = (1000.0 - MIN_ACTIVE + 1) * LEVERAGE
+        from_ledger, from_rest = await self.check_both_paths(notional=notional)
+        assert from_ledger == from_rest
+        assert from_ledger[0] is False and 'Insufficient free balance' in from_ledger[1]
+
+    async def test_max_notional(self):
+        from_ledger, from_rest = await self.check_both_paths(notional=4500, free=100000.0)
+        assert from_ledger == from_rest
+        assert from_ledger[0] is False and 'exceed max notional' in from_ledger[1]
+
+    async def test_no_ledger_uses_rest(self):
+        em = make_manager()
+        em.exchange = make_exchange()
+        em.exchange.fetch_positions = AsyncMock(return_value=[])
+        assert em.account_ledger is None
+        assert await em.can_open_position('ETHUSDT', 100) == (True, 'OK')
+        em.exchange.fetch_balance.assert_awaited_once()
+
+
+class TestHybridStreamFeed:
+    async def test_stream_feeds_ledger(self):
+        from websocket.binance_hybrid_stream import BinanceHybridStream
+        em = make_manager()
+        em.exchange = make_exchange()
+        ledger = em.enable_account_ledger()
+        ledger.stream_connected = True
+        await ledger.reconcile()
+
+        stream = BinanceHybridStream('key', 'secret', exchange_manager=em)
+        stream._on_account_update = AsyncMock()
+        await stream._handle_user_message(account_update(wallet=1300))
+        await stream._handle_user_message({'e': 'ACCOUNT_CONFIG_UPDATE', 'ac': {'s': 'ETHUSDT', 'l': 5}})
+
+        assert ledger.wallet_balance == 1300.0
+        assert ledger.available_balance == pytest.approx(1100.0)
+        assert ledger.leverage['ETHUSDT'] == 5.0
+        stream._on_account_update.assert_awaited_once()
+        await ledger.stop()
@@ -9,12 +9,16 @@ Tests cover:
 5. Connection isolation
 6. Pool lifecycle (start/stop)
 7. subscribed_symbols compatibility
+8. Per-second delta buckets (SymbolDeltaState)
+9. Columnar trade storage, precision modes, memory reporting
 
 Date: 2026-02-17
 """
 
 import asyncio
+import time
 import pytest
+from collections import deque
 from unittest.mock import AsyncMock, MagicMock, patch
 from decimal import Decimal
 
@@ -196,8 +200,8 @@ class TestDeltaCalculations:
         """Helper: seed trades into delta state"""
         state = SymbolDeltaState()
         for trade in trades:
-            state.trades.append(trade)
-        state.last_update = asyncio.get_event_loop().time()
+            state.append(trade)
+        state.last_update = time.time()
         pool.delta_states[symbol] = state
 
     def test_rolling_delta_empty_state(self, pool):
@@ -209,8 +213,7 @@ class TestDeltaCalculations:
         assert delta == Decimal('0')
 
     def test_rolling_delta_positive_buying_pressure(self, pool):
-        loop = asyncio.get_event_loop()
-        now = loop.time()
+        now = time.time()
 
         trades = [
             make_trade(100.0, 10.0, is_buyer_maker=False, ts=now - 5),  # buy $1000
@@ -222,8 +225,7 @@ class TestDeltaCalculations:
         assert delta == Decimal('700.0')
 
     def test_rolling_delta_negative_selling_pressure(self, pool):
-        loop = asyncio.get_event_loop()
-        now = loop.time()
+        now = time.time()
 
         trades = [
             make_trade(100.0, 2.0, is_buyer_maker=False, ts=now - 5),   # buy $200
@@ -235,8 +237,7 @@ class TestDeltaCalculations:
         assert delta == Decimal('-800.0')
 
     def test_rolling_delta_respects_window(self, pool):
-        loop = asyncio.get_event_loop()
-        now = loop.time()
+        now = time.time()
 
         trades = [
             make_trade(100.0, 10.0, is_buyer_maker=False, ts=now - 100),  # old buy — outside window
@@ -248,6 +249,19 @@ class TestDeltaCalculations:
         # Only the recent sell counts
         assert delta == Decimal('-500.0')
 
+    def test_avg_delta_uses_trade_time_base(self, pool):
+        """Epoch trade timestamps are windowed against wall time, not loop.time()"""
+        now = time.time()
+
+        trades = [
+            make_trade(100.0, 10.0, is_buyer_maker=False, ts=now - 5),  # buy $1000
+            make_trade(100.0, 4.0, is_buyer_maker=True, ts=now - 3),    # sell $400
+        ]
+        self._seed_trades(pool, 'BTCUSDT', trades)
+
+        avg = pool.get_avg_delta('BTCUSDT', 100)
+        assert avg == Decimal('14')  # (1000 + 400) / 100
+
     def test_avg_delta_empty_state(self, pool):
         avg = pool.get_avg_delta('BTCUSDT', 100)
         assert avg == Decimal('1')  # Default to avoid division by zero
@@ -258,8 +272,7 @@ class TestDeltaCalculations:
         assert sells == 0
 
     def test_large_trade_counts_detects_whales(self, pool):
-        loop = asyncio.get_event_loop()
-        now = loop.time()
+        now = time.time()
 
         trades = [
             make_trade(50000.0, 1.0, is_buyer_maker=False, ts=now - 10),   # buy $50k ✓
@@ -274,8 +287,7 @@ class TestDeltaCalculations:
         assert sells == 2
 
     def test_get_stats_returns_dict(self, pool):
-        loop = asyncio.get_event_loop()
-        now = loop.time()
+        now = time.time()
 
         trades = [
             make_trade(100.0, 5.0, is_buyer_maker=False, ts=now - 5),
@@ -363,7 +375,7 @@ class TestTradeHandlers:
 
         assert len(handler_calls) == 1
         assert handler_calls[0] == trade_data
-        assert len(state.trades) == 1
+        assert state.trade_count == 1
 
     def test_non_aggtrade_event_ignored(self):
         """Non-aggTrade events should be silently ignored"""
@@ -374,7 +386,7 @@ class TestTradeHandlers:
         conn._trade_handlers = []
 
         conn._process_trade({'e': 'depthUpdate', 's': 'BTCUSDT'})
-        assert len(state.trades) == 0
+        assert state.trade_count == 0
 
     def test_handler_error_does_not_crash(self):
         """One broken handler should not prevent others from running"""
@@ -428,3 +440,118 @@ class TestPoolStatus:
         assert len(status['connections']) == 2
 
         await pool.stop()
+
+
+# ══════════════════════════════════════════════════════
+# Per-second bucket tests
+# ══════════════════════════════════════════════════════
+
+class TestDeltaBuckets:
+    def test_delta_since_includes_open_bucket(self):
+        state = SymbolDeltaState()
+        state.append(make_trade(100.0, 1.0, is_buyer_maker=False, ts=1000.2))
+        state.append(make_trade(100.0, 3.0, is_buyer_maker=True, ts=1001.5))
+
+        assert state.delta_since(1000.0) == Decimal('-200.0')
+        assert state.delta_since(1001.0) == Decimal('-300.0')
+        assert state.delta_since(1002.0) == Decimal('0')
+
+    def test_empty_seconds_are_padded(self):
+        state = SymbolDeltaState()
+        state.append(make_trade(100.0, 1.0, is_buyer_maker=False, ts=1000.0))
+        state.append(make_trade(100.0, 1.0, is_buyer_maker=False, ts=1010.0))
+
+        # 10 closed buckets: second 1000 plus 9 empty ones
+        assert len(state._cum_delta) == 11
+        assert state.delta_since(1005.0) == Decimal('100.0')
+        assert state.delta_since(1000.0) == Decimal('200.0')
+
+    def test_abs_delta_between(self):
+        state = SymbolDeltaState()
+        state.append(make_trade(100.0, 2.0, is_buyer_maker=False, ts=1000.0))  # +200
+        state.append(make_trade(100.0, 5.0, is_buyer_maker=True, ts=1001.0))   # -500
+        state.append(make_trade(100.0, 1.0, is_buyer_maker=True, ts=1003.0))   # -100 (open)
+
+        assert state.abs_delta_between(1000, 1003) == Decimal('800.0')
+        assert state.abs_delta_between(1001, 1002) == Decimal('500.0')
+        assert state.abs_delta_between(1003, 1003) == Decimal('100.0')
+        assert state.abs_delta_between(990, 999) == Decimal('0')
+
+    def test_large_counts_use_state_threshold(self):
+        state = SymbolDeltaState(large_trade_threshold=Decimal('500'))
+        state.append(make_trade(100.0, 6.0, is_buyer_maker=False, ts=1000.0))  # buy $600 ✓
+        state.append(make_trade(100.0, 4.0, is_buyer_maker=True, ts=1001.0))   # sell $400 ✗
+        state.append(make_trade(100.0, 9.0, is_buyer_maker=True, ts=1002.0))  # sell $900 ✓
+
+        assert state.large_counts_since(1000.0) == (1, 1)
+        assert state.large_counts_since(1001.0) == (0, 1)
+
+    def test_history_is_bounded(self):
+        state = SymbolDeltaState(bucket_history_sec=10)
+        state.append(make_trade(100.0, 1.0, is_buyer_maker=False, ts=1000.0))
+        state.append(make_trade(100.0, 1.0, is_buyer_maker=True, ts=2000.0))
+
+        assert len(state._cum_delta) == 11
+        # Second 1000 fell out of retained history
+        assert state.delta_since(0) == Decimal('-100.0')
+
+    def test_seeded_trades_are_bucketed(self):
+        trades = deque([make_trade(100.0, 1.0, is_buyer_maker=False, ts=1000.0)], maxlen=5)
+        state = SymbolDeltaState(trades=trades)
+
+        assert state.trade_count == 1
+        assert state.delta_since(1000.0) == Decimal('100.0')
+
+
+# ══════════════════════════════════════════════════════
+# Precision and memory tests
+# ══════════════════════════════════════════════════════
+
+class TestPrecisionAndMemory:
+    def test_process_trade_updates_buckets(self):
+        state = SymbolDeltaState(precision='float')
+        conn = AggTradePerSymbolConnection.__new__(AggTradePerSymbolConnection)
+        conn.symbol = 'BTCUSDT'
+        conn.delta_state = state
+        conn._trade_handlers = []
+
+        conn._process_trade({
+            'e': 'aggTrade', 's': 'BTCUSDT',
+            'p': '200.0', 'q': '60.0', 'T': 1_000_500, 'm': True,
+        })
+
+        assert state.trade_count == 1
+        assert state.delta_since(1000.0) == -12000.0
+        assert state.large_counts_since(1000.0) == (0, 1)
+
+    def test_float_precision_returns_decimal(self):
+        pool = AggTradesPerSymbolPool(testnet=False, precision='float')
+        state = SymbolDeltaState(precision='float')
+        state.append(make_trade(100.0, 10.0, is_buyer_maker=False, ts=1000.0))
+        state.append(make_trade(100.0, 3.0, is_buyer_maker=True, ts=1001.0))
+        pool.delta_states['BTCUSDT'] = state
+
+        with patch('websocket.aggtrades_per_symbol_pool.time.time', return_value=1002.0):
+            delta = pool.get_rolling_delta('BTCUSDT', 20)
+
+        assert isinstance(delta, Decimal)
+        assert delta == Decimal('700.0')
+
+    def test_invalid_precision_rejected(self):
+        with pytest.raises(ValueError):
+            SymbolDeltaState(precision='double')
+        with pytest.raises(ValueError):
+            AggTradesPerSymbolPool(precision='double')
+
+    def test_pool_status_reports_memory(self):
+        pool = AggTradesPerSymbolPool(testnet=False)
+        pool.delta_states['BTCUSDT'] = SymbolDeltaState()
+        pool.delta_states['ETHUSDT'] = SymbolDeltaState(bucket_history_sec=60)
+        for state in pool.delta_states.values():
+            for i in range(300):
+                state.append(make_trade(100.0, 1.0, is_buyer_maker=False, ts=1000 + i))
+
+        status = pool.get_pool_status()
+        by_symbol = status['memory_bytes_by_symbol']
+        assert by_symbol['BTCUSDT'] > by_symbol['ETHUSDT'] > 0
+        assert status['memory_bytes_total'] == sum(by_symbol.values())
@@ -0,0 +1,88 @@
+"""
+Streaming indicator state in BarAggregator
+
+The O(1) paths (gain/loss and |delta|² prefix sums, RollingExtremes) are
+compared against the full scan over self.bars, which is still used when
+bars are appended to the deque directly.
+
+Tests cover:
+1. RollingExtremes vs brute-force min/max
+2. RSI / volume z-score / extremes: streaming vs scan, incl. wrap-around
+3. Fallback to scan when bars bypass _append_bar
+"""
+
+import random
+
+import pytest
+
+from core.bar_aggregator import BarAggregator, OneSecondBar, RollingExtremes
+
+
+def random_bars(n: int, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    price = 100.0
+    bars = []
+    for i in range(n):
+        price = max(1.0, price * (1 + rng.gauss(0, 0.001)))
+        delta = 0.0 if rng.random() < 0.1 else rng.gauss(0, 1000)
+        bars.append(OneSecondBar(ts=i, price=price, delta=delta, large_buy_count=0, large_sell_count=0))
+    return bars
+
+
+def streaming_and_scan(bars: list, max_bars: int = 4000):
+    """Same bars: one aggregator via add_historical_bar, one via direct append."""
+    streaming = BarAggregator('TEST', max_bars=max_bars)
+    scan = BarAggregator('TEST', max_bars=max_bars)
+    for bar in bars:
+        streaming.add_historical_bar(bar)
+        scan.bars.append(bar)
+    return streaming, scan
+
+
+class TestRollingExtremes:
+    def test_matches_brute_force(self):
+        rng = random.Random(1)
+        window = 50
+        ext = RollingExtremes(window)
+        prices = []
+        for _ in range(1000):
+            price = round(rng.uniform(90, 110), 1)  # repeats exercise ties
+            ext.push(price)
+            prices.append(price)
+            assert ext.low == min(prices[-window:])
+            assert ext.high == max(prices[-window:])
+
+
+class TestStreamingIndicators:
+    @pytest.mark.parametrize('n_bars,max_bars', [(900, 4000), (3700, 4000), (9000, 4000)])
+    def test_streaming_matches_scan(self, n_bars, max_bars):
+        streaming, scan = streaming_and_scan(random_bars(n_bars), max_bars)
+        assert streaming._streaming_in_sync()
+        assert not scan._streaming_in_sync()
+
+        for period in (14, 840):
+            assert streaming.compute_rsi(period) == pytest.approx(scan.compute_rsi(period), rel=1e-9)
+        for window, recent in ((3600, 60), (600, 30)):
+            assert streaming.compute_volume_zscore(window, recent) == pytest.approx(
+                scan.compute_volume_zscore(window, recent), rel=1e-6, abs=1e-9
+            )
+        for window in (100, 3600, 10_000):
+            assert streaming.compute_extremes(window) == pytest.approx(scan.compute_extremes(window))
+
+    def test_constant_volume_zscore_is_zero(self):
+        bars = [OneSecondBar(ts=i, price=100.0, delta=10.0, large_buy_count=0, large_sell_count=0)
+                for i in range(5000)]
+        streaming, _ = streaming_and_scan(bars)
+        assert streaming.compute_volume_zscore() == 0.0
+        assert streaming.compute_rsi() == 100.0
+
+    def test_direct_append_falls_back_to_scan(self):
+        agg = BarAggregator('TEST', max_bars=1000)
+        for bar in random_bars(900):
+            agg.add_historical_bar(bar)
+        assert agg._streaming_in_sync()
+
+        # Bypass _append_bar: streaming state is stale, scan must be used
+        agg.bars.append(OneSecondBar(ts=900, price=500.0, delta=0.0, large_buy_count=0, large_sell_count=0))
+        assert not agg._streaming_in_sync()
+        assert agg.compute_extremes(1000)['position'] == 1.0
@@ -0,0 +1,150 @@
+"""
+BarStore — persistent 1-second bars for warm restarts
+
+Tests cover:
+1. Append / flush / load round-trip, since_ts filter; timed threaded flush
+2. Per-symbol retention and compaction
+3. Torn trailing record is ignored and trimmed
+4. Retention override parsing
+5. Manager: bars queued by the bar clock are stored; restart warms the
+   aggregator from the store and fetches only the REST gap
+"""
+
+import time
+from unittest.mock import MagicMock
+
+from core.bar_aggregator import BarAggregator, OneSecondBar
+from core.bar_store import BAR_RECORD_DTYPE, BarStore, parse_retention_by_symbol
+from core.signal_lifecycle import SignalLifecycleManager
+
+
+def make_bar(ts: int, price: float = 100.0, delta: float = 1.0) -> OneSecondBar:
+    return OneSecondBar(ts=ts, price=price, delta=delta, large_buy_count=ts % 2, large_sell_count=ts % 3)
+
+
+class TestBarStore:
+    def test_round_trip(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        bars = [make_bar(1000 + i, price=100 + i, delta=-i) for i in range(10)]
+        for bar in bars:
+            store.append('btcusdt', bar)
+        assert store.load('BTCUSDT') == []  # Not flushed yet
+
+        assert store.flush() == 10
+        assert store.load('BTCUSDT') == bars
+        assert store.load('BTCUSDT', since_ts=1005) == bars[5:]
+
+        # New instance (restart) reads the same file
+        assert BarStore(str(tmp_path)).load('BTCUSDT') == bars
+
+    def test_retention_and_compaction(self, tmp_path):
+        store = BarStore(
+            str(tmp_path),
+            retention_sec=100,
+            compaction_factor=2.0,
+            retention_by_symbol={'ethusdt': 10},
+        )
+        for i in range(250):
+            store.append('BTCUSDT', make_bar(i))
+            store.append('ETHUSDT', make_bar(i))
+            store.flush()
+
+        btc = store.load('BTCUSDT')
+        assert [b.ts for b in btc] == list(range(150, 250))
+        assert [b.ts for b in store.load('ETHUSDT')] == list(range(240, 250))
+
+        btc_records = (tmp_path / 'BTCUSDT.bars').stat().st_size // BAR_RECORD_DTYPE.itemsize
+        eth_records = (tmp_path / 'ETHUSDT.bars').stat().st_size // BAR_RECORD_DTYPE.itemsize
+        assert btc_records <= 200
+        assert eth_records <= 20
+        assert store.compactions > 0
+
+    def test_torn_record_is_ignored(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        store.append('BTCUSDT', make_bar(1))
+        store.flush()
+        with open(tmp_path / 'BTCUSDT.bars', 'ab') as f:
+            f.write(b'\x00' * 7)  # Crash mid-write
+
+        restarted = BarStore(str(tmp_path))
+        assert [b.ts for b in restarted.load('BTCUSDT')] == [1]
+        restarted.append('BTCUSDT', make_bar(2))
+        restarted.flush()
+        assert [b.ts for b in restarted.load('BTCUSDT')] == [1, 2]
+
+    async def test_background_flush_is_timed_and_off_loop(self, tmp_path):
+        store = BarStore(str(tmp_path), flush_interval_sec=60)
+        store.append('BTCUSDT', make_bar(1))
+        store.maybe_flush()
+        await store._flush_task
+        assert [b.ts for b in store.load('BTCUSDT')] == [1]
+
+        # Within the interval: bars stay buffered
+        store.append('BTCUSDT', make_bar(2))
+        store.maybe_flush()
+        assert store._flush_task.done()
+        assert store.get_stats()['pending'] == 1
+
+        # Shutdown writes the rest
+        await store.close()
+        assert [b.ts for b in store.load('BTCUSDT')] == [1, 2]
+
+    def test_parse_retention_by_symbol(self):
+        assert parse_retention_by_symbol('btcusdt=7200, ETHUSDT=60,bad,X=y') == {
+            'BTCUSDT': 7200, 'ETHUSDT': 60,
+        }
+        assert parse_retention_by_symbol('') == {}
+
+
+class TestManagerWarmRestart:
+    def make_manager(self, store, lookback):
+        strategy = MagicMock()
+        return SignalLifecycleManager(
+            composite_strategy=strategy,
+            position_manager=None,
+            lookback_service=lookback,
+            bar_store=store,
+        )
+
+    async def test_bar_clock_writes_bars(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        mgr = self.make_manager(store, MagicMock())
+
+        async def on_bar(symbol, bar):
+            pass
+        mgr.on_bar = on_bar
+
+        mgr._enqueue_bar('BTCUSDT', make_bar(1))
+        mgr._enqueue_bar('BTCUSDT', make_bar(2))
+        await mgr._run_bar_clock_tick(boundary=time.time())
+        await mgr.wait_bar_evaluations()
+        await store._flush_task    # Written in a worker thread, not by the tick itself
+
+        assert [b.ts for b in store.load('BTCUSDT')] == [1, 2]
+
+    async def test_restart_warms_from_store_then_fetches_gap(self, tmp_path):
+        now = int(time.time())
+        store = BarStore(str(tmp_path))
+        for ts in range(now - 500, now - 5):
+            store.append('BTCUSDT', make_bar(ts))
+        store.flush()
+
+        lookback = MagicMock()
+        gap_bars = [make_bar(now - 10), make_bar(now - 3), make_bar(now - 2)]
+
+        async def load_bars(symbol, lookback_sec, large_threshold):
+            # Aggregator is already warm before the network call
+            assert lc.bar_aggregator.bar_count == 495
+            return gap_bars
+        lookback.load_bars = load_bars
+
+        mgr = self.make_manager(store, lookback)
+        lc = MagicMock()
+        lc.symbol = 'BTCUSDT'
+        lc.bar_aggregator = BarAggregator('BTCUSDT')
+
+        loaded = await mgr._load_lookback_bars(lc, 600)
+
+        lookback.prime.assert_called_once()
+        assert loaded == 497
+        assert [b.ts for b in list(lc.bar_aggregator.bars)[-3:]] == [now - 6, now - 3, now - 2]
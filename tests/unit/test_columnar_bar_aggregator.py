@@ -0,0 +1,166 @@
+"""
+Parity tests: ColumnarBarAggregator vs BarAggregator
+
+Both aggregators are fed the same trade / tick / historical bar sequence
+and every public query must agree (exactly for sums and counts, to
+floating-point tolerance for the vectorised indicators).
+
+Tests cover:
+1. Bars, latest bar, counts after live trades, ticks and history
+2. Rolling delta / avg |delta| / large trade counts
+3. RSI, volume z-score, pair momentum, extremes
+4. Ring wrap-around (more bars than max_bars)
+5. Dynamic threshold calibration and on_bar_callback
+"""
+
+import random
+from unittest.mock import patch
+
+import pytest
+
+from core.bar_aggregator import BarAggregator, OneSecondBar
+from core.columnar_bar_aggregator import ColumnarBarAggregator
+
+
+# ══════════════════════════════════════════════════════
+# Helpers
+# ══════════════════════════════════════════════════════
+
+def feed(aggs, n_seconds: int, seed: int = 7, start_ts: int = 1_700_000_000):
+    """Drive identical random activity into every aggregator."""
+    rng = random.Random(seed)
+    price = 100.0
+    ts = start_ts
+    with patch('core.bar_aggregator.time.time', side_effect=lambda: ts):
+        for _ in range(n_seconds):
+            ts += 1
+            roll = rng.random()
+            if roll < 0.1:
+                # Quiet second → empty bar from the 1s timer
+                for agg in aggs:
+                    agg.tick()
+                continue
+            for _ in range(rng.randint(1, 6)):
+                price = max(1.0, price * (1 + rng.gauss(0, 0.001)))
+                qty = rng.choice([0.5, 3.0, 150.0])
+                is_buyer_maker = rng.random() < 0.5
+                ms = ts * 1000 + rng.randint(0, 999)
+                for agg in aggs:
+                    agg.on_trade(price, qty, is_buyer_maker, ms)
+            for agg in aggs:
+                agg.tick()
+
+
+def history(n: int, start_ts: int = 1_699_990_000):
+    rng = random.Random(3)
+    price = 50.0
+    bars = []
+    for i in range(n):
+        price = max(1.0, price + rng.gauss(0, 0.05))
+        bars.append(OneSecondBar(
+            ts=start_ts + i,
+            price=price,
+            delta=rng.gauss(0, 500),
+            large_buy_count=rng.randint(0, 2),
+            large_sell_count=rng.randint(0, 2),
+        ))
+    return bars
+
+
+def make_pair(max_bars: int = 4000):
+    return BarAggregator('TESTUSDT', max_bars=max_bars), ColumnarBarAggregator('TESTUSDT', max_bars=max_bars)
+
+
+def assert_parity(ref: BarAggregator, col: ColumnarBarAggregator):
+    assert col.bar_count == ref.bar_count
+    assert col.ready_for_trading == ref.ready_for_trading
+    assert col.get_latest_bar() == ref.get_latest_bar()
+    assert list(col.bars) == list(ref.bars)
+
+    for window in (1, 20, 60, 300, 3600, 10_000):
+        assert col.get_rolling_delta(window) == ref.get_rolling_delta(window)
+        assert col.get_avg_abs_delta(window) == ref.get_avg_abs_delta(window)
+        assert col.get_large_trade_counts(window) == ref.get_large_trade_counts(window)
+        assert col.compute_pair_momentum(window) == pytest.approx(ref.compute_pair_momentum(window), rel=1e-12)
+        assert col.compute_extremes(window) == pytest.approx(ref.compute_extremes(window), rel=1e-12)
+
+    for period in (14, 840):
+        assert col.compute_rsi(period) == pytest.approx(ref.compute_rsi(period), rel=1e-9)
+
+    for window, recent in ((3600, 60), (500, 30)):
+        assert col.compute_volume_zscore(window, recent) == pytest.approx(
+            ref.compute_volume_zscore(window, recent), rel=1e-9, abs=1e-9
+        )
+
+
+# ══════════════════════════════════════════════════════
+# Parity tests
+# ══════════════════════════════════════════════════════
+
+class TestColumnarParity:
+    def test_empty(self):
+        ref, col = make_pair()
+        assert_parity(ref, col)
+        assert col.tick() is None
+        assert col.flush_bar() is None
+
+    def test_live_trades_and_ticks(self):
+        ref, col = make_pair()
+        feed([ref, col], 1200)
+        assert_parity(ref, col)
+
+    def test_full_hour_for_indicators(self):
+        ref, col = make_pair()
+        feed([ref, col], 3800)
+        assert ref.bar_count >= 3600
+        assert_parity(ref, col)
+
+    def test_historical_then_live(self):
+        ref, col = make_pair()
+        for bar in history(900):
+            ref.add_historical_bar(bar)
+            col.add_historical_bar(bar)
+        feed([ref, col], 300)
+        assert_parity(ref, col)
+
+    def test_wraparound(self):
+        ref, col = make_pair(max_bars=250)
+        feed([ref, col], 1000)
+        assert ref.bar_count == 250
+        assert_parity(ref, col)
+
+    def test_flat_prices(self):
+        ref, col = make_pair()
+        for i in range(1000):
+            bar = OneSecondBar(ts=i, price=100.0, delta=10.0, large_buy_count=0, large_sell_count=0)
+            ref.add_historical_bar(bar)
+            col.add_historical_bar(bar)
+        assert_parity(ref, col)
+        assert col.compute_rsi(840) == 100.0
+        assert col.compute_extremes()['position'] == 0.5
+
+    def test_calibration_and_callback(self):
+        ref, col = make_pair()
+        ref_bars, col_bars = [], []
+        ref.on_bar_callback = ref_bars.append
+        col.on_bar_callback = col_bars.append
+
+        feed([ref, col], 400)
+        assert col_bars == ref_bars
+        assert col.calibrate_dynamic_threshold() == ref.calibrate_dynamic_threshold()
+
+        feed([ref, col], 200, seed=11, start_ts=1_700_000_400)
+        assert_parity(ref, col)
+
+
+class TestColumnarView:
+    def test_bars_view_indexing(self):
+        col = ColumnarBarAggregator('TESTUSDT', max_bars=5)
+        for bar in history(8):
+            col.add_historical_bar(bar)
+
+        assert len(col.bars) == 5
+        assert col.bars[0] == history(8)[3]
+        assert col.bars[-1] == history(8)[7]
+        with pytest.raises(IndexError):
+            col.bars[5]
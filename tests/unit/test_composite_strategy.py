@@ -0,0 +1,188 @@
+"""
+CompositeStrategy — compiled score index, per-signal match cache, hot reload
+
+Tests cover:
+1. CompiledMatcher returns the same first match by priority as a linear walk
+2. get_rule_for_score and score range boundaries [score_min, score_max)
+3. The match is cached on the signal: processor + lifecycle manager match once
+4. Reload applies a changed file and invalidates cached matches
+5. Invalid files are rejected and the current rules stay active
+6. The watcher picks up file changes
+"""
+
+import asyncio
+import json
+import random
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core.composite_strategy import (
+    SIGNAL_MATCH_KEY,
+    CompiledMatcher,
+    CompositeStrategy,
+)
+from core.signal_lifecycle import SignalLifecycleManager
+from core.signal_processor_websocket import WebSocketSignalProcessor
+
+
+def rule(priority, score_min, score_max, leverage=10, rsi_min=0, vol_min=0, oi_min=0):
+    return {
+        'priority': priority,
+        'score_range': f"{score_min}-{score_max}",
+        'filter': {'score_min': score_min, 'score_max': score_max,
+                   'rsi_min': rsi_min, 'vol_min': vol_min, 'oi_min': oi_min},
+        'strategy': {'leverage': leverage, 'sl_pct': 5},
+    }
+
+
+def write_strategy(path, rules, version='1.0'):
+    path.write_text(json.dumps({'version': version, 'rules': rules}))
+
+
+@pytest.fixture
+def strategy_file(tmp_path):
+    path = tmp_path / 'composite_strategy.json'
+    write_strategy(path, [rule(1, 999, 1000, leverage=6), rule(2, 100, 999, leverage=10),
+                          rule(3, 200, 300, leverage=20, rsi_min=50)])
+    return path
+
+
+def linear_match(rules, score, rsi, vol_zscore, oi_delta):
+    """Reference: the previous linear first-match walk"""
+    for r in rules:
+        f = r.filter
+        if f.score_min <= score < f.score_max and rsi >= f.rsi_min \
+                and vol_zscore >= f.vol_min and oi_delta >= f.oi_min:
+            return r
+    return None
+
+
+class TestCompiledMatcher:
+    def test_same_as_linear_walk(self, tmp_path):
+        rng = random.Random(7)
+        rules = []
+        for priority in rng.sample(range(1, 500), 120):
+            lo = rng.randrange(0, 900, 10)
+            rules.append(rule(priority, lo, lo + rng.choice([10, 20, 50, 200]),
+                              rsi_min=rng.choice([0, 0, 30, 60]), vol_min=rng.choice([0, 1.5, 3]),
+                              oi_min=rng.choice([0, 0, 2])))
+        path = tmp_path / 'strategy.json'
+        write_strategy(path, rules)
+        cs = CompositeStrategy(path)
+
+        for _ in range(5000):
+            score = rng.choice([rng.uniform(-10, 1200), float(rng.randrange(0, 1100, 10))])
+            features = (score, rng.uniform(0, 100), rng.uniform(-2, 5), rng.uniform(-3, 5))
+            expected = linear_match(cs.rules, *features)
+            assert cs.match_signal(*features) is (expected.strategy if expected else None)
+
+    def test_score_boundaries(self, strategy_file):
+        cs = CompositeStrategy(strategy_file)
+
+        assert cs.match_signal(99.9) is None
+        assert cs.match_signal(100).leverage == 10
+        assert cs.match_signal(250, rsi=40).leverage == 10             # Rule 3 needs rsi >= 50
+        assert cs.match_signal(250, rsi=55).leverage == 10             # Rule 2 has priority
+        assert cs.match_signal(999).leverage == 6
+        assert cs.match_signal(1000) is None
+        assert cs.match_signal(float('nan')) is None
+        assert cs.get_rule_for_score(998.5).priority == 2
+        assert cs.get_rule_for_score(5000) is None
+        assert cs.get_stats()['score_intervals'] == 4                  # 100|200|300|999|1000
+
+    def test_empty(self):
+        matcher = CompiledMatcher([])
+        assert matcher.match(100, 0, 0, 0) == -1 and matcher.match_score(100) == -1
+
+
+class TestSignalCache:
+    async def test_processor_and_lifecycle_match_once(self, strategy_file):
+        cs = CompositeStrategy(strategy_file)
+        manager = SignalLifecycleManager(composite_strategy=cs, position_manager=None)
+        manager._open_position = AsyncMock(return_value=False)
+        manager._cleanup_lifecycle = AsyncMock()
+        processor = WebSocketSignalProcessor(MagicMock(), MagicMock(), MagicMock(), MagicMock())
+        processor.set_lifecycle_manager(manager)
+
+        calls = []
+        original = CompiledMatcher.match
+
+        def counting_match(self, *args):
+            calls.append(args)
+            return original(self, *args)
+
+        signals = [{'symbol': 'BTCUSDT', 'total_score': 150, 'rsi': 40},
+                   {'symbol': 'ETHUSDT', 'total_score': 50}]
+        with patch.object(CompiledMatcher, 'match', counting_match):
+            remaining = await processor._delegate_to_lifecycle(signals)
+
+        assert remaining == [signals[1]]
+        assert len(calls) == 2                                         # One per signal
+        assert signals[0][SIGNAL_MATCH_KEY] == (cs.matcher.generation, 1)
+        assert signals[1][SIGNAL_MATCH_KEY] == (cs.matcher.generation, -1)
+        assert cs.get_stats()['match_cache_hits'] == 1
+        assert manager._open_position.await_args.args[0].strategy.leverage == 10
+        json.dumps(signals)                                            # Cache entry stays serializable
+
+    def test_reload_invalidates_cache(self, strategy_file):
+        cs = CompositeStrategy(strategy_file)
+        signal = {'total_score': 150}
+        assert cs.match_signal_dict(signal).strategy.leverage == 10
+
+        write_strategy(strategy_file, [rule(1, 100, 200, leverage=3)], version='2.0')
+        assert cs.reload()
+        assert cs.match_signal_dict(signal).strategy.leverage == 3
+        assert cs.match_cache_hits == 0
+
+
+class TestReload:
+    def test_unchanged_file_not_reloaded(self, strategy_file):
+        cs = CompositeStrategy(strategy_file)
+        assert not cs.reload()
+        assert cs.reload(force=True)
+        assert cs.get_stats()['reloads'] == 1
+
+    @pytest.mark.parametrize('content', [
+        '{"version": "2.0", "rules": [',                               # Truncated write
+        json.dumps({'version': '2.0', 'rules': []}),
+        json.dumps({'version': '2.0', 'rules': [rule(1, 300, 200)]}),
+        json.dumps({'version': '2.0', 'rules': [rule(1, 100, 200, leverage=0)]}),
+        json.dumps({'version': '2.0', 'rules': [rule(1, 100, 200), {**rule(2, 0, 100), 'filter': {'score_min': 'x'}}]}),
+    ])
+    def test_invalid_file_keeps_current_rules(self, strategy_file, content):
+        cs = CompositeStrategy(strategy_file)
+        matcher = cs.matcher
+        strategy_file.write_text(content)
+
+        assert not cs.reload()
+        assert cs.matcher is matcher and cs.version == '1.0' and len(cs.rules) == 3
+        assert cs.match_signal(150).leverage == 10
+        stats = cs.get_stats()
+        assert stats['reload_failures'] == 1 and stats['last_reload_error']
+        assert not cs.reload()                                         # Same broken file not retried
+
+        write_strategy(strategy_file, [rule(1, 100, 200, leverage=4)], version='2.1')
+        assert cs.reload()
+        assert cs.version == '2.1' and cs.match_signal(150).leverage == 4
+        assert cs.get_stats()['last_reload_error'] is None
+
+    def test_missing_file_keeps_current_rules(self, strategy_file):
+        cs = CompositeStrategy(strategy_file)
+        strategy_file.unlink()
+        assert not cs.reload()
+        assert cs.reload_failures == 1 and cs.match_signal(150).leverage == 10
+
+    async def test_watcher(self, strategy_file):
+        cs = CompositeStrategy(strategy_file)
+        cs.start_watching(interval_sec=0.01)
+        write_strategy(strategy_file, [rule(1, 0, 1000, leverage=2)], version='3.0')
+
+        for _ in range(500):
+            if cs.version == '3.0':
+                break
+            await asyncio.sleep(0.01)
+        await cs.stop_watching()
+
+        assert cs.version == '3.0' and cs.match_signal(10).leverage == 2
+        assert cs._watch_task is None
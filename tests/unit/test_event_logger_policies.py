@@ -0,0 +1,107 @@
+"""
+EventLogger sampling / aggregation policies
+
+Tests cover:
+1. Types without a policy are queued as before
+2. sample:N keeps 1 in N events
+3. aggregate: one summary row per window with count and min/max/last price
+4. Ended windows are emitted by flush_aggregates / shutdown
+5. Policy parsing, per-type emitted/suppressed counters in get_stats()
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+from core.event_logger import EventLogger, EventPolicy, EventType, parse_event_policies
+
+
+def queued(event_logger: EventLogger):
+    events = []
+    while not event_logger._event_queue.empty():
+        events.append(event_logger._event_queue.get_nowait())
+    return events
+
+
+def price_update(price):
+    return {'symbol': 'BTCUSDT', 'position_id': 1, 'new_price': price, 'source': 'websocket'}
+
+
+class TestPolicies:
+    async def test_default_types_written_as_is(self):
+        event_logger = EventLogger(MagicMock())
+        await event_logger.log_event(EventType.ORDER_PLACED, {'a': 1}, symbol='BTCUSDT')
+        await event_logger.log_event(EventType.ORDER_PLACED, {'a': 2}, symbol='BTCUSDT')
+
+        assert [json.loads(e['event_data'])['a'] for e in queued(event_logger)] == [1, 2]
+        assert event_logger.get_stats()['emitted'] == {'order_placed': 2}
+
+    async def test_sample_keeps_one_in_n(self):
+        event_logger = EventLogger(MagicMock(), policies={
+            EventType.TRAILING_STOP_UPDATED: EventPolicy('sample', every=3),
+        })
+        for i in range(7):
+            await event_logger.log_event(EventType.TRAILING_STOP_UPDATED, {'i': i})
+
+        assert [json.loads(e['event_data'])['i'] for e in queued(event_logger)] == [0, 3, 6]
+        stats = event_logger.get_stats()
+        assert stats['emitted']['trailing_stop_updated'] == 3
+        assert stats['suppressed']['trailing_stop_updated'] == 4
+
+    async def test_aggregate_window(self):
+        event_logger = EventLogger(MagicMock())  # POSITION_UPDATED aggregates by default
+        with patch('core.event_logger.time.monotonic', return_value=1000.0):
+            for price in (100.0, 98.0, 103.0, 101.0):
+                await event_logger.log_event(
+                    EventType.POSITION_UPDATED, price_update(price),
+                    position_id=1, symbol='BTCUSDT', exchange='binance',
+                )
+        assert queued(event_logger) == []
+
+        # Next event after the window closes the previous one
+        with patch('core.event_logger.time.monotonic', return_value=1061.0):
+            await event_logger.log_event(
+                EventType.POSITION_UPDATED, price_update(105.0),
+                position_id=1, symbol='BTCUSDT', exchange='binance',
+            )
+
+        (row,) = queued(event_logger)
+        summary = json.loads(row['event_data'])
+        assert row['event_type'] == 'position_updated'
+        assert (row['position_id'], row['symbol'], row['exchange']) == (1, 'BTCUSDT', 'binance')
+        assert summary['count'] == 4
+        assert (summary['min_price'], summary['max_price'], summary['last_price']) == (98.0, 103.0, 101.0)
+        assert summary['last']['new_price'] == 101.0
+
+        stats = event_logger.get_stats()
+        assert stats['emitted'] == {'position_updated': 1}
+        assert stats['suppressed'] == {'position_updated': 3}
+        assert stats['open_aggregates'] == 1
+
+    async def test_windows_are_per_position_and_flushed(self):
+        event_logger = EventLogger(MagicMock())
+        with patch('core.event_logger.time.monotonic', return_value=1000.0):
+            await event_logger.log_event(EventType.POSITION_UPDATED, price_update(1.0), position_id=1, symbol='A')
+            await event_logger.log_event(EventType.POSITION_UPDATED, price_update(2.0), position_id=2, symbol='B')
+
+        with patch('core.event_logger.time.monotonic', return_value=1030.0):
+            await event_logger.flush_aggregates()
+        assert queued(event_logger) == []
+
+        await event_logger.shutdown()
+        rows = queued(event_logger)
+        assert sorted(row['symbol'] for row in rows) == ['A', 'B']
+        assert event_logger.get_stats()['open_aggregates'] == 0
+
+
+class TestParsePolicies:
+    def test_parse(self):
+        policies = parse_event_policies(
+            'position_updated=always, trailing_stop_updated=sample:10,'
+            'signal_filtered=aggregate:30,bogus=sample:2,order_placed=sample:x'
+        )
+        assert policies == {
+            EventType.POSITION_UPDATED: EventPolicy('always'),
+            EventType.TRAILING_STOP_UPDATED: EventPolicy('sample', every=10),
+            EventType.SIGNAL_FILTERED: EventPolicy('aggregate', window_sec=30.0),
+        }
+        assert parse_event_policies('') == {}
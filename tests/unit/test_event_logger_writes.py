@@ -0,0 +1,247 @@
+"""
+EventLogger batch writes — COPY, adaptive batch size, spill-to-disk
+
+Uses a fake asyncpg pool that records COPY / executemany calls.
+
+Tests cover:
+1. Batches are written with copy_records_to_table (or executemany INSERT)
+2. Batch size grows with queue depth
+3. Failed write / full queue spill to disk; spill replayed when the DB is back
+4. Torn spill line is skipped
+5. Rejected batch falls back to row by row; a bad row is dead-lettered
+   after EVENT_MAX_ATTEMPTS instead of being replayed forever
+6. Replay streams the file in chunks and keeps the unread tail on outage
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import asyncpg
+
+from core.event_logger import (
+    EVENT_BATCH_MAX, EVENT_BATCH_MIN, EVENT_COLUMNS, EVENT_MAX_ATTEMPTS, EventLogger, EventType,
+)
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def copy_records_to_table(self, table, schema_name, columns, records):
+        self.pool.check()
+        if any(r[3] in self.pool.bad for r in records):
+            raise asyncpg.DataError('invalid input syntax')
+        self.pool.copies.append((schema_name, table, columns, list(records)))
+
+    async def executemany(self, query, records):
+        self.pool.check()
+        self.pool.inserts.append(list(records))
+
+
+class FakePool:
+    def __init__(self):
+        self.copies = []
+        self.inserts = []
+        self.down = False
+        self.bad = set()        # position_ids the server rejects
+
+    def check(self):
+        if self.down:
+            raise ConnectionError('database down')
+
+    def acquire(self):
+        pool = self
+
+        class _Ctx:
+            async def __aenter__(self):
+                return FakeConnection(pool)
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Ctx()
+
+    def rows(self):
+        return [r for _, _, _, records in self.copies for r in records]
+
+
+def make_event(i):
+    return {
+        'event_type': 'order_placed', 'event_data': json.dumps({'i': i}), 'correlation_id': None,
+        'position_id': i, 'order_id': None, 'symbol': 'BTCUSDT', 'exchange': 'binance',
+        'severity': 'INFO', 'error_message': None, 'stack_trace': None,
+        'created_at': datetime(2026, 1, 1, tzinfo=timezone.utc),
+    }
+
+
+class TestWriteBatch:
+    async def test_copy(self, tmp_path):
+        pool = FakePool()
+        event_logger = EventLogger(pool, spill_path=str(tmp_path / 'spill.jsonl'))
+
+        assert await event_logger._write_batch([make_event(1), make_event(2)])
+
+        ((schema, table, columns, records),) = pool.copies
+        assert (schema, table, columns) == ('monitoring', 'events', EVENT_COLUMNS)
+        assert [r[3] for r in records] == [1, 2]
+        assert event_logger.get_stats()['rows_written'] == 2
+
+    async def test_insert_mode(self, tmp_path):
+        pool = FakePool()
+        event_logger = EventLogger(pool, use_copy=False, spill_path=str(tmp_path / 'spill.jsonl'))
+
+        await event_logger._write_batch([make_event(1)])
+
+        assert pool.copies == []
+        assert len(pool.inserts[0]) == 1
+
+    async def test_batch_size_follows_queue_depth(self, tmp_path):
+        event_logger = EventLogger(FakePool(), spill_path=str(tmp_path / 'spill.jsonl'))
+        assert event_logger._target_batch_size() == EVENT_BATCH_MIN
+
+        for i in range(3000):
+            event_logger._event_queue.put_nowait(make_event(i))
+        assert event_logger._target_batch_size() == 3000
+
+        for i in range(7000):
+            event_logger._event_queue.put_nowait(make_event(i))
+        assert event_logger._target_batch_size() == EVENT_BATCH_MAX
+
+
+class TestSpill:
+    async def test_failed_write_spills_and_replays(self, tmp_path):
+        pool = FakePool()
+        spill = tmp_path / 'spill.jsonl'
+        event_logger = EventLogger(pool, spill_path=str(spill))
+
+        pool.down = True
+        assert not await event_logger._write_batch([make_event(1), make_event(2)])
+        assert event_logger._has_spill()
+
+        pool.down = False
+        assert await event_logger._replay_spill() == 2
+        assert [r[3] for r in pool.rows()] == [1, 2]
+        assert pool.rows()[0][10] == datetime(2026, 1, 1, tzinfo=timezone.utc)
+        assert not event_logger._has_spill()
+
+    async def test_full_queue_spills_instead_of_writing(self, tmp_path):
+        pool = FakePool()
+        event_logger = EventLogger(pool, spill_path=str(tmp_path / 'spill.jsonl'))
+        event_logger._event_queue = asyncio.Queue(maxsize=1)
+
+        await event_logger.log_event(EventType.ORDER_PLACED, {'i': 1})
+        await event_logger.log_event(EventType.ORDER_PLACED, {'i': 2})
+
+        assert pool.copies == []  # No write on the hot path
+        assert event_logger.spilled == 1
+
+        await event_logger._replay_spill()
+        assert json.loads(pool.rows()[0][1]) == {'i': 2}
+
+    async def test_worker_replays_when_db_recovers(self, tmp_path):
+        pool = FakePool()
+        event_logger = EventLogger(pool, spill_path=str(tmp_path / 'spill.jsonl'))
+        event_logger._flush_interval = 0
+        event_logger._spill([make_event(1)])  # Left over from an outage / previous run
+
+        event_logger._worker_task = asyncio.create_task(event_logger._event_worker())
+        await event_logger.log_event(EventType.ORDER_PLACED, {'i': 2})
+        for _ in range(50):
+            if len(pool.rows()) == 2:
+                break
+            await asyncio.sleep(0.05)
+        await event_logger.shutdown()
+
+        assert sorted(r[3] or 0 for r in pool.rows()) == [0, 1]
+        assert event_logger.replayed == 1
+
+    async def test_torn_line_skipped(self, tmp_path):
+        pool = FakePool()
+        spill = tmp_path / 'spill.jsonl'
+        event_logger = EventLogger(pool, spill_path=str(spill))
+        event_logger._spill([make_event(1)])
+        event_logger._close_spill_file()
+        with open(spill, 'a') as f:
+            f.write('{"event_type": "order_pl')  # Crash mid-write
+
+        assert await event_logger._replay_spill() == 1
+
+
+class TestRejectedRows:
+    async def test_bad_row_does_not_block_batch(self, tmp_path):
+        pool = FakePool()
+        pool.bad = {2}
+        event_logger = EventLogger(pool, spill_path=str(tmp_path / 'spill.jsonl'))
+
+        assert await event_logger._write_batch([make_event(1), make_event(2), make_event(3)])
+
+        assert sorted(r[3] for r in pool.rows()) == [1, 3]
+        assert event_logger.rejected_rows == 1
+        assert event_logger._db_ok
+
+    async def test_bad_row_is_dead_lettered(self, tmp_path):
+        pool = FakePool()
+        pool.bad = {2}
+        spill = tmp_path / 'spill.jsonl'
+        event_logger = EventLogger(pool, spill_path=str(spill))
+
+        await event_logger._write_batch([make_event(1), make_event(2)])
+        replays = 0
+        while event_logger._has_spill():
+            await event_logger._replay_spill()
+            replays += 1
+            assert replays < 10
+
+        assert replays == EVENT_MAX_ATTEMPTS - 1
+        assert event_logger.dead_lettered == 1
+        (dead,) = [json.loads(line) for line in open(str(spill) + '.dead')]
+        assert dead['position_id'] == 2
+        assert dead['_attempts'] == EVENT_MAX_ATTEMPTS
+        assert 'invalid input syntax' in dead['_last_error']
+
+
+class TestReplayStreaming:
+    async def test_outage_keeps_unread_tail(self, tmp_path):
+        pool = FakePool()
+        spill = tmp_path / 'spill.jsonl'
+        event_logger = EventLogger(pool, spill_path=str(spill))
+        event_logger._max_batch_size = 2
+        event_logger._spill([make_event(i) for i in range(5)])
+
+        writes = 0
+        original = event_logger._write_records
+
+        async def write_then_fail(records):
+            nonlocal writes
+            writes += 1
+            if writes == 2:
+                pool.down = True
+            await original(records)
+        event_logger._write_records = write_then_fail
+
+        assert await event_logger._replay_spill() == 2
+        # Failed chunk went back to the spill file, the unread tail stayed in .replay
+        assert [json.loads(line)['position_id'] for line in open(str(spill) + '.replay')] == [4]
+        assert [json.loads(line)['position_id'] for line in open(spill)] == [2, 3]
+
+        pool.down = False
+        event_logger._write_records = original
+        await event_logger._replay_spill()
+        await event_logger._replay_spill()
+        assert sorted(r[3] for r in pool.rows()) == [0, 1, 2, 3, 4]
+        assert not event_logger._has_spill()
+
+    async def test_queue_full_spill_is_not_flushed_per_event(self, tmp_path):
+        spill = tmp_path / 'spill.jsonl'
+        event_logger = EventLogger(FakePool(), spill_path=str(spill))
+        event_logger._event_queue = asyncio.Queue(maxsize=1)
+
+        for i in range(3):
+            await event_logger.log_event(EventType.ORDER_PLACED, {'i': i})
+
+        assert event_logger.spilled == 2
+        assert spill.stat().st_size == 0      # Still buffered
+        event_logger._flush_spill_file()      # Once per worker pass
+        assert len(spill.read_text().splitlines()) == 2
+        event_logger._close_spill_file()
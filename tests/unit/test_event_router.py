@@ -0,0 +1,212 @@
+"""
+EventRouter — per-key ordered lanes, immutable handler tables, overflow policies
+
+Tests cover:
+1. Events of one symbol are handled in order; a slow symbol does not stall others
+2. Routing key: normalized symbol, position id, shared lane
+3. Wildcard handlers are merged without growing the registered tables
+4. Handler tables are swapped on subscribe (in-flight dispatch unaffected)
+5. Overflow policies: block (backpressure), drop_oldest, drop_newest;
+   emits from inside a handler never block
+6. Per-event-type counters: dispatched, dropped, handler errors, latency, queue depth
+"""
+
+import asyncio
+
+import pytest
+
+from websocket.event_router import (
+    BLOCK, DROP_NEWEST, DROP_OLDEST, SHARED_LANE, EventRouter, default_routing_key, parse_overflow_policies,
+)
+
+
+@pytest.fixture
+def router():
+    return EventRouter()
+
+
+class TestLanes:
+    async def test_order_per_symbol_parallel_across(self, router):
+        seen = []
+        release = asyncio.Event()
+
+        @router.on('position.update')
+        async def handler(data):
+            if data['symbol'] == 'SLOWUSDT':
+                await release.wait()
+            seen.append((data['symbol'], data['n']))
+
+        for n in range(3):
+            await router.emit('position.update', {'symbol': 'SLOWUSDT', 'n': n})
+            await router.emit('position.update', {'symbol': 'FASTUSDT', 'n': n})
+        await asyncio.sleep(0.01)
+
+        assert seen == [('FASTUSDT', 0), ('FASTUSDT', 1), ('FASTUSDT', 2)]
+        release.set()
+        await router.join()
+        assert [n for s, n in seen if s == 'SLOWUSDT'] == [0, 1, 2]
+        assert router.get_stats()['lanes'] == 0                 # Drained lanes are retired
+
+    def test_routing_key(self):
+        assert default_routing_key('order.update', {'symbol': 'BTC/USDT:USDT'}) == 'BTCUSDT'
+        assert default_routing_key('x', {'s': 'ethusdt'}) == 'ETHUSDT'
+        assert default_routing_key('x', {'position_id': 7}) == 'position:7'
+        assert default_routing_key('error', {'error': 'boom'}) == SHARED_LANE
+
+    async def test_same_symbol_formats_share_lane(self, router):
+        seen = []
+
+        @router.on('*')
+        async def handler(data):
+            await asyncio.sleep(0)
+            seen.append(data['n'])
+
+        await router.emit('position.update', {'symbol': 'BTCUSDT', 'n': 1})
+        await router.emit('order.update', {'symbol': 'BTC/USDT:USDT', 'n': 2})
+        await router.emit('algo.update', {'symbol': 'BTCUSDT', 'n': 3})
+        await router.join()
+        assert seen == [1, 2, 3]
+
+
+class TestHandlerTables:
+    async def test_wildcard_merge_does_not_grow(self, router):
+        calls = []
+        router.add_handler('price_update', lambda d: calls.append('price'))
+        router.add_handler('*', lambda d: calls.append('any'))
+
+        for _ in range(3):
+            await router.emit('price_update', {'symbol': 'BTCUSDT'})
+        await router.emit('other', {'symbol': 'BTCUSDT'})
+        await router.join()
+
+        assert calls == ['price', 'any'] * 3 + ['any']
+        assert router.get_stats()['handlers'] == {'price_update': 1, '*': 1}
+
+    async def test_subscribe_during_dispatch(self, router):
+        calls = []
+
+        async def late(data):
+            calls.append('late')
+
+        @router.on('tick')
+        async def first(data):
+            router.add_handler('tick', late)                   # Takes effect from the next event
+            calls.append('first')
+
+        await router.emit('tick', {'symbol': 'BTCUSDT'})
+        await router.join()
+        assert calls == ['first']
+
+        router.remove_handler('tick', first)
+        router.remove_handler('tick', first)                  # Unknown handler: no-op
+        await router.emit('tick', {'symbol': 'BTCUSDT'})
+        await router.join()
+        assert calls == ['first', 'late']
+
+
+class TestOverflow:
+    async def test_block_backpressure(self):
+        router = EventRouter(lane_size=2)
+        release = asyncio.Event()
+        handled = []
+
+        @router.on('tick')
+        async def handler(data):
+            await release.wait()
+            handled.append(data['n'])
+
+        await router.emit('tick', {'symbol': 'BTCUSDT', 'n': 0})
+        await asyncio.sleep(0)                                 # 0 in flight
+        for n in (1, 2):                                       # Lane full
+            await router.emit('tick', {'symbol': 'BTCUSDT', 'n': n})
+        blocked = asyncio.create_task(router.emit('tick', {'symbol': 'BTCUSDT', 'n': 3}))
+        await asyncio.sleep(0.01)
+        assert not blocked.done() and router.stats['emit_waits'] == 1
+
+        release.set()
+        await blocked
+        await router.join()
+        assert handled == [0, 1, 2, 3]
+
+    async def test_drop_policies(self):
+        router = EventRouter(lane_size=2, overflow_policies={'tick': DROP_OLDEST, 'info': DROP_NEWEST})
+        release = asyncio.Event()
+        handled = []
+
+        @router.on('*')
+        async def handler(data):
+            await release.wait()
+            handled.append(data['n'])
+
+        await router.emit('tick', {'symbol': 'BTCUSDT', 'n': 0})           # In flight
+        await asyncio.sleep(0)
+        await router.emit('tick', {'symbol': 'BTCUSDT', 'n': 1})
+        await router.emit('info', {'symbol': 'BTCUSDT', 'n': 2})
+        await router.emit('tick', {'symbol': 'BTCUSDT', 'n': 3})           # Drops tick 1
+        await router.emit('info', {'symbol': 'BTCUSDT', 'n': 4})           # Dropped
+        release.set()
+        await router.join()
+
+        assert handled == [0, 2, 3]
+        events = router.get_stats()['events']
+        assert events['tick']['dropped'] == 1 and events['info']['dropped'] == 1
+        assert router.stats['events_dropped'] == 2
+
+    async def test_emit_from_handler_never_blocks(self):
+        router = EventRouter(lane_size=1)
+        handled = []
+
+        @router.on('tick')
+        async def handler(data):
+            handled.append(data['n'])
+            if data['n'] < 3:
+                await router.emit('tick', {'symbol': 'BTCUSDT', 'n': data['n'] + 1})
+                await router.emit('tick', {'symbol': 'BTCUSDT', 'n': 10 + data['n']})
+
+        await router.emit('tick', {'symbol': 'BTCUSDT', 'n': 0})
+        await asyncio.wait_for(router.join(), 1)
+        assert handled[:2] == [0, 1] and len(handled) == 7
+
+    def test_parse_policies(self):
+        assert parse_overflow_policies('position.update=drop_oldest, price_update=DROP_NEWEST,x=bad,=block') == {
+            'position.update': DROP_OLDEST, 'price_update': DROP_NEWEST,
+        }
+        assert parse_overflow_policies('') == {}
+        assert BLOCK == EventRouter().default_policy
+
+
+class TestStats:
+    async def test_counters(self, router):
+        @router.on('position.update')
+        async def slow(data):
+            await asyncio.sleep(0.01)
+
+        @router.on('position.update')
+        async def broken(data):
+            raise RuntimeError("db down")
+
+        for i in range(4):
+            await router.emit('position.update', {'symbol': 'BTCUSDT'})
+        assert router.get_stats()['events']['position.update']['queued'] == 4
+        assert router.get_stats()['queue_size'] == 4
+
+        await router.join()
+        stats = router.get_stats()
+        events = stats['events']['position.update']
+        assert events['dispatched'] == 4 and events['handler_errors'] == 4 and events['queued'] == 0
+        assert events['max_queued'] == 4 and stats['max_lane_depth'] == 4
+        assert events['latency_max_ms'] >= 40 > events['latency_avg_ms'] >= 10
+        assert stats['events_processed'] == 4 and stats['queue_size'] == 0
+
+    async def test_stop_discards(self, router):
+        @router.on('tick')
+        async def handler(data):
+            await asyncio.sleep(10)
+
+        for symbol in ('A', 'B'):
+            for _ in range(3):
+                await router.emit('tick', {'symbol': symbol})
+        await asyncio.sleep(0)
+        await router.stop()
+        stats = router.get_stats()
+        assert stats['lanes'] == 0 and stats['events']['tick']['queued'] == 0
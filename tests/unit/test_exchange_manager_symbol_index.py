@@ -0,0 +1,121 @@
+"""
+ExchangeManager reverse symbol index and precomputed market filters
+
+Uses a recorded Binance USD-M load_markets result (tests/unit/fixtures).
+
+Tests cover:
+1. find_exchange_symbol via the index matches the previous linear scan for every market
+2. Normalized-id collisions resolve to the first market, as before
+3. get_min_amount / get_step_size / get_tick_size match the previous per-call parsing
+4. Index is rebuilt when markets are reloaded or replaced
+"""
+
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from core.exchange_manager import ExchangeManager
+from utils.symbol_helpers import normalize_symbol
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'binance_usdm_markets.json'
+
+
+def load_markets():
+    with open(FIXTURE) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def manager():
+    em = ExchangeManager(
+        'binance', {'api_key': 'test', 'api_secret': 'test', 'testnet': True},
+        repository=None, position_manager=None,
+    )
+    em._set_markets(load_markets())
+    return em
+
+
+def scan_symbol(markets, normalized_symbol):
+    """Previous find_exchange_symbol: exact match, then linear scan"""
+    if normalized_symbol in markets:
+        return normalized_symbol
+    for market_symbol in markets.keys():
+        if normalize_symbol(market_symbol) == normalized_symbol:
+            return market_symbol
+    return None
+
+
+def scan_filters(market):
+    """Previous get_min_amount / get_step_size / get_tick_size parsing (Binance)"""
+    min_amount = step_size = None
+    for f in market['info']['filters']:
+        if f['filterType'] == 'LOT_SIZE':
+            min_amount = float(f['minQty'])
+            step_size = float(f['stepSize'])
+    if min_amount is None:
+        min_amount = market['limits']['amount']['min']
+    if step_size is None:
+        step_size = market['precision']['amount']
+    return min_amount, step_size, market['precision']['price']
+
+
+class TestSymbolIndex:
+    def test_fixture_is_recorded_markets(self, manager):
+        assert len(manager.markets) > 50
+        assert 'BTC/USDT:USDT' in manager.markets
+
+    def test_index_matches_scan_for_every_market(self, manager):
+        markets = manager.markets
+        for market_symbol, market in markets.items():
+            for candidate in (market_symbol, market['id'], normalize_symbol(market_symbol)):
+                assert manager.find_exchange_symbol(candidate) == scan_symbol(markets, candidate), candidate
+
+    def test_unknown_symbol(self, manager):
+        assert manager.find_exchange_symbol('NOSUCHUSDT') is None
+        assert manager.get_market_filters('NOSUCHUSDT') is None
+        assert manager.get_min_amount('NOSUCHUSDT') == 0.001
+        assert manager.get_step_size('NOSUCHUSDT') == 0.001
+        assert manager.get_tick_size('NOSUCHUSDT') == 0.01
+
+    def test_collision_keeps_first_market(self, manager):
+        # Quarterly BTC/USDT:USDT-250627 also normalizes to BTCUSDT
+        assert normalize_symbol('BTC/USDT:USDT-250627') == 'BTCUSDT'
+        assert manager.find_exchange_symbol('BTCUSDT') == 'BTC/USDT:USDT'
+
+    async def test_reload_rebuilds_index(self, manager):
+        markets = load_markets()
+        markets['NEW/USDT:USDT'] = dict(markets['BTC/USDT:USDT'], symbol='NEW/USDT:USDT', id='NEWUSDT')
+        manager.exchange.load_markets = AsyncMock(return_value=markets)
+
+        assert manager.find_exchange_symbol('NEWUSDT') is None
+        await manager.reload_markets(reload=True)
+
+        manager.exchange.load_markets.assert_awaited_once_with(True)
+        assert manager.find_exchange_symbol('NEWUSDT') == 'NEW/USDT:USDT'
+        assert manager.get_tick_size('NEWUSDT') == 0.01
+
+    def test_markets_replaced_directly(self, manager):
+        manager.markets = {'ZEC/USDT:USDT': {'precision': {'amount': 0.001, 'price': 0.01},
+                                             'limits': {'amount': {'min': 0.001}}}}
+        assert manager.find_exchange_symbol('ZECUSDT') == 'ZEC/USDT:USDT'
+        assert manager.find_exchange_symbol('BTCUSDT') is None
+
+
+class TestMarketFilters:
+    def test_filters_match_previous_parsing(self, manager):
+        for market_symbol, market in manager.markets.items():
+            normalized = normalize_symbol(market_symbol)
+            if manager.find_exchange_symbol(normalized) != market_symbol:
+                continue  # Shadowed by an earlier market with the same normalized id
+            min_amount, step_size, tick_size = scan_filters(market)
+            assert manager.get_min_amount(normalized) == min_amount, market_symbol
+            assert manager.get_step_size(normalized) == step_size, market_symbol
+            assert manager.get_tick_size(normalized) == tick_size, market_symbol
+
+    def test_filters_are_decimal(self, manager):
+        filters = manager.get_market_filters('BTCUSDT')
+        assert str(filters.min_amount) == '0.01'
+        assert str(filters.step_size) == '0.01'
+        assert str(filters.tick_size) == '0.01'
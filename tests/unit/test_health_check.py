@@ -0,0 +1,227 @@
+"""
+HealthChecker — concurrent checks with deadlines, in-process probes, cached snapshot
+
+Tests cover:
+1. A slow component times out at its deadline without delaying the other checks
+2. Checks run concurrently (two slow checks cost one, not two)
+3. Exchange probe: REST error rate since the previous check, rate-limit headroom, bans
+4. Stream probe: last-message age per pool, silent / disconnected streams, message rate
+5. Position counts come from the position manager, not full-table queries
+6. Snapshot (and /health) served without I/O
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from monitoring.health_check import ComponentType, HealthChecker, HealthStatus
+
+DB_OK = {'status': 'ok', 'pool_size': 5, 'pool_idle': 3, 'pool_max': 20, 'acquire_ms': 0.4, 'query_ms': 0.6}
+TS_ROW = {'total_ts': 2, 'activated_ts': 1, 'activations_last_hour': 0,
+          'updates_last_hour': 3, 'avg_updates_per_ts': 1.5, 'cnt': 0}
+
+
+def make_repository(delay=0.0):
+    async def health_check():
+        await asyncio.sleep(delay)
+        return DB_OK
+
+    repository = Mock()
+    repository.health_check = health_check
+    repository.pool.fetchrow = AsyncMock(return_value=TS_ROW)
+    repository.pool.fetchval = AsyncMock(return_value=2)
+    repository.get_open_positions = AsyncMock(side_effect=AssertionError("full row load"))
+    return repository
+
+
+class FakeLimiter:
+    max_weight = 2000
+
+    def __init__(self):
+        self.stats = {'total_requests': 0, 'failed_requests': 0, 'rate_limited_requests': 0,
+                      'current_tokens': 1800.0, 'used_weight_1m': 200, 'blocked_for': 0.0}
+
+    def get_stats(self):
+        return dict(self.stats)
+
+
+def make_exchange():
+    return SimpleNamespace(rate_limiter=SimpleNamespace(limiter=FakeLimiter()))
+
+
+class FakePool:
+    def __init__(self, ages):
+        self.connections = [
+            {'symbol': f"S{i}USDT", 'connected': True, 'messages_received': 0, 'last_message_age_sec': age}
+            for i, age in enumerate(ages)
+        ]
+
+    def get_status(self):
+        return {'connections': self.connections}
+
+
+def make_stream(ages=(0.5, 1.0), connected=True):
+    return SimpleNamespace(connected=connected, mark_price_pool=FakePool(ages),
+                           last_mark_message_time=asyncio.get_running_loop().time() - 0.5,
+                           last_user_message_time=0.0)
+
+
+def make_position_manager(stop_losses=(True, True)):
+    positions = {f"S{i}USDT": SimpleNamespace(has_stop_loss=sl) for i, sl in enumerate(stop_losses)}
+    return SimpleNamespace(positions=positions)
+
+
+def make_checker(repository=None, **config):
+    return HealthChecker(
+        repository or make_repository(), config,
+        exchanges={'binance': make_exchange()},
+        websockets={'binance_hybrid': make_stream()},
+        position_manager=make_position_manager()
+    )
+
+
+def component(health, component_type):
+    return next(c for c in health.components if c.type == component_type)
+
+
+class TestConcurrency:
+    async def test_slow_check_times_out_without_delaying_others(self):
+        checker = make_checker(make_repository(delay=10), check_timeout_sec=1.0,
+                               check_timeouts={'database': 0.05})
+        start = time.perf_counter()
+        health = await checker.check_system_health()
+        elapsed = time.perf_counter() - start
+
+        database = component(health, ComponentType.DATABASE)
+        assert elapsed < 0.5
+        assert database.status == HealthStatus.UNHEALTHY and 'timed out' in database.error_message
+        others = [c for c in health.components if c.type != ComponentType.DATABASE]
+        assert all(c.response_time_ms < 50 for c in others)
+        assert component(health, ComponentType.EXCHANGE_API).status == HealthStatus.HEALTHY
+        assert checker.consecutive_failures[ComponentType.DATABASE] == 1
+
+    async def test_checks_overlap(self):
+        repository = make_repository(delay=0.1)
+
+        async def slow_fetchrow(query):
+            if 'trailing_stop_state' in query:
+                await asyncio.sleep(0.1)
+            return TS_ROW
+
+        repository.pool.fetchrow = slow_fetchrow
+        checker = make_checker(repository)
+        start = time.perf_counter()
+        health = await checker.check_system_health()
+
+        assert time.perf_counter() - start < 0.18                      # Not 0.1 + 0.1
+        assert component(health, ComponentType.DATABASE).response_time_ms >= 100
+        assert component(health, ComponentType.WEBSOCKET).response_time_ms < 50
+
+
+class TestProbes:
+    async def test_database_pool_metrics(self):
+        repository = make_repository()
+        checker = make_checker(repository, max_pool_acquire_ms=100)
+        database = await checker._check_database()
+        assert database.status == HealthStatus.HEALTHY
+        assert database.metadata['pool_acquire_ms'] == 0.4 and database.metadata['pool_idle'] == 3
+
+        repository.health_check = AsyncMock(return_value=dict(DB_OK, acquire_ms=350.0))
+        assert (await checker._check_database()).status == HealthStatus.DEGRADED
+        repository.health_check = AsyncMock(return_value={'status': 'down', 'error': 'Pool not initialized'})
+        assert (await checker._check_database()).status == HealthStatus.UNHEALTHY
+
+    async def test_exchange_error_rate_since_last_check(self):
+        checker = make_checker()
+        limiter = checker.exchanges['binance'].rate_limiter.limiter
+
+        limiter.stats.update(total_requests=100, failed_requests=20)
+        health = await checker._check_exchange_api()
+        assert health.status == HealthStatus.DEGRADED
+        assert health.metadata['binance']['error_rate'] == 0.2
+
+        limiter.stats.update(total_requests=200)                        # 100 more, no new errors
+        health = await checker._check_exchange_api()
+        assert health.status == HealthStatus.HEALTHY
+        assert health.metadata['binance']['headroom'] == 0.9
+
+        limiter.stats.update(current_tokens=100.0)
+        assert (await checker._check_exchange_api()).status == HealthStatus.DEGRADED
+        limiter.stats.update(blocked_for=30.0)
+        health = await checker._check_exchange_api()
+        assert health.status == HealthStatus.UNHEALTHY and 'blocked' in health.error_message
+
+    async def test_stream_message_age(self):
+        checker = make_checker(max_stream_silence_sec=30)
+        stream = checker.websockets['binance_hybrid']
+
+        health = await checker._check_websocket()
+        probe = health.metadata['binance_hybrid']
+        assert health.status == HealthStatus.HEALTHY
+        assert probe['max_message_age_sec'] == 1.0 and probe['mark_age_sec'] == pytest.approx(0.5, abs=0.1)
+        assert 'user_age_sec' not in probe                              # Never received
+
+        stream.mark_price_pool.connections[0]['last_message_age_sec'] = 45.0
+        for c in stream.mark_price_pool.connections:
+            c['messages_received'] += 10
+        health = await checker._check_websocket()
+        assert health.status == HealthStatus.DEGRADED and '1/2' in health.error_message
+        assert health.metadata['binance_hybrid']['message_rate'] > 0
+
+        stream.mark_price_pool.connections[1]['last_message_age_sec'] = 60.0
+        assert (await checker._check_websocket()).status == HealthStatus.UNHEALTHY
+        stream.connected = False
+        health = await checker._check_websocket()
+        assert health.status == HealthStatus.UNHEALTHY and 'disconnected' in health.error_message
+
+    async def test_in_process_position_counts(self):
+        repository = make_repository()
+        checker = make_checker(repository)
+        checker.position_manager = make_position_manager(stop_losses=(True, False))
+
+        positions = await checker._check_position_manager()
+        assert positions.status == HealthStatus.DEGRADED
+        assert positions.metadata == {'active_positions': 2, 'without_stop_loss': 1, 'pending_orders': 0}
+
+        trailing = await checker._check_trailing_stop()
+        assert trailing.status == HealthStatus.HEALTHY and trailing.metadata['open_positions'] == 2
+        repository.get_open_positions.assert_not_awaited()
+        repository.pool.fetchval.assert_not_awaited()
+
+    async def test_unattached_components(self):
+        checker = HealthChecker(make_repository(), {})
+        assert (await checker._check_exchange_api()).status == HealthStatus.DEGRADED
+        assert (await checker._check_websocket()).status == HealthStatus.DEGRADED
+        assert await checker._open_positions_count() == 2              # COUNT(*) fallback
+
+
+class TestSnapshot:
+    async def test_snapshot_without_io(self):
+        repository = make_repository()
+        checker = make_checker(repository)
+        assert checker.get_snapshot()['status'] == 'unknown'
+
+        await checker.check_system_health()
+        repository.health_check = AsyncMock(side_effect=AssertionError("I/O"))
+        snapshot = checker.get_snapshot()
+
+        assert snapshot['status'] == checker.system_health.status.value
+        assert snapshot['components']['PostgreSQL Database']['metadata']['connection_pool_size'] == 5
+        assert snapshot['check_duration_ms'] > 0 and snapshot['age_sec'] >= 0
+        assert (await checker.get_health_summary())['last_check'] == snapshot['last_check']
+
+    async def test_metrics_health_endpoint(self):
+        from monitoring.metrics import MetricsCollector
+
+        checker = make_checker()
+        await checker.check_system_health()
+        collector = MetricsCollector(Mock(), {})
+        collector.set_health_checker(checker)
+        handler = next(r.handler for r in collector.app.router.routes() if r.resource.canonical == '/health')
+
+        response = await handler(Mock())
+        assert response.status == 200
+        assert b'"checks_passed"' in response.body
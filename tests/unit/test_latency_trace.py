@@ -0,0 +1,233 @@
+"""
+Signal latency tracing — frame arrival to protected position
+
+Tests cover:
+1. SignalTrace: spans between consecutive marks, time to protected, breakdown row
+2. Sampling: rate 0 / 1 / fractional; NULL_TRACE is a no-op
+3. finish(): sinks receive the row, failing sinks are counted, open traces bounded
+4. Pipeline: client → processor → lifecycle → position request carry one trace;
+   signal dicts stay JSON serializable
+5. Unmatched / rejected outcomes; no tracing when sampling is off
+6. Signals dropped before dispatch finish their trace (nothing left open);
+   event_log_sink keeps its log tasks referenced
+7. MetricsCollector exports stage and signal-to-protected histograms
+"""
+
+import asyncio
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+from core.composite_strategy import CompositeStrategy
+from core.latency_trace import (
+    DROPPED, ERROR, NULL_TRACE, OPENED, REJECTED, TRACE_KEY, UNMATCHED, SignalTrace, SignalTracer,
+    _sink_tasks, event_log_sink,
+)
+from core.signal_lifecycle import SignalLifecycleManager
+from core.signal_processor_websocket import WebSocketSignalProcessor
+from websocket.signal_client import SignalWebSocketClient
+from monitoring.metrics import MetricsCollector
+
+POSITION_STAGES = ['risk_checks', 'spread', 'entry_order', 'position_record', 'sl_placement', 'activation']
+
+
+@pytest.fixture
+def strategy_file(tmp_path):
+    path = tmp_path / 'composite_strategy.json'
+    path.write_text(json.dumps({'version': '1.0', 'rules': [{
+        'priority': 1, 'score_range': '100-999',
+        'filter': {'score_min': 100, 'score_max': 999, 'rsi_min': 0, 'vol_min': 0, 'oi_min': 0},
+        'strategy': {'leverage': 10, 'sl_pct': 5},
+    }]}))
+    return path
+
+
+class FakePositionManager:
+    """Marks the PositionManager / AtomicPositionManager stages on the request's trace"""
+
+    def __init__(self, opens=True):
+        self.opens = opens
+        self.requests = []
+        self.has_open_position = AsyncMock(return_value=False)
+
+    async def open_position(self, request):
+        self.requests.append(request)
+        if not self.opens:
+            return None
+        for stage in POSITION_STAGES:
+            request.trace.mark(stage)
+        request.trace.set(position_id=7)
+        return SimpleNamespace(entry_price=Decimal('100'), id=7)
+
+
+def make_pipeline(strategy_file, sample_rate=1.0, opens=True):
+    position_manager = FakePositionManager(opens)
+    manager = SignalLifecycleManager(composite_strategy=CompositeStrategy(strategy_file),
+                                     position_manager=position_manager)
+    manager._load_lookback_bars = AsyncMock(return_value=0)
+    processor = WebSocketSignalProcessor(MagicMock(), MagicMock(), MagicMock(), MagicMock())
+    processor.tracer.sample_rate = sample_rate
+    processor.tracer.sinks.clear()
+    processor.set_lifecycle_manager(manager)
+    return processor, manager, position_manager
+
+
+def frame(symbol, score, price=100.0):
+    return json.dumps({'type': 'signal', 'pair_symbol': symbol, 'total_score': score, 'rsi': 40, 'price': price})
+
+
+class TestSignalTrace:
+    def test_spans_and_row(self):
+        trace = SignalTrace(1, 'BTCUSDT', start_ns=1_000_000)
+        trace.marks = [('decode', 1_500_000), ('match', 2_000_000), ('activation', 12_000_000),
+                       ('lookback', 20_000_000)]
+        trace.set(position_id=3)
+
+        assert trace.spans() == {'decode': 0.5, 'match': 0.5, 'activation': 10.0, 'lookback': 8.0}
+        row = trace.to_row(OPENED)
+        assert row['protected_ms'] == 11.0 and row['total_ms'] == 19.0
+        assert row['position_id'] == 3 and row['outcome'] == OPENED
+        assert SignalTrace(2).to_row(REJECTED)['protected_ms'] is None
+
+    def test_repeated_stage_accumulates(self):
+        trace = SignalTrace(1, start_ns=0)
+        trace.marks = [('sl_placement', 2_000_000), ('retry', 3_000_000), ('sl_placement', 5_000_000)]
+        assert trace.spans()['sl_placement'] == 4.0
+
+
+class TestTracer:
+    def test_sampling(self):
+        assert SignalTracer(0.0).start('BTCUSDT') is NULL_TRACE
+        assert SignalTracer(1.0).start('BTCUSDT').sampled
+
+        draws = iter([0.1, 0.6, 0.2, 0.9])
+        tracer = SignalTracer(0.5, rng=lambda: next(draws))
+        assert [tracer.start().sampled for _ in range(4)] == [True, False, True, False]
+        assert tracer.started == 2
+
+        NULL_TRACE.mark('decode')
+        NULL_TRACE.set(position_id=1)
+        assert tracer.finish(NULL_TRACE) is None and tracer.finished == 0
+
+    def test_finish_sinks_and_open_traces(self):
+        tracer = SignalTracer(1.0, history=2)
+        rows = []
+        tracer.add_sink(rows.append)
+        tracer.add_sink(Mock(side_effect=RuntimeError("down")))
+
+        traces = [tracer.start(f"S{i}USDT") for i in range(3)]
+        signal = {TRACE_KEY: traces[1].trace_id}
+        assert tracer.trace_for(signal) is traces[1] and tracer.trace_for({}) is NULL_TRACE
+        for trace in traces:
+            trace.mark('activation')
+            tracer.finish(trace)
+
+        assert [r['symbol'] for r in rows] == ['S0USDT', 'S1USDT', 'S2USDT']
+        stats = tracer.get_stats()
+        assert stats['finished'] == 3 and stats['sink_errors'] == 3 and stats['open'] == 0
+        assert len(tracer.recent) == 2 and stats['protected_p50_ms'] is not None
+        assert tracer.trace_for(signal) is NULL_TRACE                  # Finished: no longer open
+
+
+class TestPipeline:
+    async def test_frame_to_protected(self, strategy_file):
+        processor, manager, position_manager = make_pipeline(strategy_file)
+        rows = []
+        processor.tracer.add_sink(rows.append)
+
+        await processor.ws_client.handle_message(frame('BTCUSDT', 150))
+
+        request = position_manager.requests[0]
+        assert request.trace.sampled
+        row = rows[0]
+        assert row['outcome'] == OPENED and row['symbol'] == 'BTCUSDT' and row['position_id'] == 7
+        assert list(row['stages']) == ['decode', 'dispatch', 'match', 'lifecycle', *POSITION_STAGES,
+                                       'registration', 'lookback']
+        assert 0 < row['protected_ms'] <= row['total_ms']
+        assert all(ms >= 0 for ms in row['stages'].values())
+
+        json.dumps(processor.ws_client.signal_buffer)                  # Signal carries the id only
+        assert manager.active['BTCUSDT'].trace is NULL_TRACE            # Re-entries are not traced
+        assert processor.get_stats()['tracing']['finished'] == 1
+
+    async def test_unmatched_and_rejected(self, strategy_file):
+        processor, manager, _ = make_pipeline(strategy_file, opens=False)
+        rows = []
+        processor.tracer.add_sink(rows.append)
+
+        await processor.ws_client.handle_message(frame('LOWUSDT', 50))
+        await processor.ws_client.handle_message(frame('ETHUSDT', 150))
+
+        assert [(r['symbol'], r['outcome']) for r in rows] == [('LOWUSDT', UNMATCHED), ('ETHUSDT', REJECTED)]
+        assert list(rows[0]['stages']) == ['decode', 'dispatch', 'match']
+        assert rows[1]['protected_ms'] is None
+
+    async def test_sampling_off(self, strategy_file):
+        processor, _, position_manager = make_pipeline(strategy_file, sample_rate=0.0)
+        await processor.ws_client.handle_message(frame('BTCUSDT', 150))
+
+        assert position_manager.requests[0].trace is NULL_TRACE
+        assert TRACE_KEY not in processor.ws_client.signal_buffer[0]
+        assert processor.tracer.get_stats()['started'] == 0
+
+
+class TestDropPaths:
+    async def test_no_lifecycle_manager(self, strategy_file):
+        processor, _, _ = make_pipeline(strategy_file)
+        processor.lifecycle_manager = None
+        rows = []
+        processor.tracer.add_sink(rows.append)
+
+        await processor.ws_client.handle_message(frame('BTCUSDT', 150))
+
+        assert [r['outcome'] for r in rows] == [DROPPED]
+        assert processor.tracer.get_stats()['open'] == 0
+
+    async def test_no_consumer_and_failing_consumer(self):
+        tracer = SignalTracer(1.0)
+        rows = []
+        tracer.add_sink(rows.append)
+        client = SignalWebSocketClient({}, tracer=tracer)
+
+        await client.handle_message(frame('BTCUSDT', 150))             # No on_signals callback
+        client.on_signals_callback = AsyncMock(side_effect=RuntimeError("boom"))
+        await client.handle_message(frame('ETHUSDT', 150))
+
+        assert [(r['symbol'], r['outcome']) for r in rows] == [('BTCUSDT', DROPPED), ('ETHUSDT', ERROR)]
+        stats = tracer.get_stats()
+        assert stats['open'] == 0 and stats['evicted'] == 0
+
+    async def test_event_log_sink_keeps_task(self):
+        release = asyncio.Event()
+        event_logger = Mock()
+
+        async def log_event(*args, **kwargs):
+            await release.wait()
+        event_logger.log_event = log_event
+
+        with patch('core.latency_trace.get_event_logger', return_value=event_logger):
+            event_log_sink(SignalTrace(1, 'BTCUSDT').to_row(OPENED))
+        assert len(_sink_tasks) == 1
+
+        release.set()
+        await asyncio.gather(*_sink_tasks)
+        await asyncio.sleep(0)
+        assert not _sink_tasks
+
+
+class TestMetricsExport:
+    def test_histograms(self):
+        collector = MetricsCollector(Mock(), {})
+        trace = SignalTrace(1, 'BTCUSDT', start_ns=0)
+        trace.marks = [('decode', 200_000), ('activation', 850_000_000)]
+        collector.record_signal_trace(trace.to_row(OPENED))
+        collector.record_signal_trace(SignalTrace(2).to_row(UNMATCHED))
+
+        registry = collector.registry
+        assert registry.get_sample_value('signal_stage_latency_ms_count', {'stage': 'decode'}) == 1
+        assert registry.get_sample_value('signal_to_protected_latency_ms_count') == 1
+        assert registry.get_sample_value('signal_to_protected_latency_ms_bucket', {'le': '1000.0'}) == 1
+        assert registry.get_sample_value('signal_traces_total', {'outcome': UNMATCHED}) == 1
@@ -0,0 +1,154 @@
+"""
+Non-blocking logging pipeline (utils/logger.py)
+
+Tests cover:
+1. Records (and tracebacks) reach the file via the listener thread; stop() drains
+2. Full queue: records are dropped and counted, the drop is reported afterwards
+3. Dedup: identical records within the window are dropped, repeats annotated
+4. Rate limit: per-logger token bucket below WARNING; ERROR always passes
+   Both apply to hot-path loggers only; trading/position records always pass
+5. setup_async_logging replaces root handlers; stats reflect the counters
+"""
+
+import io
+import logging
+import queue
+
+import pytest
+
+from utils.logger import (
+    HotPathFilter, NonBlockingQueueHandler, get_logging_stats, setup_async_logging, stop_async_logging,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def record(msg, name='websocket.test', level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+@pytest.fixture
+def root_handlers():
+    root = logging.getLogger()
+    saved, level = root.handlers[:], root.level
+    yield
+    stop_async_logging()
+    root.handlers[:] = saved
+    root.setLevel(level)
+
+
+class TestQueueHandler:
+    def test_drops_when_full(self):
+        q = queue.Queue(maxsize=2)
+        handler = NonBlockingQueueHandler(q)
+        for i in range(5):
+            handler.handle(record(f"msg {i}"))
+
+        assert (handler.enqueued, handler.dropped) == (2, 3)
+        q.get_nowait(), q.get_nowait()
+        handler.handle(record("after"))
+        notice, after = q.get_nowait(), q.get_nowait()
+        assert notice.levelno == logging.WARNING and 'dropped 3 records' in notice.getMessage()
+        assert after.getMessage() == 'after'
+
+
+class TestHotPathFilter:
+    def test_dedup_window(self):
+        clock = FakeClock()
+        f = HotPathFilter(rate_per_sec=0, dedup_window_sec=5, clock=clock)
+
+        assert f.filter(record("price tick"))
+        assert not f.filter(record("price tick"))
+        assert not f.filter(record("price tick"))
+        assert f.filter(record("price tick", name='websocket.other'))       # Other logger
+        assert f.filter(record("price tick", level=logging.WARNING))   # Other level
+
+        clock.now += 5
+        again = record("price tick")
+        assert f.filter(again)
+        assert again.getMessage() == 'price tick [repeated 2x in 5s]'
+        assert f.deduplicated == 2
+
+    def test_rate_limit_per_logger(self):
+        clock = FakeClock()
+        f = HotPathFilter(rate_per_sec=10, burst=3, dedup_window_sec=0, clock=clock)
+
+        passed = [f.filter(record(f"tick {i}")) for i in range(10)]
+        assert passed == [True] * 3 + [False] * 7
+        assert f.filter(record("tick", name='websocket.other'))            # Separate bucket
+        assert f.filter(record("warn", level=logging.WARNING))        # WARNING not rate limited
+
+        clock.now += 0.1                                               # One token back
+        resumed = record("tick 10")
+        assert f.filter(resumed)
+        assert resumed.getMessage() == 'tick 10 [+7 rate-limited]'
+        assert f.rate_limited == 7 and f.suppressed_by_logger == {'websocket.test': 7}
+
+    def test_errors_always_pass(self):
+        f = HotPathFilter(rate_per_sec=1, burst=1, dedup_window_sec=60, clock=FakeClock())
+        assert all(f.filter(record("boom", level=logging.ERROR)) for _ in range(20))
+
+    def test_only_hot_path_loggers_suppressed(self):
+        f = HotPathFilter(rate_per_sec=1, burst=1, dedup_window_sec=60, clock=FakeClock())
+
+        audit = [f.filter(record("Position opened BTCUSDT", name='core.position_manager'))
+                 for _ in range(20)]
+        assert all(audit)
+        assert f.filter(record("tick", name='websocket.mark_price_pool'))       # Child of 'websocket'
+        assert not f.filter(record("tick", name='websocket.mark_price_pool'))
+        assert f.filter(record("tick", name='websocketx'))                      # Not a child
+        assert f.suppressed_by_logger == {'websocket.mark_price_pool': 1}
+
+        custom = HotPathFilter(rate_per_sec=1, burst=1, dedup_window_sec=60, clock=FakeClock(),
+                               hot_loggers=['core.position_manager'])
+        assert custom.filter(record("same", name='core.position_manager'))
+        assert not custom.filter(record("same", name='core.position_manager'))
+
+    def test_tracked_messages_bounded(self):
+        clock = FakeClock()
+        f = HotPathFilter(rate_per_sec=0, dedup_window_sec=5, clock=clock)
+        for i in range(HotPathFilter.MAX_TRACKED_MESSAGES * 2):
+            f.filter(record(f"unique {i}"))
+        assert len(f._recent) <= HotPathFilter.MAX_TRACKED_MESSAGES
+
+
+class TestPipeline:
+    def test_file_and_console(self, tmp_path, root_handlers):
+        log_file = tmp_path / 'logs' / 'bot.log'
+        console = io.StringIO()
+        pipeline = setup_async_logging(level='INFO', log_file=str(log_file), stream=console,
+                                       rate_limit_per_sec=0, dedup_window_sec=0)
+        assert logging.getLogger().handlers == [pipeline.handler]
+
+        log = logging.getLogger('tests.logging_pipeline')
+        for i in range(100):
+            log.info(f"event {i}")
+        log.debug("hidden")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("failed %s", 'order')
+        stop_async_logging()
+
+        text = log_file.read_text()
+        lines = text.splitlines()
+        assert lines[99].endswith('event 99') and 'hidden' not in text
+        assert 'ERROR - failed order' in lines[100] and 'ValueError: boom' in text
+        assert console.getvalue().count('event') == 100
+        assert get_logging_stats() == {}
+
+    def test_stats(self, tmp_path, root_handlers):
+        setup_async_logging(log_file=None, stream=io.StringIO(), rate_limit_per_sec=0, dedup_window_sec=5)
+        log = logging.getLogger('websocket.logging_pipeline')
+        for _ in range(10):
+            log.info("same")
+
+        stats = get_logging_stats()
+        assert stats['enqueued'] == 1 and stats['deduplicated'] == 9 and stats['dropped'] == 0
+        assert stats['suppressed_by_logger'] == {'websocket.logging_pipeline': 9}
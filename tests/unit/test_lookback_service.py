@@ -0,0 +1,262 @@
+"""
+LookbackService — shared lookback history for SignalLifecycleManager
+
+Uses a fake aiohttp session serving a synthetic aggTrades tape.
+
+Tests cover:
+1. Trades folded into 1s bars (close, delta, large counts), pagination
+2. Cache: repeat load / primed cache fetches only the gap, mid-second merge
+3. Threshold change / longer window bypasses the cache
+4. Concurrent fetches across symbols bounded by the semaphore
+5. WeightBudget waits when the budget is exhausted
+6. SignalLifecycleManager._load_lookback_bars feeds the aggregator
+"""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.bar_aggregator import BarAggregator, OneSecondBar
+from core.lookback_service import LookbackService, WeightBudget
+from core.signal_lifecycle import SignalLifecycleManager
+
+NOW_MS = 1_700_000_000_000
+
+
+class FakeResponse:
+    def __init__(self, payload, status=200):
+        self.status = status
+        self._payload = payload
+
+    async def json(self):
+        return self._payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Serves aggTrades from a tape, honouring startTime/endTime/limit."""
+
+    def __init__(self, tapes, delay=0.0):
+        self.tapes = tapes
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.closed = False
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(dict(params))
+        tape = self.tapes.get(params['symbol'], [])
+        page = [t for t in tape if params['startTime'] <= t['T'] <= params['endTime']][:params['limit']]
+        session = self
+
+        class _Ctx(FakeResponse):
+            async def __aenter__(self):
+                session.in_flight += 1
+                session.peak_in_flight = max(session.peak_in_flight, session.in_flight)
+                await asyncio.sleep(session.delay)
+                session.in_flight -= 1
+                return self
+
+        return _Ctx(page)
+
+
+def trade(t_ms, price, qty, is_buyer_maker=False):
+    return {'T': t_ms, 'p': str(price), 'q': str(qty), 'm': is_buyer_maker}
+
+
+def clock(ms):
+    return patch('core.lookback_service.time.time', return_value=ms / 1000)
+
+
+class TestLoadBars:
+    async def test_folds_trades_into_bars(self):
+        tape = [
+            trade(NOW_MS - 5_000, 100, 1),              # buy $100
+            trade(NOW_MS - 4_900, 101, 200, True),      # large sell $20 200
+            trade(NOW_MS - 3_000, 102, 150),            # large buy $15 300
+        ]
+        svc = LookbackService(session=FakeSession({'ABCUSDT': tape}))
+        with clock(NOW_MS):
+            bars = await svc.load_bars('abcusdt', 60, large_threshold=10_000)
+
+        assert [b.ts for b in bars] == [(NOW_MS - 5_000) // 1000, (NOW_MS - 3_000) // 1000]
+        assert bars[0].price == 101
+        assert bars[0].delta == pytest.approx(100 - 20_200)
+        assert (bars[0].large_buy_count, bars[0].large_sell_count) == (0, 1)
+        assert (bars[1].large_buy_count, bars[1].large_sell_count) == (1, 0)
+
+    async def test_paginates(self):
+        tape = [trade(NOW_MS - 50_000 + i * 10, 100, 1) for i in range(2500)]
+        session = FakeSession({'ABCUSDT': tape})
+        svc = LookbackService(session=session)
+        with clock(NOW_MS):
+            bars = await svc.load_bars('ABCUSDT', 60, 10_000)
+
+        assert len(session.calls) == 3
+        assert session.calls[1]['startTime'] == tape[999]['T'] + 1
+        assert sum(b.delta for b in bars) == pytest.approx(2500 * 100)
+
+
+class TestCache:
+    async def test_repeat_load_fetches_only_gap(self):
+        tape = [trade(NOW_MS - 10_000, 100, 1), trade(NOW_MS - 500, 100, 1)]
+        session = FakeSession({'ABCUSDT': tape})
+        svc = LookbackService(session=session)
+        with clock(NOW_MS):
+            await svc.load_bars('ABCUSDT', 60, 10_000)
+
+        # Later trade in the same second as the cached edge, then a new second
+        tape += [trade(NOW_MS + 200, 101, 1), trade(NOW_MS + 2_000, 102, 1)]
+        with clock(NOW_MS + 3_000):
+            bars = await svc.load_bars('ABCUSDT', 60, 10_000)
+
+        assert session.calls[-1]['startTime'] == NOW_MS + 1
+        assert svc.cache_hits == 1
+        now_sec = NOW_MS // 1000
+        assert [b.ts for b in bars] == [now_sec - 10, now_sec - 1, now_sec, now_sec + 2]
+        assert sum(b.delta for b in bars) == pytest.approx(100 + 100 + 101 + 102)
+
+    async def test_mid_second_edge_merges_into_one_bar(self):
+        edge = NOW_MS + 400
+        tape = [trade(edge - 100, 100, 1)]
+        session = FakeSession({'ABCUSDT': tape})
+        svc = LookbackService(session=session)
+        with clock(edge):
+            await svc.load_bars('ABCUSDT', 60, 10_000)
+
+        tape.append(trade(edge + 100, 105, 1))
+        with clock(edge + 1_000):
+            bars = await svc.load_bars('ABCUSDT', 60, 10_000)
+
+        assert [b.ts for b in bars] == [edge // 1000]
+        assert bars[0].price == 105
+        assert bars[0].delta == pytest.approx(205)
+
+    @pytest.mark.parametrize('second_call', [
+        {'lookback_sec': 60, 'large_threshold': 5_000},     # threshold changed
+        {'lookback_sec': 600, 'large_threshold': 10_000},   # longer than cached window
+    ])
+    async def test_cache_bypassed(self, second_call):
+        session = FakeSession({'ABCUSDT': [trade(NOW_MS - 1_000, 100, 1)]})
+        svc = LookbackService(session=session)
+        with clock(NOW_MS):
+            await svc.load_bars('ABCUSDT', 60, 10_000)
+            await svc.load_bars('ABCUSDT', **second_call)
+
+        assert svc.cache_hits == 0
+        assert session.calls[-1]['startTime'] == NOW_MS - second_call['lookback_sec'] * 1000
+
+    async def test_primed_cache_fetches_gap(self):
+        session = FakeSession({'ABCUSDT': [trade(NOW_MS - 1_500, 101, 1)]})
+        svc = LookbackService(session=session)
+        stored = [OneSecondBar(ts=NOW_MS // 1000 - s, price=100, delta=1, large_buy_count=0, large_sell_count=0)
+                  for s in range(120, 2, -1)]
+        svc.prime('ABCUSDT', stored, 10_000)
+
+        with clock(NOW_MS):
+            bars = await svc.load_bars('ABCUSDT', 60, 10_000)
+
+        assert session.calls[-1]['startTime'] == (NOW_MS // 1000 - 3) * 1000 + 1000
+        assert bars[-1].price == 101
+        assert len(bars) == 59
+
+    async def test_stale_cache_refetches_window(self):
+        session = FakeSession({'ABCUSDT': []})
+        svc = LookbackService(session=session)
+        stale = [OneSecondBar(ts=NOW_MS // 1000 - 7200, price=100, delta=1, large_buy_count=0, large_sell_count=0)]
+        svc.prime('ABCUSDT', stale, 10_000)
+
+        with clock(NOW_MS):
+            bars = await svc.load_bars('ABCUSDT', 60, 10_000)
+
+        assert svc.cache_hits == 0
+        assert session.calls[-1]['startTime'] == NOW_MS - 60_000
+        assert bars == []
+
+
+class TestConcurrency:
+    async def test_symbols_fetched_concurrently_up_to_limit(self):
+        tapes = {f'S{i}USDT': [trade(NOW_MS - 1_000, 100, 1)] for i in range(6)}
+        session = FakeSession(tapes, delay=0.01)
+        svc = LookbackService(session=session, max_concurrent=3)
+        with clock(NOW_MS):
+            results = await asyncio.gather(*(svc.load_bars(s, 60, 10_000) for s in tapes))
+
+        assert all(len(bars) == 1 for bars in results)
+        assert session.peak_in_flight == 3
+
+    async def test_weight_budget_waits_when_exhausted(self):
+        budget = WeightBudget(weight_per_minute=60)  # 1 weight/sec
+        slept = []
+
+        async def fake_sleep(delay):
+            slept.append(delay)
+            budget._last_refill -= delay
+
+        with patch('core.lookback_service.asyncio.sleep', side_effect=fake_sleep):
+            assert await budget.acquire(60) == 0.0
+            waited = await budget.acquire(20)
+
+        assert waited == pytest.approx(20, rel=0.01)
+        assert slept
+
+
+class TestManagerIntegration:
+    async def test_load_lookback_bars_uses_service(self):
+        tape = [trade(NOW_MS - 2_000, 100, 1), trade(NOW_MS - 1_000, 101, 1)]
+        strategy = MagicMock()
+        mgr = SignalLifecycleManager(
+            composite_strategy=strategy,
+            position_manager=None,
+            lookback_service=LookbackService(session=FakeSession({'ABCUSDT': tape})),
+        )
+        lc = MagicMock()
+        lc.symbol = 'ABCUSDT'
+        lc.bar_aggregator = BarAggregator('ABCUSDT')
+
+        with clock(NOW_MS):
+            loaded = await mgr._load_lookback_bars(lc, 100)
+
+        assert loaded == 2
+        assert lc.bar_aggregator.bar_count == 2
+        assert mgr.get_stats()['lookback']['requests'] == 1
+
+    async def test_restore_loads_history_before_going_live(self):
+        tape = [trade(NOW_MS - 2_000, 100, 1), trade(NOW_MS - 1_000, 101, 1)]
+        repository = MagicMock()
+
+        async def get_active_lifecycles():
+            return [{'symbol': 'ABCUSDT', 'exchange': 'binance', 'state': 'in_position'}]
+        repository.get_active_lifecycles = get_active_lifecycles
+
+        mgr = SignalLifecycleManager(
+            composite_strategy=MagicMock(),
+            position_manager=None,
+            repository=repository,
+            lookback_service=LookbackService(session=FakeSession({'ABCUSDT': tape})),
+        )
+        seen_at_subscribe = {}
+
+        async def subscribe(symbol):
+            agg = mgr.active[symbol].bar_aggregator
+            seen_at_subscribe['bars'] = [b.ts for b in agg.bars]
+            seen_at_subscribe['callback'] = agg.on_bar_callback is not None
+        mgr.aggtrades_stream = MagicMock()
+        mgr.aggtrades_stream.subscribe = subscribe
+
+        with clock(NOW_MS):
+            restored = await mgr.restore_from_db()
+
+        assert restored == 1
+        # History was in place before live trades could reach the aggregator
+        assert seen_at_subscribe == {
+            'bars': [NOW_MS // 1000 - 2, NOW_MS // 1000 - 1],
+            'callback': True,
+        }
@@ -0,0 +1,147 @@
+"""
+MarketsCache and ExchangeManager startup from cached markets
+
+Uses the recorded Binance USD-M load_markets result (tests/unit/fixtures).
+
+Tests cover:
+1. Save / load round trip; missing, corrupt, other-version and expired entries are misses
+2. Fingerprint is the same for exchangeInfo symbols and CCXT market info
+3. initialize() with a valid cache skips load_markets (fingerprint checked)
+4. Changed exchange info invalidates the entry: full load and cache refresh
+5. Cache miss: load_markets + leverage brackets, written for the next start
+"""
+
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from core.exchange_manager import ExchangeManager
+from core.markets_cache import MARKETS_CACHE_VERSION, MarketsCache, exchange_info_fingerprint
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'binance_usdm_markets.json'
+
+
+def load_markets():
+    with open(FIXTURE) as f:
+        return json.load(f)
+
+
+def exchange_info(markets):
+    return {'symbols': [m['info'] for m in markets.values() if m.get('linear')]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_760_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return MarketsCache(tmp_path / 'markets', max_age_sec=3600, clock=clock)
+
+
+def make_manager():
+    em = ExchangeManager('binance', {'api_key': 'test', 'api_secret': 'test', 'testnet': True},
+                         repository=None, position_manager=None)
+    markets = load_markets()
+    brackets = {'BTC/USDT:USDT': [{'tier': 1, 'minNotional': 0, 'maxNotional': 50000, 'maxLeverage': 125}]}
+    em.exchange.load_markets = AsyncMock(return_value=markets)
+    em.exchange.fetch_balance = AsyncMock(return_value={'USDT': {'free': 100}})
+    em.exchange.fapiPublicGetExchangeInfo = AsyncMock(return_value=exchange_info(markets))
+    em.exchange.fetch_leverage_tiers = AsyncMock(return_value=brackets)
+    return em
+
+
+class TestMarketsCache:
+    def test_round_trip(self, cache):
+        markets = load_markets()
+        cache.save('binance', markets, 'abc', {'BTC/USDT:USDT': [{'tier': 1}]})
+        entry = cache.load('binance')
+
+        assert entry.markets == markets and entry.fingerprint == 'abc'
+        assert entry.leverage_brackets == {'BTC/USDT:USDT': [{'tier': 1}]}
+        assert cache.get_stats() == {'hits': 1, 'misses': 0, 'saves': 1}
+
+    def test_misses(self, cache, clock):
+        assert cache.load('binance') is None                      # Missing
+
+        cache.path('binance').write_text('{not json')
+        assert cache.load('binance') is None                      # Corrupt
+
+        cache.save('binance', load_markets(), 'abc')
+        data = json.loads(cache.path('binance').read_text())
+        cache.path('binance').write_text(json.dumps(dict(data, version=MARKETS_CACHE_VERSION + 1)))
+        assert cache.load('binance') is None                      # Other format
+
+        cache.save('binance', load_markets(), 'abc')
+        clock.now += 3601
+        assert cache.load('binance') is None                      # Expired
+        assert cache.misses == 4
+
+        cache.invalidate('binance')
+        assert not cache.path('binance').exists()
+
+    def test_fingerprint_sources_agree(self):
+        markets = load_markets()
+        from_info = exchange_info_fingerprint(exchange_info(markets)['symbols'])
+        from_markets = exchange_info_fingerprint(m['info'] for m in reversed(list(markets.values())))
+        assert from_info == from_markets
+
+        changed = exchange_info(markets)['symbols']
+        changed[0] = dict(changed[0], status='SETTLING')
+        assert exchange_info_fingerprint(changed) != from_info
+
+
+class TestExchangeManagerStartup:
+    async def test_cold_then_warm_start(self, cache):
+        cold = make_manager()
+        await cold.initialize(markets_cache=cache)
+
+        cold.exchange.load_markets.assert_awaited_once()
+        assert not cold.markets_from_cache
+        assert cold.get_leverage_brackets('BTCUSDT')[0]['maxLeverage'] == 125
+        assert cache.saves == 1
+
+        warm = make_manager()
+        await warm.initialize(markets_cache=cache)
+
+        warm.exchange.load_markets.assert_not_awaited()
+        warm.exchange.fetch_leverage_tiers.assert_not_awaited()
+        warm.exchange.fapiPublicGetExchangeInfo.assert_awaited_once()
+        warm.exchange.fetch_balance.assert_awaited_once()
+        assert warm.markets_from_cache
+        assert set(warm.markets) == set(cold.markets)
+        assert warm.find_exchange_symbol('BTCUSDT') == 'BTC/USDT:USDT'
+        assert warm.get_tick_size('BTCUSDT') == cold.get_tick_size('BTCUSDT')
+        assert warm.get_leverage_brackets('BTC/USDT:USDT') == cold.get_leverage_brackets('BTCUSDT')
+
+    async def test_changed_exchange_info_reloads(self, cache):
+        await make_manager().initialize(markets_cache=cache)
+
+        em = make_manager()
+        info = exchange_info(load_markets())
+        info['symbols'].append({'symbol': 'NEWUSDT', 'status': 'TRADING', 'filters': []})
+        em.exchange.fapiPublicGetExchangeInfo = AsyncMock(return_value=info)
+        await em.initialize(markets_cache=cache)
+
+        em.exchange.load_markets.assert_awaited_once()
+        assert not em.markets_from_cache and cache.saves == 2
+
+    async def test_without_cache(self):
+        em = make_manager()
+        await em.initialize()
+
+        em.exchange.load_markets.assert_awaited_once()
+        em.exchange.fapiPublicGetExchangeInfo.assert_not_awaited()
+        em.exchange.fetch_leverage_tiers.assert_not_awaited()
+        assert em.get_leverage_brackets('BTCUSDT') == []
@@ -0,0 +1,273 @@
+"""
+Incremental metrics — event-fed trading state behind MetricsCollector gauges
+
+Tests cover:
+1. RollingCounter: bucketed window totals, expiry, late (out-of-order) closes
+2. Open positions: count / exposure / unrealized PnL from open, update, close events
+3. Win rates per window and today's PnL from closed trades; warm start
+4. Drawdown from daily balance peaks; AccountLedger balance listener
+5. Reconcile replaces drifted positions from a database snapshot
+6. MetricsCollector: scrape refreshes gauges without I/O; DB only on reconcile
+7. PositionManager emits position.opened / position.closed; warm-start query
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+from prometheus_client import generate_latest
+
+from core.account_ledger import AccountLedger
+from monitoring.metrics import MetricsCollector
+from monitoring.metrics_state import RollingCounter, TradingMetricsState
+
+DAY = 86400
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_760_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def state(clock):
+    return TradingMetricsState(clock=clock)
+
+
+def close(state, symbol, pnl, **extra):
+    state.on_position_closed({'symbol': symbol, 'realized_pnl': pnl, **extra})
+
+
+class TestRollingCounter:
+    def test_window_and_expiry(self, clock):
+        counter = RollingCounter(3600, buckets=60)
+        counter.add('binance', True, clock.now)
+        counter.add('binance', False, clock.now + 600)
+        assert counter.counts('binance', clock.now + 600) == (2, 1)
+
+        assert counter.counts('binance', clock.now + 3600 + 60) == (1, 0)      # First close expired
+        assert counter.counts('binance', clock.now + 2 * 3600) == (0, 0)
+        assert len(counter) == 0 and counter.keys() == []
+
+    def test_late_close(self, clock):
+        counter = RollingCounter(3600, buckets=60)
+        counter.add('binance', True, clock.now)
+        counter.add('binance', True, clock.now - 1200)                         # Inserted before
+        counter.add('binance', False, clock.now - 7200)                        # Outside: ignored
+        assert counter.counts('binance', clock.now) == (2, 2)
+        assert counter.counts('binance', clock.now + 2400 + 60) == (1, 1)
+
+
+class TestPositions:
+    def test_open_update_close(self, state):
+        state.on_position_opened({'symbol': 'BTC/USDT:USDT', 'quantity': 0.1, 'entry_price': 60000})
+        state.on_position_opened({'symbol': 'ETHUSDT', 'quantity': 2, 'entry_price': 3000, 'side': 'short'})
+        assert state.active_positions('binance') == 2
+        assert state.exposure('binance') == pytest.approx(12000)
+
+        # Hybrid stream snapshot: strings, size 0 when gone
+        state.on_position_update({'symbol': 'BTCUSDT', 'side': 'long', 'size': '0.2',
+                                  'entry_price': '60000', 'unrealized_pnl': '15.5', 'mark_price': '60077.5'})
+        assert state.exposure('binance') == pytest.approx(18000)
+        assert state.unrealized_pnl('binance') == pytest.approx(15.5)
+        state.on_position_update({'symbol': 'ETHUSDT', 'size': '0'})
+        state.on_position_update({'symbol': 'XRPUSDT', 'mark_price': '0.5'})   # No size: ignored
+        assert state.active_positions('binance') == 1
+
+        close(state, 'BTCUSDT', 20)
+        assert state.active_positions('binance') == 0
+        assert state.exposure('binance') == 0.0 and state.unrealized_pnl('binance') == 0.0
+
+    def test_reconcile_replaces_drift(self, state):
+        state.on_position_opened({'symbol': 'BTCUSDT', 'quantity': 1, 'entry_price': 100})
+        state.on_position_opened({'symbol': 'ETHUSDT', 'quantity': 1, 'entry_price': 100})   # Close missed
+
+        rows = [{'symbol': 'BTCUSDT', 'exchange': 'binance', 'quantity': 1, 'entry_price': 100, 'pnl': 2},
+                {'symbol': 'SOLUSDT', 'exchange': 'binance', 'quantity': 3, 'entry_price': 50, 'pnl': -1}]
+        assert state.reconcile(rows) == 2                                       # ETH gone, SOL added
+        assert state.active_positions('binance') == 2
+        assert state.exposure('binance') == 250 and state.unrealized_pnl('binance') == 1
+        assert state.get_stats()['reconcile_corrections'] == 2
+
+
+class TestTrades:
+    def test_win_rate_windows(self, state, clock):
+        close(state, 'BTCUSDT', 10)
+        close(state, 'BTCUSDT', -5)
+        clock.now += 2 * 3600
+        close(state, 'ETHUSDT', 3)
+        close(state, 'ETHUSDT', 0)                                              # Break-even is not a win
+
+        assert state.win_rate('binance', '1h') == 50.0
+        assert state.win_rate('binance', '24h') == 50.0
+        assert state.trade_count('binance', '24h') == 4
+        clock.now += 2 * DAY
+        assert state.win_rate('binance', '24h') == 0.0
+        assert state.trade_count('binance', '7d') == 4
+        assert state.win_rate('bybit', '30d') == 0.0
+
+    def test_daily_pnl_resets(self, state, clock):
+        clock.now = (int(clock.now // DAY) + 1) * DAY - 60                     # One minute before midnight
+        state._roll_day(clock.now)
+        close(state, 'BTCUSDT', 10)
+        close(state, 'ETHUSDT', -3, closed_at=int((clock.now - DAY) * 1000))   # Yesterday (ms)
+        assert state.daily_pnl('binance') == 10
+        clock.now += 120
+        assert state.daily_pnl('binance') == 0.0
+
+    def test_warm_start(self, state, clock):
+        closed = [SimpleNamespace(exchange='binance', realized_pnl=pnl,
+                                  closed_at=datetime.fromtimestamp(clock.now - age, timezone.utc))
+                  for pnl, age in ((5, 600), (-1, 7200), (2, 10 * DAY), (1, 0))]
+        closed.append(SimpleNamespace(exchange='binance', realized_pnl=1, closed_at=None))
+        assert state.load_closed_trades(closed) == 4
+        assert state.trade_count('binance', '1h') == 2
+        assert state.trade_count('binance', '30d') == 4
+        assert state.win_rate('binance', '30d') == 75.0
+
+
+class TestDrawdown:
+    def test_daily_peaks(self, state, clock):
+        state.on_balance('binance', 1000)
+        state.on_balance('binance', 1200)
+        clock.now += DAY
+        state.on_balance('binance', 900)
+        assert state.drawdown('binance') == pytest.approx(25.0)
+
+        clock.now += 30 * DAY                                                   # 1200 peak out of range
+        state.on_balance('binance', 950)
+        assert state.drawdown('binance') == 0.0
+        assert state.drawdown('bybit') == 0.0
+
+    def test_ledger_listener(self, state):
+        ledger = AccountLedger(Mock())
+        ledger.balance_listener = lambda balance: state.on_balance('binance', balance)
+        ledger.apply_account_update({'a': {'B': [{'a': 'USDT', 'wb': '1000'}]}})
+        ledger.apply_account_update({'a': {'B': [{'a': 'USDT', 'wb': '800'}]}})
+        assert state.drawdown('binance') == pytest.approx(20.0)
+
+
+class TestCollector:
+    def make_collector(self, clock):
+        repository = Mock()
+        repository.get_open_positions = AsyncMock(return_value=[
+            {'symbol': 'BTCUSDT', 'exchange': 'binance', 'quantity': 1, 'entry_price': 100, 'pnl': 4}])
+        repository.get_closed_positions_since = AsyncMock(return_value=[])
+        repository.get_active_positions = AsyncMock(side_effect=AssertionError("polling query"))
+        collector = MetricsCollector(repository, {'reconcile_interval': 300})
+        collector.state = TradingMetricsState(clock=clock)
+        return collector
+
+    async def test_events_to_scrape(self, clock):
+        collector = self.make_collector(clock)
+        router = Mock()
+        collector.attach(router)
+        handlers = {call.args[0]: call.args[1] for call in router.add_handler.call_args_list}
+
+        await handlers['position.opened']({'symbol': 'BTCUSDT', 'side': 'long', 'quantity': 1, 'entry_price': 100})
+        await handlers['position.closed']({'symbol': 'BTCUSDT', 'side': 'long', 'realized_pnl': 7.5})
+        await handlers['order.update']({'symbol': 'BTCUSDT', 'status': 'FILLED', 'type': 'MARKET', 'side': 'BUY'})
+
+        route = next(r for r in collector.app.router.routes() if r.resource.canonical == '/metrics')
+        body = (await route.handler(Mock())).body.decode()
+        assert 'trading_win_rate_percent{exchange="binance",timeframe="24h"} 100.0' in body
+        assert 'trading_daily_pnl_usd{exchange="binance"} 7.5' in body
+        assert 'trading_active_positions{exchange="binance"} 0.0' in body
+        assert 'trading_orders_filled_total{exchange="binance",side="BUY",type="MARKET"} 1.0' in body
+        assert collector.db_queries == 0
+
+    async def test_reconcile_interval(self, clock):
+        collector = self.make_collector(clock)
+        ledger = AccountLedger(Mock())
+        ledger.wallet_balance = 1000.0
+        collector.attach_account_ledger('binance', ledger)
+
+        for _ in range(3):
+            await collector.collect()
+        collector.last_reconcile -= 300
+        await collector.collect()
+
+        assert collector.repository.get_open_positions.await_count == 2
+        assert collector.db_queries == 2 and collector.collections == 4
+        assert collector.state.active_positions('binance') == 1
+        ledger.apply_account_update({'a': {'B': [{'a': 'USDT', 'wb': '900'}]}})
+        collector._refresh_trading_gauges()
+        assert b'risk_current_drawdown_percent{exchange="binance"} 10.0' in generate_latest(collector.registry)
+
+
+class TestPositionEvents:
+    async def test_close_position_emits_realized_pnl(self, clock):
+        from core.position_manager import PositionManager
+
+        repo = MagicMock()
+        for name in ('close_position', 'create_order', 'create_trade'):
+            setattr(repo, name, AsyncMock())
+        pm = PositionManager.__new__(PositionManager)
+        pm.repository = repo
+        pm.price_writer = Mock(flush=AsyncMock())
+        pm.exchanges = {'bybit': MagicMock()}
+        pm.stats = {'positions_closed': 0, 'total_pnl': 0, 'win_count': 0, 'loss_count': 0}
+        pm._cleanup_position_monitoring = AsyncMock(return_value={'errors': []})
+        pm.lifecycle_manager = None
+        pm.event_router = Mock(emit=AsyncMock())
+        pm.positions = {'BTCUSDT': SimpleNamespace(
+            id=7, symbol='BTCUSDT', exchange='bybit', side='long', quantity=Decimal('2'),
+            entry_price=Decimal('100'), current_price=Decimal('100'),
+        )}
+
+        with patch('core.position_manager.get_event_logger', return_value=None):
+            await pm.close_position('BTCUSDT', reason='websocket_closure', close_price=103.0)
+
+        event, data = pm.event_router.emit.await_args.args
+        assert event == 'position.closed'
+        assert (data['exchange'], data['realized_pnl'], data['position_id']) == ('bybit', 6.0, 7)
+
+        collector = MetricsCollector(Mock(), {})
+        collector.state = TradingMetricsState(clock=clock)
+        data['closed_at'] = datetime.fromtimestamp(clock.now, timezone.utc)
+        await collector._on_position_closed(data)
+        assert collector.state.win_rate('bybit', '24h') == 100.0
+
+    async def test_open_emits_position_opened(self):
+        from core.position_manager import PositionManager
+
+        pm = PositionManager.__new__(PositionManager)
+        pm.event_router = Mock(emit=AsyncMock())
+        await pm._emit_position_opened(SimpleNamespace(
+            id=3, symbol='ETHUSDT', exchange='binance', side='short', quantity=Decimal('1.5'),
+            entry_price=Decimal('2000'), opened_at=None,
+        ))
+
+        event, data = pm.event_router.emit.await_args.args
+        assert event == 'position.opened'
+        assert (data['symbol'], data['quantity'], data['entry_price']) == ('ETHUSDT', 1.5, 2000.0)
+
+    async def test_closed_positions_since_query(self):
+        from database.repository import Repository
+
+        since = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        row = {'id': 1, 'exchange': 'binance', 'realized_pnl': Decimal('4.5'), 'fees': 0,
+               'closed_at': since + timedelta(hours=1)}
+        conn = Mock(fetch=AsyncMock(return_value=[row]))
+        repo = Repository.__new__(Repository)
+        repo.pool = MagicMock()
+        repo.pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+        repo.pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        (closed,) = await repo.get_closed_positions_since(since)
+
+        query, arg = conn.fetch.await_args.args
+        assert "status = 'closed'" in query and arg == since
+        assert closed.realized_pnl == Decimal('4.5')
+        state = TradingMetricsState(clock=lambda: (since + timedelta(hours=2)).timestamp())
+        assert state.load_closed_trades([closed]) == 1
@@ -0,0 +1,347 @@
+"""
+MultiplexedStreamTransport — shared combined-stream WebSockets for the per-symbol pools
+
+A local WebSocket server stands in for wss://fstream.binance.com/stream: it
+answers SUBSCRIBE / UNSUBSCRIBE and replays recorded frames
+(tests/unit/fixtures/binance_market_frames.json) of the subscribed streams
+at a configurable rate.
+
+Tests cover:
+1. MarkPricePerSymbolPool and AggTradesPerSymbolPool share one connection
+2. Symbol changes are live SUBSCRIBE / UNSUBSCRIBE, no reconnect
+3. One parse per frame, fanned out to every handler of the stream
+4. Connections open when full and are drained (rebalanced) when under-filled
+5. Reconnect resubscribes all streams of the connection
+6. Capacity limit and the per-event-loop shared transport
+7. A slow async handler stalls neither the reader nor other streams
+8. A rejected SUBSCRIBE is retried with backoff
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from websockets.asyncio.server import serve
+
+import websocket.multiplexed_stream as mux
+from websocket.aggtrades_per_symbol_pool import AggTradesPerSymbolPool
+from websocket.mark_price_per_symbol_pool import MarkPricePerSymbolPool, PerSymbolConnection
+from websocket.multiplexed_stream import (
+    MultiplexedConnection,
+    MultiplexedStreamTransport,
+    get_shared_transport,
+)
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'binance_market_frames.json'
+
+
+class FakeCombinedStream:
+    """Local stand-in for the Binance combined stream endpoint"""
+
+    def __init__(self, frames, rate: float):
+        self.frames = frames
+        self.rate = rate                          # Frames per second per connection
+        self.connections = 0
+        self.requests = []                        # [(method, params)]
+        self.subscriptions = {}                   # {server connection: set of streams}
+        self.frames_sent = 0
+        self.reject = set()                       # Streams whose SUBSCRIBE is answered with an error
+
+    async def __aenter__(self):
+        self.server = await serve(self._handler, '127.0.0.1', 0)
+        port = list(self.server.sockets)[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/stream"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handler(self, ws):
+        self.connections += 1
+        streams = self.subscriptions[ws] = set()
+        replay = asyncio.create_task(self._replay(ws, streams))
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                self.requests.append((msg['method'], msg['params']))
+                if msg['method'] == 'SUBSCRIBE' and self.reject & set(msg['params']):
+                    await ws.send(json.dumps({'error': {'code': 2, 'msg': 'Invalid request'}, 'id': msg['id']}))
+                    continue
+                if msg['method'] == 'SUBSCRIBE':
+                    streams.update(msg['params'])
+                else:
+                    streams.difference_update(msg['params'])
+                await ws.send(json.dumps({'result': None, 'id': msg['id']}))
+        finally:
+            replay.cancel()
+            del self.subscriptions[ws]
+
+    async def _replay(self, ws, streams):
+        while True:
+            sent = False
+            for frame in self.frames:
+                if frame['stream'] in streams:
+                    await ws.send(json.dumps(frame))
+                    self.frames_sent += 1
+                    sent = True
+                    await asyncio.sleep(1 / self.rate)
+            if not sent:
+                await asyncio.sleep(0.005)
+
+    def subscribed(self):
+        return set().union(*self.subscriptions.values()) if self.subscriptions else set()
+
+    async def drop_connections(self):
+        for ws in list(self.subscriptions):
+            await ws.close()
+
+
+async def until(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def frames():
+    with open(FIXTURE) as f:
+        return json.load(f)
+
+
+def make_transport(server, **kwargs):
+    kwargs.setdefault('control_interval_sec', 0)
+    kwargs.setdefault('rebalance_delay_sec', 0)
+    return MultiplexedStreamTransport(base_url=server.url, **kwargs)
+
+
+class PriceCollector:
+    def __init__(self):
+        self.updates = []
+
+    async def __call__(self, data):
+        self.updates.append(data)
+
+    def symbols(self):
+        return {u['s'] for u in self.updates}
+
+
+class TestSharedTransport:
+    @pytest.mark.parametrize('rate', [50, 1000])
+    async def test_pools_share_one_connection(self, frames, rate):
+        async with FakeCombinedStream(frames, rate) as server:
+            transport = make_transport(server)
+            prices = PriceCollector()
+            mark_pool = MarkPricePerSymbolPool(on_price_update=prices, transport=transport)
+            agg_pool = AggTradesPerSymbolPool(precision='float', transport=transport)
+            await agg_pool.start()
+
+            await mark_pool.set_symbols({'BTCUSDT', 'ETHUSDT'})
+            await agg_pool.subscribe('BTCUSDT')
+            await until(lambda: prices.symbols() == {'BTCUSDT', 'ETHUSDT'}
+                        and agg_pool.delta_states['BTCUSDT'].trade_count > 0)
+
+            assert server.connections == 1
+            assert mark_pool.all_connected
+            assert agg_pool._connections['BTCUSDT'].connected
+            assert all(u['e'] == 'markPriceUpdate' for u in prices.updates)
+            status = mark_pool.get_status()
+            assert status['total_connections'] == 2           # Per-symbol streams
+            assert status['transport']['total_connections'] == 1
+            assert status['transport']['total_streams'] == 3
+            assert agg_pool.get_pool_status()['transport']['handler_errors'] == 0
+
+            await mark_pool.stop()
+            await agg_pool.stop()
+            assert transport.get_status()['total_connections'] == 0
+
+    async def test_live_subscribe_unsubscribe(self, frames):
+        async with FakeCombinedStream(frames, rate=500) as server:
+            transport = make_transport(server)
+            prices = PriceCollector()
+            pool = MarkPricePerSymbolPool(on_price_update=prices, transport=transport)
+            await pool.set_symbols({'BTCUSDT', 'ETHUSDT'})
+            await until(lambda: prices.symbols() == {'BTCUSDT', 'ETHUSDT'})
+
+            await pool.set_symbols({'BTCUSDT', 'SOLUSDT'})
+            await until(lambda: 'SOLUSDT' in prices.symbols()
+                        and server.subscribed() == {'btcusdt@markPrice@1s', 'solusdt@markPrice@1s'})
+
+            assert server.connections == 1                     # No reconnect
+            assert ('SUBSCRIBE', ['solusdt@markPrice@1s']) in server.requests
+            assert ('UNSUBSCRIBE', ['ethusdt@markPrice@1s']) in server.requests
+
+            prices.updates.clear()
+            await until(lambda: {'BTCUSDT', 'SOLUSDT'} <= prices.symbols())
+            assert 'ETHUSDT' not in prices.symbols()
+
+            await pool.stop()
+            await transport.stop()
+
+    async def test_single_parse_per_frame(self, frames):
+        parses = []
+
+        def counting_loads(raw):
+            parses.append(raw)
+            return json.loads(raw)
+
+        async with FakeCombinedStream(frames, rate=500) as server:
+            transport = make_transport(server)
+            first, second = PriceCollector(), PriceCollector()
+            pools = [MarkPricePerSymbolPool(on_price_update=c, transport=transport) for c in (first, second)]
+            with patch.object(mux, '_json_loads', counting_loads):
+                for pool in pools:
+                    await pool.add_symbol('BTCUSDT')
+                await until(lambda: len(second.updates) >= 10)
+                for pool in pools:
+                    await pool.stop()
+
+            conn_messages = server.frames_sent + len(server.requests)     # Data frames + acks
+            assert len(parses) <= conn_messages
+            # Both handlers got the same parsed object for every routed frame
+            shared = {id(u) for u in first.updates} & {id(u) for u in second.updates}
+            assert len(shared) >= 10
+            await transport.stop()
+
+
+class TestRebalance:
+    async def test_open_when_full_and_drain_when_underfilled(self, frames):
+        async with FakeCombinedStream(frames, rate=500) as server:
+            transport = make_transport(server, max_streams_per_connection=2)
+            prices = PriceCollector()
+            pool = MarkPricePerSymbolPool(on_price_update=prices, transport=transport)
+            for symbol in ('BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'XRPUSDT', 'DOGEUSDT'):
+                await pool.add_symbol(symbol)
+            await until(lambda: pool.all_connected and len(prices.symbols()) == 5)
+            assert server.connections == 3
+
+            # BTC+ETH | SOL+XRP | DOGE → remove three, one from each
+            for symbol in ('ETHUSDT', 'XRPUSDT', 'DOGEUSDT'):
+                await pool.remove_symbol(symbol)
+            await until(lambda: transport.rebalances == 1)
+
+            status = transport.get_status()
+            assert status['total_connections'] == 1
+            assert status['connections'][0]['streams'] == 2
+            assert pool.all_connected
+
+            prices.updates.clear()
+            await until(lambda: prices.symbols() == {'BTCUSDT', 'SOLUSDT'})
+            assert len(server.subscriptions) == 1
+            assert server.subscribed() == {'btcusdt@markPrice@1s', 'solusdt@markPrice@1s'}
+
+            await pool.stop()
+            await transport.stop()
+
+    async def test_reconnect_resubscribes(self, frames):
+        async with FakeCombinedStream(frames, rate=500) as server:
+            transport = make_transport(server)
+            prices = PriceCollector()
+            pool = MarkPricePerSymbolPool(on_price_update=prices, transport=transport)
+            with patch.object(MultiplexedConnection, '_get_reconnect_delay', return_value=0.01):
+                await pool.set_symbols({'BTCUSDT', 'ETHUSDT'})
+                await until(lambda: pool.all_connected)
+
+                await server.drop_connections()
+                await until(lambda: not pool.connected)
+                prices.updates.clear()
+                await until(lambda: pool.all_connected and prices.symbols() == {'BTCUSDT', 'ETHUSDT'})
+
+            assert server.connections == 2
+            assert transport.get_status()['connections'][0]['reconnect_count'] == 0   # Reset on connect
+            await pool.stop()
+            await transport.stop()
+
+
+class TestLimits:
+    async def test_capacity_limit(self, frames):
+        async with FakeCombinedStream(frames, rate=100) as server:
+            transport = make_transport(server, max_streams_per_connection=1, max_connections=1)
+            handler = AsyncMock()
+            assert await transport.add_stream('btcusdt@markPrice@1s', handler)
+            assert not await transport.add_stream('ethusdt@markPrice@1s', handler)
+            assert transport.streams == {'btcusdt@markPrice@1s'}
+            await transport.stop()
+
+    async def test_pools_default_to_shared_transport(self):
+        mark_pool = MarkPricePerSymbolPool(on_price_update=AsyncMock())
+        agg_pool = AggTradesPerSymbolPool()
+        await agg_pool.start()
+        with patch.object(PerSymbolConnection, 'start', new_callable=AsyncMock), \
+                patch('websocket.aggtrades_per_symbol_pool.AggTradePerSymbolConnection.start', new_callable=AsyncMock):
+            await mark_pool.add_symbol('BTCUSDT')
+            await agg_pool.subscribe('BTCUSDT')
+
+        shared = get_shared_transport()
+        assert mark_pool._connections['BTCUSDT'].transport is shared
+        assert agg_pool._connections['BTCUSDT'].transport is shared
+        assert get_shared_transport() is shared
+
+        legacy = MarkPricePerSymbolPool(on_price_update=AsyncMock(), multiplexed=False)
+        with patch.object(PerSymbolConnection, 'start', new_callable=AsyncMock):
+            await legacy.add_symbol('BTCUSDT')
+        assert legacy._connections['BTCUSDT'].transport is None
+        assert 'btcusdt@markPrice@1s' in legacy._connections['BTCUSDT']._url
+
+
+class TestDispatch:
+    async def test_slow_handler_does_not_stall_other_streams(self, frames):
+        async with FakeCombinedStream(frames, rate=500) as server:
+            transport = make_transport(server)
+            release = asyncio.Event()
+            slow_calls = 0
+
+            async def slow(data):
+                nonlocal slow_calls
+                slow_calls += 1
+                await release.wait()          # e.g. a router.emit blocked by BLOCK overflow
+
+            fast = PriceCollector()
+            await transport.add_stream('btcusdt@markPrice@1s', slow)
+            await transport.add_stream('ethusdt@markPrice@1s', fast)
+            await until(lambda: slow_calls == 1 and len(fast.updates) >= 20)
+
+            route = transport._routes['btcusdt@markPrice@1s']
+            assert slow_calls == 1                          # One frame in flight per stream
+            assert 0 < len(route.backlog) <= mux.STREAM_BACKLOG_MAX
+
+            release.set()
+            await until(lambda: route.task is None)
+            assert transport.handler_errors == 0
+            await transport.stop()
+
+    async def test_sync_handler_runs_in_reader(self):
+        transport = MultiplexedStreamTransport()
+        seen = []
+        with patch.object(MultiplexedConnection, 'start'):
+            await transport.add_stream('btcusdt@aggTrade', seen.append)
+        route = transport._routes['btcusdt@aggTrade']
+
+        transport._route(route.connection, 'btcusdt@aggTrade', {'p': '1'})
+
+        assert seen == [{'p': '1'}]
+        assert not route.is_async and route.task is None
+
+
+class TestSubscribeRetry:
+    async def test_failed_subscribe_is_retried(self, frames):
+        async with FakeCombinedStream(frames, rate=500) as server:
+            server.reject = {'btcusdt@markPrice@1s'}
+            transport = make_transport(server)
+            prices = PriceCollector()
+            await transport.add_stream('btcusdt@markPrice@1s', prices)
+            await until(lambda: server.requests)
+            conn = transport._connections[0]
+            await until(lambda: conn._retry_handle is not None)
+            assert not transport.is_connected('btcusdt@markPrice@1s')
+
+            server.reject.clear()
+            await until(lambda: transport.is_connected('btcusdt@markPrice@1s') and prices.updates)
+
+            assert conn.subscribe_retries >= 1
+            assert server.requests.count(('SUBSCRIBE', ['btcusdt@markPrice@1s'])) >= 2
+            assert server.connections == 1                   # Retried on the same socket
+            await transport.stop()
@@ -0,0 +1,242 @@
+"""
+PositionGuard single scheduler — streamed prices, shared per-symbol market data
+
+Tests cover:
+1. One pass over many positions reads streamed prices: no ticker calls
+2. Health pass fetches order book / OHLCV once per symbol; liquidity cached for its TTL
+3. Symbols without a streamed price fall back to one ticker per symbol
+4. SymbolVolatilityStore: bar bucketing, same value as the 5m OHLCV formula
+5. price_update events feed prices, daily change, volatility and peaks
+6. Critical loss from a streamed price exits without REST; scheduler start / stop
+7. Without a streamed 24h change it is fetched once per symbol per interval
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+from database.models import Position
+from protection.position_guard import PositionGuard, RiskLevel, SymbolVolatilityStore
+
+SYMBOLS = [f"S{i}/USDT:USDT" for i in range(5)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_760_000_100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_position(position_id, symbol, entry=100.0, side='long'):
+    return Position(
+        id=position_id, trade_id=position_id, exchange='binance', symbol=symbol, side=side,
+        quantity=1.0, entry_price=entry, status='OPEN', opened_at=datetime.now(timezone.utc)
+    )
+
+
+def make_exchange_manager():
+    em = Mock()
+    em.fetch_ticker = AsyncMock(return_value={'last': 100.5, 'percentage': 1.0})
+    em.fetch_ohlcv = AsyncMock(return_value=[[0, 100, 100, 100, 100, 1]] * 20)
+    em.fetch_order_book = AsyncMock(return_value={
+        'bids': [[100.4, 1000.0]], 'asks': [[100.6, 1000.0]]
+    })
+    em.close_position = AsyncMock(return_value=True)
+    return em
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def guard(clock):
+    stop_loss_manager = Mock()
+    stop_loss_manager.cancel_position_stops = AsyncMock()
+    repository = Mock()
+    repository.create_risk_event = AsyncMock()
+    return PositionGuard(
+        exchange_manager=make_exchange_manager(),
+        risk_manager=Mock(),
+        stop_loss_manager=stop_loss_manager,
+        trailing_stop_manager=Mock(),
+        repository=repository,
+        event_router=Mock(),
+        config={'liquidity_ttl_sec': 90, 'health_interval_sec': 60},
+        clock=clock
+    )
+
+
+def monitor(guard, positions):
+    for position in positions:
+        guard.monitored_positions[position.id] = position
+        guard.position_peaks[str(position.id)] = Decimal(str(position.entry_price))
+
+
+async def stream(guard, symbol, price, **extra):
+    await guard._handle_price_update({'symbol': symbol.split('/')[0] + 'USDT', 'price': str(price), **extra})
+
+
+class TestGuardPass:
+    async def test_streamed_prices_batched_health(self, guard, clock):
+        positions = [make_position(i, SYMBOLS[i % len(SYMBOLS)]) for i in range(30)]
+        monitor(guard, positions)
+
+        async def tick():
+            for symbol in SYMBOLS:
+                await stream(guard, symbol, 100.5, percentage=1.0)
+
+        await tick()
+        await guard.run_guard_pass()                            # First pass includes health
+        em = guard.exchange_manager
+        em.fetch_ticker.assert_not_awaited()
+        assert em.fetch_order_book.await_count == len(SYMBOLS)
+        assert em.fetch_ohlcv.await_count == len(SYMBOLS)
+        assert len(guard.position_health) == 30
+        assert all(h.risk_level == RiskLevel.LOW for h in guard.position_health.values())
+
+        clock.now += 30
+        await tick()
+        await guard.run_guard_pass()                            # Price-only pass
+        clock.now += 30
+        await tick()
+        await guard.run_guard_pass()                            # Health, liquidity still fresh
+        assert em.fetch_order_book.await_count == len(SYMBOLS)
+        assert em.fetch_ohlcv.await_count == len(SYMBOLS)
+
+        clock.now += 61
+        await tick()
+        await guard.run_guard_pass()                            # Liquidity expired
+        assert em.fetch_order_book.await_count == 2 * len(SYMBOLS)
+
+        stats = guard.get_guard_stats()
+        assert stats['passes'] == 4 and stats['health_passes'] == 3
+        assert stats['rest_calls'] == 3 * len(SYMBOLS)
+        # Previous loop: 2 tickers / position / pass + OHLCV and order book / position / health pass
+        assert stats['rest_calls_saved'] == 4 * 2 * 30 + 3 * 2 * 30 - 3 * len(SYMBOLS)
+        assert stats['symbols'] == len(SYMBOLS) and stats['max_pass_ms'] >= stats['last_pass_ms'] > 0
+
+    async def test_ticker_fallback_once_per_symbol(self, guard):
+        monitor(guard, [make_position(i, 'BTC/USDT:USDT') for i in range(10)])
+        await guard.run_guard_pass()
+
+        guard.exchange_manager.fetch_ticker.assert_awaited_once_with('BTC/USDT:USDT')
+
+    async def test_custom_price_source(self, guard):
+        streamed = {'ETHUSDT': '2000.5'}
+        guard.price_source = streamed.get
+        monitor(guard, [make_position(1, 'ETH/USDT:USDT', entry=2000.0)])
+        await guard.run_guard_pass()
+
+        guard.exchange_manager.fetch_ticker.assert_awaited_once()     # 24h change only
+        assert guard.position_peaks['1'] == Decimal('2000.5')
+
+
+class TestVolatilityStore:
+    def test_bars_and_formula(self, clock):
+        store = SymbolVolatilityStore(bar_sec=300, window=20, clock=clock)
+        store.update('BTC/USDT:USDT', 100)
+        store.update('BTCUSDT', 101)                            # Same bar: replaces the close
+        assert store.volatility('BTCUSDT') is None
+
+        closes = [101]
+        for price in (102, 100, 103, 99):
+            clock.now += 300
+            store.update('BTCUSDT', price)
+            closes.append(price)
+
+        returns = np.diff(closes) / np.array(closes[:-1])
+        assert store.volatility('BTC/USDT:USDT') == pytest.approx(np.std(returns) * np.sqrt(288) * 100)
+
+    def test_window_and_seed(self, clock):
+        store = SymbolVolatilityStore(window=3, clock=clock)
+        store.seed('BTCUSDT', [100, 100, 100, 100, 100])
+        assert store.volatility('BTCUSDT') == 0.0
+        clock.now += 300
+        store.update('BTCUSDT', 110)
+        assert store.volatility('BTCUSDT') > 0
+        store.discard('BTCUSDT')
+        assert len(store) == 0
+
+
+class TestStreamedEvents:
+    async def test_price_update_feeds_shared_state(self, guard):
+        position = make_position(1, 'BTC/USDT:USDT')
+        monitor(guard, [position])
+        await stream(guard, 'BTC/USDT:USDT', 101, percentage=-12.5)
+
+        assert guard.mark_prices['BTCUSDT'] == Decimal('101')
+        assert guard.daily_changes['BTCUSDT'] == -12.5
+        assert guard.position_peaks['1'] == Decimal('101')
+
+        await guard._handle_price_update({'symbol': 'BTCUSDT', 'price': 0})     # Ignored
+        assert guard.mark_prices['BTCUSDT'] == Decimal('101')
+
+    async def test_critical_loss_without_rest(self, guard):
+        position = make_position(1, 'BTC/USDT:USDT')
+        monitor(guard, [position])
+        await stream(guard, 'BTC/USDT:USDT', 95)                # 5% loss
+        guard._last_health_pass = guard.clock()                 # Skip the health pass
+
+        await guard.run_guard_pass()
+
+        guard.exchange_manager.fetch_ticker.assert_not_awaited()
+        guard.exchange_manager.close_position.assert_awaited_once()
+        assert 1 not in guard.monitored_positions
+
+    async def test_scheduler_lifecycle(self, guard):
+        guard.check_interval = 0.001
+        guard.run_guard_pass = AsyncMock()
+        monitor(guard, [make_position(1, 'BTC/USDT:USDT')])
+
+        guard.start()
+        task = guard._guard_task
+        guard.start()                                           # Already running
+        assert guard._guard_task is task
+        await asyncio.sleep(0.02)
+        assert guard.run_guard_pass.await_count >= 2
+
+        guard.monitored_positions.clear()                       # Exits when nothing is monitored
+        await asyncio.wait_for(task, 1)
+        await guard.stop()
+
+
+class TestDailyChange:
+    async def test_fetched_once_per_symbol_per_interval(self, guard, clock):
+        guard.exchange_manager.fetch_ticker.return_value = {'last': 100.5, 'percentage': -12.0}
+        guard._tighten_protection = AsyncMock()
+        monitor(guard, [make_position(i, SYMBOLS[i % 2]) for i in range(6)])
+        guard._last_health_pass = guard.clock()                 # Skip the health pass
+
+        for _ in range(3):
+            for symbol in SYMBOLS[:2]:
+                await stream(guard, symbol, 100.5)              # Mark price without 24h change
+            await guard.run_guard_pass()
+            clock.now += 5
+
+        assert guard.exchange_manager.fetch_ticker.await_count == 2
+        assert guard._tighten_protection.await_count == 3 * 6   # >10% move detected
+
+        clock.now += 60
+        for symbol in SYMBOLS[:2]:
+            await stream(guard, symbol, 100.5)
+        await guard.run_guard_pass()
+        assert guard.exchange_manager.fetch_ticker.await_count == 4
+
+    async def test_streamed_change_used_without_rest(self, guard):
+        guard._tighten_protection = AsyncMock()
+        monitor(guard, [make_position(1, 'BTC/USDT:USDT')])
+        await stream(guard, 'BTC/USDT:USDT', 100.5, percentage=11.0)
+        guard._last_health_pass = guard.clock()
+
+        await guard.run_guard_pass()
+
+        guard.exchange_manager.fetch_ticker.assert_not_awaited()
+        guard._tighten_protection.assert_awaited_once()
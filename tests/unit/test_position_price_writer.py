@@ -0,0 +1,157 @@
+"""
+PositionPriceWriter — write-behind cache for position price/PnL
+
+Tests cover:
+1. Ticks coalesce to the latest row per position; one round-trip per flush
+2. Flush loop writes on its interval; close() writes what is pending
+3. Failed flush keeps rows (newer ticks win); stats (lag, round-trips)
+4. POSITION_UPDATED logged once per flushed row
+5. PositionManager.close_position flushes before the close UPDATE and
+   forgets the closed position
+"""
+
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core.position_price_writer import PositionPriceWriter
+
+
+def make_position(position_id=1, price='100', pnl='1.5', pnl_pct=1.5, symbol='BTCUSDT'):
+    return SimpleNamespace(
+        id=position_id, symbol=symbol, exchange='binance',
+        current_price=Decimal(price), unrealized_pnl=Decimal(pnl), unrealized_pnl_percent=pnl_pct,
+    )
+
+
+def make_repository():
+    repo = MagicMock()
+    repo.batch_update_position_prices = AsyncMock(side_effect=lambda rows: len(rows))
+    return repo
+
+
+class TestCoalescing:
+    async def test_latest_tick_per_position_in_one_round_trip(self):
+        repo = make_repository()
+        writer = PositionPriceWriter(repo, flush_interval_sec=60)
+        for price in ('100', '101', '102'):
+            writer.mark(make_position(1, price=price))
+        writer.mark(make_position(2, price='5', symbol='ETHUSDT'))
+        writer.mark(make_position('pending'))  # Not in DB yet
+
+        assert await writer.flush() == 2
+        repo.batch_update_position_prices.assert_awaited_once_with([
+            (1, 102.0, 1.5, 1.5),
+            (2, 5.0, 1.5, 1.5),
+        ])
+        assert await writer.flush() == 0
+        assert repo.batch_update_position_prices.await_count == 1
+        await writer.close()
+
+    async def test_flush_loop_and_close(self):
+        repo = make_repository()
+        writer = PositionPriceWriter(repo, flush_interval_sec=0.1)
+        writer.mark(make_position(1))
+        await asyncio.sleep(0.25)
+        assert repo.batch_update_position_prices.await_count == 1
+
+        writer.mark(make_position(1, price='105'))
+        await writer.close()
+        assert repo.batch_update_position_prices.await_args.args[0] == [(1, 105.0, 1.5, 1.5)]
+        assert writer._task is None
+
+
+class TestFailuresAndStats:
+    async def test_failed_flush_keeps_rows(self):
+        repo = make_repository()
+        writer = PositionPriceWriter(repo, flush_interval_sec=60)
+        writer.mark(make_position(1, price='100'))
+        writer.mark(make_position(2, price='5'))
+
+        async def fail_with_tick_in_flight(rows):
+            writer.mark(make_position(1, price='110'))  # Newer tick during the failed write
+            raise RuntimeError('db down')
+        repo.batch_update_position_prices.side_effect = fail_with_tick_in_flight
+
+        assert await writer.flush() == 0
+        assert writer.flush_errors == 1
+
+        repo.batch_update_position_prices.side_effect = lambda rows: len(rows)
+        assert await writer.flush() == 2
+        assert sorted(repo.batch_update_position_prices.await_args.args[0]) == [
+            (1, 110.0, 1.5, 1.5),
+            (2, 5.0, 1.5, 1.5),
+        ]
+        await writer.close()
+
+    async def test_stats(self):
+        writer = PositionPriceWriter(make_repository(), flush_interval_sec=60)
+        writer.mark(make_position(1))
+        await asyncio.sleep(0.02)
+        writer.mark(make_position(1))
+        await writer.flush()
+
+        stats = writer.get_stats()
+        assert stats['marks'] == 2
+        assert stats['rows_written'] == 1
+        assert stats['round_trips_per_sec'] == pytest.approx(1 / 60, abs=1e-3)
+        assert stats['last_flush_lag_ms'] >= 20
+        await writer.close()
+
+
+class TestEvents:
+    async def test_position_updated_per_flushed_row(self):
+        event_logger = MagicMock()
+        event_logger.log_event = AsyncMock()
+        writer = PositionPriceWriter(make_repository(), flush_interval_sec=60)
+
+        with patch('core.position_price_writer.get_event_logger', return_value=event_logger):
+            writer.mark(make_position(1, price='100'))
+            await writer.flush()
+            writer.mark(make_position(1, price='101'))
+            writer.mark(make_position(1, price='102'))
+            await writer.flush()
+
+        assert event_logger.log_event.await_count == 2
+        data = event_logger.log_event.await_args.args[1]
+        assert (data['old_price'], data['new_price']) == (100.0, 102.0)
+        await writer.close()
+
+
+class TestPositionManagerClose:
+    async def test_close_position_flushes_first(self):
+        from core.position_manager import PositionManager
+
+        calls = []
+        repo = MagicMock()
+        repo.batch_update_position_prices = AsyncMock(side_effect=lambda rows: calls.append('flush'))
+        repo.close_position = AsyncMock(side_effect=lambda *a, **k: calls.append('close'))
+        repo.create_order = AsyncMock()
+        repo.create_trade = AsyncMock()
+
+        pm = PositionManager.__new__(PositionManager)
+        pm.price_writer = PositionPriceWriter(repo, flush_interval_sec=60)
+        pm.repository = repo
+        pm.exchanges = {'binance': MagicMock()}
+        pm.stats = {'positions_closed': 0, 'total_pnl': 0, 'win_count': 0, 'loss_count': 0}
+        pm._cleanup_position_monitoring = AsyncMock(side_effect=RuntimeError('stop here'))
+
+        position = make_position(7)
+        position.side = 'long'
+        position.entry_price = Decimal('100')
+        position.quantity = Decimal('1')
+        pm.positions = {'BTCUSDT': position}
+        pm.price_writer.mark(position)
+
+        with patch('core.position_manager.get_event_logger', return_value=None):
+            try:
+                await pm.close_position('BTCUSDT', reason='websocket_closure', close_price=101.0)
+            except RuntimeError:
+                pass
+
+        assert calls == ['flush', 'close']
+        assert 7 not in pm.price_writer._flushed_prices
+        await pm.price_writer.close()
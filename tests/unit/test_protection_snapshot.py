@@ -0,0 +1,210 @@
+"""
+ProtectionSnapshot — account-wide Algo order snapshot for the protection sweep
+
+Tests cover:
+1. has_stop_loss from the snapshot matches StopLossManager.has_stop_loss (per-symbol REST)
+2. ALGO_UPDATE events add / remove orders, also while a refresh is in flight
+3. Refetch after max_age_sec; failed refresh reports no usable snapshot
+4. check_positions_protection makes one account-wide request instead of one per position
+5. BinanceHybridStream emits 'algo.update' with REST-shaped keys
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core.position_manager import PositionManager, PositionState
+from core.protection_snapshot import ProtectionSnapshot
+from core.stop_loss_manager import StopLossManager
+
+
+def algo(algo_id, symbol, side='SELL', status='NEW', algo_type='CONDITIONAL', trigger='90'):
+    return {
+        'algoId': algo_id, 'symbol': symbol, 'side': side, 'algoStatus': status,
+        'algoType': algo_type, 'triggerPrice': trigger,
+    }
+
+
+ALGO_ORDERS = [
+    algo(1, 'BTCUSDT', trigger='90000'),
+    algo(2, 'ETHUSDT', side='BUY', trigger='4000'),
+    algo(3, 'SOLUSDT', status='CANCELED'),
+    algo(4, 'XRPUSDT', algo_type='TWAP'),
+    algo(5, 'DOGEUSDT', side='BUY'),
+    algo(6, 'DOGEUSDT', side='SELL', trigger='0.1'),
+]
+
+
+def make_exchange(orders=ALGO_ORDERS):
+    """CCXT mock: openAlgoOrders filtered by symbol if given (as the API does)"""
+    exchange = MagicMock()
+
+    async def open_algo_orders(params):
+        symbol = params.get('symbol')
+        return [o for o in orders if symbol is None or o['symbol'] == symbol]
+    exchange.fapiPrivateGetOpenAlgoOrders = AsyncMock(side_effect=open_algo_orders)
+    return exchange
+
+
+class TestSnapshot:
+    @pytest.mark.parametrize('symbol', ['BTCUSDT', 'BTC/USDT:USDT', 'ETHUSDT', 'SOLUSDT', 'XRPUSDT', 'DOGEUSDT', 'ADAUSDT'])
+    @pytest.mark.parametrize('position_side', [None, 'long', 'short'])
+    async def test_matches_stop_loss_manager(self, symbol, position_side):
+        exchange = make_exchange()
+        snapshot = ProtectionSnapshot(exchange)
+        assert await snapshot.ensure_fresh()
+
+        expected = await StopLossManager(exchange, 'binance').has_stop_loss(symbol, position_side)
+        assert snapshot.has_stop_loss(symbol, position_side) == expected
+
+    async def test_algo_updates(self):
+        snapshot = ProtectionSnapshot(make_exchange([]))
+        await snapshot.refresh()
+
+        snapshot.apply_algo_update(algo(7, 'BTCUSDT', trigger='91000'))
+        assert snapshot.has_stop_loss('BTCUSDT') == (True, '91000', '7')
+
+        snapshot.apply_algo_update(algo(7, 'BTCUSDT', status='TRIGGERED'))
+        assert snapshot.has_stop_loss('BTCUSDT') == (False, None, None)
+        assert snapshot.get_stats()['symbols'] == 0
+
+    async def test_update_during_refresh_not_lost(self):
+        release = asyncio.Event()
+        exchange = MagicMock()
+
+        async def slow_fetch(params):
+            await release.wait()
+            return [algo(1, 'BTCUSDT')]    # Response predates the cancel below
+        exchange.fapiPrivateGetOpenAlgoOrders = AsyncMock(side_effect=slow_fetch)
+        snapshot = ProtectionSnapshot(exchange)
+
+        refresh = asyncio.create_task(snapshot.refresh())
+        await asyncio.sleep(0)
+        snapshot.apply_algo_update(algo(1, 'BTCUSDT', status='CANCELED'))
+        snapshot.apply_algo_update(algo(2, 'ETHUSDT'))
+        release.set()
+        await refresh
+
+        assert snapshot.has_stop_loss('BTCUSDT')[0] is False
+        assert snapshot.has_stop_loss('ETHUSDT')[0] is True
+
+    async def test_refetch_when_stale(self):
+        exchange = make_exchange()
+        snapshot = ProtectionSnapshot(exchange, max_age_sec=60)
+
+        with patch('core.protection_snapshot.time.monotonic', return_value=1000.0):
+            await snapshot.ensure_fresh()
+            await snapshot.ensure_fresh()
+        assert exchange.fapiPrivateGetOpenAlgoOrders.await_count == 1
+
+        with patch('core.protection_snapshot.time.monotonic', return_value=1061.0):
+            await snapshot.ensure_fresh()
+        assert exchange.fapiPrivateGetOpenAlgoOrders.await_count == 2
+        exchange.fapiPrivateGetOpenAlgoOrders.assert_awaited_with({})
+
+    async def test_failed_refresh(self):
+        exchange = MagicMock()
+        exchange.fapiPrivateGetOpenAlgoOrders = AsyncMock(side_effect=ConnectionError('down'))
+        snapshot = ProtectionSnapshot(exchange)
+
+        assert not await snapshot.ensure_fresh()
+        assert snapshot.get_stats()['refresh_errors'] == 1
+
+
+def make_position(symbol, side='long'):
+    return PositionState(
+        id=1, symbol=symbol, exchange='binance', side=side, quantity=1.0, entry_price=100.0,
+        current_price=100.0, unrealized_pnl=0, unrealized_pnl_percent=0,
+        opened_at=datetime.now(timezone.utc),
+    )
+
+
+def make_config():
+    config = MagicMock()
+    config.stop_loss_percent = 4.0
+    config.max_open_positions = 10
+    config.trailing_activation_percent = 2.0
+    config.trailing_callback_percent = 0.5
+    config.protection_snapshot_max_age_sec = 60.0
+    return config
+
+
+class TestProtectionSweep:
+    def make_manager(self, exchange, event_router=None):
+        exchange_manager = MagicMock()
+        exchange_manager.exchange = exchange
+        exchange_manager.name = 'binance'
+        return PositionManager(
+            config=make_config(), repository=AsyncMock(),
+            exchanges={'binance': exchange_manager}, event_router=event_router or MagicMock(),
+        )
+
+    async def test_one_request_per_sweep(self):
+        exchange = make_exchange()
+        pm = self.make_manager(exchange)
+        for symbol in ('BTCUSDT', 'ETHUSDT', 'DOGEUSDT'):
+            pm.positions[symbol] = make_position(symbol)
+
+        with patch('core.stop_loss_manager.StopLossManager') as sl_manager_class:
+            await pm.check_positions_protection()
+            sl_manager_class.return_value.has_stop_loss.assert_not_called()
+
+        exchange.fapiPrivateGetOpenAlgoOrders.assert_awaited_once_with({})
+        assert pm.positions['BTCUSDT'].has_stop_loss
+        assert pm.positions['BTCUSDT'].stop_loss_price == '90000'
+        assert pm.positions['ETHUSDT'].has_stop_loss    # Side is not checked by the sweep (as before)
+        assert pm.get_statistics()['protection_snapshots']['binance']['lookups'] == 3
+
+    async def test_missing_sl_goes_to_repair(self):
+        pm = self.make_manager(make_exchange())
+        pm.positions['ADAUSDT'] = make_position('ADAUSDT')
+
+        with patch('core.stop_loss_manager.StopLossManager') as sl_manager_class:
+            sl_manager_class.return_value.verify_and_fix_missing_sl = AsyncMock(return_value=(True, '99'))
+            pm.exchanges['binance'].fetch_ticker = AsyncMock(return_value={'last': 100.0, 'info': {}})
+            await pm.check_positions_protection()
+
+            sl_manager_class.return_value.verify_and_fix_missing_sl.assert_awaited_once()
+        assert 'ADAUSDT' in pm.positions_without_sl_time
+
+    async def test_fallback_when_snapshot_unavailable(self):
+        exchange = MagicMock()
+        exchange.fapiPrivateGetOpenAlgoOrders = AsyncMock(side_effect=ConnectionError('down'))
+        pm = self.make_manager(exchange)
+        pm.positions['BTCUSDT'] = make_position('BTCUSDT')
+
+        with patch('core.stop_loss_manager.StopLossManager') as sl_manager_class:
+            sl_manager_class.return_value.has_stop_loss = AsyncMock(return_value=(True, '90', '1'))
+            await pm.check_positions_protection()
+            sl_manager_class.return_value.has_stop_loss.assert_awaited_once_with('BTCUSDT')
+
+    async def test_algo_update_event_reaches_snapshot(self):
+        from websocket.event_router import EventRouter
+        router = EventRouter()
+        pm = self.make_manager(make_exchange([]), event_router=router)
+
+        await router.emit('algo.update', algo(9, 'BTCUSDT'))
+        await asyncio.sleep(0.01)
+
+        assert pm.protection_snapshots['binance'].has_stop_loss('BTCUSDT')[0]
+
+
+class TestHybridStreamAlgoUpdate:
+    async def test_algo_update_emitted(self):
+        from websocket.binance_hybrid_stream import BinanceHybridStream
+        handler = AsyncMock()
+        stream = BinanceHybridStream('key', 'secret', event_handler=handler)
+
+        await stream._handle_user_message({
+            'e': 'ALGO_UPDATE', 'T': 1750000000000, 'E': 1750000000001,
+            'o': {'caid': 'sl-1', 'aid': 2148719, 'at': 'CONDITIONAL', 'o': 'STOP_MARKET',
+                  's': 'BTCUSDT', 'S': 'SELL', 'ps': 'BOTH', 'q': '0.01', 'X': 'NEW',
+                  'tp': '90000', 'p': '0', 'R': True, 'cp': False},
+        })
+
+        event, info = handler.await_args.args
+        assert event == 'algo.update'
+        assert (info['algoId'], info['symbol'], info['side'], info['algoStatus'], info['algoType'], info['triggerPrice']) \
+            == (2148719, 'BTCUSDT', 'SELL', 'NEW', 'CONDITIONAL', '90000')
@@ -0,0 +1,240 @@
+"""
+RateLimiter — request weights, response-header resync and priorities
+
+A scripted exchange simulator replays a sequence of (status, headers)
+responses through the CCXT on_rest_response hook; a virtual clock drives
+the limiter so waits are exact and instant.
+
+Tests cover:
+1. Documented Binance endpoint weights, incl. CCXT implicit API methods
+2. X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-10S resync the buckets
+3. Reads stop at the reserve, orders use the full budget
+4. 429 Retry-After blocks all requests, then the request is retried
+5. Waiting orders are served before waiting reads
+6. No waits while budget is available (fast path)
+"""
+
+import asyncio
+
+import ccxt
+import ccxt.async_support as ccxt_async
+import pytest
+
+from utils.rate_limiter import (
+    BINANCE_ENDPOINT_WEIGHTS,
+    PRIORITY_ORDER,
+    PRIORITY_READ,
+    ExchangeRateLimiter,
+    RateLimitConfig,
+    RateLimiter,
+    RequestCost,
+)
+
+
+class SimClock:
+    """Virtual monotonic clock; sleeping advances it in ticks, yielding to other tasks"""
+
+    def __init__(self, tick=0.01):
+        self.now = 1000.0
+        self.tick = tick
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, delay):
+        target = self.now + delay
+        while self.now < target:
+            self.now += min(self.tick, target - self.now)
+            await asyncio.sleep(0)
+
+
+def headers(weight, orders=None, retry_after=None):
+    result = {'Content-Type': 'application/json', 'X-MBX-USED-WEIGHT-1M': str(weight)}
+    if orders is not None:
+        result['X-MBX-ORDER-COUNT-10S'] = str(orders)
+    if retry_after is not None:
+        result['Retry-After'] = str(retry_after)
+    return result
+
+
+class ScriptedBinance:
+    """CCXT stand-in: every request replays the next scripted (status, headers)"""
+
+    def __init__(self, script=()):
+        self.script = list(script)
+        self.calls = []
+
+    def on_rest_response(self, code, reason, url, method, response_headers, response_body,
+                         request_headers, request_body):
+        return response_body
+
+    async def _request(self, name, path):
+        status, response_headers = self.script.pop(0) if self.script else (200, {})
+        self.calls.append(name)
+        self.on_rest_response(status, 'OK', f'https://fapi.binance.com/fapi/{path}', 'GET',
+                              response_headers, '{}', {}, None)
+        if status == 429:
+            raise ccxt.RateLimitExceeded('binanceusdm 429 Too Many Requests')
+        if status == 418:
+            raise ccxt.DDoSProtection('binanceusdm 418 IP banned')
+        return {'method': name}
+
+    async def fetch_positions(self, symbols=None, params=None):
+        return await self._request('fetch_positions', 'v2/positionRisk')
+
+    async def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        return await self._request('fetch_open_orders', 'v1/openOrders')
+
+    async def create_order(self, symbol, type, side, amount, price=None, params=None):
+        return await self._request('create_order', 'v1/order')
+
+    async def cancel_order(self, id, symbol=None, params=None):
+        return await self._request('cancel_order', 'v1/order')
+
+
+@pytest.fixture
+def clock():
+    return SimClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    config = RateLimitConfig(weight_per_minute=2000, orders_per_10s=250, read_reserve_ratio=0.15,
+                             header_url_filter='/fapi/', min_retry_delay=1.0)
+    return RateLimiter(config, endpoint_weights=BINANCE_ENDPOINT_WEIGHTS, clock=clock, sleep=clock.sleep)
+
+
+@pytest.fixture
+def exchange(limiter):
+    exchange = ScriptedBinance()
+    wrapper = ExchangeRateLimiter('binance')
+    wrapper.limiter = limiter
+    wrapper.attach(exchange)
+    return exchange, wrapper
+
+
+class TestWeights:
+    def test_endpoint_weights(self, limiter):
+        fake = ScriptedBinance()
+        assert limiter.cost_of(fake.fetch_positions) == RequestCost(5, 0, PRIORITY_READ)
+        assert limiter.cost_of(fake.fetch_open_orders, ('BTC/USDT:USDT',)).weight == 1
+        assert limiter.cost_of(fake.fetch_open_orders, (None,)).weight == 40
+        assert limiter.cost_of(fake.create_order, (), {'symbol': 'BTC/USDT:USDT'}) == RequestCost(1, 1, PRIORITY_ORDER)
+        assert limiter.cost_of(fake.cancel_order) == RequestCost(1, 0, PRIORITY_ORDER)
+
+    def test_implicit_api_methods(self, limiter):
+        binance = ccxt_async.binanceusdm()
+        assert limiter.cost_of(binance.fapiPrivateGetOpenAlgoOrders, ({},)).weight == 40
+        assert limiter.cost_of(binance.fapiPrivateGetOpenAlgoOrders, ({'symbol': 'BTCUSDT'},)).weight == 1
+        assert limiter.cost_of(binance.fapiPrivatePostAlgoOrder, ({},)) == RequestCost(1, 1, PRIORITY_ORDER)
+        assert limiter.cost_of(binance.fapiPrivateV2GetPositionRisk, ({},)).weight == 5
+        assert limiter.cost_of(binance.fetch_ohlcv, ('BTC/USDT:USDT', '1m'), {'limit': 1500}).weight == 10
+        assert limiter.cost_of(binance.fetch_order_book, ('BTC/USDT:USDT', 1000)).weight == 20
+
+    def test_ohlcv_positional_limit(self, limiter):
+        binance = ccxt_async.binanceusdm()
+        # fetch_ohlcv(symbol, timeframe, since, limit): `since` must not be read as the limit
+        since = 1_700_000_000_000
+        assert limiter.cost_of(binance.fetch_ohlcv, ('BTC/USDT:USDT', '1m', since, 1500)).weight == 10
+        assert limiter.cost_of(binance.fetch_ohlcv, ('BTC/USDT:USDT', '1m', since, 50)).weight == 1
+        assert limiter.cost_of(binance.fetch_ohlcv, ('BTC/USDT:USDT', '1m', since)).weight == 5
+
+
+class TestHeaderSync:
+    async def test_scripted_header_sequence(self, exchange, limiter, clock):
+        fake, wrapper = exchange
+        fake.script = [(200, headers(5)), (200, headers(400)), (200, headers(1500, orders=3)), (200, headers(1750)),
+                       (200, headers(1700))]
+
+        for expected_used in (5, 400, 1500, 1750):
+            await wrapper.execute_request(fake.fetch_positions)
+            assert limiter.get_stats()['current_tokens'] == 2000 - expected_used
+        assert limiter.order_tokens == 250 - 3
+        assert clock.now == 1000.0                                    # No waits so far
+
+        # 250 left, reserve 300: a read (weight 5) waits for 55 weight to refill (2000/60 per s)
+        await wrapper.execute_request(fake.fetch_positions)
+        assert clock.now - 1000.0 == pytest.approx(55 / (2000 / 60))
+        assert limiter.get_stats()['header_syncs'] == 5
+
+    async def test_orders_use_reserve(self, exchange, limiter, clock):
+        fake, wrapper = exchange
+        fake.script = [(200, headers(1990)), (200, headers(1991, orders=1))]
+        await wrapper.execute_request(fake.fetch_positions)
+
+        await wrapper.execute_request(fake.create_order, 'BTC/USDT:USDT', 'market', 'sell', 0.01)
+        assert clock.now == 1000.0                                    # Immediately, despite < reserve
+
+    async def test_order_count_header(self, exchange, limiter, clock):
+        fake, wrapper = exchange
+        fake.script = [(200, headers(10, orders=250)), (200, headers(11, orders=1))]
+        await wrapper.execute_request(fake.create_order, 'BTC/USDT:USDT', 'market', 'buy', 0.01)
+
+        await wrapper.execute_request(fake.create_order, 'BTC/USDT:USDT', 'market', 'buy', 0.01)
+        assert clock.now - 1000.0 == pytest.approx(1 / 25)           # One order token at 250/10s
+
+    async def test_other_urls_ignored(self, limiter):
+        binance = ccxt_async.binanceusdm()
+        wrapper = ExchangeRateLimiter('binance')
+        wrapper.limiter = limiter
+        wrapper.attach(binance)
+
+        binance.on_rest_response(200, 'OK', 'https://api.binance.com/api/v3/account', 'GET',
+                                 headers(900), ' {} ', {}, None)
+        assert limiter.used_weight_1m is None
+        body = binance.on_rest_response(200, 'OK', 'https://fapi.binance.com/fapi/v1/order', 'POST',
+                                        headers(37, orders=3), ' {} ', {}, None)
+        assert body == '{}'                                           # Original hook still applied
+        assert (limiter.used_weight_1m, limiter.order_count_10s) == (37, 3)
+
+
+class TestBackoff:
+    async def test_retry_after_blocks_then_retries(self, exchange, limiter, clock):
+        fake, wrapper = exchange
+        fake.script = [(429, headers(1500, retry_after=7)), (200, headers(12))]
+
+        result = await wrapper.execute_request(fake.fetch_positions)
+
+        assert result == {'method': 'fetch_positions'}
+        assert fake.calls == ['fetch_positions', 'fetch_positions']
+        assert clock.now - 1000.0 == pytest.approx(7.0)
+        stats = limiter.get_stats()
+        assert stats['bans'] == 1 and stats['successful_requests'] == 1
+        assert stats['current_tokens'] == 2000 - 12
+
+
+class TestPriority:
+    async def test_orders_before_waiting_reads(self, exchange, limiter, clock):
+        fake, wrapper = exchange
+        fake.script = [(200, headers(2000))] + [(200, headers(100))] * 2
+        await wrapper.execute_request(fake.fetch_positions)
+        assert limiter.weight_tokens == 0
+
+        done = []
+
+        async def run(name, func, *args):
+            await wrapper.execute_request(func, *args)
+            done.append(name)
+
+        read = asyncio.create_task(run('read', fake.fetch_positions))
+        await asyncio.sleep(0)                                        # Read is queued first
+        order = asyncio.create_task(run('cancel', fake.cancel_order, '123', 'BTC/USDT:USDT'))
+        await asyncio.gather(read, order)
+
+        assert done == ['cancel', 'read']
+
+    async def test_fast_path_no_waits(self, exchange, limiter, clock):
+        fake, wrapper = exchange
+        fake.script = [(200, headers(50 + i)) for i in range(300)]
+
+        for i in range(300):
+            if i % 3 == 0:
+                await wrapper.execute_request(fake.create_order, 'BTC/USDT:USDT', 'limit', 'buy', 1, 1.0)
+            else:
+                await wrapper.execute_request(fake.fetch_open_orders, 'BTC/USDT:USDT')
+
+        stats = limiter.get_stats()
+        assert clock.now == 1000.0
+        assert stats['rate_limited_requests'] == 0 and stats['total_wait_time'] == 0
+        assert stats['total_requests'] == 300 and stats['priority_requests'] == 100
+        assert stats['requests_last_minute'] == 300
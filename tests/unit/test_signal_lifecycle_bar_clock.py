@@ -0,0 +1,181 @@
+"""
+SignalLifecycleManager bar clock
+
+Completed bars are queued per symbol by the aggregator callback; the
+1s clock flushes aggregators and hands each symbol's queue to its own
+evaluation task without waiting on it.
+
+Tests cover:
+1. Callback queues bars (no task per bar), bounded backlog drops oldest
+2. Tick flushes aggregators and evaluates each symbol's bars in order
+3. A slow handler holds up neither the clock nor other symbols
+4. One evaluation in flight per symbol; later bars wait behind it
+5. Missed boundaries still produce their empty bars
+6. Tick wall time / lag / busy counters, exposed in get_stats()
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+from core.bar_aggregator import BarAggregator, OneSecondBar
+from core.signal_lifecycle import SignalLifecycleManager, SignalState
+
+
+def make_manager(backlog: int = 3) -> SignalLifecycleManager:
+    strategy = MagicMock()
+    strategy.version = 'test'
+    return SignalLifecycleManager(
+        composite_strategy=strategy,
+        position_manager=None,
+        bar_backlog_max=backlog,
+    )
+
+
+def make_bar(ts: int, price: float = 100.0) -> OneSecondBar:
+    return OneSecondBar(ts=ts, price=price, delta=0.0, large_buy_count=0, large_sell_count=0)
+
+
+def add_lifecycle(mgr: SignalLifecycleManager, symbol: str, state=SignalState.IN_POSITION):
+    lc = MagicMock()
+    lc.state = state
+    lc.bar_aggregator = BarAggregator(symbol)
+    lc.bar_aggregator.on_bar_callback = lambda bar, s=symbol: mgr._enqueue_bar(s, bar)
+    mgr.active[symbol] = lc
+    return lc
+
+
+class TestBarBacklog:
+    def test_callback_queues_without_tasks(self):
+        mgr = make_manager()
+        add_lifecycle(mgr, 'AUSDT')
+        mgr.active['AUSDT'].bar_aggregator.on_trade(100.0, 1.0, False, 1_000_000)
+        mgr.active['AUSDT'].bar_aggregator.on_trade(101.0, 1.0, False, 1_001_000)
+
+        assert [b.ts for b in mgr._bar_backlog['AUSDT']] == [1000]
+        assert not mgr._bar_tasks
+
+    def test_full_backlog_drops_oldest(self):
+        mgr = make_manager(backlog=3)
+        for ts in range(5):
+            mgr._enqueue_bar('AUSDT', make_bar(ts))
+
+        assert [b.ts for b in mgr._bar_backlog['AUSDT']] == [2, 3, 4]
+        assert mgr.bar_clock_stats.bars_dropped == 2
+
+
+class TestBarClockTick:
+    async def test_tick_flushes_and_evaluates_in_order(self):
+        mgr = make_manager()
+        seen = []
+
+        async def on_bar(symbol, bar):
+            seen.append((symbol, bar.ts))
+        mgr.on_bar = on_bar
+
+        add_lifecycle(mgr, 'AUSDT')
+        add_lifecycle(mgr, 'BUSDT')
+        add_lifecycle(mgr, 'CUSDT', state=SignalState.WAITING_DATA)
+        mgr._enqueue_bar('AUSDT', make_bar(1))
+        mgr._enqueue_bar('AUSDT', make_bar(2))
+        mgr.active['BUSDT'].bar_aggregator.on_trade(50.0, 1.0, True, 3_000)
+
+        await mgr._run_bar_clock_tick(boundary=0)
+        await mgr.wait_bar_evaluations()
+
+        assert [ts for s, ts in seen if s == 'AUSDT'] == [1, 2]
+        assert [ts for s, ts in seen if s == 'BUSDT'] == [3]
+        assert 'CUSDT' not in mgr._bar_backlog
+        assert not any(mgr._bar_backlog.values())
+        assert not mgr._bar_tasks
+
+        stats = mgr.bar_clock_stats
+        assert stats.ticks == 1
+        assert stats.bars_processed == 3
+        assert stats.last_lag_ms > 0
+        assert mgr.get_stats()['bar_clock']['bars_processed'] == 3
+
+    async def test_slow_handler_does_not_block_clock_or_other_symbols(self):
+        mgr = make_manager(backlog=10)
+        release = asyncio.Event()
+        seen = []
+
+        async def on_bar(symbol, bar):
+            if symbol == 'SLOWUSDT':
+                await release.wait()    # e.g. a hung _close_position REST call
+            seen.append((symbol, bar.ts))
+        mgr.on_bar = on_bar
+
+        mgr._enqueue_bar('SLOWUSDT', make_bar(1))
+        mgr._enqueue_bar('FASTUSDT', make_bar(1))
+        await asyncio.wait_for(mgr._run_bar_clock_tick(boundary=0), timeout=1)
+        await asyncio.sleep(0)
+        assert seen == [('FASTUSDT', 1)]
+
+        # Next tick: the fast symbol keeps moving, the slow one stays queued
+        mgr._enqueue_bar('SLOWUSDT', make_bar(2))
+        mgr._enqueue_bar('FASTUSDT', make_bar(2))
+        await asyncio.wait_for(mgr._run_bar_clock_tick(boundary=1), timeout=1)
+        await asyncio.sleep(0)
+        assert seen == [('FASTUSDT', 1), ('FASTUSDT', 2)]
+        assert mgr.bar_clock_stats.busy_symbol_ticks == 1
+        assert list(mgr._bar_tasks) == ['SLOWUSDT']
+
+        release.set()
+        await mgr.wait_bar_evaluations()
+        assert [ts for s, ts in seen if s == 'SLOWUSDT'] == [1, 2]
+        assert mgr.bar_clock_stats.bars_processed == 4
+
+    async def test_one_evaluation_in_flight_per_symbol(self):
+        mgr = make_manager(backlog=10)
+        running = 0
+        peak = 0
+
+        async def on_bar(symbol, bar):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+        mgr.on_bar = on_bar
+
+        for ts in range(5):
+            mgr._enqueue_bar('AUSDT', make_bar(ts))
+            await mgr._run_bar_clock_tick(boundary=ts)
+
+        await mgr.wait_bar_evaluations()
+        assert peak == 1
+        assert mgr.bar_clock_stats.bars_processed == 5
+
+    async def test_missed_boundaries_produce_empty_bars(self):
+        mgr = make_manager(backlog=10)
+
+        async def on_bar(symbol, bar):
+            pass
+        mgr.on_bar = on_bar
+
+        lc = add_lifecycle(mgr, 'AUSDT')
+        lc.bar_aggregator.add_historical_bar(make_bar(99))
+
+        await mgr._run_bar_clock_tick(boundary=103, catch_up_from=101)
+
+        assert [b.ts for b in mgr._bar_backlog['AUSDT']] == [101, 102, 103]
+        assert mgr.bar_clock_stats.caught_up_ticks == 2
+        await mgr.wait_bar_evaluations()
+
+    async def test_error_in_one_symbol_does_not_stop_others(self):
+        mgr = make_manager()
+        seen = []
+
+        async def on_bar(symbol, bar):
+            if symbol == 'AUSDT':
+                raise RuntimeError('boom')
+            seen.append(symbol)
+        mgr.on_bar = on_bar
+
+        mgr._enqueue_bar('AUSDT', make_bar(1))
+        mgr._enqueue_bar('BUSDT', make_bar(1))
+        await mgr._run_bar_clock_tick(boundary=0)
+        await mgr.wait_bar_evaluations()
+
+        assert seen == ['BUSDT']
+        assert not mgr._bar_tasks
@@ -0,0 +1,125 @@
+"""
+StartupGraph — concurrent startup stages with per-stage timings
+
+Tests cover:
+1. Independent stages overlap; dependents start only after their dependencies
+2. Critical failure cancels running stages and re-raises; report still available
+3. Non-critical failure skips only its dependents
+4. Unknown dependencies and cycles are rejected before anything runs
+5. BOT_STARTUP_STAGES with simulated stage durations: time-to-protected does
+   not wait for streams / signal processor / lifecycle and stays within budget
+"""
+
+import asyncio
+
+import pytest
+
+from core.startup import BOT_STARTUP_STAGES, CANCELLED, FAILED, OK, SKIPPED, StartupGraph
+
+# Simulated stage durations (s): heavy REST / DB stages of a restart
+STAGE_SEC = {
+    'database': 0.08,
+    'exchanges': 0.10,
+    'streams': 0.12,
+    'positions': 0.06,          # Load + verify SLs (marks 'protected')
+    'stream_sync': 0.03,
+    'signal_processor': 0.02,
+    'lifecycle': 0.05,
+}
+SERIAL_TO_PROTECTED = STAGE_SEC['database'] + STAGE_SEC['exchanges'] + STAGE_SEC['streams'] + STAGE_SEC['positions']
+PROTECTED_BUDGET = max(STAGE_SEC['database'], STAGE_SEC['exchanges']) + STAGE_SEC['positions'] + 0.05
+
+
+def sleeper(sec, log=None, name=None):
+    async def stage():
+        if log is not None:
+            log.append(('start', name))
+        await asyncio.sleep(sec)
+        if log is not None:
+            log.append(('end', name))
+    return stage
+
+
+class TestStartupGraph:
+    async def test_independent_stages_overlap(self):
+        log = []
+        graph = StartupGraph()
+        graph.add('a', sleeper(0.05, log, 'a'))
+        graph.add('b', sleeper(0.05, log, 'b'))
+        graph.add('c', sleeper(0.01, log, 'c'), after=('a', 'b'))
+        report = await graph.run()
+
+        assert log[:2] == [('start', 'a'), ('start', 'b')]
+        assert log.index(('start', 'c')) > max(log.index(('end', 'a')), log.index(('end', 'b')))
+        assert report.total < 0.1 < report.serial_total + 0.01
+        assert all(s.status == OK for s in report.stages.values())
+        c = report.stages['c']
+        assert c.start >= report.stages['a'].end and c.duration == pytest.approx(0.01, abs=0.01)
+        assert 'c' in report.summary()
+
+    async def test_critical_failure_cancels(self):
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+
+        graph = StartupGraph()
+        graph.add('db', boom)
+        graph.add('slow', sleeper(1.0))
+        graph.add('after_db', sleeper(0.01), after=('db',))
+        with pytest.raises(RuntimeError, match='db down'):
+            await graph.run()
+
+        report = graph.report()
+        assert report.stages['db'].status == FAILED and report.stages['db'].error == 'db down'
+        assert report.stages['slow'].status == CANCELLED
+        assert report.stages['after_db'].status in (SKIPPED, CANCELLED)
+        assert report.total < 0.5
+
+    async def test_non_critical_failure_skips_dependents(self):
+        async def boom():
+            raise RuntimeError("optional")
+
+        graph = StartupGraph()
+        graph.add('optional', boom, critical=False)
+        graph.add('uses_optional', sleeper(0), after=('optional',))
+        graph.add('other', sleeper(0))
+        report = await graph.run()
+
+        assert {n: s.status for n, s in report.stages.items()} == {
+            'optional': FAILED, 'uses_optional': SKIPPED, 'other': OK,
+        }
+
+    async def test_invalid_graph(self):
+        graph = StartupGraph()
+        graph.add('a', sleeper(0), after=('missing',))
+        with pytest.raises(ValueError, match='unknown stage missing'):
+            await graph.run()
+
+        graph = StartupGraph()
+        graph.add('a', sleeper(0), after=('b',))
+        graph.add('b', sleeper(0), after=('a',))
+        with pytest.raises(ValueError, match='cycle'):
+            await graph.run()
+
+        with pytest.raises(ValueError, match='Duplicate'):
+            graph.add('a', sleeper(0))
+
+
+class TestBotStartupLayout:
+    async def test_time_to_protected(self):
+        graph = StartupGraph()
+        for name, after in BOT_STARTUP_STAGES.items():
+            stage = sleeper(STAGE_SEC[name])
+            if name == 'positions':
+                async def stage(inner=stage):
+                    await inner()
+                    graph.mark('protected')
+            graph.add(name, stage, after=after)
+        report = await graph.run()
+
+        assert set(report.stages) == set(STAGE_SEC)
+        assert report.time_to_protected is not None
+        assert report.time_to_protected < PROTECTED_BUDGET < SERIAL_TO_PROTECTED
+        assert report.time_to_protected < report.stages['streams'].end     # Not waiting for streams
+        assert report.total < report.serial_total
+        assert report.to_dict()['milestones']['protected'] == round(report.time_to_protected, 3)
@@ -0,0 +1,181 @@
+"""
+SmartTrailingStopManager.update_price — float fast path and per-symbol locks
+
+Tests cover:
+1. Quiet ticks (no new peak / breakeven / activation) skip the locked path
+2. Crossing a threshold after quiet ticks still activates / tracks the peak (long and short)
+3. Same final state as the locked path on a random walk
+4. A slow update for one symbol does not block another symbol
+5. Lock-wait metrics in get_status()
+"""
+
+import asyncio
+import random
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from protection.trailing_stop import (
+    SmartTrailingStopManager,
+    TrailingStopConfig,
+    TrailingStopInstance,
+    TrailingStopState,
+)
+
+
+def make_manager(breakeven_at=None) -> SmartTrailingStopManager:
+    manager = SmartTrailingStopManager(
+        exchange_manager=MagicMock(),
+        config=TrailingStopConfig(breakeven_at=breakeven_at),
+        exchange_name='binance',
+        repository=AsyncMock(),
+    )
+    manager._save_state = AsyncMock(return_value=True)
+    manager._update_stop_order = AsyncMock(return_value=True)
+    return manager
+
+
+def add_stop(manager, symbol='AUSDT', side='long', entry='100', activation_percent='2'):
+    entry = Decimal(entry)
+    sign = 1 if side == 'long' else -1
+    ts = TrailingStopInstance(
+        symbol=symbol,
+        entry_price=entry,
+        current_price=entry,
+        highest_price=entry if side == 'long' else Decimal('999999'),
+        lowest_price=Decimal('999999') if side == 'long' else entry,
+        side=side,
+        quantity=Decimal('1'),
+        activation_percent=Decimal(activation_percent),
+        callback_percent=Decimal('0.5'),
+        activation_price=entry * (1 + sign * Decimal(activation_percent) / 100),
+    )
+    manager.trailing_stops[symbol] = ts
+    return ts
+
+
+class TestFastPath:
+    async def test_quiet_ticks_skip_lock(self):
+        manager = make_manager()
+        ts = add_stop(manager)
+
+        await manager.update_price('AUSDT', Decimal('100.5'))   # New peak: locked
+        for price in ('100.1', '99.0', '100.4', '100.5'):
+            await manager.update_price('AUSDT', Decimal(price))
+
+        assert manager.locked_ticks == 2        # First tick + equal-to-peak tick
+        assert manager.fast_path_ticks == 3
+        assert ts.current_price == Decimal('100.5')
+        assert ts.highest_price == Decimal('100.5')
+        assert ts.state == TrailingStopState.INACTIVE
+
+    async def test_activation_after_quiet_ticks(self):
+        manager = make_manager()
+        ts = add_stop(manager)
+        await manager.update_price('AUSDT', Decimal('101'))
+        await manager.update_price('AUSDT', Decimal('100'))
+
+        result = await manager.update_price('AUSDT', Decimal('102'))
+
+        assert result['action'] == 'activated'
+        assert ts.state == TrailingStopState.ACTIVE
+        assert ts.highest_price == Decimal('102')
+
+    async def test_short_side(self):
+        manager = make_manager()
+        ts = add_stop(manager, side='short')
+        await manager.update_price('AUSDT', Decimal('99'))
+        await manager.update_price('AUSDT', Decimal('99.5'))     # Quiet
+        assert manager.fast_path_ticks == 1
+
+        result = await manager.update_price('AUSDT', Decimal('98'))
+        assert result['action'] == 'activated'
+        assert ts.lowest_price == Decimal('98')
+
+    async def test_breakeven_not_skipped(self):
+        manager = make_manager(breakeven_at=Decimal('0.5'))
+        ts = add_stop(manager)
+        await manager.update_price('AUSDT', Decimal('100.2'))
+        await manager.update_price('AUSDT', Decimal('100.1'))
+
+        result = await manager.update_price('AUSDT', Decimal('100.5'))
+
+        assert result['action'] == 'breakeven'
+        assert ts.state == TrailingStopState.WAITING
+
+    async def test_matches_locked_path_on_random_walk(self):
+        rng = random.Random(7)
+        prices = [Decimal('100')]
+        for _ in range(2000):
+            prices.append((prices[-1] * Decimal(str(1 + rng.gauss(0, 0.002)))).quantize(Decimal('0.0001')))
+
+        fast = make_manager(breakeven_at=Decimal('0.5'))
+        locked = make_manager(breakeven_at=Decimal('0.5'))
+        fast_ts = add_stop(fast, activation_percent='3')
+        locked_ts = add_stop(locked, activation_percent='3')
+
+        with patch.object(locked, '_quiet_limit', return_value=None):
+            for price in prices:
+                fast_result = await fast.update_price('AUSDT', price)
+                locked_result = await locked.update_price('AUSDT', price)
+                assert fast_result == locked_result
+
+        for field in ('current_price', 'highest_price', 'highest_profit_percent', 'state', 'current_stop_price'):
+            assert getattr(fast_ts, field) == getattr(locked_ts, field), field
+        assert fast.fast_path_ticks > 1000
+
+
+class TestSymbolLocks:
+    async def test_slow_symbol_does_not_block_others(self):
+        manager = make_manager()
+        add_stop(manager, 'AUSDT')
+        add_stop(manager, 'BUSDT')
+        release = asyncio.Event()
+
+        async def slow_check(ts):
+            if ts.symbol == 'AUSDT':
+                await release.wait()
+            return None
+        manager._check_activation = slow_check
+
+        slow = asyncio.create_task(manager.update_price('AUSDT', Decimal('101')))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(manager.update_price('BUSDT', Decimal('101')), timeout=1)
+
+        assert not slow.done()
+        release.set()
+        await slow
+
+    async def test_close_waits_for_in_flight_update(self):
+        manager = make_manager()
+        add_stop(manager)
+        order = []
+        manager._delete_state = AsyncMock(side_effect=lambda symbol: order.append('deleted') or True)
+        release = asyncio.Event()
+
+        async def slow_check(ts):
+            await release.wait()
+            order.append('update')
+        manager._check_activation = slow_check
+
+        update = asyncio.create_task(manager.update_price('AUSDT', Decimal('101')))
+        await asyncio.sleep(0)
+        close = asyncio.create_task(manager.on_position_closed('AUSDT'))
+        await asyncio.sleep(0)
+        release.set()
+        await update
+        await close
+
+        assert order == ['update', 'deleted']
+        assert 'AUSDT' not in manager.trailing_stops
+        assert 'AUSDT' not in manager.symbol_locks
+
+    async def test_status_exposes_lock_wait(self):
+        manager = make_manager()
+        add_stop(manager)
+        await manager.update_price('AUSDT', Decimal('101'))
+        await manager.update_price('AUSDT', Decimal('100'))
+
+        stats = manager.get_status()['update_price']
+        assert stats['locked_ticks'] == 1
+        assert stats['fast_path_ticks'] == 1
+        assert stats['lock_wait_max_ms'] >= 0
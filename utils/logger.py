@@ -1,11 +1,31 @@
 """
 Centralized logging configuration
+
+setup_async_logging() routes the root logger through a bounded queue: callers
+(the event loop) only enqueue records, a QueueListener thread does the
+formatting, console/file I/O and rotation. Repetitive records of the
+hot-path loggers (market streams, bar aggregation) are deduplicated and rate
+limited per logger before they are enqueued; every other logger - trading,
+positions, orders, audit - passes untouched.
 """
 import logging
 import logging.handlers
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Loggers (and their children) subject to dedup and rate limiting
+HOT_PATH_LOGGERS: Tuple[str, ...] = (
+    'websocket',
+    'core.bar_aggregator',
+    'core.columnar_bar_aggregator',
+    'core.latency_trace',
+)
 
 
 def setup_logger(
@@ -35,17 +55,29 @@ def setup_logger(
     # Remove existing handlers
     logger.handlers = []
 
-    # Default format
-    if not format_string:
-        format_string = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    for handler in _build_handlers(log_file, console, format_string or DEFAULT_FORMAT):
+        logger.addHandler(handler)
+
+    return logger
+
 
+def _build_handlers(
+        log_file: Optional[str],
+        console: bool,
+        format_string: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        stream=sys.stdout
+) -> List[logging.Handler]:
+    """Console and rotating file handlers sharing one formatter"""
     formatter = logging.Formatter(format_string)
+    handlers: List[logging.Handler] = []
 
     # Console handler
     if console:
-        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler = logging.StreamHandler(stream)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
     # File handler with rotation
     if log_file:
@@ -53,16 +85,15 @@ def setup_logger(
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Rotating file handler (10MB max, 5 backups)
         file_handler = logging.handlers.RotatingFileHandler(
             log_file,
-            maxBytes=10 * 1024 * 1024,
-            backupCount=5
+            maxBytes=max_bytes,
+            backupCount=backup_count
         )
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
 
-    return logger
+    return handlers
 
 
 def setup_trading_logger():
@@ -75,5 +106,277 @@ def setup_trading_logger():
     )
 
 
-# Default logger instance for imports
-logger = setup_trading_logger()
\ No newline at end of file
+class HotPathFilter(logging.Filter):
+    """
+    Deduplicate and rate limit repetitive records before they are enqueued
+
+    Only records of `hot_loggers` (logger names, children included) are
+    considered; all other loggers always pass.
+
+    - Dedup: a record identical to one seen within dedup_window_sec (same
+      logger, level and message) is dropped; the next identical record after
+      the window is annotated with the number of repeats.
+    - Rate limit: a token bucket per logger (rate_per_sec, burst) for records
+      below WARNING; the next record that passes is annotated with the count.
+
+    ERROR and above always pass. 0 disables either mechanism.
+    """
+
+    MAX_TRACKED_MESSAGES = 4096
+
+    def __init__(
+            self,
+            rate_per_sec: float = 50.0,
+            burst: Optional[float] = None,
+            dedup_window_sec: float = 5.0,
+            clock: Optional[Callable[[], float]] = None,
+            hot_loggers: Iterable[str] = HOT_PATH_LOGGERS
+    ):
+        super().__init__()
+        self.hot_loggers = tuple(hot_loggers)
+        self._is_hot: Dict[str, bool] = {}                 # logger -> matches hot_loggers
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst if burst is not None else max(rate_per_sec, 1.0)
+        self.dedup_window_sec = dedup_window_sec
+        self.clock = clock or time.monotonic
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, List[float]] = {}         # logger -> [tokens, last refill]
+        self._recent: Dict[tuple, List[float]] = {}        # (logger, level, message) -> [expires, repeats]
+        self._pending: Dict[str, int] = {}                 # logger -> rate-limited since last pass
+
+        # Statistics
+        self.passed = 0
+        self.deduplicated = 0
+        self.rate_limited = 0
+        self.suppressed_by_logger: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR or not self._hot(record.name):
+            self.passed += 1
+            return True
+
+        now = self.clock()
+        notes = []
+        with self._lock:
+            if self.dedup_window_sec > 0:
+                message = record.getMessage()
+                key = (record.name, record.levelno, message)
+                seen = self._recent.get(key)
+                if seen is not None and now < seen[0]:
+                    seen[1] += 1
+                    self.deduplicated += 1
+                    self._suppressed(record.name)
+                    return False
+                if seen is not None and seen[1]:
+                    notes.append(f"repeated {int(seen[1])}x in {self.dedup_window_sec:g}s")
+                if len(self._recent) >= self.MAX_TRACKED_MESSAGES:
+                    self._prune(now)
+                self._recent[key] = [now + self.dedup_window_sec, 0]
+
+            if self.rate_per_sec > 0 and record.levelno < logging.WARNING:
+                bucket = self._buckets.get(record.name)
+                if bucket is None:
+                    bucket = self._buckets[record.name] = [self.burst, now]
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate_per_sec)
+                bucket[1] = now
+                if bucket[0] < 1.0:
+                    self.rate_limited += 1
+                    self._pending[record.name] = self._pending.get(record.name, 0) + 1
+                    self._suppressed(record.name)
+                    return False
+                bucket[0] -= 1.0
+                limited = self._pending.pop(record.name, 0)
+                if limited:
+                    notes.append(f"+{limited} rate-limited")
+
+            self.passed += 1
+
+        if notes:
+            record.msg = f"{record.getMessage()} [{', '.join(notes)}]"
+            record.args = None
+        return True
+
+    def _hot(self, name: str) -> bool:
+        hot = self._is_hot.get(name)
+        if hot is None:
+            hot = self._is_hot[name] = any(
+                name == prefix or name.startswith(prefix + '.') for prefix in self.hot_loggers
+            )
+        return hot
+
+    def _suppressed(self, name: str):
+        self.suppressed_by_logger[name] = self.suppressed_by_logger.get(name, 0) + 1
+
+    def _prune(self, now: float):
+        """Forget expired messages; if all are live, forget the oldest half."""
+        expired = [k for k, (expires, _) in self._recent.items() if expires <= now]
+        if not expired:
+            expired = list(self._recent)[:len(self._recent) // 2]
+        for key in expired:
+            del self._recent[key]
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the caller
+
+    When the queue is full the record is dropped and counted; the next record
+    that fits is preceded by a WARNING with the number dropped.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same-process queue: resolve args now (they may be mutated later) but
+        # leave formatting and exception text to the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self._unreported:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                    'msg': f"Log queue full: dropped {self._unreported} records",
+                }))
+                self._unreported = 0
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+
+class LoggingPipeline:
+    """Root logger -> HotPathFilter -> bounded queue -> listener thread -> handlers"""
+
+    def __init__(
+            self,
+            handlers: List[logging.Handler],
+            queue_size: int = 10000,
+            rate_limit_per_sec: float = 50.0,
+            rate_limit_burst: Optional[float] = None,
+            dedup_window_sec: float = 5.0,
+            hot_loggers: Iterable[str] = HOT_PATH_LOGGERS
+    ):
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.filter = HotPathFilter(rate_limit_per_sec, rate_limit_burst, dedup_window_sec,
+                                    hot_loggers=hot_loggers)
+        self.handler = NonBlockingQueueHandler(self.queue)
+        self.handler.addFilter(self.filter)
+        self.handlers = handlers
+        self.listener = logging.handlers.QueueListener(
+            self.queue, *handlers, respect_handler_level=True
+        )
+        self.running = False
+
+    def start(self):
+        self.listener.start()
+        self.running = True
+
+    def stop(self):
+        """Drain the queue, stop the listener thread and close the handlers"""
+        if self.running:
+            self.listener.stop()
+            self.running = False
+        for handler in self.handlers:
+            handler.close()
+
+    def get_stats(self) -> Dict:
+        return {
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'enqueued': self.handler.enqueued,
+            'dropped': self.handler.dropped,
+            'deduplicated': self.filter.deduplicated,
+            'rate_limited': self.filter.rate_limited,
+            'suppressed_by_logger': dict(self.filter.suppressed_by_logger),
+        }
+
+
+_pipeline: Optional[LoggingPipeline] = None
+
+
+def setup_async_logging(
+        level: str = 'INFO',
+        log_file: Optional[str] = None,
+        console: bool = True,
+        format_string: Optional[str] = None,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        queue_size: int = 10000,
+        rate_limit_per_sec: float = 50.0,
+        rate_limit_burst: Optional[float] = None,
+        dedup_window_sec: float = 5.0,
+        hot_loggers: Iterable[str] = HOT_PATH_LOGGERS,
+        stream=sys.stdout
+) -> LoggingPipeline:
+    """
+    Configure the root logger with a non-blocking queue pipeline
+
+    Replaces any root handlers (and a previously started pipeline).
+
+    Args:
+        level: Root logging level
+        log_file: Rotating log file (None = console only)
+        console: Enable console output
+        format_string: Log format string
+        max_bytes: Rotate the file at this size
+        backup_count: Rotated files kept
+        queue_size: Records buffered before new ones are dropped
+        rate_limit_per_sec: Per-logger budget for records below WARNING (0 = off)
+        rate_limit_burst: Bucket size (default: rate_limit_per_sec)
+        dedup_window_sec: Drop identical records within this window (0 = off)
+        hot_loggers: Loggers (with children) that dedup and rate limit apply to
+        stream: Console stream
+
+    Returns:
+        The started LoggingPipeline
+    """
+    global _pipeline
+    stop_async_logging()
+
+    handlers = _build_handlers(log_file, console, format_string or DEFAULT_FORMAT,
+                               max_bytes, backup_count, stream)
+    pipeline = LoggingPipeline(handlers, queue_size, rate_limit_per_sec,
+                               rate_limit_burst, dedup_window_sec, hot_loggers)
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level.upper()))
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(pipeline.handler)
+
+    pipeline.start()
+    _pipeline = pipeline
+    return pipeline
+
+
+def stop_async_logging():
+    """Flush and stop the pipeline started by setup_async_logging (no-op if none)"""
+    global _pipeline
+    if _pipeline is None:
+        return
+    logging.getLogger().removeHandler(_pipeline.handler)
+    _pipeline.stop()
+    _pipeline = None
+
+
+def get_logging_stats() -> Dict:
+    """Queue, drop and suppression counters of the active pipeline"""
+    return _pipeline.get_stats() if _pipeline else {}
+
+
+def __getattr__(name):
+    # Default logger instance for imports, created on first use so that
+    # importing this module does not open logs/trading_bot.log
+    if name == 'logger':
+        global logger
+        logger = setup_trading_logger()
+        return logger
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
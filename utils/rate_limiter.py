@@ -1,6 +1,17 @@
 """
-Rate limiter with exponential backoff and jitter
+Rate limiter with request weights, exchange header sync and backoff
 Prevents API bans and handles rate limit exceptions gracefully
+
+Binance limits REST usage by request weight (X-MBX-USED-WEIGHT-1M) and
+order count (X-MBX-ORDER-COUNT-10S), not by number of requests. The limiter
+charges each endpoint's documented weight from a token bucket, resyncs the
+bucket from the response headers of every request (CCXT on_rest_response
+hook, see ExchangeRateLimiter.attach), and honours Retry-After on 429/418.
+
+Order placement, cancels and SL updates (PRIORITY_ORDER) may use the whole
+budget and are served before waiting reads; housekeeping reads
+(PRIORITY_READ) stop at a reserve so protective orders never queue behind
+position/balance polling.
 """
 import asyncio
 import time
@@ -9,21 +20,65 @@ import logging
 import os
 from typing import Dict, Optional, Any, Callable
 from functools import wraps
-from collections import defaultdict, deque
-from datetime import datetime, timedelta, timezone
-from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from dataclasses import dataclass
 from dotenv import load_dotenv
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 
+# Request priorities (lower is served first)
+PRIORITY_ORDER = 0   # Order placement, cancels, SL updates, leverage
+PRIORITY_READ = 1    # Housekeeping reads (positions, balance, tickers, ...)
+
+# Binance USD-M documented request weights by CCXT method name
+BINANCE_ENDPOINT_WEIGHTS: Dict[str, int] = {
+    'load_markets': 1,
+    'fetch_markets': 1,
+    'fetch_balance': 5,
+    'fetch_positions': 5,
+    'fapiPrivateV2GetPositionRisk': 5,
+    'fapiPrivateV3GetPositionRisk': 5,
+    'fetch_ticker': 1,
+    'fetch_tickers': 40,
+    'fetch_order': 1,
+    'fetch_my_trades': 5,
+    'fetch_open_orders': 1,              # 40 without symbol
+    'fapiPrivateGetOpenAlgoOrders': 1,   # 40 without symbol
+    'fetch_order_book': 5,               # By limit, see _order_book_weight
+    'fetch_ohlcv': 5,                    # By limit, see _klines_weight
+    'create_order': 1,
+    'create_market_order': 1,
+    'create_limit_order': 1,
+    'fapiPrivatePostAlgoOrder': 1,
+    'cancel_order': 1,
+    'cancel_all_orders': 1,
+    'fapiPrivateDeleteAlgoOrder': 1,
+    'set_leverage': 1,
+}
+NO_SYMBOL_WEIGHT = 40
+TOKEN_EPSILON = 1e-6
+
+# Methods counted against the order rate limit
+ORDER_METHODS = frozenset({
+    'create_order', 'create_market_order', 'create_limit_order', 'edit_order',
+    'fapiPrivatePostAlgoOrder',
+})
+# Methods served with PRIORITY_ORDER
+PRIORITY_METHODS = ORDER_METHODS | frozenset({
+    'cancel_order', 'cancel_all_orders', 'fapiPrivateDeleteAlgoOrder',
+    'set_leverage', 'private_post_v5_position_trading_stop',
+})
+
+
 @dataclass
 class RateLimitConfig:
     """Configuration for rate limiting"""
-    requests_per_second: int = 10
-    requests_per_minute: int = 100
-    burst_size: int = 20
+    weight_per_minute: int = 1200        # Request weight budget (bucket refills over 60s)
+    orders_per_10s: int = 100            # Order count budget (bucket refills over 10s)
+    read_reserve_ratio: float = 0.15     # Share of the weight budget reads may not use
+    header_url_filter: Optional[str] = None   # Sync only from responses whose URL contains this
     min_retry_delay: float = 1.0
     max_retry_delay: float = 60.0
     max_retries: int = 5
@@ -38,57 +93,244 @@ class RateLimitStats:
     successful_requests: int = 0
     rate_limited_requests: int = 0
     failed_requests: int = 0
+    priority_requests: int = 0
+    weight_charged: int = 0
+    header_syncs: int = 0
+    bans: int = 0
     total_wait_time: float = 0.0
     last_rate_limit: Optional[datetime] = None
-    request_history: deque = field(default_factory=lambda: deque(maxlen=1000))
+
+
+@dataclass(frozen=True)
+class RequestCost:
+    """What one request charges: weight, order count and its priority"""
+    weight: int = 1
+    orders: int = 0
+    priority: int = PRIORITY_READ
+
+
+def _order_book_weight(limit) -> int:
+    limit = int(limit or 500)
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+def _klines_weight(limit) -> int:
+    limit = int(limit or 500)
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
 
 
 class RateLimiter:
     """
-    Advanced rate limiter with exponential backoff and jitter
+    Weight-aware token bucket with header resync, priorities and backoff
     """
     
-    def __init__(self, config: RateLimitConfig):
+    def __init__(self, config: RateLimitConfig,
+                 endpoint_weights: Optional[Dict[str, int]] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable = asyncio.sleep):
         """
         Initialize rate limiter
         
         Args:
             config: Rate limiting configuration
+            endpoint_weights: Weight per CCXT method name (None = every request weighs 1)
+            clock: Monotonic clock (injectable for simulation)
+            sleep: Async sleep (injectable for simulation)
         """
         self.config = config
         self.stats = RateLimitStats()
+        self.endpoint_weights = endpoint_weights
+        self._clock = clock
+        self._sleep = sleep
         
-        # Token bucket for rate limiting
-        self.tokens = config.burst_size
-        self.max_tokens = config.burst_size
-        self.last_refill = time.time()
-        self.refill_rate = config.requests_per_second
+        # Weight bucket (per minute) and order bucket (per 10s)
+        self.max_weight = float(config.weight_per_minute)
+        self.weight_tokens = self.max_weight
+        self.weight_refill_rate = config.weight_per_minute / 60.0
+        self.max_orders = float(config.orders_per_10s)
+        self.order_tokens = self.max_orders
+        self.order_refill_rate = config.orders_per_10s / 10.0
+        self.read_reserve = self.max_weight * config.read_reserve_ratio
+        self.last_refill = clock()
         
-        # Tracking for per-minute limits
-        self.minute_requests = deque()
+        # Exchange-reported usage (last response headers)
+        self.used_weight_1m: Optional[int] = None
+        self.order_count_10s: Optional[int] = None
+        self._blocked_until = 0.0
+
+        # Requests per minute (fixed window, for stats)
+        self._minute_window_start = self.last_refill
+        self._minute_requests = 0
+
+        # Waiters per priority; one FIFO lock per priority for the slow path
+        self._waiting = {PRIORITY_ORDER: 0, PRIORITY_READ: 0}
+        self._wait_locks = {PRIORITY_ORDER: asyncio.Lock(), PRIORITY_READ: asyncio.Lock()}
         
         # Backoff state
         self.current_delay = config.min_retry_delay
         self.consecutive_limits = 0
         
-        # Lock for thread safety
-        self.lock = asyncio.Lock()
+        self._method_names: Dict[Any, str] = {}
     
-    def _refill_tokens(self):
+    # ==================== Request cost ====================
+
+    def _method_name(self, func: Callable) -> Optional[str]:
+        name = getattr(func, '__name__', None)
+        if name != 'unbound_method':
+            return name
+        # CCXT implicit API methods are all named 'unbound_method': find the attribute
+        key = getattr(func, '__func__', func)
+        if key not in self._method_names:
+            owner = getattr(func, '__self__', None)
+            candidates = set(self.endpoint_weights or ()) | PRIORITY_METHODS
+            self._method_names[key] = next(
+                (n for n in candidates if owner is not None and getattr(type(owner), n, None) is key),
+                name,
+            )
+        return self._method_names[key]
+
+    def cost_of(self, func: Callable, args: tuple = (), kwargs: Optional[Dict] = None) -> RequestCost:
+        """Weight, order count and priority of calling func(*args, **kwargs)"""
+        kwargs = kwargs or {}
+        name = self._method_name(func)
+        orders = 1 if name in ORDER_METHODS else 0
+        priority = PRIORITY_ORDER if name in PRIORITY_METHODS else PRIORITY_READ
+        if self.endpoint_weights is None:
+            return RequestCost(1, orders, priority)
+
+        weight = self.endpoint_weights.get(name, 1)
+        if name == 'fetch_open_orders':
+            symbol = args[0] if args else kwargs.get('symbol')
+            weight = weight if symbol else NO_SYMBOL_WEIGHT
+        elif name == 'fapiPrivateGetOpenAlgoOrders':
+            params = args[0] if args else kwargs.get('params') or {}
+            weight = weight if params.get('symbol') else NO_SYMBOL_WEIGHT
+        elif name == 'fetch_order_book':
+            weight = _order_book_weight(args[1] if len(args) > 1 else kwargs.get('limit'))
+        elif name == 'fetch_ohlcv':
+            weight = _klines_weight(args[3] if len(args) > 3 else kwargs.get('limit'))  # (symbol, timeframe, since, limit)
+        return RequestCost(weight, orders, priority)
+
+    # ==================== Buckets ====================
+
+    def _refill_tokens(self, now: float):
         """Refill tokens based on elapsed time"""
-        now = time.time()
         elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.weight_tokens = min(self.max_weight, self.weight_tokens + elapsed * self.weight_refill_rate)
+            self.order_tokens = min(self.max_orders, self.order_tokens + elapsed * self.order_refill_rate)
+            self.last_refill = now
         
-        # Add tokens based on elapsed time
-        tokens_to_add = elapsed * self.refill_rate
-        self.tokens = min(self.max_tokens, self.tokens + tokens_to_add)
-        self.last_refill = now
+    def _weight_floor(self, cost: RequestCost) -> float:
+        if cost.priority == PRIORITY_ORDER:
+            return 0.0
+        # A read heavier than the unreserved budget waits for a full bucket
+        return min(self.read_reserve, self.max_weight - cost.weight)
     
-    def _clean_minute_requests(self):
-        """Remove requests older than 1 minute"""
-        cutoff = datetime.now(timezone.utc) - timedelta(minutes=1)
-        while self.minute_requests and self.minute_requests[0] < cutoff:
-            self.minute_requests.popleft()
+    def try_acquire(self, cost: RequestCost = RequestCost(), queued: bool = False) -> bool:
+        """
+        Take tokens for one request if available (no await, no lock).
+
+        Args:
+            cost: Request cost (see cost_of)
+            queued: Caller is the head of its priority queue
+        """
+        if not queued:
+            # Don't overtake waiters of the same or a higher priority
+            if self._waiting[PRIORITY_ORDER] or (cost.priority == PRIORITY_READ and self._waiting[PRIORITY_READ]):
+                return False
+        elif cost.priority == PRIORITY_READ and self._waiting[PRIORITY_ORDER]:
+            return False
+
+        now = self._clock()
+        if now < self._blocked_until:
+            return False
+        self._refill_tokens(now)
+        # Epsilon: a wait of exactly _time_until_available() must be enough despite float rounding
+        if self.weight_tokens + TOKEN_EPSILON - cost.weight < self._weight_floor(cost):
+            return False
+        if cost.orders and self.order_tokens + TOKEN_EPSILON < cost.orders:
+            return False
+
+        self.weight_tokens -= cost.weight
+        self.order_tokens -= cost.orders
+        self.stats.total_requests += 1
+        self.stats.weight_charged += cost.weight
+        if cost.priority == PRIORITY_ORDER:
+            self.stats.priority_requests += 1
+        if now - self._minute_window_start >= 60:
+            self._minute_window_start = now
+            self._minute_requests = 0
+        self._minute_requests += 1
+        return True
+
+    def _time_until_available(self, cost: RequestCost) -> float:
+        now = self._clock()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        self._refill_tokens(now)
+        delay = (cost.weight + self._weight_floor(cost) - self.weight_tokens) / self.weight_refill_rate
+        if cost.orders:
+            delay = max(delay, (cost.orders - self.order_tokens) / self.order_refill_rate)
+        return max(delay, 0.01)
+
+    # ==================== Header sync ====================
+
+    def update_from_headers(self, status: int, headers: Optional[Dict], url: str = '') -> None:
+        """
+        Resync buckets from exchange response headers.
+
+        X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-10S set the remaining budget;
+        a 429/418 blocks all requests for Retry-After seconds.
+        """
+        if not headers:
+            return
+        if self.config.header_url_filter and self.config.header_url_filter not in url:
+            return
+
+        used_weight = order_count = retry_after = None
+        for key, value in headers.items():
+            key = key.lower()
+            if key == 'x-mbx-used-weight-1m':
+                used_weight = int(value)
+            elif key == 'x-mbx-order-count-10s':
+                order_count = int(value)
+            elif key == 'retry-after':
+                retry_after = float(value)
+
+        now = self._clock()
+        self._refill_tokens(now)
+        if used_weight is not None:
+            self.used_weight_1m = used_weight
+            self.weight_tokens = max(0.0, min(self.max_weight, self.max_weight - used_weight))
+            self.stats.header_syncs += 1
+        if order_count is not None:
+            self.order_count_10s = order_count
+            self.order_tokens = max(0.0, min(self.max_orders, self.max_orders - order_count))
+
+        if status in (418, 429):
+            self.stats.bans += 1
+            self.stats.last_rate_limit = datetime.now(timezone.utc)
+            if retry_after is not None:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            logger.warning(
+                f"HTTP {status} from exchange (used weight {used_weight}), "
+                f"blocking requests for {retry_after if retry_after is not None else 'backoff'}s"
+            )
+
+    # ==================== Acquire ====================
     
     def _calculate_backoff_delay(self, attempt: int) -> float:
         """
@@ -115,73 +357,46 @@ class RateLimiter:
         # Ensure minimum delay
         return max(self.config.min_retry_delay, delay)
     
-    async def acquire(self) -> bool:
+    async def acquire(self, cost: RequestCost = RequestCost()) -> bool:
         """
         Acquire permission to make a request
         
         Returns:
             True if request can proceed, False if rate limited
         """
-        async with self.lock:
-            self._refill_tokens()
-            self._clean_minute_requests()
-            
-            # Check per-minute limit
-            if len(self.minute_requests) >= self.config.requests_per_minute:
-                logger.warning(f"Per-minute rate limit reached: {len(self.minute_requests)}/{self.config.requests_per_minute}")
-                self.stats.rate_limited_requests += 1
-                self.stats.last_rate_limit = datetime.now(timezone.utc)
-                return False
-            
-            # Check token bucket
-            if self.tokens < 1:
-                logger.warning(f"Token bucket exhausted: {self.tokens:.2f}/{self.max_tokens}")
-                self.stats.rate_limited_requests += 1
-                self.stats.last_rate_limit = datetime.now(timezone.utc)
-                return False
-            
-            # Consume token
-            self.tokens -= 1
-            self.minute_requests.append(datetime.now(timezone.utc))
-            self.stats.total_requests += 1
-            self.stats.request_history.append(datetime.now(timezone.utc))
-            
-            # Reset consecutive limits on success
+        if self.try_acquire(cost):
             self.consecutive_limits = 0
             self.current_delay = self.config.min_retry_delay
-            
             return True
+        self.stats.rate_limited_requests += 1
+        self.stats.last_rate_limit = datetime.now(timezone.utc)
+        return False
     
-    async def wait_if_needed(self) -> float:
+    async def wait_if_needed(self, cost: RequestCost = RequestCost()) -> float:
         """
-        Wait if rate limited
+        Wait until the request's weight is available
         
         Returns:
             Time waited in seconds
         """
-        if await self.acquire():
+        if self.try_acquire(cost):
             return 0.0
         
-        # Calculate backoff delay
-        delay = self._calculate_backoff_delay(self.consecutive_limits)
-        self.consecutive_limits += 1
-        
-        logger.info(f"Rate limited, waiting {delay:.2f}s (attempt {self.consecutive_limits})")
+        self.stats.rate_limited_requests += 1
+        start = self._clock()
+        self._waiting[cost.priority] += 1
+        try:
+            async with self._wait_locks[cost.priority]:
+                while not self.try_acquire(cost, queued=True):
+                    await self._sleep(self._time_until_available(cost))
+        finally:
+            self._waiting[cost.priority] -= 1
         
-        # Wait with progress logging for long delays
-        if delay > 10:
-            intervals = int(delay / 10)
-            for i in range(intervals):
-                await asyncio.sleep(10)
-                remaining = delay - (i + 1) * 10
-                if remaining > 0:
-                    logger.debug(f"Waiting... {remaining:.0f}s remaining")
-            await asyncio.sleep(delay % 10)
-        else:
-            await asyncio.sleep(delay)
-        
-        self.stats.total_wait_time += delay
-        return delay
+        waited = self._clock() - start
+        self.stats.total_wait_time += waited
+        if waited > 10:
+            logger.info(f"Rate limited, waited {waited:.2f}s (weight {cost.weight})")
+        return waited
     
     async def execute_with_retry(self, 
                                  func: Callable, 
@@ -203,32 +418,35 @@ class RateLimiter:
         """
         import ccxt
         
+        cost = self.cost_of(func, args, kwargs)
         last_exception = None
         
         for attempt in range(self.config.max_retries):
             try:
                 # Wait for rate limit if needed
-                wait_time = await self.wait_if_needed()
+                wait_time = await self.wait_if_needed(cost)
                 if wait_time > 0:
                     logger.debug(f"Waited {wait_time:.2f}s before attempt {attempt + 1}")
                 
                 # Execute function
                 result = await func(*args, **kwargs)
                 self.stats.successful_requests += 1
+                self.consecutive_limits = 0
                 return result
                 
-            except ccxt.RateLimitExceeded as e:
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection) as e:
                 last_exception = e
                 self.stats.rate_limited_requests += 1
                 self.consecutive_limits += 1
                 
                 if attempt < self.config.max_retries - 1:
-                    delay = self._calculate_backoff_delay(attempt)
+                    # Retry-After (from the response hook) is waited out by wait_if_needed
+                    delay = 0.0 if self._blocked_until > self._clock() else self._calculate_backoff_delay(attempt)
                     logger.warning(
                         f"Rate limit exceeded on attempt {attempt + 1}/{self.config.max_retries}, "
                         f"waiting {delay:.2f}s: {e}"
                     )
-                    await asyncio.sleep(delay)
+                    await self._sleep(delay)
                 else:
                     logger.error(f"Max retries exceeded for rate limit: {e}")
                     
@@ -241,7 +459,7 @@ class RateLimiter:
                         f"Network error on attempt {attempt + 1}/{self.config.max_retries}, "
                         f"retrying in {delay:.2f}s: {e}"
                     )
-                    await asyncio.sleep(delay)
+                    await self._sleep(delay)
                 else:
                     logger.error(f"Max retries exceeded for network error: {e}")
 
@@ -261,16 +479,26 @@ class RateLimiter:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get rate limiter statistics"""
+        now = self._clock()
+        self._refill_tokens(now)
         return {
             'total_requests': self.stats.total_requests,
             'successful_requests': self.stats.successful_requests,
             'rate_limited_requests': self.stats.rate_limited_requests,
             'failed_requests': self.stats.failed_requests,
+            'priority_requests': self.stats.priority_requests,
             'total_wait_time': round(self.stats.total_wait_time, 2),
             'last_rate_limit': self.stats.last_rate_limit.isoformat() if self.stats.last_rate_limit else None,
-            'current_tokens': round(self.tokens, 2),
+            'current_tokens': round(self.weight_tokens, 2),
+            'order_tokens': round(self.order_tokens, 2),
+            'weight_charged': self.stats.weight_charged,
+            'used_weight_1m': self.used_weight_1m,
+            'order_count_10s': self.order_count_10s,
+            'header_syncs': self.stats.header_syncs,
+            'bans': self.stats.bans,
+            'blocked_for': round(max(0.0, self._blocked_until - now), 2),
             'consecutive_limits': self.consecutive_limits,
-            'requests_last_minute': len(self.minute_requests)
+            'requests_last_minute': self._minute_requests,
         }
     
     def reset_backoff(self):
@@ -285,25 +513,30 @@ class ExchangeRateLimiter:
     """
     
     # Exchange-specific configurations (loaded from environment variables)
+    # Binance USD-M: 2400 weight/min and 300 orders/10s per account, kept below the limits
     EXCHANGE_CONFIGS = {
         'binance': RateLimitConfig(
-            requests_per_second=int(os.getenv('BINANCE_RATE_LIMIT_PER_SEC', 16)),
-            requests_per_minute=int(os.getenv('BINANCE_RATE_LIMIT_PER_MIN', 960)),
-            burst_size=50,
+            weight_per_minute=int(os.getenv('BINANCE_WEIGHT_PER_MIN', 2000)),
+            orders_per_10s=int(os.getenv('BINANCE_ORDERS_PER_10S', 250)),
+            read_reserve_ratio=float(os.getenv('BINANCE_READ_RESERVE_RATIO', 0.15)),
+            header_url_filter='/fapi/',
             min_retry_delay=1.0,
             max_retry_delay=60.0,
             max_retries=5
         ),
 
         'default': RateLimitConfig(
-            requests_per_second=int(os.getenv('DEFAULT_RATE_LIMIT_PER_SEC', 5)),
-            requests_per_minute=int(os.getenv('DEFAULT_RATE_LIMIT_PER_MIN', 60)),
-            burst_size=10,
+            weight_per_minute=int(os.getenv('DEFAULT_RATE_LIMIT_PER_MIN', 60)),
+            orders_per_10s=int(os.getenv('DEFAULT_ORDERS_PER_10S', 50)),
             min_retry_delay=2.0,
             max_retry_delay=60.0,
             max_retries=3
         )
     }
+
+    ENDPOINT_WEIGHTS = {
+        'binance': BINANCE_ENDPOINT_WEIGHTS,
+    }
     
     def __init__(self, exchange_name: str):
         """
@@ -317,13 +550,37 @@ class ExchangeRateLimiter:
             self.exchange_name, 
             self.EXCHANGE_CONFIGS['default']
         )
-        self.limiter = RateLimiter(config)
+        self.limiter = RateLimiter(config, endpoint_weights=self.ENDPOINT_WEIGHTS.get(self.exchange_name))
         
         logger.info(
             f"Rate limiter initialized for {exchange_name}: "
-            f"{config.requests_per_second} req/s, "
-            f"{config.requests_per_minute} req/min"
+            f"{config.weight_per_minute} weight/min, "
+            f"{config.orders_per_10s} orders/10s"
         )
+
+    def attach(self, exchange) -> None:
+        """
+        Resync the limiter from every REST response of a CCXT exchange.
+
+        Wraps exchange.on_rest_response, which CCXT calls with the status
+        code and headers of each response before parsing it.
+        """
+        if getattr(exchange, '_rate_limiter_hook', None) is self.limiter:
+            return
+        original = exchange.on_rest_response
+        limiter = self.limiter
+
+        def on_rest_response(code, reason, url, method, response_headers, response_body,
+                             request_headers, request_body):
+            try:
+                limiter.update_from_headers(code, response_headers, url)
+            except Exception as e:
+                logger.debug(f"Rate limit header sync failed: {e}")
+            return original(code, reason, url, method, response_headers, response_body,
+                            request_headers, request_body)
+
+        exchange.on_rest_response = on_rest_response
+        exchange._rate_limiter_hook = limiter
     
     async def execute_request(self, func: Callable, *args, **kwargs) -> Any:
         """
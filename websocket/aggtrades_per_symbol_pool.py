@@ -1,9 +1,14 @@
 """
-AggTradesPerSymbolPool — Per-symbol WebSocket connections for Binance AggTrades
+AggTradesPerSymbolPool — Per-symbol aggTrade streams for Binance
 
 Architecture:
-  - One WebSocket connection per subscribed symbol
-  - URL: wss://fstream.binance.com/ws/{symbol}@aggTrade
+  - One AggTradePerSymbolConnection per subscribed symbol
+  - Multiplexed (default): each one is a {symbol}@aggTrade stream on the
+    shared MultiplexedStreamTransport (combined-stream WebSockets, live
+    SUBSCRIBE/UNSUBSCRIBE, 200 streams per connection, one connection
+    failure affects at most its 200 streams and reconnects them all)
+  - multiplexed=False: one WebSocket per symbol,
+    URL: wss://fstream.binance.com/ws/{symbol}@aggTrade
   - Adding/removing a symbol has ZERO impact on other symbols
   - Auto-reconnect with exponential backoff + jitter per connection
   - Built-in heartbeat zombie detection (60s timeout)
@@ -18,14 +23,17 @@ Date: 2026-02-17
 
 import asyncio
 import logging
+import math
 import random
+import sys
 import time
-from typing import Dict, Callable, Optional, Set, Tuple
+from typing import Deque, Dict, Callable, Iterable, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from collections import deque
 from decimal import Decimal
 
 from utils.symbol_helpers import normalize_symbol
+from websocket.multiplexed_stream import MultiplexedStreamTransport, get_shared_transport
 
 try:
     import orjson
@@ -41,6 +49,12 @@ logger = logging.getLogger(__name__)
 BASE_WS_URL = "wss://fstream.binance.com/ws"
 MAX_CONNECTIONS_PER_IP = 300  # Binance futures WS limit
 
+# Delta state
+LARGE_TRADE_THRESHOLD = Decimal('10000')  # Large trade threshold in USDT
+DELTA_BUCKET_HISTORY_SEC = 600            # 1-second buckets retained per symbol
+PRECISION_DECIMAL = 'decimal'
+PRECISION_FLOAT = 'float'
+
 
 # ═══════════════════════════════════════════════════════════════
 # Data structures (moved from binance_aggtrades_stream.py)
@@ -67,8 +81,23 @@ class TradeData:
 
 @dataclass
 class SymbolDeltaState:
-    """Delta calculation state for a symbol"""
-    trades: deque = field(default_factory=lambda: deque(maxlen=10000))  # Last 10k trades
+    """
+    Delta calculation state for a symbol
+
+    Trades are folded into 1-second buckets as they arrive; no per-trade
+    record is kept. Closed buckets are stored as cumulative sums (same
+    layout as BarAggregator), so rolling delta, average |delta| and large
+    trade counts are O(1) lookups instead of rescans of the tape.
+
+    Resolution is one second: a bucket is counted in a window if its
+    second is >= floor(cutoff).
+
+    precision:
+        'decimal' — bucket sums are exact Decimals (Decimal(str) per trade)
+        'float'   — bucket sums are floats (no Decimal on the hot path)
+    """
+    trades: Iterable = field(default_factory=tuple)  # Seed TradeData (folded into buckets)
+    trade_count: int = 0
     last_update: float = 0.0
 
     # Rolling stats
@@ -79,6 +108,155 @@ class SymbolDeltaState:
     large_buy_count: int = 0
     large_sell_count: int = 0
 
+    large_trade_threshold: Decimal = LARGE_TRADE_THRESHOLD
+    bucket_history_sec: int = DELTA_BUCKET_HISTORY_SEC
+    precision: str = PRECISION_DECIMAL
+
+    def __post_init__(self):
+        if self.precision not in (PRECISION_DECIMAL, PRECISION_FLOAT):
+            raise ValueError(f"Unknown delta precision: {self.precision!r}")
+
+        self._decimal = self.precision == PRECISION_DECIMAL
+        self._zero = Decimal('0') if self._decimal else 0.0
+        self._threshold = (
+            Decimal(self.large_trade_threshold) if self._decimal
+            else float(self.large_trade_threshold)
+        )
+
+        seeded = self.trades
+        self.trades = ()
+
+        # Open (current) bucket
+        self._open_sec: Optional[int] = None
+        self._open_delta = self._zero
+        self._open_large_buy = 0
+        self._open_large_sell = 0
+
+        # Cumulative sums over closed buckets, one entry per second.
+        # Index 0 = baseline, index i = sum including closed bucket i-1.
+        # Closed buckets cover seconds [_open_sec - n, _open_sec - 1].
+        size = self.bucket_history_sec + 1
+        self._cum_delta: Deque = deque([self._zero], maxlen=size)
+        self._cum_abs_delta: Deque = deque([self._zero], maxlen=size)
+        self._cum_large_buy: Deque[int] = deque([0], maxlen=size)
+        self._cum_large_sell: Deque[int] = deque([0], maxlen=size)
+
+        for trade in seeded:
+            self.append(trade)
+
+    def append(self, trade: TradeData):
+        """Record a TradeData (tests, backfill)."""
+        self.add_trade(trade.timestamp, trade.price, trade.quantity, trade.is_buyer_maker)
+
+    def add_trade(self, ts: float, price, qty, is_buyer_maker: bool):
+        """
+        Fold one trade into its 1-second bucket.
+
+        price/qty may be payload strings, floats or Decimals.
+        """
+        if self._decimal:
+            volume = Decimal(str(price)) * Decimal(str(qty))
+        else:
+            volume = float(price) * float(qty)
+
+        is_large = volume >= self._threshold
+        self.trade_count += 1
+
+        sec = math.floor(ts)
+        if self._open_sec is None:
+            self._open_sec = sec
+        elif sec > self._open_sec:
+            self._close_buckets(sec)
+        # Late (out-of-order) trades are folded into the open bucket
+
+        if is_buyer_maker:
+            self._open_delta -= volume
+            if is_large:
+                self._open_large_sell += 1
+        else:
+            self._open_delta += volume
+            if is_large:
+                self._open_large_buy += 1
+
+    def to_decimal(self, value) -> Decimal:
+        """Convert a bucket sum to the Decimal returned by the public API."""
+        return value if self._decimal else Decimal(repr(value))
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the bucket sums."""
+        sums = (self._cum_delta, self._cum_abs_delta, self._cum_large_buy, self._cum_large_sell)
+        total = 0
+        for column in sums:
+            total += sys.getsizeof(column) + len(column) * sys.getsizeof(column[-1])
+        return total
+
+    def _close_buckets(self, new_sec: int):
+        """Close the open bucket and pad empty seconds up to new_sec."""
+        self._cum_delta.append(self._cum_delta[-1] + self._open_delta)
+        self._cum_abs_delta.append(self._cum_abs_delta[-1] + abs(self._open_delta))
+        self._cum_large_buy.append(self._cum_large_buy[-1] + self._open_large_buy)
+        self._cum_large_sell.append(self._cum_large_sell[-1] + self._open_large_sell)
+
+        # Empty seconds between trades (bounded by retained history)
+        gap = min(new_sec - self._open_sec - 1, self.bucket_history_sec)
+        for _ in range(gap):
+            self._cum_delta.append(self._cum_delta[-1])
+            self._cum_abs_delta.append(self._cum_abs_delta[-1])
+            self._cum_large_buy.append(self._cum_large_buy[-1])
+            self._cum_large_sell.append(self._cum_large_sell[-1])
+
+        self._open_sec = new_sec
+        self._open_delta = self._zero
+        self._open_large_buy = 0
+        self._open_large_sell = 0
+
+    def _closed_since(self, cutoff_sec: int) -> int:
+        """Number of closed buckets whose second is >= cutoff_sec."""
+        closed = len(self._cum_delta) - 1
+        return max(0, min(self._open_sec - cutoff_sec, closed))
+
+    def delta_since(self, cutoff: float):
+        """Sum of delta over buckets with second >= floor(cutoff)."""
+        if self._open_sec is None:
+            return self._zero
+        cutoff_sec = math.floor(cutoff)
+        k = self._closed_since(cutoff_sec)
+        delta = self._cum_delta[-1] - self._cum_delta[-(k + 1)]
+        if self._open_sec >= cutoff_sec:
+            delta += self._open_delta
+        return delta
+
+    def large_counts_since(self, cutoff: float) -> Tuple[int, int]:
+        """(large_buys, large_sells) over buckets with second >= floor(cutoff)."""
+        if self._open_sec is None:
+            return (0, 0)
+        cutoff_sec = math.floor(cutoff)
+        k = self._closed_since(cutoff_sec)
+        buys = self._cum_large_buy[-1] - self._cum_large_buy[-(k + 1)]
+        sells = self._cum_large_sell[-1] - self._cum_large_sell[-(k + 1)]
+        if self._open_sec >= cutoff_sec:
+            buys += self._open_large_buy
+            sells += self._open_large_sell
+        return (buys, sells)
+
+    def abs_delta_between(self, first_sec: int, last_sec: int):
+        """Sum of per-second |delta| for seconds in [first_sec, last_sec]."""
+        if self._open_sec is None or last_sec < first_sec:
+            return self._zero
+
+        total = self._zero
+        if first_sec <= self._open_sec <= last_sec:
+            total += abs(self._open_delta)
+
+        # Closed buckets: cumsum index i covers second (_open_sec - n) + i - 1
+        n = len(self._cum_abs_delta) - 1
+        base_sec = self._open_sec - n
+        lo = max(first_sec, base_sec) - base_sec
+        hi = min(last_sec, self._open_sec - 1) - base_sec + 1
+        if hi > lo:
+            total += self._cum_abs_delta[hi] - self._cum_abs_delta[lo]
+        return total
+
 
 # ═══════════════════════════════════════════════════════════════
 # Per-symbol WebSocket connection
@@ -86,11 +264,13 @@ class SymbolDeltaState:
 
 class AggTradePerSymbolConnection:
     """
-    Single WebSocket connection for one symbol's aggTrade stream.
+    One symbol's aggTrade stream.
 
+    With a transport the stream is subscribed on the shared combined-stream
+    connections; without one it opens its own WebSocket:
     URL: wss://fstream.binance.com/ws/{symbol}@aggTrade
 
-    Features:
+    Features (own WebSocket):
     - Auto-reconnect with exponential backoff + jitter
     - Heartbeat monitoring (60s frozen detection)
     - Clean lifecycle via `websockets` context manager
@@ -102,16 +282,19 @@ class AggTradePerSymbolConnection:
         symbol: str,
         delta_state: SymbolDeltaState,
         trade_handlers: list,
+        transport: Optional[MultiplexedStreamTransport] = None,
     ):
         """
         Args:
             symbol: Raw Binance symbol (e.g., 'BTCUSDT')
             delta_state: Shared SymbolDeltaState for this symbol
             trade_handlers: List of callbacks for raw trade data
+            transport: Shared multiplexed transport (None = own WebSocket)
         """
         self.symbol = normalize_symbol(symbol)
         self.delta_state = delta_state
         self._trade_handlers = trade_handlers
+        self.transport = transport
 
         # Connection state
         self._running = False
@@ -122,8 +305,8 @@ class AggTradePerSymbolConnection:
         self._messages_received = 0
 
         # Build URL
-        stream_name = f"{self.symbol.lower()}@aggTrade"
-        self._url = f"{BASE_WS_URL}/{stream_name}"
+        self.stream = f"{self.symbol.lower()}@aggTrade"
+        self._url = f"{BASE_WS_URL}/{self.stream}"
 
     @property
     def connected(self) -> bool:
@@ -134,6 +317,10 @@ class AggTradePerSymbolConnection:
         if self._running:
             return
         self._running = True
+        if self.transport is not None:
+            await self.transport.add_stream(self.stream, self._on_stream_data, self._set_connected)
+            logger.debug(f"🌐 [AGG-{self.symbol}] Subscribed on multiplexed transport")
+            return
         self._task = asyncio.create_task(self._run_forever())
         logger.info(
             f"🌐 [AGG-{self.symbol}] Starting per-symbol aggTrade connection"
@@ -142,6 +329,8 @@ class AggTradePerSymbolConnection:
     async def stop(self):
         """Stop connection gracefully"""
         self._running = False
+        if self.transport is not None:
+            await self.transport.remove_stream(self.stream, self._on_stream_data)
         if self._task and not self._task.done():
             self._task.cancel()
             try:
@@ -252,16 +441,14 @@ class AggTradePerSymbolConnection:
         if event_type != 'aggTrade':
             return
 
-        # Update delta state
-        trade = TradeData(
-            timestamp=data.get('T', 0) / 1000,  # Convert to seconds
-            price=Decimal(str(data.get('p', '0'))),
-            quantity=Decimal(str(data.get('q', '0'))),
-            is_buyer_maker=data.get('m', False)
+        # Update delta state (1-second buckets, no per-trade objects)
+        self.delta_state.add_trade(
+            data.get('T', 0) / 1000,  # Convert to seconds
+            data.get('p', '0'),
+            data.get('q', '0'),
+            data.get('m', False),
         )
-
-        self.delta_state.trades.append(trade)
-        self.delta_state.last_update = asyncio.get_event_loop().time()
+        self.delta_state.last_update = time.time()
 
         # Notify registered trade handlers (for bar_aggregator feed)
         for handler in self._trade_handlers:
@@ -270,6 +457,15 @@ class AggTradePerSymbolConnection:
             except Exception as e:
                 logger.debug(f"Trade handler error: {e}")
 
+    def _on_stream_data(self, data: dict):
+        """Frame routed by the multiplexed transport (already parsed)"""
+        self._last_message_time = time.monotonic()
+        self._messages_received += 1
+        self._process_trade(data)
+
+    def _set_connected(self, connected: bool):
+        self._connected = connected
+
     async def _heartbeat_monitor(self, ws):
         """
         Detect frozen connections (connected but no data flowing).
@@ -315,7 +511,8 @@ class AggTradePerSymbolConnection:
             'connected': self._connected,
             'messages_received': self._messages_received,
             'reconnect_count': self._reconnect_count,
-            'trades_in_buffer': len(self.delta_state.trades),
+            'trades_received': self.delta_state.trade_count,
+            'memory_bytes': self.delta_state.memory_bytes(),
         }
 
 
@@ -325,11 +522,12 @@ class AggTradePerSymbolConnection:
 
 class AggTradesPerSymbolPool:
     """
-    Pool of per-symbol WebSocket connections for Binance AggTrades.
+    Pool of per-symbol aggTrade streams for Binance.
 
     Drop-in replacement for BinanceAggTradesStream.
-    Each symbol gets its own WebSocket connection, so a failure
-    in one symbol's stream has ZERO impact on other symbols.
+    Each symbol gets its own stream (a live SUBSCRIBE on the shared
+    multiplexed transport, or its own WebSocket with multiplexed=False),
+    and subscribing/unsubscribing one symbol never interrupts the others.
 
     API (identical to BinanceAggTradesStream):
         pool = AggTradesPerSymbolPool(testnet=False)
@@ -341,14 +539,29 @@ class AggTradesPerSymbolPool:
     """
 
     # Large trade threshold in USDT
-    LARGE_TRADE_THRESHOLD = Decimal('10000')
+    LARGE_TRADE_THRESHOLD = LARGE_TRADE_THRESHOLD
 
-    def __init__(self, testnet: bool = False):
+    def __init__(
+        self,
+        testnet: bool = False,
+        precision: str = PRECISION_DECIMAL,
+        multiplexed: bool = True,
+        transport: Optional[MultiplexedStreamTransport] = None,
+    ):
         """
         Args:
             testnet: Use testnet endpoints (not supported for per-symbol)
+            precision: Delta arithmetic, 'decimal' (exact) or 'float' (fast)
+            multiplexed: Streams on a shared combined-stream transport (False = one WS per symbol)
+            transport: Transport to use (default: get_shared_transport())
         """
+        if precision not in (PRECISION_DECIMAL, PRECISION_FLOAT):
+            raise ValueError(f"Unknown delta precision: {precision!r}")
+
         self.testnet = testnet
+        self.precision = precision
+        self.multiplexed = multiplexed
+        self._transport = transport
 
         # Per-symbol connections
         self._connections: Dict[str, AggTradePerSymbolConnection] = {}
@@ -370,7 +583,9 @@ class AggTradesPerSymbolPool:
         self.running = False
         self.connected = False  # Compat: always True when running
 
-        logger.info(f"AggTradesPerSymbolPool initialized (testnet={testnet})")
+        logger.info(
+            f"AggTradesPerSymbolPool initialized (testnet={testnet}, precision={precision})"
+        )
 
     async def start(self):
         """Start the pool (no WS connections yet — they start on subscribe)"""
@@ -379,7 +594,7 @@ class AggTradesPerSymbolPool:
             return
         self.running = True
         self.connected = True
-        logger.info("🚀 AggTradesPerSymbolPool started (per-symbol mode)")
+        logger.info(f"🚀 AggTradesPerSymbolPool started ({'multiplexed' if self.multiplexed else 'per-symbol'} mode)")
 
     async def stop(self):
         """Stop all connections"""
@@ -424,21 +639,27 @@ class AggTradesPerSymbolPool:
 
         # Initialize delta state
         if symbol not in self.delta_states:
-            self.delta_states[symbol] = SymbolDeltaState()
+            self.delta_states[symbol] = SymbolDeltaState(
+                large_trade_threshold=self.LARGE_TRADE_THRESHOLD,
+                precision=self.precision,
+            )
 
         # Create per-symbol connection
         async with self._lock:
-            if len(self._connections) >= MAX_CONNECTIONS_PER_IP:
+            if not self.multiplexed and len(self._connections) >= MAX_CONNECTIONS_PER_IP:
                 logger.error(
                     f"❌ [AGG-POOL] Cannot subscribe to {symbol}: "
                     f"at Binance limit ({MAX_CONNECTIONS_PER_IP} connections)"
                 )
                 return
 
+            if self.multiplexed and self._transport is None:
+                self._transport = get_shared_transport()
             conn = AggTradePerSymbolConnection(
                 symbol=symbol,
                 delta_state=self.delta_states[symbol],
                 trade_handlers=self._trade_handlers,
+                transport=self._transport if self.multiplexed else None,
             )
             self._connections[symbol] = conn
             self.subscribed_symbols.add(symbol)
@@ -489,6 +710,7 @@ class AggTradesPerSymbolPool:
         Get rolling delta for symbol over time window
 
         Delta = sum(buy_volume) - sum(sell_volume) in USDT
+        O(1): read from the per-second cumulative sums.
 
         Args:
             symbol: Trading symbol
@@ -500,23 +722,11 @@ class AggTradesPerSymbolPool:
         symbol = normalize_symbol(symbol).upper()
 
         state = self.delta_states.get(symbol)
-        if not state or not state.trades:
+        if not state or not state.trade_count:
             return Decimal('0')
 
-        current_time = asyncio.get_event_loop().time()
-        cutoff = current_time - window_sec
-
-        buy_volume = Decimal('0')
-        sell_volume = Decimal('0')
-
-        for trade in state.trades:
-            if trade.timestamp >= cutoff:
-                if trade.side == 'buy':
-                    buy_volume += trade.volume_usdt
-                else:
-                    sell_volume += trade.volume_usdt
-
-        delta = buy_volume - sell_volume
+        current_time = time.time()  # Epoch seconds, same base as trade timestamps
+        delta = state.to_decimal(state.delta_since(current_time - window_sec))
         state.rolling_delta = delta
 
         return delta
@@ -526,6 +736,7 @@ class AggTradesPerSymbolPool:
         Get average absolute delta over recent samples
 
         Used as baseline for threshold comparison
+        O(1): one sample per 1-second bucket, summed via cumulative |delta|.
 
         Args:
             symbol: Trading symbol
@@ -537,33 +748,17 @@ class AggTradesPerSymbolPool:
         symbol = normalize_symbol(symbol).upper()
 
         state = self.delta_states.get(symbol)
-        if not state or not state.trades:
+        if not state or not state.trade_count:
             return Decimal('1')  # Return 1 to avoid division by zero
 
-        # Calculate delta for each 1-second bucket
-        current_time = asyncio.get_event_loop().time()
-        bucket_deltas = []
-
-        for i in range(samples):
-            bucket_start = current_time - (i + 1)
-            bucket_end = current_time - i
-
-            bucket_buy = Decimal('0')
-            bucket_sell = Decimal('0')
-
-            for trade in state.trades:
-                if bucket_start <= trade.timestamp < bucket_end:
-                    if trade.side == 'buy':
-                        bucket_buy += trade.volume_usdt
-                    else:
-                        bucket_sell += trade.volume_usdt
-
-            bucket_deltas.append(abs(bucket_buy - bucket_sell))
-
-        if not bucket_deltas:
+        if samples <= 0:
             return Decimal('1')
 
-        avg = sum(bucket_deltas) / len(bucket_deltas)
+        # Average |delta| of the last `samples` completed 1-second buckets
+        # (seconds without trades count as zero)
+        last_sec = math.floor(time.time()) - 1
+        total = state.abs_delta_between(last_sec - samples + 1, last_sec)
+        avg = state.to_decimal(total / samples)
         state.avg_delta = avg
 
         return avg
@@ -573,6 +768,7 @@ class AggTradesPerSymbolPool:
         Get large trade counts in recent window
 
         Large trade = trade > LARGE_TRADE_THRESHOLD (default $10k)
+        O(1): counts are classified on arrival and kept as cumulative sums.
 
         Args:
             symbol: Trading symbol
@@ -584,22 +780,11 @@ class AggTradesPerSymbolPool:
         symbol = normalize_symbol(symbol).upper()
 
         state = self.delta_states.get(symbol)
-        if not state or not state.trades:
+        if not state or not state.trade_count:
             return (0, 0)
 
-        current_time = asyncio.get_event_loop().time()
-        cutoff = current_time - window_sec
-
-        large_buys = 0
-        large_sells = 0
-
-        for trade in state.trades:
-            if trade.timestamp >= cutoff:
-                if trade.volume_usdt >= self.LARGE_TRADE_THRESHOLD:
-                    if trade.side == 'buy':
-                        large_buys += 1
-                    else:
-                        large_sells += 1
+        current_time = time.time()  # Epoch seconds, same base as trade timestamps
+        large_buys, large_sells = state.large_counts_since(current_time - window_sec)
 
         state.large_buy_count = large_buys
         state.large_sell_count = large_sells
@@ -633,14 +818,19 @@ class AggTradesPerSymbolPool:
             'delta_ratio': float(rolling_delta / avg_delta) if avg_delta > 0 else 0,
             'large_buys_60s': large_buys,
             'large_sells_60s': large_sells,
-            'trade_count': len(state.trades),
-            'last_update': state.last_update
+            'trade_count': state.trade_count,
+            'last_update': state.last_update,
+            'memory_bytes': state.memory_bytes(),
         }
 
     # ────────────────── Pool Status ──────────────────
 
     def get_pool_status(self) -> Dict:
         """Get pool status for monitoring"""
+        memory_by_symbol = {
+            symbol: state.memory_bytes()
+            for symbol, state in self.delta_states.items()
+        }
         return {
             'total_connections': len(self._connections),
             'connected_count': sum(
@@ -650,4 +840,9 @@ class AggTradesPerSymbolPool:
             'connections': [
                 c.get_status() for c in self._connections.values()
             ],
+            'precision': self.precision,
+            'multiplexed': self.multiplexed,
+            'transport': self._transport.get_status() if self._transport else None,
+            'memory_bytes_by_symbol': memory_by_symbol,
+            'memory_bytes_total': sum(memory_by_symbol.values()),
         }
@@ -15,48 +15,21 @@ import asyncio
 import aiohttp
 import json
 import logging
+import math
+import time
 from typing import Dict, Callable, Optional, Set, Tuple
-from dataclasses import dataclass, field
-from collections import deque
 from decimal import Decimal
 from datetime import datetime
 
-logger = logging.getLogger(__name__)
-
-
-@dataclass
-class TradeData:
-    """Single aggregated trade"""
-    timestamp: float  # Unix timestamp in seconds
-    price: Decimal
-    quantity: Decimal
-    is_buyer_maker: bool  # True = sell initiated, False = buy initiated
-    
-    @property
-    def side(self) -> str:
-        """Returns 'buy' if buyer initiated, 'sell' if seller initiated"""
-        return 'sell' if self.is_buyer_maker else 'buy'
-    
-    @property
-    def volume_usdt(self) -> Decimal:
-        """Trade volume in USDT"""
-        return self.price * self.quantity
+# Shared per-second delta state (also used by AggTradesPerSymbolPool)
+from websocket.aggtrades_per_symbol_pool import (
+    LARGE_TRADE_THRESHOLD,
+    PRECISION_DECIMAL,
+    SymbolDeltaState,
+)
 
+logger = logging.getLogger(__name__)
 
-@dataclass
-class SymbolDeltaState:
-    """Delta calculation state for a symbol"""
-    trades: deque = field(default_factory=lambda: deque(maxlen=10000))  # Last 10k trades
-    last_update: float = 0.0
-    
-    # Rolling stats
-    rolling_delta: Decimal = Decimal('0')  
-    avg_delta: Decimal = Decimal('0')  # Historical average for comparison
-    
-    # Large trade tracking (>$10k USDT)
-    large_buy_count: int = 0
-    large_sell_count: int = 0
-    
 
 class BinanceAggTradesStream:
     """
@@ -74,16 +47,18 @@ class BinanceAggTradesStream:
     """
     
     # Large trade threshold in USDT
-    LARGE_TRADE_THRESHOLD = Decimal('10000')
+    LARGE_TRADE_THRESHOLD = LARGE_TRADE_THRESHOLD
     
-    def __init__(self, testnet: bool = False):
+    def __init__(self, testnet: bool = False, precision: str = PRECISION_DECIMAL):
         """
         Initialize AggTrades WebSocket
         
         Args:
             testnet: Use testnet endpoints
+            precision: Delta arithmetic, 'decimal' (exact) or 'float' (fast)
         """
         self.testnet = testnet
+        self.precision = precision
         
         # URLs
         if testnet:
@@ -179,7 +154,10 @@ class BinanceAggTradesStream:
         
         # Initialize delta state
         if symbol not in self.delta_states:
-            self.delta_states[symbol] = SymbolDeltaState()
+            self.delta_states[symbol] = SymbolDeltaState(
+                large_trade_threshold=self.LARGE_TRADE_THRESHOLD,
+                precision=self.precision,
+            )
         
         # Add to pending
         self.pending_subscriptions.add(symbol)
@@ -233,23 +211,11 @@ class BinanceAggTradesStream:
         symbol = symbol.upper()
         
         state = self.delta_states.get(symbol)
-        if not state or not state.trades:
+        if not state or not state.trade_count:
             return Decimal('0')
         
-        current_time = asyncio.get_event_loop().time()
-        cutoff = current_time - window_sec
-        
-        buy_volume = Decimal('0')
-        sell_volume = Decimal('0')
-        
-        for trade in state.trades:
-            if trade.timestamp >= cutoff:
-                if trade.side == 'buy':
-                    buy_volume += trade.volume_usdt
-                else:
-                    sell_volume += trade.volume_usdt
-        
-        delta = buy_volume - sell_volume
+        current_time = time.time()  # Epoch seconds, same base as trade timestamps
+        delta = state.to_decimal(state.delta_since(current_time - window_sec))
         state.rolling_delta = delta
         
         return delta
@@ -270,33 +236,16 @@ class BinanceAggTradesStream:
         symbol = symbol.upper()
         
         state = self.delta_states.get(symbol)
-        if not state or not state.trades:
+        if not state or not state.trade_count:
             return Decimal('1')  # Return 1 to avoid division by zero
         
-        # Calculate delta for each 1-second bucket
-        current_time = asyncio.get_event_loop().time()
-        bucket_deltas = []
-        
-        for i in range(samples):
-            bucket_start = current_time - (i + 1)
-            bucket_end = current_time - i
-            
-            bucket_buy = Decimal('0')
-            bucket_sell = Decimal('0')
-            
-            for trade in state.trades:
-                if bucket_start <= trade.timestamp < bucket_end:
-                    if trade.side == 'buy':
-                        bucket_buy += trade.volume_usdt
-                    else:
-                        bucket_sell += trade.volume_usdt
-            
-            bucket_deltas.append(abs(bucket_buy - bucket_sell))
-        
-        if not bucket_deltas:
+        if samples <= 0:
             return Decimal('1')
         
-        avg = sum(bucket_deltas) / len(bucket_deltas)
+        # Average |delta| of the last `samples` completed 1-second buckets
+        last_sec = math.floor(time.time()) - 1
+        total = state.abs_delta_between(last_sec - samples + 1, last_sec)
+        avg = state.to_decimal(total / samples)
         state.avg_delta = avg
         
         return avg
@@ -317,22 +266,11 @@ class BinanceAggTradesStream:
         symbol = symbol.upper()
         
         state = self.delta_states.get(symbol)
-        if not state or not state.trades:
+        if not state or not state.trade_count:
             return (0, 0)
         
-        current_time = asyncio.get_event_loop().time()
-        cutoff = current_time - window_sec
-        
-        large_buys = 0
-        large_sells = 0
-        
-        for trade in state.trades:
-            if trade.timestamp >= cutoff:
-                if trade.volume_usdt >= self.LARGE_TRADE_THRESHOLD:
-                    if trade.side == 'buy':
-                        large_buys += 1
-                    else:
-                        large_sells += 1
+        current_time = time.time()  # Epoch seconds, same base as trade timestamps
+        large_buys, large_sells = state.large_counts_since(current_time - window_sec)
         
         state.large_buy_count = large_buys
         state.large_sell_count = large_sells
@@ -366,7 +304,7 @@ class BinanceAggTradesStream:
             'delta_ratio': float(rolling_delta / avg_delta) if avg_delta > 0 else 0,
             'large_buys_60s': large_buys,
             'large_sells_60s': large_sells,
-            'trade_count': len(state.trades),
+            'trade_count': state.trade_count,
             'last_update': state.last_update
         }
     
@@ -477,17 +415,14 @@ class BinanceAggTradesStream:
         
         state = self.delta_states[symbol]
         
-        # Create trade record
-        trade = TradeData(
-            timestamp=data.get('T', 0) / 1000,  # Convert to seconds
-            price=Decimal(str(data.get('p', '0'))),
-            quantity=Decimal(str(data.get('q', '0'))),
-            is_buyer_maker=data.get('m', False)
+        # Record trade (1-second buckets)
+        state.add_trade(
+            data.get('T', 0) / 1000,  # Convert to seconds
+            data.get('p', '0'),
+            data.get('q', '0'),
+            data.get('m', False),
         )
-        
-        # Add to deque (auto-removes oldest if maxlen exceeded)
-        state.trades.append(trade)
-        state.last_update = asyncio.get_event_loop().time()
+        state.last_update = time.time()
 
         # Notify registered trade handlers (FIX N-5)
         for handler in self._trade_handlers:
@@ -13,6 +13,7 @@ Date: 2025-10-25
 import asyncio
 import aiohttp
 import logging
+import os
 import random
 from typing import Dict, Callable, Optional, Set
 from datetime import datetime
@@ -102,10 +103,12 @@ class BinanceHybridStream:
         self.mark_prices: Dict[str, str] = {}  # {symbol: latest_mark_price}
 
         # ==================== NEW ARCHITECTURE (Expert Panel 2026-02-12) ====================
-        # MarkPricePerSymbolPool: per-symbol WS connections (zero-impact add/remove)
+        # MarkPricePerSymbolPool: per-symbol streams (zero-impact add/remove),
+        # multiplexed on shared combined-stream connections unless disabled
         self.mark_price_pool = MarkPricePerSymbolPool(
             on_price_update=self._on_pool_price_update,
             frequency="1s",
+            multiplexed=os.getenv('MARKET_STREAMS_MULTIPLEXED', 'true').lower() == 'true',
         )
         # SymbolStateManager: single source of truth, replaces 4 overlapping sets
         self.symbol_state = SymbolStateManager(stale_threshold=3.0)
@@ -771,6 +774,10 @@ class BinanceHybridStream:
                 reconnect_count = 0  # Reset on successful connection
                 logger.info("✅ [USER] Connected")
 
+                ledger = self._account_ledger()
+                if ledger:
+                    ledger.on_stream_connected()
+
                 # ✅ FIX: Sync state with snapshot on reconnect
                 # This handles positions opened while disconnected
                 await self._sync_state_with_snapshot()
@@ -804,6 +811,9 @@ class BinanceHybridStream:
 
             finally:
                 self.user_connected = False
+                ledger = self._account_ledger()
+                if ledger:
+                    ledger.on_stream_gap()
 
                 if self.running:
                     reconnect_count += 1
@@ -821,7 +831,14 @@ class BinanceHybridStream:
         event_type = data.get('e')
 
         if event_type == 'ACCOUNT_UPDATE':
+            ledger = self._account_ledger()
+            if ledger:
+                ledger.apply_account_update(data)
             await self._on_account_update(data)
+        elif event_type == 'ACCOUNT_CONFIG_UPDATE':
+            ledger = self._account_ledger()
+            if ledger:
+                ledger.apply_config_update(data)
         elif event_type == 'listenKeyExpired':
             logger.warning("[USER] Listen key expired, reconnecting...")
             self.user_connected = False
@@ -829,6 +846,12 @@ class BinanceHybridStream:
             await self._create_listen_key()
         elif event_type == 'ORDER_TRADE_UPDATE':
             await self._handle_order_update(data)
+        elif event_type == 'ALGO_UPDATE':
+            await self._handle_algo_update(data)
+
+    def _account_ledger(self):
+        """AccountLedger of the exchange manager, if enabled (fed from the user stream)"""
+        return getattr(self.exchange_manager, 'account_ledger', None)
 
     async def _on_account_update(self, data: Dict):
         """
@@ -976,6 +999,45 @@ class BinanceHybridStream:
             except Exception as e:
                 logger.error(f"Order event emission error: {e}")
 
+    async def _handle_algo_update(self, data: Dict):
+        """
+        Handle ALGO_UPDATE event from User Data Stream (Algo / conditional orders).
+
+        Emits 'algo.update' with the same keys as the openAlgoOrders REST
+        response, so consumers (ProtectionSnapshot) can treat both alike.
+        """
+        algo_data = data.get('o', {})
+        if not algo_data:
+            return
+
+        algo_info = {
+            'algoId': algo_data.get('aid'),
+            'clientAlgoId': algo_data.get('caid'),
+            'algoType': algo_data.get('at', ''),
+            'orderType': algo_data.get('o', ''),
+            'symbol': algo_data.get('s', ''),
+            'side': algo_data.get('S', ''),
+            'positionSide': algo_data.get('ps'),
+            'quantity': algo_data.get('q'),
+            'algoStatus': algo_data.get('X', ''),
+            'triggerPrice': algo_data.get('tp'),
+            'price': algo_data.get('p'),
+            'reduceOnly': algo_data.get('R', False),
+            'closePosition': algo_data.get('cp', False),
+            'timestamp': data.get('T'),
+        }
+
+        logger.info(
+            f"[ALGO] {algo_info['algoStatus']}: {algo_info['symbol']} {algo_info['side']} "
+            f"{algo_info['orderType']} trigger={algo_info['triggerPrice']} algoId={algo_info['algoId']}"
+        )
+
+        if self.event_handler:
+            try:
+                await self.event_handler('algo.update', algo_info)
+            except Exception as e:
+                logger.error(f"Algo event emission error: {e}")
+
     async def _sync_state_with_snapshot(self):
         """
         Sync internal state with position snapshot from exchange.
@@ -1,12 +1,28 @@
 import asyncio
+import contextvars
 import logging
-from typing import Dict, List, Callable, Any
+import time
+from typing import Dict, List, Callable, Any, Optional, Tuple
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import deque
 from datetime import datetime
 
+from utils.symbol_helpers import normalize_symbol
+
 logger = logging.getLogger(__name__)
 
+# Lane overflow policies (per event type)
+BLOCK = 'block'              # emit() waits for room (backpressure to the producer)
+DROP_OLDEST = 'drop_oldest'  # Drop the oldest queued event of the same type in the lane
+DROP_NEWEST = 'drop_newest'  # Drop the incoming event
+OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+DEFAULT_LANE_SIZE = 1000
+SHARED_LANE = ''             # Events without a routing key
+
+# Lane whose worker is running the current task (emits from handlers never block)
+_current_lane: contextvars.ContextVar = contextvars.ContextVar('event_router_lane', default=None)
+
 
 @dataclass
 class Event:
@@ -15,31 +31,125 @@ class Event:
     data: Dict[str, Any]
     timestamp: datetime = None
     source: str = None
+    enqueued_at: float = 0.0
 
     def __post_init__(self):
         if not self.timestamp:
             self.timestamp = datetime.now()
 
 
+def default_routing_key(event_name: str, data: Dict[str, Any]) -> str:
+    """Symbol (normalized), else position id, else the shared lane"""
+    symbol = data.get('symbol') or data.get('s')
+    if symbol and isinstance(symbol, str):
+        return normalize_symbol(symbol)
+    position_id = data.get('position_id')
+    if position_id is not None:
+        return f"position:{position_id}"
+    return SHARED_LANE
+
+
+def parse_overflow_policies(spec: str) -> Dict[str, str]:
+    """
+    Parse per-event-type overflow policies: "position.update=drop_oldest,price_update=drop_newest".
+
+    Invalid entries are skipped with a warning.
+    """
+    policies: Dict[str, str] = {}
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, policy = item.partition('=')
+        policy = policy.strip().lower()
+        if not name.strip() or policy not in OVERFLOW_POLICIES:
+            logger.warning(f"Ignoring invalid event router overflow policy: {item!r}")
+            continue
+        policies[name.strip()] = policy
+    return policies
+
+
+class _EventTypeStats:
+    __slots__ = ('dispatched', 'handler_errors', 'dropped', 'queued', 'max_queued',
+                 'latency_total', 'latency_max')
+
+    def __init__(self):
+        self.dispatched = 0
+        self.handler_errors = 0
+        self.dropped = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'dispatched': self.dispatched,
+            'handler_errors': self.handler_errors,
+            'dropped': self.dropped,
+            'queued': self.queued,
+            'max_queued': self.max_queued,
+            'latency_avg_ms': round(self.latency_total / self.dispatched * 1000, 3) if self.dispatched else 0.0,
+            'latency_max_ms': round(self.latency_max * 1000, 3),
+        }
+
+
+class _Lane:
+    __slots__ = ('key', 'events', 'not_full', 'worker')
+
+    def __init__(self, key: str):
+        self.key = key
+        self.events: deque = deque()
+        self.not_full = asyncio.Event()
+        self.not_full.set()
+        self.worker: Optional[asyncio.Task] = None
+
+
 class EventRouter:
     """
     Central event routing system
     Inspired by Node.js EventEmitter pattern
+
+    Events are ordered per routing key (symbol or position id, see
+    default_routing_key): each key has its own lane and worker, so a slow
+    handler only delays later events of the same key. Lanes are bounded
+    (lane_size); when full, the event type's overflow policy applies
+    (default: block). Emits from inside a handler never block.
+
+    Handler tables are immutable: subscribe / unsubscribe build new tuples
+    (wildcard '*' handlers merged in) and swap them in.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        lane_size: int = DEFAULT_LANE_SIZE,
+        overflow_policies: Optional[Dict[str, str]] = None,
+        default_policy: str = BLOCK,
+        routing_key: Callable[[str, Dict[str, Any]], str] = default_routing_key,
+    ):
         """Initialize event router"""
-        self._handlers = defaultdict(list)
+        self._handlers: Dict[str, Tuple[Callable, ...]] = {}
+        self._dispatch: Dict[str, Tuple[Tuple[Callable, bool], ...]] = {}
+        self._wildcard: Tuple[Tuple[Callable, bool], ...] = ()
         self._middleware = []
-        self._event_queue = asyncio.Queue()
-        self._processing = False
+
+        self.lane_size = lane_size
+        self.overflow_policies = dict(overflow_policies or {})
+        self.default_policy = default_policy
+        self.routing_key = routing_key
+        self._lanes: Dict[str, _Lane] = {}
 
         # Statistics
         self.stats = {
             'events_processed': 0,
             'events_failed': 0,
-            'handlers_registered': 0
+            'events_dropped': 0,
+            'handlers_registered': 0,
+            'max_lanes': 0,
+            'max_lane_depth': 0,
+            'emit_waits': 0,
         }
+        self._event_stats: Dict[str, _EventTypeStats] = {}
 
         logger.info("EventRouter initialized")
 
@@ -61,14 +171,35 @@ class EventRouter:
 
     def add_handler(self, event_name: str, handler: Callable):
         """Add event handler"""
-        self._handlers[event_name].append(handler)
+        handlers = dict(self._handlers)
+        handlers[event_name] = handlers.get(event_name, ()) + (handler,)
+        self._swap_handlers(handlers)
         self.stats['handlers_registered'] += 1
         logger.debug(f"Handler registered for '{event_name}'")
 
     def remove_handler(self, event_name: str, handler: Callable):
         """Remove event handler"""
-        if event_name in self._handlers:
-            self._handlers[event_name].remove(handler)
+        if handler not in self._handlers.get(event_name, ()):
+            return
+        handlers = dict(self._handlers)
+        remaining = list(handlers[event_name])
+        remaining.remove(handler)
+        if remaining:
+            handlers[event_name] = tuple(remaining)
+        else:
+            del handlers[event_name]
+        self._swap_handlers(handlers)
+
+    def _swap_handlers(self, handlers: Dict[str, Tuple[Callable, ...]]):
+        """Rebuild the dispatch tables (event handlers + wildcard) and swap them in"""
+        def entries(funcs):
+            return tuple((f, asyncio.iscoroutinefunction(f)) for f in funcs)
+
+        wildcard = entries(handlers.get('*', ()))
+        dispatch = {name: entries(funcs) + wildcard for name, funcs in handlers.items() if name != '*'}
+        self._handlers = handlers
+        self._dispatch = dispatch
+        self._wildcard = wildcard
 
     def use(self, middleware: Callable):
         """Add middleware for all events"""
@@ -78,6 +209,9 @@ class EventRouter:
         """
         Emit event asynchronously
 
+        Queues the event on its routing key's lane; handlers run on the lane
+        worker. Returns once queued (or dropped by the overflow policy).
+
         Args:
             event_name: Name of the event
             data: Event data dictionary
@@ -87,26 +221,99 @@ class EventRouter:
             name=event_name,
             data=data or {},
             source=kwargs.get('source'),
-            timestamp=kwargs.get('timestamp', datetime.now())
+            timestamp=kwargs.get('timestamp', datetime.now()),
+            enqueued_at=time.perf_counter()
         )
-
-        await self._event_queue.put(event)
-
-        # Start processing if not already running
-        if not self._processing:
-            asyncio.create_task(self._process_events())
-
-    async def _process_events(self):
-        """Process events from queue"""
-        self._processing = True
-
+        key = self.routing_key(event_name, event.data)
+
+        while True:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = self._lanes[key] = _Lane(key)
+                self.stats['max_lanes'] = max(self.stats['max_lanes'], len(self._lanes))
+            if len(lane.events) < self.lane_size or _current_lane.get() is not None:
+                break
+
+            policy = self.overflow_policies.get(event_name, self.default_policy)
+            if policy == DROP_NEWEST:
+                self._count_drop(event_name)
+                return
+            if policy == DROP_OLDEST and self._drop_oldest(lane, event_name):
+                break
+            # BLOCK (or nothing of this type to drop): wait for the worker to make room
+            self.stats['emit_waits'] += 1
+            lane.not_full.clear()
+            await lane.not_full.wait()
+
+        self._enqueue(lane, event)
+
+    def _enqueue(self, lane: _Lane, event: Event):
+        lane.events.append(event)
+        depth = len(lane.events)
+        if depth > self.stats['max_lane_depth']:
+            self.stats['max_lane_depth'] = depth
+        stats = self._type_stats(event.name)
+        stats.queued += 1
+        if stats.queued > stats.max_queued:
+            stats.max_queued = stats.queued
+
+        if lane.worker is None:
+            lane.worker = asyncio.create_task(self._run_lane(lane))
+
+    def _drop_oldest(self, lane: _Lane, event_name: str) -> bool:
+        for i, queued in enumerate(lane.events):
+            if queued.name == event_name:
+                del lane.events[i]
+                self._type_stats(event_name).queued -= 1
+                self._count_drop(event_name)
+                return True
+        return False
+
+    def _count_drop(self, event_name: str):
+        self._type_stats(event_name).dropped += 1
+        self.stats['events_dropped'] += 1
+
+    def _type_stats(self, event_name: str) -> _EventTypeStats:
+        stats = self._event_stats.get(event_name)
+        if stats is None:
+            stats = self._event_stats[event_name] = _EventTypeStats()
+        return stats
+
+    async def _run_lane(self, lane: _Lane):
+        """Dispatch a lane's events in order; retire the lane once empty"""
+        _current_lane.set(lane.key)
         try:
-            while not self._event_queue.empty():
-                event = await self._event_queue.get()
+            while lane.events:
+                event = lane.events.popleft()
+                self._type_stats(event.name).queued -= 1
+                lane.not_full.set()
                 await self._handle_event(event)
-
         finally:
-            self._processing = False
+            lane.worker = None
+            if lane.events:
+                # Cancelled with events left (stop()): drop them from the counters
+                for event in lane.events:
+                    self._type_stats(event.name).queued -= 1
+                lane.events.clear()
+            if self._lanes.get(lane.key) is lane:
+                del self._lanes[lane.key]
+            lane.not_full.set()
+
+    async def join(self):
+        """Wait until all queued events (including ones emitted meanwhile) are handled"""
+        while self._lanes:
+            workers = [lane.worker for lane in list(self._lanes.values()) if lane.worker]
+            if not workers:
+                await asyncio.sleep(0)
+                continue
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def stop(self):
+        """Cancel lane workers; queued events are discarded"""
+        workers = [lane.worker for lane in self._lanes.values() if lane.worker]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
 
     async def _handle_event(self, event: Event):
         """Handle single event"""
@@ -121,30 +328,35 @@ class EventRouter:
                 if not event:
                     return
 
-            # Get handlers for event
-            handlers = self._handlers.get(event.name, [])
-
-            # Also check for wildcard handlers
-            if '*' in self._handlers:
-                handlers.extend(self._handlers['*'])
+            # Handlers for event (wildcard handlers already merged in)
+            handlers = self._dispatch.get(event.name, self._wildcard)
 
-            # Log event handling (only for position.update)
             if event.name == 'position.update':
-                logger.info(f"📡 Event '{event.name}': {len(handlers)} handlers")
+                logger.debug(f"📡 Event '{event.name}': {len(handlers)} handlers")
 
             # Execute handlers
             if handlers:
                 tasks = []
-                for handler in handlers:
-                    if asyncio.iscoroutinefunction(handler):
+                for handler, is_async in handlers:
+                    if is_async:
                         tasks.append(handler(event.data))
                     else:
                         handler(event.data)
 
                 if tasks:
-                    await asyncio.gather(*tasks, return_exceptions=True)
+                    results = await asyncio.gather(*tasks, return_exceptions=True)
+                    for result in results:
+                        if isinstance(result, Exception):
+                            self._type_stats(event.name).handler_errors += 1
+                            logger.error(f"Handler error for '{event.name}': {result}")
 
             self.stats['events_processed'] += 1
+            stats = self._type_stats(event.name)
+            stats.dispatched += 1
+            latency = time.perf_counter() - event.enqueued_at if event.enqueued_at else 0.0
+            stats.latency_total += latency
+            if latency > stats.latency_max:
+                stats.latency_max = latency
 
         except Exception as e:
             logger.error(f"Error handling event '{event.name}': {e}")
@@ -166,5 +378,7 @@ class EventRouter:
                 event: len(handlers)
                 for event, handlers in self._handlers.items()
             },
-            'queue_size': self._event_queue.qsize()
-        }
\ No newline at end of file
+            'queue_size': sum(len(lane.events) for lane in self._lanes.values()),
+            'lanes': len(self._lanes),
+            'events': {name: stats.to_dict() for name, stats in self._event_stats.items()},
+        }
@@ -1,9 +1,13 @@
 """
-MarkPricePerSymbolPool — Per-symbol WebSocket connections for Binance Mark Prices
+MarkPricePerSymbolPool — Per-symbol mark price streams for Binance
 
 Architecture:
-  - One WebSocket connection per symbol
-  - URL: wss://fstream.binance.com/ws/{symbol}@markPrice@{frequency}
+  - One PerSymbolConnection per symbol
+  - Multiplexed (default): each one is a {symbol}@markPrice@{frequency}
+    stream on the shared MultiplexedStreamTransport (combined-stream
+    WebSockets, live SUBSCRIBE/UNSUBSCRIBE, 200 streams per connection)
+  - multiplexed=False: one WebSocket per symbol,
+    URL: wss://fstream.binance.com/ws/{symbol}@markPrice@{frequency}
   - Adding/removing a symbol has ZERO impact on other symbols
   - Auto-reconnect with exponential backoff + jitter per connection
   - Built-in heartbeat zombie detection (60s timeout)
@@ -25,6 +29,7 @@ import time
 from typing import Callable, Set, Optional, Dict
 
 from utils.symbol_helpers import normalize_symbol
+from websocket.multiplexed_stream import MultiplexedStreamTransport, get_shared_transport
 
 try:
     import orjson
@@ -43,11 +48,13 @@ MAX_CONNECTIONS_PER_IP = 300  # Binance futures WS limit
 
 class PerSymbolConnection:
     """
-    Single WebSocket connection for one symbol's mark price stream.
+    One symbol's mark price stream.
 
+    With a transport the stream is subscribed on the shared combined-stream
+    connections; without one it opens its own WebSocket:
     URL: wss://fstream.binance.com/ws/{symbol}@markPrice@{frequency}
 
-    Features:
+    Features (own WebSocket):
     - Auto-reconnect with exponential backoff + jitter
     - Heartbeat monitoring (60s frozen detection)
     - Clean lifecycle via `websockets` context manager
@@ -58,16 +65,19 @@ class PerSymbolConnection:
         symbol: str,
         callback: Callable,
         frequency: str = "1s",
+        transport: Optional[MultiplexedStreamTransport] = None,
     ):
         """
         Args:
             symbol: Raw Binance symbol (e.g., 'BTCUSDT')
             callback: Async callback(data: dict) for each markPriceUpdate
             frequency: Mark price frequency ('1s' or '3s')
+            transport: Shared multiplexed transport (None = own WebSocket)
         """
         self.symbol = normalize_symbol(symbol)
         self.callback = callback
         self.frequency = frequency
+        self.transport = transport
 
         # Connection state
         self._running = False
@@ -78,8 +88,8 @@ class PerSymbolConnection:
         self._messages_received = 0
 
         # Build URL: single stream, no combined endpoint needed
-        stream_name = f"{symbol.lower()}@markPrice@{frequency}"
-        self._url = f"{BASE_WS_URL}/{stream_name}"
+        self.stream = f"{symbol.lower()}@markPrice@{frequency}"
+        self._url = f"{BASE_WS_URL}/{self.stream}"
 
     @property
     def connected(self) -> bool:
@@ -90,6 +100,10 @@ class PerSymbolConnection:
         if self._running:
             return
         self._running = True
+        if self.transport is not None:
+            await self.transport.add_stream(self.stream, self._on_stream_data, self._set_connected)
+            logger.debug(f"🌐 [WS-{self.symbol}] Subscribed on multiplexed transport")
+            return
         self._task = asyncio.create_task(self._run_forever())
         logger.info(
             f"🌐 [WS-{self.symbol}] Starting per-symbol connection"
@@ -98,6 +112,8 @@ class PerSymbolConnection:
     async def stop(self):
         """Stop connection gracefully"""
         self._running = False
+        if self.transport is not None:
+            await self.transport.remove_stream(self.stream, self._on_stream_data)
         if self._task and not self._task.done():
             self._task.cancel()
             try:
@@ -194,6 +210,15 @@ class PerSymbolConnection:
             )
             await asyncio.sleep(delay)
 
+    async def _on_stream_data(self, data: dict):
+        """Frame routed by the multiplexed transport (already parsed)"""
+        self._last_message_time = time.monotonic()
+        self._messages_received += 1
+        await self.callback(data)
+
+    def _set_connected(self, connected: bool):
+        self._connected = connected
+
     async def _heartbeat_monitor(self, ws):
         """
         Detect frozen connections (connected but no data flowing).
@@ -239,21 +264,24 @@ class PerSymbolConnection:
             'connected': self._connected,
             'messages_received': self._messages_received,
             'reconnect_count': self._reconnect_count,
+            'last_message_age_sec': round(time.monotonic() - self._last_message_time, 1)
+            if self._last_message_time else None,
         }
 
 
 class MarkPricePerSymbolPool:
     """
-    Pool of per-symbol WebSocket connections for Binance Mark Prices.
+    Pool of per-symbol mark price streams for Binance.
 
     Drop-in replacement for MarkPriceConnectionPool.
-    Each symbol gets its own WebSocket connection, so adding/removing
-    a symbol has ZERO impact on other symbols' data flow.
+    Each symbol gets its own stream (a live SUBSCRIBE on the shared
+    multiplexed transport, or its own WebSocket with multiplexed=False),
+    so adding/removing a symbol has ZERO impact on other symbols' data flow.
 
     API (identical to MarkPriceConnectionPool):
         pool = MarkPricePerSymbolPool(on_price_update=my_callback)
-        await pool.add_symbol('BTCUSDT')     # starts 1 new WS
-        await pool.remove_symbol('BTCUSDT')  # stops only that WS
+        await pool.add_symbol('BTCUSDT')     # subscribes 1 new stream
+        await pool.remove_symbol('BTCUSDT')  # unsubscribes only that stream
         await pool.set_symbols({'BTC', 'ETH'})  # diff-based update
         await pool.stop()                    # stop all
     """
@@ -264,20 +292,36 @@ class MarkPricePerSymbolPool:
         max_streams_per_connection: int = 200,  # Ignored, kept for API compat
         max_connections: int = 3,                # Ignored, kept for API compat
         frequency: str = "1s",
+        multiplexed: bool = True,
+        transport: Optional[MultiplexedStreamTransport] = None,
     ):
         """
         Args:
             on_price_update: Async callback(data: dict) for each markPriceUpdate
-            max_streams_per_connection: IGNORED (API compatibility)
-            max_connections: IGNORED (API compatibility)
+            max_streams_per_connection: IGNORED (API compatibility, set on the transport)
+            max_connections: IGNORED (API compatibility, set on the transport)
             frequency: Mark price update frequency ('1s' or '3s')
+            multiplexed: Streams on a shared combined-stream transport (False = one WS per symbol)
+            transport: Transport to use (default: get_shared_transport())
         """
         self.on_price_update = on_price_update
         self.frequency = frequency
+        self.multiplexed = multiplexed
+        self._transport = transport
 
         self._connections: Dict[str, PerSymbolConnection] = {}
         self._lock = asyncio.Lock()
 
+    def _create_connection(self, symbol: str) -> PerSymbolConnection:
+        if self.multiplexed and self._transport is None:
+            self._transport = get_shared_transport()
+        return PerSymbolConnection(
+            symbol=symbol,
+            callback=self.on_price_update,
+            frequency=self.frequency,
+            transport=self._transport if self.multiplexed else None,
+        )
+
     @property
     def connected(self) -> bool:
         """True if at least one connection is active"""
@@ -298,7 +342,7 @@ class MarkPricePerSymbolPool:
 
     async def add_symbol(self, symbol: str):
         """
-        Add a single symbol — starts one new WS connection.
+        Add a single symbol — starts one new stream.
 
         Zero impact on existing connections.
         """
@@ -308,18 +352,14 @@ class MarkPricePerSymbolPool:
                 logger.debug(f"[POOL] {symbol} already tracked, skipping")
                 return
 
-            if len(self._connections) >= MAX_CONNECTIONS_PER_IP:
+            if not self.multiplexed and len(self._connections) >= MAX_CONNECTIONS_PER_IP:
                 logger.error(
                     f"❌ [POOL] Cannot add {symbol}: at Binance limit "
                     f"({MAX_CONNECTIONS_PER_IP} connections)"
                 )
                 return
 
-            conn = PerSymbolConnection(
-                symbol=symbol,
-                callback=self.on_price_update,
-                frequency=self.frequency,
-            )
+            conn = self._create_connection(symbol)
             self._connections[symbol] = conn
             await conn.start()
             logger.info(
@@ -329,7 +369,7 @@ class MarkPricePerSymbolPool:
 
     async def remove_symbol(self, symbol: str):
         """
-        Remove a single symbol — stops only that WS connection.
+        Remove a single symbol — stops only that stream.
 
         Zero impact on other connections.
         """
@@ -381,17 +421,13 @@ class MarkPricePerSymbolPool:
 
             # Start new connections
             for symbol in added:
-                if len(self._connections) >= MAX_CONNECTIONS_PER_IP:
+                if not self.multiplexed and len(self._connections) >= MAX_CONNECTIONS_PER_IP:
                     logger.error(
                         f"❌ [POOL] Cannot add {symbol}: at Binance limit"
                     )
                     break
 
-                conn = PerSymbolConnection(
-                    symbol=symbol,
-                    callback=self.on_price_update,
-                    frequency=self.frequency,
-                )
+                conn = self._create_connection(symbol)
                 self._connections[symbol] = conn
                 await conn.start()
 
@@ -430,4 +466,6 @@ class MarkPricePerSymbolPool:
             'connections': [
                 c.get_status() for c in self._connections.values()
             ],
+            'multiplexed': self.multiplexed,
+            'transport': self._transport.get_status() if self._transport else None,
         }
@@ -258,6 +258,8 @@ class MarkPriceConnection:
             'streams_count': len(self.streams),
             'messages_received': self._messages_received,
             'reconnect_count': self._reconnect_count,
+            'last_message_age_sec': round(time.monotonic() - self._last_message_time, 1)
+            if self._last_message_time else None,
             'symbols': sorted(self.symbols),
         }
 
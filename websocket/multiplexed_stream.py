@@ -0,0 +1,684 @@
+"""
+MultiplexedStreamTransport — shared Combined Stream connections for Binance market streams
+
+Architecture:
+  - Up to 200 streams per connection on wss://fstream.binance.com/stream
+  - Streams are added/removed with live SUBSCRIBE / UNSUBSCRIBE on open
+    connections: no reconnect, no blackout for the other streams
+  - A new connection is opened only when all open ones are full; when
+    removals leave more connections than needed, the least-loaded one is
+    drained into the others (subscribe on target first, then hand over)
+  - Each frame is parsed once and routed by its "stream" name to the
+    handlers registered for that stream; async handlers run in a task per
+    stream fed by a bounded backlog, so the reader never waits on them
+  - A failed SUBSCRIBE is retried with backoff
+  - Auto-reconnect with exponential backoff + jitter and heartbeat zombie
+    detection (60s timeout) per connection, resubscribing all its streams
+
+Used by MarkPricePerSymbolPool and AggTradesPerSymbolPool: their per-symbol
+connections register one stream each on the shared transport of the
+running event loop (get_shared_transport()), so 300 symbols × 2 streams
+need 3 WebSockets instead of 600.
+
+Date: 2026-10-17
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import math
+import random
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import orjson
+    def _json_loads(s): return orjson.loads(s)
+except ImportError:
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+
+# Binance limits
+COMBINED_WS_URL = "wss://fstream.binance.com/stream"
+MAX_STREAMS_PER_CONNECTION = 200
+MAX_CONNECTIONS = 10
+MAX_PARAMS_PER_MESSAGE = 50          # Streams per SUBSCRIBE / UNSUBSCRIBE request
+CONTROL_MESSAGE_INTERVAL = 0.2       # Binance allows 10 incoming messages/s (incl. pongs)
+REBALANCE_DELAY_SEC = 5.0            # Let bursts of removals settle before consolidating
+HANDOVER_TIMEOUT_SEC = 10.0          # Max wait for the target's SUBSCRIBE ack
+STREAM_BACKLOG_MAX = 100             # Frames queued per stream behind a slow async handler
+SUBSCRIBE_RETRY_MAX_SEC = 60.0
+
+HEARTBEAT_TIMEOUT = 60.0
+HEARTBEAT_CHECK_INTERVAL = 15.0
+
+
+@dataclass
+class StreamRoute:
+    """Handlers of one stream and the connection currently carrying it."""
+    connection: 'MultiplexedConnection'
+    subscribers: List[Tuple[Callable, Optional[Callable]]] = field(default_factory=list)  # (handler, on_state)
+    is_async: bool = False                   # Handlers run in `task`, not in the reader
+    backlog: deque = field(default_factory=lambda: deque(maxlen=STREAM_BACKLOG_MAX))
+    task: Optional[asyncio.Task] = None
+
+
+class MultiplexedConnection:
+    """
+    One Combined Stream WebSocket carrying up to max_streams_per_connection streams.
+
+    `streams` is the desired set; a writer task sends SUBSCRIBE / UNSUBSCRIBE
+    for the difference to what the socket has, so any number of changes
+    between two control messages collapse into one request.
+    """
+
+    def __init__(self, transport: 'MultiplexedStreamTransport', connection_id: int):
+        self.transport = transport
+        self.connection_id = connection_id
+        self.streams: Set[str] = set()       # Streams this connection should carry
+        self.draining = False                # Being emptied by rebalance, takes no new streams
+
+        # Connection state
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._connected = False
+        self._reconnect_count = 0
+        self._last_message_time = 0.0
+        self._messages_received = 0
+
+        # Subscription state of the current socket
+        self._sent: Set[str] = set()         # SUBSCRIBE sent
+        self._acked: Set[str] = set()        # SUBSCRIBE acknowledged
+        self._requests: Dict[int, Tuple[str, List[str]]] = {}
+        self._next_request_id = 1
+        self._last_control_time = 0.0
+        self._dirty = asyncio.Event()
+        self._ack_event = asyncio.Event()
+        self._subscribe_failures = 0
+        self._retry_handle: Optional[asyncio.TimerHandle] = None
+        self.control_messages = 0
+        self.subscribe_retries = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def mark_dirty(self):
+        """Desired streams changed: let the writer send the difference"""
+        self._dirty.set()
+
+    def start(self):
+        """Start connection in background task"""
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run_forever())
+        logger.info(f"🌐 [MUX-{self.connection_id}] Starting combined-stream connection")
+
+    async def stop(self):
+        """Stop connection gracefully"""
+        self._running = False
+        self._cancel_subscribe_retry()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._connected = False
+        logger.info(
+            f"⏹️ [MUX-{self.connection_id}] Stopped "
+            f"(total messages: {self._messages_received})"
+        )
+
+    async def _run_forever(self):
+        """
+        Main connection loop with automatic reconnect.
+
+        Every (re)connect starts with an empty subscription and lets the
+        writer subscribe all streams of the connection.
+        """
+        import websockets
+
+        while self._running:
+            try:
+                logger.debug(f"🌐 [MUX-{self.connection_id}] Connecting to {self.transport.base_url}...")
+
+                async with websockets.connect(
+                    self.transport.base_url,
+                    ping_interval=20,
+                    ping_timeout=30,
+                    close_timeout=10,
+                    max_size=2**20,  # 1MB max message
+                ) as ws:
+                    self._connected = True
+                    self._reconnect_count = 0
+                    self._last_message_time = time.monotonic()
+                    self._sent.clear()
+                    self._acked.clear()
+                    self._requests.clear()
+                    self._cancel_subscribe_retry()
+                    self._subscribe_failures = 0
+                    self._dirty.set()
+                    logger.info(
+                        f"✅ [MUX-{self.connection_id}] Connected ({len(self.streams)} streams)"
+                    )
+
+                    tasks = [
+                        asyncio.create_task(self._heartbeat_monitor(ws)),
+                        asyncio.create_task(self._sync_subscriptions(ws)),
+                    ]
+                    try:
+                        async for message in ws:
+                            if not self._running:
+                                break
+                            self._last_message_time = time.monotonic()
+                            self._messages_received += 1
+                            await self._on_message(message)
+                    finally:
+                        for task in tasks:
+                            task.cancel()
+                        await asyncio.gather(*tasks, return_exceptions=True)
+
+            except asyncio.CancelledError:
+                logger.debug(f"[MUX-{self.connection_id}] Cancelled")
+                break
+
+            except Exception as e:
+                logger.warning(f"❌ [MUX-{self.connection_id}] Connection error: {e}")
+
+            finally:
+                self._connected = False
+                self._acked.clear()
+                self.transport._notify_state(self, self.streams, False)
+
+            if not self._running:
+                break
+
+            # Reconnect with exponential backoff + jitter
+            delay = self._get_reconnect_delay()
+            self._reconnect_count += 1
+            logger.info(
+                f"🔄 [MUX-{self.connection_id}] Reconnecting in {delay:.1f}s "
+                f"(attempt {self._reconnect_count})..."
+            )
+            await asyncio.sleep(delay)
+
+    async def _on_message(self, message):
+        """Parse once, then route data frames by stream or handle request acks"""
+        try:
+            msg = _json_loads(message)
+        except Exception as e:
+            logger.error(f"[MUX-{self.connection_id}] Bad frame: {e}")
+            return
+
+        stream = msg.get('stream')
+        if stream is not None:
+            self.transport._route(self, stream, msg.get('data'))
+            return
+
+        request_id = msg.get('id')
+        if request_id is not None:
+            self._handle_ack(request_id, msg)
+
+    def _handle_ack(self, request_id, msg: Dict):
+        request = self._requests.pop(request_id, None)
+        if request is None:
+            return
+        method, streams = request
+        if msg.get('error'):
+            logger.warning(f"[MUX-{self.connection_id}] {method} {streams} failed: {msg['error']}")
+            if method == 'SUBSCRIBE':
+                self._sent.difference_update(streams)
+                self._schedule_subscribe_retry()
+            return
+        if method == 'SUBSCRIBE':
+            self._subscribe_failures = 0
+            acked = [s for s in streams if s in self._sent]
+            self._acked.update(acked)
+            self.transport._notify_state(self, acked, True)
+            self._ack_event.set()
+
+    def _schedule_subscribe_retry(self):
+        """Let the writer resend unsent streams after exponential backoff + jitter"""
+        self._subscribe_failures += 1
+        base = min(2.0 ** (self._subscribe_failures - 1), SUBSCRIBE_RETRY_MAX_SEC)
+        delay = max(0.5, base + base * 0.25 * (2 * random.random() - 1))
+        self._cancel_subscribe_retry()
+        self._retry_handle = asyncio.get_running_loop().call_later(delay, self._retry_subscribe)
+        logger.info(f"[MUX-{self.connection_id}] Retrying SUBSCRIBE in {delay:.1f}s")
+
+    def _retry_subscribe(self):
+        self._retry_handle = None
+        self.subscribe_retries += 1
+        self.mark_dirty()
+
+    def _cancel_subscribe_retry(self):
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+
+    async def _sync_subscriptions(self, ws):
+        """Writer: send SUBSCRIBE / UNSUBSCRIBE for desired vs. sent streams, paced"""
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+
+            to_unsubscribe = sorted(self._sent - self.streams)
+            to_subscribe = sorted(self.streams - self._sent)
+            for method, streams in (('UNSUBSCRIBE', to_unsubscribe), ('SUBSCRIBE', to_subscribe)):
+                for i in range(0, len(streams), MAX_PARAMS_PER_MESSAGE):
+                    await self._send_control(ws, method, streams[i:i + MAX_PARAMS_PER_MESSAGE])
+
+    async def _send_control(self, ws, method: str, streams: List[str]):
+        wait = self._last_control_time + self.transport.control_interval_sec - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        request_id = self._next_request_id
+        self._next_request_id += 1
+        self._requests[request_id] = (method, streams)
+        if method == 'SUBSCRIBE':
+            self._sent.update(streams)
+        else:
+            self._sent.difference_update(streams)
+            self._acked.difference_update(streams)
+
+        await ws.send(json.dumps({'method': method, 'params': streams, 'id': request_id}))
+        self._last_control_time = time.monotonic()
+        self.control_messages += 1
+        logger.debug(f"[MUX-{self.connection_id}] {method} {len(streams)} streams (id={request_id})")
+
+    async def wait_subscribed(self, streams: Set[str], timeout: float) -> bool:
+        """Wait until all `streams` are acknowledged on the current socket"""
+        deadline = time.monotonic() + timeout
+        while not streams <= self._acked:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._ack_event.clear()
+            try:
+                await asyncio.wait_for(self._ack_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return streams <= self._acked
+        return True
+
+    async def _heartbeat_monitor(self, ws):
+        """
+        Detect frozen connections (connected but no data flowing).
+
+        If no message received for 60s, force-close the WebSocket.
+        The outer loop will automatically reconnect.
+        """
+        while self._running:
+            try:
+                await asyncio.sleep(HEARTBEAT_CHECK_INTERVAL)
+
+                if not self._running:
+                    break
+
+                silence = time.monotonic() - self._last_message_time
+                if silence > HEARTBEAT_TIMEOUT:
+                    logger.warning(
+                        f"💔 [MUX-{self.connection_id}] Frozen! "
+                        f"No messages for {silence:.1f}s. Forcing close..."
+                    )
+                    await ws.close()
+                    break
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"[MUX-{self.connection_id}] Heartbeat error: {e}")
+
+    def _get_reconnect_delay(self) -> float:
+        """Exponential backoff with jitter. Max 60s."""
+        base = min(1.0 * (2 ** self._reconnect_count), 60.0)
+        jitter = base * 0.25 * (2 * random.random() - 1)
+        return max(0.5, base + jitter)
+
+    def get_status(self) -> Dict:
+        return {
+            'connection_id': self.connection_id,
+            'connected': self._connected,
+            'streams': len(self.streams),
+            'subscribed': len(self._acked),
+            'draining': self.draining,
+            'messages_received': self._messages_received,
+            'reconnect_count': self._reconnect_count,
+            'control_messages': self.control_messages,
+            'subscribe_retries': self.subscribe_retries,
+        }
+
+
+class MultiplexedStreamTransport:
+    """
+    Shared Combined Stream connections with live subscription changes.
+
+    Usage:
+        transport = get_shared_transport()
+        await transport.add_stream('btcusdt@markPrice@1s', on_data, on_state)
+        await transport.remove_stream('btcusdt@markPrice@1s', on_data)
+        await transport.stop()
+
+    on_data(data) receives the "data" payload of each frame (same dict as
+    the single-stream endpoint delivers) and may be sync or async. Sync
+    handlers run in the connection reader; a stream with an async handler
+    gets its own task draining a backlog of STREAM_BACKLOG_MAX frames
+    (oldest shed first), so one slow stream does not stall the others.
+    on_state(connected: bool) is called when the stream is acknowledged on
+    an open connection and when that connection drops.
+    """
+
+    def __init__(
+        self,
+        base_url: str = COMBINED_WS_URL,
+        max_streams_per_connection: int = MAX_STREAMS_PER_CONNECTION,
+        max_connections: int = MAX_CONNECTIONS,
+        control_interval_sec: float = CONTROL_MESSAGE_INTERVAL,
+        rebalance_delay_sec: float = REBALANCE_DELAY_SEC,
+    ):
+        """
+        Args:
+            base_url: Combined stream endpoint
+            max_streams_per_connection: Streams per WebSocket (Binance limit 200)
+            max_connections: Upper bound of WebSockets opened by this transport
+            control_interval_sec: Min interval between SUBSCRIBE/UNSUBSCRIBE requests
+            rebalance_delay_sec: Delay before consolidating under-filled connections
+        """
+        self.base_url = base_url
+        self.max_streams_per_connection = max_streams_per_connection
+        self.max_connections = max_connections
+        self.control_interval_sec = control_interval_sec
+        self.rebalance_delay_sec = rebalance_delay_sec
+
+        self._routes: Dict[str, StreamRoute] = {}
+        self._connections: List[MultiplexedConnection] = []
+        self._next_connection_id = 1
+        self._rebalance_task: Optional[asyncio.Task] = None
+
+        # Stats
+        self.frames_routed = 0
+        self.frames_dropped = 0
+        self.frames_shed = 0
+        self.handler_errors = 0
+        self.rebalances = 0
+
+    @property
+    def streams(self) -> Set[str]:
+        return set(self._routes)
+
+    def is_connected(self, stream: str) -> bool:
+        route = self._routes.get(stream)
+        return route is not None and stream in route.connection._acked
+
+    # ────────────────── Subscriptions ──────────────────
+
+    async def add_stream(self, stream: str, handler: Callable, on_state: Optional[Callable] = None) -> bool:
+        """
+        Route `stream` to `handler`, subscribing it on a connection if new.
+
+        Returns False if all connections are full.
+        """
+        route = self._routes.get(stream)
+        if route is not None:
+            route.subscribers.append((handler, on_state))
+            route.is_async = route.is_async or _is_async_handler(handler)
+            if on_state and self.is_connected(stream):
+                on_state(True)
+            return True
+
+        conn = self._pick_connection()
+        if conn is None:
+            logger.error(
+                f"❌ [MUX] Cannot add {stream}: all {self.max_connections} connections "
+                f"at {self.max_streams_per_connection} streams"
+            )
+            return False
+
+        self._routes[stream] = StreamRoute(
+            connection=conn, subscribers=[(handler, on_state)], is_async=_is_async_handler(handler),
+        )
+        conn.streams.add(stream)
+        if conn.running:
+            conn.mark_dirty()
+        else:
+            conn.start()
+        return True
+
+    async def remove_stream(self, stream: str, handler: Callable):
+        """Remove `handler` from `stream`; UNSUBSCRIBE when it was the last one"""
+        route = self._routes.get(stream)
+        if route is None:
+            return
+        route.subscribers = [s for s in route.subscribers if s[0] != handler]
+        if route.subscribers:
+            return
+
+        del self._routes[stream]
+        self._stop_route(route)
+        conn = route.connection
+        conn.streams.discard(stream)
+        if not conn.streams and not conn.draining:
+            self._connections.remove(conn)
+            await conn.stop()
+        else:
+            conn.mark_dirty()
+            self._schedule_rebalance()
+
+    def _pick_connection(self) -> Optional[MultiplexedConnection]:
+        """Least-loaded connection with room; a new one only when all are full"""
+        candidates = [
+            c for c in self._connections
+            if not c.draining and len(c.streams) < self.max_streams_per_connection
+        ]
+        if candidates:
+            return min(candidates, key=lambda c: len(c.streams))
+        if len(self._connections) >= self.max_connections:
+            return None
+        conn = MultiplexedConnection(self, self._next_connection_id)
+        self._next_connection_id += 1
+        self._connections.append(conn)
+        return conn
+
+    # ────────────────── Rebalance ──────────────────
+
+    def _connections_needed(self) -> int:
+        return max(1, math.ceil(len(self._routes) / self.max_streams_per_connection))
+
+    def _schedule_rebalance(self):
+        if len(self._connections) <= self._connections_needed():
+            return
+        if self._rebalance_task is None or self._rebalance_task.done():
+            self._rebalance_task = asyncio.create_task(self._delayed_rebalance())
+
+    async def _delayed_rebalance(self):
+        await asyncio.sleep(self.rebalance_delay_sec)
+        await self.rebalance()
+
+    async def rebalance(self):
+        """
+        Drain least-loaded connections into the others while fewer would do.
+
+        Make-before-break: moved streams are subscribed on the target and
+        acknowledged before their route switches; frames from the source are
+        dropped from then on until its UNSUBSCRIBE goes through.
+        """
+        while len(self._connections) > self._connections_needed():
+            source = min(self._connections, key=lambda c: len(c.streams))
+            targets = [c for c in self._connections if c is not source and c.connected]
+            if not source.streams:
+                self._connections.remove(source)
+                await source.stop()
+                continue
+            spare = sum(self.max_streams_per_connection - len(c.streams) for c in targets)
+            if spare < len(source.streams):
+                return  # Targets not connected yet, retried on the next removal
+
+            source.draining = True
+            moves: Dict[MultiplexedConnection, Set[str]] = {}
+            pending = sorted(source.streams)
+            for target in targets:
+                room = self.max_streams_per_connection - len(target.streams)
+                batch, pending = set(pending[:room]), pending[room:]
+                if batch:
+                    moves[target] = batch
+                    target.streams.update(batch)
+                    target.mark_dirty()
+
+            for target, batch in moves.items():
+                ok = await target.wait_subscribed(batch, HANDOVER_TIMEOUT_SEC)
+                for stream in batch:
+                    route = self._routes.get(stream)
+                    if ok and route is not None and route.connection is source:
+                        route.connection = target
+                        source.streams.discard(stream)
+                    elif route is None or route.connection is not target:
+                        target.streams.discard(stream)   # Removed meanwhile, or handover failed
+                if ok:
+                    self._notify_state(target, batch, True)
+                target.mark_dirty()
+
+            source.draining = False
+            if source.streams:
+                source.mark_dirty()
+                logger.warning(f"[MUX] Rebalance of MUX-{source.connection_id} incomplete, keeping it")
+                return
+
+            self._connections.remove(source)
+            await source.stop()
+            self.rebalances += 1
+            logger.info(
+                f"♻️ [MUX] Drained MUX-{source.connection_id}: "
+                f"{len(self._routes)} streams on {len(self._connections)} connections"
+            )
+
+    # ────────────────── Routing ──────────────────
+
+    def _route(self, conn: MultiplexedConnection, stream: str, data):
+        """Called by the connection reader: never awaits a handler"""
+        route = self._routes.get(stream)
+        if route is None or route.connection is not conn:
+            self.frames_dropped += 1   # Unsubscribed, or duplicate during handover
+            return
+        self.frames_routed += 1
+        if route.is_async:
+            if len(route.backlog) == route.backlog.maxlen:
+                self.frames_shed += 1
+            route.backlog.append(data)
+            if route.task is None:
+                route.task = asyncio.create_task(self._drain_route(stream, route))
+            return
+        pending = []
+        for handler, _ in route.subscribers:
+            try:
+                result = handler(data)
+                if inspect.isawaitable(result):
+                    pending.append(result)
+            except Exception as e:
+                self.handler_errors += 1
+                logger.error(f"[MUX] Handler error for {stream}: {e}")
+        if pending:
+            # Handler not detected as async at add_stream: move the stream to its own task
+            route.is_async = True
+            route.task = asyncio.create_task(self._drain_route(stream, route, pending))
+
+    async def _drain_route(self, stream: str, route: StreamRoute, pending=()):
+        """Run the stream's handlers over its backlog, one frame at a time"""
+        try:
+            for result in pending:
+                try:
+                    await result
+                except Exception as e:
+                    self.handler_errors += 1
+                    logger.error(f"[MUX] Handler error for {stream}: {e}")
+            while route.backlog:
+                data = route.backlog.popleft()
+                for handler, _ in list(route.subscribers):
+                    try:
+                        result = handler(data)
+                        if inspect.isawaitable(result):
+                            await result
+                    except Exception as e:
+                        self.handler_errors += 1
+                        logger.error(f"[MUX] Handler error for {stream}: {e}")
+        finally:
+            if route.task is asyncio.current_task():
+                route.task = None
+
+    @staticmethod
+    def _stop_route(route: StreamRoute):
+        route.backlog.clear()
+        if route.task is not None:
+            route.task.cancel()
+            route.task = None
+
+    def _notify_state(self, conn: MultiplexedConnection, streams, connected: bool):
+        for stream in streams:
+            route = self._routes.get(stream)
+            if route is None or route.connection is not conn:
+                continue
+            for _, on_state in route.subscribers:
+                if on_state:
+                    on_state(connected)
+
+    # ────────────────── Lifecycle ──────────────────
+
+    async def stop(self):
+        """Stop all connections and drop all routes"""
+        if self._rebalance_task and not self._rebalance_task.done():
+            self._rebalance_task.cancel()
+            try:
+                await self._rebalance_task
+            except asyncio.CancelledError:
+                pass
+        connections, self._connections = self._connections, []
+        for route in self._routes.values():
+            self._stop_route(route)
+        self._routes.clear()
+        if connections:
+            await asyncio.gather(*(c.stop() for c in connections))
+
+    def get_status(self) -> Dict:
+        return {
+            'total_connections': len(self._connections),
+            'connected_count': sum(1 for c in self._connections if c.connected),
+            'total_streams': len(self._routes),
+            'max_streams_per_connection': self.max_streams_per_connection,
+            'frames_routed': self.frames_routed,
+            'frames_dropped': self.frames_dropped,
+            'frames_shed': self.frames_shed,
+            'handler_errors': self.handler_errors,
+            'rebalances': self.rebalances,
+            'connections': [c.get_status() for c in self._connections],
+        }
+
+
+def _is_async_handler(handler: Callable) -> bool:
+    return inspect.iscoroutinefunction(handler) or inspect.iscoroutinefunction(
+        getattr(handler, '__call__', None)
+    )
+
+
+_shared_transports: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MultiplexedStreamTransport]' = \
+    weakref.WeakKeyDictionary()
+
+
+def get_shared_transport() -> MultiplexedStreamTransport:
+    """Transport shared by all market-stream pools of the running event loop"""
+    loop = asyncio.get_running_loop()
+    transport = _shared_transports.get(loop)
+    if transport is None:
+        transport = MultiplexedStreamTransport()
+        _shared_transports[loop] = transport
+    return transport
@@ -7,12 +7,15 @@ WebSocket клиент для получения торговых сигнало
 import asyncio
 import json
 import logging
+import time
 from datetime import datetime
 from typing import Optional, Callable, List, Dict
 from enum import Enum
 
 import websockets
 
+from core.latency_trace import ERROR, TRACE_KEY
+
 logger = logging.getLogger('SignalWSClient')
 
 
@@ -30,7 +33,7 @@ class SignalWebSocketClient:
     WebSocket клиент для получения сигналов от сервера
     """
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, tracer=None):
         # Настройки подключения
         self.server_url = config.get('SIGNAL_WS_URL', 'ws://localhost:8765')
         self.auth_token = config.get('SIGNAL_WS_TOKEN')
@@ -70,6 +73,9 @@ class SignalWebSocketClient:
         # Accumulator for individual 'signal' messages (broadcast)
         self._pending_signals: List[dict] = []
 
+        # Latency tracing (core.latency_trace.SignalTracer): traces start at frame arrival
+        self.tracer = tracer
+
         logger.info(f"Signal WebSocket Client initialized for {self.server_url}")
 
     def set_callbacks(self, **kwargs):
@@ -235,6 +241,8 @@ class SignalWebSocketClient:
 
     async def handle_message(self, message: str):
         """Обработка сообщения от сервера"""
+        received_ns = time.monotonic_ns() if self.tracer else 0
+        normalized = None
         try:
             data = json.loads(message)
             msg_type = data.get('type')
@@ -242,6 +250,11 @@ class SignalWebSocketClient:
             if msg_type == 'signal':
                 # Individual signal (broadcast from server)
                 normalized = self._normalize_signal(data)
+                if self.tracer:
+                    trace = self.tracer.start(normalized.get('symbol') or '', start_ns=received_ns)
+                    if trace.sampled:
+                        trace.mark('decode')
+                        normalized[TRACE_KEY] = trace.trace_id
                 self._pending_signals.append(normalized)
                 # Flush immediately — each broadcast is a complete signal
                 await self._flush_pending_signals()
@@ -276,6 +289,8 @@ class SignalWebSocketClient:
             logger.error(f"Invalid JSON: {message[:100]}")
         except Exception as e:
             logger.error(f"Error handling message: {e}")
+            if self.tracer and normalized is not None:
+                self.tracer.discard(normalized, ERROR)
 
     @staticmethod
     def _normalize_signal(data: dict) -> dict:
@@ -344,6 +359,9 @@ class SignalWebSocketClient:
         # Вызываем callback если установлен
         if self.on_signals_callback:
             await self.on_signals_callback(signals)
+        elif self.tracer:
+            for signal in signals:
+                self.tracer.discard(signal)
 
     async def reconnect(self):
         """